@@ -0,0 +1,118 @@
+<?php
+require_once __DIR__ . '/ChallanGenerator.php';
+
+/**
+ * Content-addressed index of generated challans
+ *
+ * Every challan is keyed by a hash of the template and the student fields
+ * printed on it. A challan whose key is unchanged and whose file is still on
+ * disk is not rendered or written again. The index is kept as JSON in the
+ * output directory; paths in it are relative to that directory.
+ */
+class ChallanCache
+{
+    const INDEX_FILE = 'challan_index.json';
+
+    public $hits = 0;
+    public $misses = 0;
+
+    private $directory;
+    private $index = [];
+    private $seen = [];
+    private $dirty = false;
+
+    private static $templateHash = null;
+
+    /**
+     * @param string $directory Directory holding the challans and the index
+     */
+    public function __construct($directory)
+    {
+        $this->directory = rtrim($directory, '/');
+        $file = $this->directory . '/' . self::INDEX_FILE;
+        if (is_file($file)) {
+            $this->index = json_decode(file_get_contents($file), true) ?: [];
+        }
+    }
+
+    /**
+     * Cache key for one student's challan
+     */
+    public static function key($studentId, $studentName)
+    {
+        if (self::$templateHash === null) {
+            self::$templateHash = sha1(ChallanGenerator::TEMPLATE);
+        }
+        return sha1(self::$templateHash . "\0" . $studentId . "\0" . $studentName);
+    }
+
+    /**
+     * Path of an up-to-date challan for this student, or false on a miss
+     */
+    public function lookup($studentId, $key)
+    {
+        $this->seen[$studentId] = true;
+        $entry = $this->index[$studentId] ?? null;
+        if ($entry !== null && $entry['key'] === $key && is_file($this->directory . '/' . $entry['path'])) {
+            $this->hits++;
+            return $entry['path'];
+        }
+        $this->misses++;
+        return false;
+    }
+
+    /**
+     * Records a freshly written challan
+     */
+    public function store($studentId, $key, $path, $generatedAt)
+    {
+        $this->seen[$studentId] = true;
+        $this->index[$studentId] = ['key' => $key, 'path' => $path, 'generated_at' => $generatedAt];
+        $this->dirty = true;
+    }
+
+    public function entry($studentId)
+    {
+        return $this->index[$studentId] ?? null;
+    }
+
+    public function count()
+    {
+        return count($this->index);
+    }
+
+    /**
+     * Deletes challans of students not looked up or stored since the cache was opened
+     *
+     * @return int Number of challans removed
+     */
+    public function prune()
+    {
+        $removed = 0;
+        foreach ($this->index as $studentId => $entry) {
+            if (!isset($this->seen[$studentId])) {
+                @unlink($this->directory . '/' . $entry['path']);
+                unset($this->index[$studentId]);
+                $removed++;
+            }
+        }
+        if ($removed > 0) {
+            $this->dirty = true;
+        }
+        return $removed;
+    }
+
+    /**
+     * Writes the index back if anything changed
+     */
+    public function save()
+    {
+        if (!$this->dirty) {
+            return;
+        }
+        $file = $this->directory . '/' . self::INDEX_FILE;
+        file_put_contents($file . '.tmp', json_encode($this->index));
+        rename($file . '.tmp', $file);
+        $this->dirty = false;
+    }
+}
@@ -1,4 +1,6 @@
 <?php
+require_once __DIR__ . '/ChallanCache.php';
+
 /**
  * PDF Generator class that uses HTML/CSS for generating fee challans
  * This eliminates the need for FPDF
@@ -6,19 +8,10 @@
 class ChallanGenerator
 {
     /**
-     * Generates a fee challan for a student as an HTML file
-     * 
-     * @param string $studentId The ID of the student
-     * @param string $studentName The name of the student
-     * @return string The filename of the generated HTML challan
+     * Challan markup; {{name}} placeholders are filled in by render()
      */
-    public static function generateChallan($studentId, $studentName)
-    {
-        // Generate filename
-        $filename = $studentId . '_challan.html';
-        
-        // Create HTML content
-        $html = '<!DOCTYPE html>
+    const TEMPLATE = <<<'HTML'
+<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -48,8 +41,13 @@ class ChallanGenerator
             text-align: center;
             font-size: 12px;
         }
+        @page {
+            size: A4;
+            margin: 0;
+        }
         @media print {
             body {
+                box-sizing: border-box;
                 width: 210mm;
                 height: 297mm;
             }
@@ -60,19 +58,243 @@ class ChallanGenerator
     <div class="header">Fee Challan</div>
     
     <div class="content">
-        <div class="info">Student ID: ' . htmlspecialchars($studentId) . '</div>
-        <div class="info">Student Name: ' . htmlspecialchars($studentName) . '</div>
+        <div class="info">Student ID: {{student_id}}</div>
+        <div class="info">Student Name: {{student_name}}</div>
     </div>
     
     <div class="footer">
-        This document was generated on ' . date('Y-m-d H:i:s') . '
+        This document was generated on {{generated_at}}
     </div>
 </body>
-</html>';
-        
+</html>
+HTML;
+
+    /**
+     * Challans per directory (or per folder inside an archive) in bulk mode
+     */
+    const SHARD_SIZE = 1000;
+
+    /**
+     * Template split once into literal and placeholder pieces
+     */
+    private static $compiled = null;
+
+    /**
+     * Generates a fee challan for a student as an HTML file
+     * 
+     * @param string $studentId The ID of the student
+     * @param string $studentName The name of the student
+     * @param ChallanCache|null $cache Cache for the current directory; an unchanged challan is not rewritten
+     * @return string The filename of the generated HTML challan
+     */
+    public static function generateChallan($studentId, $studentName, $cache = null)
+    {
+        // Generate filename
+        $filename = $studentId . '_challan.html';
+
+        if ($cache !== null) {
+            $key = ChallanCache::key($studentId, $studentName);
+            if ($cache->lookup($studentId, $key) === $filename) {
+                return $filename;
+            }
+        }
+
         // Save to file
-        file_put_contents($filename, $html);
-        
+        $generatedAt = date('Y-m-d H:i:s');
+        file_put_contents($filename, self::render($studentId, $studentName, $generatedAt));
+        if ($cache !== null) {
+            $cache->store($studentId, $key, $filename, $generatedAt);
+        }
+
         return $filename;
     }
-}
\ No newline at end of file
+
+    /**
+     * Renders the challan HTML for one student
+     *
+     * @param string $studentId The ID of the student
+     * @param string $studentName The name of the student
+     * @param string $generatedAt Timestamp printed in the footer
+     * @return string The challan HTML
+     */
+    public static function render($studentId, $studentName, $generatedAt)
+    {
+        if (self::$compiled === null) {
+            self::$compiled = preg_split('/\{\{(\w+)\}\}/', self::TEMPLATE, -1, PREG_SPLIT_DELIM_CAPTURE);
+        }
+        $values = [
+            'student_id' => htmlspecialchars($studentId),
+            'student_name' => htmlspecialchars($studentName),
+            'generated_at' => $generatedAt,
+        ];
+
+        // Odd pieces are placeholder names, even pieces are literal markup
+        $html = '';
+        foreach (self::$compiled as $i => $piece) {
+            $html .= ($i % 2) ? $values[$piece] : $piece;
+        }
+        return $html;
+    }
+
+    /**
+     * Generates challans for every row of the student table in one pass
+     *
+     * Rows are streamed from an unbuffered query and every challan shares one
+     * timestamp. Output goes to a .tar or .zip archive, or to a directory
+     * with one sub-directory per SHARD_SIZE challans. The tar writer streams
+     * to disk; ZipArchive keeps entries in memory until the archive is closed.
+     *
+     * A directory is kept up to date through a ChallanCache: students whose
+     * challan fields are unchanged are skipped, and challans of students no
+     * longer in the table are deleted. Archives are always written in full.
+     *
+     * With a ChallanLedger every student is also issued a challan in the
+     * ledger. The ledger needs its own connection, since $conn is busy
+     * streaming rows until the end of the run.
+     *
+     * @param mysqli $conn Database connection
+     * @param string $output Path ending in .tar or .zip, or a directory
+     * @param ChallanLedger|null $ledger Ledger to record issued challans in
+     * @return array count, bytes, seconds, per_second, hits, misses, removed and issued for the run
+     */
+    public static function generateBulk($conn, $output, $ledger = null)
+    {
+        $format = self::outputFormat($output);
+        $generatedAt = date('Y-m-d H:i:s');
+        $mtime = time();
+        $started = hrtime(true);
+
+        if ($format === 'zip') {
+            $zip = new ZipArchive();
+            if ($zip->open($output, ZipArchive::CREATE | ZipArchive::OVERWRITE) !== true) {
+                throw new RuntimeException("Cannot create archive $output");
+            }
+        } elseif ($format === 'tar') {
+            $tar = fopen($output, 'wb');
+            if ($tar === false) {
+                throw new RuntimeException("Cannot create archive $output");
+            }
+        } else {
+            if (!is_dir($output) && !mkdir($output, 0777, true)) {
+                throw new RuntimeException("Cannot create directory $output");
+            }
+            $cache = new ChallanCache($output);
+        }
+
+        $result = $conn->query("SELECT Student_ID, Name, Point_no FROM student", MYSQLI_USE_RESULT);
+        if ($result === false) {
+            throw new RuntimeException("Query failed: " . $conn->error);
+        }
+
+        $count = 0;
+        $bytes = 0;
+        while ($row = $result->fetch_row()) {
+            if ($ledger !== null) {
+                $ledger->issue($row[0], $row[1], $row[2]);
+            }
+            $name = self::shardPath($count, $row[0]);
+            if ($format === 'dir') {
+                $key = ChallanCache::key($row[0], $row[1]);
+                if ($cache->lookup($row[0], $key) !== false) {
+                    $count++;
+                    continue;
+                }
+                // A changed challan is rewritten in place
+                $entry = $cache->entry($row[0]);
+                if ($entry !== null) {
+                    $name = $entry['path'];
+                }
+            }
+            $html = self::render($row[0], $row[1], $generatedAt);
+
+            if ($format === 'zip') {
+                $zip->addFromString($name, $html);
+            } elseif ($format === 'tar') {
+                fwrite($tar, self::tarHeader($name, strlen($html), $mtime));
+                fwrite($tar, str_pad($html, (int) ceil(strlen($html) / 512) * 512, "\0"));
+            } else {
+                $dir = $output . '/' . dirname($name);
+                if (!is_dir($dir)) {
+                    mkdir($dir);
+                }
+                file_put_contents($output . '/' . $name, $html);
+                $cache->store($row[0], $key, $name, $generatedAt);
+            }
+
+            $count++;
+            $bytes += strlen($html);
+        }
+        $result->free();
+        if ($ledger !== null) {
+            $ledger->flush();
+        }
+
+        $removed = 0;
+        if ($format === 'dir') {
+            $removed = $cache->prune();
+            $cache->save();
+        }
+
+        if ($format === 'zip') {
+            $zip->close();
+        } elseif ($format === 'tar') {
+            // End of archive: two empty records
+            fwrite($tar, str_repeat("\0", 1024));
+            fclose($tar);
+        }
+
+        $seconds = (hrtime(true) - $started) / 1e9;
+        return [
+            'output' => $output,
+            'format' => $format,
+            'count' => $count,
+            'bytes' => $bytes,
+            'seconds' => $seconds,
+            'per_second' => $seconds > 0 ? $count / $seconds : 0,
+            'hits' => $format === 'dir' ? $cache->hits : 0,
+            'misses' => $format === 'dir' ? $cache->misses : $count,
+            'removed' => $removed,
+            'issued' => $ledger !== null ? $count : 0,
+        ];
+    }
+
+    /**
+     * Archive type implied by the output path
+     */
+    private static function outputFormat($output)
+    {
+        $extension = strtolower(pathinfo($output, PATHINFO_EXTENSION));
+        return in_array($extension, ['tar', 'zip']) ? $extension : 'dir';
+    }
+
+    /**
+     * Relative path of the n-th challan, e.g. 0012/k213199_challan.html
+     */
+    private static function shardPath($n, $studentId)
+    {
+        $safeId = preg_replace('/[^A-Za-z0-9_.-]/', '_', $studentId);
+        return sprintf('%04d', intdiv($n, self::SHARD_SIZE)) . '/' . $safeId . '_challan.html';
+    }
+
+    /**
+     * 512-byte ustar header for a regular file
+     */
+    private static function tarHeader($name, $size, $mtime)
+    {
+        $header = str_pad($name, 100, "\0")
+            . sprintf("%07o\0", 0644)
+            . sprintf("%07o\0", 0)
+            . sprintf("%07o\0", 0)
+            . sprintf("%011o\0", $size)
+            . sprintf("%011o\0", $mtime)
+            . str_repeat(' ', 8)
+            . '0'
+            . str_repeat("\0", 100)
+            . "ustar\0" . "00"
+            . str_repeat("\0", 32 + 32 + 8 + 8 + 155 + 12);
+
+        // Checksum is the byte sum with the checksum field read as spaces
+        $checksum = array_sum(unpack('C*', $header));
+        return substr_replace($header, sprintf("%06o\0 ", $checksum), 148, 8);
+    }
+}
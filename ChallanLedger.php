@@ -0,0 +1,155 @@
+<?php
+/**
+ * Ledger of issued fee challans
+ *
+ * Challan numbers are reserved from the challan_sequence row in blocks of
+ * BLOCK_SIZE, so issuing thousands of challans touches the counter row once
+ * per block instead of once per challan. Unused numbers of a block are lost
+ * when the ledger goes away; numbers are unique but not gap-free.
+ *
+ * Issued challans are buffered and written with multi-row INSERTs of up to
+ * BATCH_SIZE rows. Call flush() (or let the destructor do it) before reading
+ * them back.
+ */
+class ChallanLedger
+{
+    const FEE_AMOUNT = 35000;
+
+    const BLOCK_SIZE = 1000;
+    const BATCH_SIZE = 500;
+
+    private $db;
+    private $blockSize;
+    private $nextNumber = 0;
+    private $blockEnd = 0;
+    private $pending = [];
+    private $batchStmt = null;
+
+    /**
+     * @param mysqli $dbConnection Connection the ledger writes through
+     * @param int $blockSize Challan numbers reserved per trip to the sequence row
+     */
+    public function __construct($dbConnection, $blockSize = self::BLOCK_SIZE)
+    {
+        $this->db = $dbConnection;
+        $this->blockSize = $blockSize;
+    }
+
+    public function __destruct()
+    {
+        if ($this->pending) {
+            $this->flush();
+        }
+    }
+
+    /**
+     * Reserve $count consecutive challan numbers
+     *
+     * @return int The first number of the block
+     */
+    public function allocate($count)
+    {
+        // LAST_INSERT_ID(expr) hands the new value back on this connection only
+        $stmt = $this->db->prepare("UPDATE challan_sequence SET next_value = LAST_INSERT_ID(next_value + ?) WHERE id = 1");
+        $stmt->bind_param("i", $count);
+        $stmt->execute();
+        $stmt->close();
+
+        return $this->db->insert_id - $count;
+    }
+
+    /**
+     * Next challan number, reserving a new block when the current one runs out
+     */
+    public function nextNumber()
+    {
+        if ($this->nextNumber >= $this->blockEnd) {
+            $this->nextNumber = $this->allocate($this->blockSize);
+            $this->blockEnd = $this->nextNumber + $this->blockSize;
+        }
+        return $this->nextNumber++;
+    }
+
+    /**
+     * Record a challan for a student
+     *
+     * @return array The challan as it will be stored, including its number
+     */
+    public function issue($studentId, $studentName, $pointNo, $amount = self::FEE_AMOUNT)
+    {
+        $challan = [
+            'Challan_no' => $this->nextNumber(),
+            'Student_ID' => $studentId,
+            'Name' => $studentName,
+            'Point_no' => $pointNo,
+            'Amount' => $amount,
+            'Issued_at' => date('Y-m-d H:i:s'),
+        ];
+        $this->pending[] = $challan;
+        if (count($this->pending) >= self::BATCH_SIZE) {
+            $this->flush();
+        }
+        return $challan;
+    }
+
+    /**
+     * Write buffered challans
+     *
+     * @return int Number of challans written
+     */
+    public function flush()
+    {
+        $written = 0;
+        foreach (array_chunk($this->pending, self::BATCH_SIZE) as $batch) {
+            $stmt = $this->insertStatement(count($batch));
+            $values = [];
+            foreach ($batch as $challan) {
+                array_push($values, ...array_values($challan));
+            }
+            $stmt->bind_param(str_repeat("isssis", count($batch)), ...$values);
+            $stmt->execute();
+            if (count($batch) < self::BATCH_SIZE) {
+                $stmt->close();
+            }
+            $written += count($batch);
+        }
+        $this->pending = [];
+        return $written;
+    }
+
+    /**
+     * Most recent challan issued to a student, for reprints
+     *
+     * @return array|null Null when the student has no challan
+     */
+    public function latestFor($studentId)
+    {
+        $stmt = $this->db->prepare(
+            "SELECT Challan_no, Student_ID, Name, Point_no, Amount, Issued_at FROM challan
+             WHERE Student_ID = ? ORDER BY Issued_at DESC, Challan_no DESC LIMIT 1"
+        );
+        $stmt->bind_param("s", $studentId);
+        $stmt->execute();
+        $row = $stmt->get_result()->fetch_assoc();
+        $stmt->close();
+
+        return $row ?: null;
+    }
+
+    /**
+     * Prepared multi-row INSERT; the full-size one is kept for reuse
+     */
+    private function insertStatement($rows)
+    {
+        if ($rows === self::BATCH_SIZE && $this->batchStmt !== null) {
+            return $this->batchStmt;
+        }
+        $sql = "INSERT INTO challan (Challan_no, Student_ID, Name, Point_no, Amount, Issued_at) VALUES "
+            . implode(", ", array_fill(0, $rows, "(?, ?, ?, ?, ?, ?)"));
+        $stmt = $this->db->prepare($sql);
+        if ($rows === self::BATCH_SIZE) {
+            $this->batchStmt = $stmt;
+        }
+        return $stmt;
+    }
+}
@@ -0,0 +1,197 @@
+<?php
+require_once __DIR__ . '/RouteIndex.php';
+
+/**
+ * Stop arrival predictions for buses on their routes
+ *
+ * Each route's stops are loaded once into a RouteIndex. A bus's latest fix is
+ * snapped onto its route and the distance to every stop still ahead is turned
+ * into an ETA. Results are cached per driver and reused until the driver's
+ * fix changes. When APCu is available the route indexes and the per-driver
+ * cache survive across requests.
+ */
+class EtaService
+{
+    // 30 km/h, a fixed assumed average bus speed; no speed is measured from the fixes
+    const DEFAULT_SPEED_MPS = 8.3;
+
+    const CACHE_TTL = 300;
+
+    private $db;
+    private $indexes = [];
+    private $driverCache = [];
+    private $useApcu;
+
+    public $hits = 0;
+    public $misses = 0;
+
+    /**
+     * Constructor accepts a database connection
+     */
+    public function __construct($dbConnection)
+    {
+        $this->db = $dbConnection;
+        $this->useApcu = function_exists('apcu_fetch') && ini_get('apc.enabled');
+    }
+
+    /**
+     * Get the spatial index for a route, building it on first use
+     *
+     * @param string $route Route name as stored in the driver table
+     * @return RouteIndex|null Null when the route has fewer than two stops
+     */
+    public function routeIndex($route)
+    {
+        if (array_key_exists($route, $this->indexes)) {
+            return $this->indexes[$route];
+        }
+
+        $key = 'eta_route_' . $route;
+        if ($this->useApcu) {
+            $index = apcu_fetch($key, $found);
+            if ($found) {
+                return $this->indexes[$route] = $index;
+            }
+        }
+
+        $stmt = $this->db->prepare("SELECT Stop_name, lat, lng FROM route_stop WHERE Route = ? ORDER BY Stop_seq");
+        $stmt->bind_param("s", $route);
+        $stmt->execute();
+        $result = $stmt->get_result();
+
+        $stops = [];
+        while ($row = $result->fetch_assoc()) {
+            $stops[] = ['name' => $row['Stop_name'], 'lat' => (float) $row['lat'], 'lng' => (float) $row['lng']];
+        }
+        $stmt->close();
+
+        $index = count($stops) >= 2 ? new RouteIndex($stops) : null;
+        if ($this->useApcu) {
+            apcu_store($key, $index, self::CACHE_TTL);
+        }
+
+        return $this->indexes[$route] = $index;
+    }
+
+    /**
+     * Register a prebuilt index for a route
+     *
+     * @param string $route Route name
+     * @param RouteIndex $index Index to use for it
+     */
+    public function setRouteIndex($route, RouteIndex $index)
+    {
+        $this->indexes[$route] = $index;
+    }
+
+    /**
+     * ETAs for one driver from its latest persisted fix
+     *
+     * @param string $driverId The ID of the driver
+     * @return array|false ETA data, or false when the driver, its route or its position is unknown
+     */
+    public function etaForDriver($driverId)
+    {
+        $stmt = $this->db->prepare(
+            "SELECT d.Route, l.lat_e5, l.lng_e5 FROM driver d JOIN driver_location l ON l.Driver_ID = d.Driver_ID WHERE d.Driver_ID = ?"
+        );
+        $stmt->bind_param("s", $driverId);
+        $stmt->execute();
+        $row = $stmt->get_result()->fetch_assoc();
+        $stmt->close();
+
+        if (!$row) {
+            return false;
+        }
+
+        return $this->compute($driverId, $row['Route'], $row['lat_e5'] / 100000, $row['lng_e5'] / 100000);
+    }
+
+    /**
+     * ETAs for every driver that has reported a position
+     *
+     * @return array Driver_ID => ETA data
+     */
+    public function etaForFleet()
+    {
+        $result = $this->db->query(
+            "SELECT d.Driver_ID, d.Route, l.lat_e5, l.lng_e5 FROM driver d JOIN driver_location l ON l.Driver_ID = d.Driver_ID"
+        );
+
+        $fleet = [];
+        while ($row = $result->fetch_assoc()) {
+            $eta = $this->compute($row['Driver_ID'], $row['Route'], $row['lat_e5'] / 100000, $row['lng_e5'] / 100000);
+            if ($eta !== false) {
+                $fleet[$row['Driver_ID']] = $eta;
+            }
+        }
+        return $fleet;
+    }
+
+    /**
+     * Snap a fix onto a route and compute ETAs for the stops still ahead
+     *
+     * @param string $driverId The ID of the driver, used as the cache key
+     * @param string $route Route the driver is on
+     * @param float $lat Latitude of the fix
+     * @param float $lng Longitude of the fix
+     * @param float $speedMps Expected speed in metres per second
+     * @return array|false ETA data, or false when the route has no stops
+     */
+    public function compute($driverId, $route, $lat, $lng, $speedMps = self::DEFAULT_SPEED_MPS)
+    {
+        $fix = $route . '|' . round($lat * 100000) . '|' . round($lng * 100000) . '|' . $speedMps;
+
+        $cached = $this->cacheGet($driverId);
+        if ($cached !== null && $cached['fix'] === $fix) {
+            $this->hits++;
+            return $cached['eta'];
+        }
+        $this->misses++;
+
+        $index = $this->routeIndex($route);
+        if ($index === null) {
+            return false;
+        }
+
+        $snapped = $index->snap($lat, $lng);
+        $stops = [];
+        foreach ($index->remainingStops($snapped['along']) as $stop) {
+            $stop['eta_s'] = (int) round($stop['distance_m'] / $speedMps);
+            $stop['distance_m'] = (int) round($stop['distance_m']);
+            $stops[] = $stop;
+        }
+
+        $eta = [
+            'route' => $route,
+            'snapped' => ['lat' => round($snapped['lat'], 6), 'lng' => round($snapped['lng'], 6)],
+            'off_route_m' => (int) round($snapped['offset']),
+            'stops' => $stops,
+        ];
+
+        $this->cacheSet($driverId, ['fix' => $fix, 'eta' => $eta]);
+        return $eta;
+    }
+
+    private function cacheGet($driverId)
+    {
+        if (isset($this->driverCache[$driverId])) {
+            return $this->driverCache[$driverId];
+        }
+        if ($this->useApcu) {
+            $entry = apcu_fetch('eta_driver_' . $driverId, $found);
+            if ($found) {
+                return $this->driverCache[$driverId] = $entry;
+            }
+        }
+        return null;
+    }
+
+    private function cacheSet($driverId, $entry)
+    {
+        $this->driverCache[$driverId] = $entry;
+        if ($this->useApcu) {
+            apcu_store('eta_driver_' . $driverId, $entry, self::CACHE_TTL);
+        }
+    }
+}
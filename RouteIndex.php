@@ -0,0 +1,223 @@
+<?php
+/**
+ * Spatial index over one route's stop sequence
+ *
+ * The route is the polyline through its stops. Segments are bucketed into a
+ * uniform grid so snapping a bus only looks at the few segments in the cells
+ * around it instead of the whole route.
+ */
+class RouteIndex
+{
+    const METERS_PER_DEGREE = 111320.0;
+    const CELL_METERS = 500.0;
+
+    // Beyond this many rings around the bus, fall back to scanning every segment
+    const MAX_RINGS = 4;
+
+    private $stops;
+    private $originLat;
+    private $originLng;
+    private $lngScale;
+    private $points = [];
+    private $cumulative = [];
+    private $grid = [];
+
+    /**
+     * Build the index
+     *
+     * @param array $stops Ordered stops, each with 'name', 'lat' and 'lng'
+     */
+    public function __construct(array $stops)
+    {
+        if (count($stops) < 2) {
+            throw new InvalidArgumentException("A route needs at least two stops");
+        }
+
+        $this->stops = array_values($stops);
+        $this->originLat = (float) $this->stops[0]['lat'];
+        $this->originLng = (float) $this->stops[0]['lng'];
+        $this->lngScale = cos(deg2rad($this->originLat));
+
+        $distance = 0.0;
+        foreach ($this->stops as $i => $stop) {
+            $this->points[$i] = $this->project($stop['lat'], $stop['lng']);
+            if ($i > 0) {
+                $distance += $this->distance($this->points[$i - 1], $this->points[$i]);
+            }
+            $this->cumulative[$i] = $distance;
+        }
+
+        for ($segment = 0; $segment < count($this->points) - 1; $segment++) {
+            $this->addToGrid($segment);
+        }
+    }
+
+    /**
+     * Snap a position onto the route
+     *
+     * @param float $lat Latitude of the bus
+     * @param float $lng Longitude of the bus
+     * @return array 'segment' index, 'along' metres from the first stop,
+     *               'offset' metres from the route, and the snapped 'lat'/'lng'
+     */
+    public function snap($lat, $lng)
+    {
+        $point = $this->project($lat, $lng);
+        $cx = (int) floor($point[0] / self::CELL_METERS);
+        $cy = (int) floor($point[1] / self::CELL_METERS);
+
+        $best = null;
+        $seen = [];
+        for ($ring = 0; $ring <= self::MAX_RINGS; $ring++) {
+            foreach ($this->ringCells($cx, $cy, $ring) as $key) {
+                if (!isset($this->grid[$key])) {
+                    continue;
+                }
+                foreach ($this->grid[$key] as $segment) {
+                    if (isset($seen[$segment])) {
+                        continue;
+                    }
+                    $seen[$segment] = true;
+                    $candidate = $this->projectOntoSegment($point, $segment);
+                    if ($best === null || $candidate['offset'] < $best['offset']) {
+                        $best = $candidate;
+                    }
+                }
+            }
+            // Anything not yet seen lies at least $ring cells away
+            if ($best !== null && $best['offset'] <= $ring * self::CELL_METERS) {
+                return $this->withLatLng($best);
+            }
+        }
+
+        // Far from the route: check every segment
+        for ($segment = 0; $segment < count($this->points) - 1; $segment++) {
+            if (isset($seen[$segment])) {
+                continue;
+            }
+            $candidate = $this->projectOntoSegment($point, $segment);
+            if ($best === null || $candidate['offset'] < $best['offset']) {
+                $best = $candidate;
+            }
+        }
+
+        return $this->withLatLng($best);
+    }
+
+    /**
+     * Stops that are still ahead of a snapped position
+     *
+     * @param float $along Metres from the first stop, as returned by snap()
+     * @return array Stops with 'seq', 'name' and 'distance_m' left to travel
+     */
+    public function remainingStops($along)
+    {
+        $remaining = [];
+        foreach ($this->stops as $i => $stop) {
+            // Tolerate rounding so a bus parked on a stop still lists it
+            if ($this->cumulative[$i] + 1e-6 >= $along) {
+                $remaining[] = [
+                    'seq' => $i + 1,
+                    'name' => $stop['name'],
+                    'distance_m' => max(0.0, $this->cumulative[$i] - $along),
+                ];
+            }
+        }
+        return $remaining;
+    }
+
+    /**
+     * Total route length in metres
+     */
+    public function totalLength()
+    {
+        return $this->cumulative[count($this->cumulative) - 1];
+    }
+
+    private function project($lat, $lng)
+    {
+        return [
+            ($lng - $this->originLng) * self::METERS_PER_DEGREE * $this->lngScale,
+            ($lat - $this->originLat) * self::METERS_PER_DEGREE,
+        ];
+    }
+
+    private function unproject($x, $y)
+    {
+        return [
+            $this->originLat + $y / self::METERS_PER_DEGREE,
+            $this->originLng + $x / (self::METERS_PER_DEGREE * $this->lngScale),
+        ];
+    }
+
+    private function distance($a, $b)
+    {
+        return hypot($b[0] - $a[0], $b[1] - $a[1]);
+    }
+
+    private function addToGrid($segment)
+    {
+        $a = $this->points[$segment];
+        $b = $this->points[$segment + 1];
+
+        // Walk the segment in half-cell steps so every cell it crosses gets it
+        $steps = max(1, (int) ceil($this->distance($a, $b) / (self::CELL_METERS / 2)));
+        for ($i = 0; $i <= $steps; $i++) {
+            $t = $i / $steps;
+            $cx = (int) floor(($a[0] + ($b[0] - $a[0]) * $t) / self::CELL_METERS);
+            $cy = (int) floor(($a[1] + ($b[1] - $a[1]) * $t) / self::CELL_METERS);
+            for ($dx = -1; $dx <= 1; $dx++) {
+                for ($dy = -1; $dy <= 1; $dy++) {
+                    $this->grid[($cx + $dx) . ':' . ($cy + $dy)][$segment] = $segment;
+                }
+            }
+        }
+    }
+
+    private function ringCells($cx, $cy, $ring)
+    {
+        if ($ring === 0) {
+            return [$cx . ':' . $cy];
+        }
+        $cells = [];
+        for ($d = -$ring; $d <= $ring; $d++) {
+            $cells[] = ($cx + $d) . ':' . ($cy - $ring);
+            $cells[] = ($cx + $d) . ':' . ($cy + $ring);
+        }
+        for ($d = -$ring + 1; $d <= $ring - 1; $d++) {
+            $cells[] = ($cx - $ring) . ':' . ($cy + $d);
+            $cells[] = ($cx + $ring) . ':' . ($cy + $d);
+        }
+        return $cells;
+    }
+
+    private function projectOntoSegment($point, $segment)
+    {
+        $a = $this->points[$segment];
+        $b = $this->points[$segment + 1];
+        $dx = $b[0] - $a[0];
+        $dy = $b[1] - $a[1];
+        $lengthSquared = $dx * $dx + $dy * $dy;
+
+        $t = $lengthSquared > 0 ? (($point[0] - $a[0]) * $dx + ($point[1] - $a[1]) * $dy) / $lengthSquared : 0.0;
+        $t = max(0.0, min(1.0, $t));
+
+        $x = $a[0] + $dx * $t;
+        $y = $a[1] + $dy * $t;
+
+        return [
+            'segment' => $segment,
+            'along' => $this->cumulative[$segment] + sqrt($lengthSquared) * $t,
+            'offset' => hypot($point[0] - $x, $point[1] - $y),
+            'x' => $x,
+            'y' => $y,
+        ];
+    }
+
+    private function withLatLng($snapped)
+    {
+        list($snapped['lat'], $snapped['lng']) = $this->unproject($snapped['x'], $snapped['y']);
+        unset($snapped['x'], $snapped['y']);
+        return $snapped;
+    }
+}
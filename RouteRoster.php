@@ -0,0 +1,166 @@
+<?php
+/**
+ * Who rides and who drives each point, per route
+ *
+ * route_roster holds one row per point_details row with the student's and
+ * the driver's details copied in, clustered on (Route, Point_no). A route's
+ * roster is one primary-key range read and a point's roster one unique-key
+ * lookup, instead of a three-way join on string keys. Every write to a
+ * student, driver or point refreshes the roster rows it belongs to, inside
+ * the writing transaction.
+ */
+class RouteRoster
+{
+    // Roster columns, in the order route() and point() return them
+    const COLUMNS = ['Route', 'Point_no', 'Student_ID', 'Student_Name', 'Student_Phone', 'Fee_Status',
+                     'Driver_ID', 'Driver_Name', 'Driver_Phone'];
+
+    // The roster rows as the join computes them; a missing student or driver leaves its columns NULL
+    const SOURCE = "SELECT p.Route, p.Point_no, p.Student_ID, s.Name, s.Phone, s.Fee_Status, p.Driver_ID, d.Name, d.Phone
+                    FROM point_details p
+                    LEFT JOIN student s ON s.Student_ID = p.Student_ID
+                    LEFT JOIN driver d ON d.Driver_ID = p.Driver_ID";
+
+    // point_details columns a roster row can be refreshed by
+    const KEYS = ['Student_ID', 'Driver_ID', 'Point_no'];
+
+    private $db;
+
+    /**
+     * Constructor accepts a database connection
+     */
+    public function __construct($dbConnection)
+    {
+        $this->db = $dbConnection;
+    }
+
+    /**
+     * Recompute the roster rows of every point whose $column is $value
+     *
+     * Must run in the transaction that wrote the student, driver or point.
+     *
+     * @param string $column Student_ID, Driver_ID or Point_no
+     * @param string $value
+     * @return bool False when the refresh failed and the transaction must be rolled back
+     */
+    public function refresh($column, $value)
+    {
+        if (!in_array($column, self::KEYS, true)) {
+            throw new InvalidArgumentException("The roster is not keyed by $column");
+        }
+
+        $deleteStmt = $this->db->prepare("DELETE FROM route_roster WHERE `$column` = ?");
+        $deleteStmt->bind_param("s", $value);
+        $ok = $deleteStmt->execute();
+        $deleteStmt->close();
+        if (!$ok) {
+            return false;
+        }
+
+        $insertStmt = $this->db->prepare(
+            "INSERT INTO route_roster (" . implode(", ", self::COLUMNS) . ") " . self::SOURCE . " WHERE p.`$column` = ?"
+        );
+        $insertStmt->bind_param("s", $value);
+        $ok = $insertStmt->execute();
+        $insertStmt->close();
+        return $ok;
+    }
+
+    /**
+     * Put a student and a driver on a point, replacing whoever was there
+     *
+     * @return bool|string True on success, the error message otherwise
+     */
+    public function assign($pointNo, $route, $studentId, $driverId)
+    {
+        $this->db->begin_transaction();
+        $deleteStmt = $this->db->prepare("DELETE FROM point_details WHERE Point_no = ?");
+        $deleteStmt->bind_param("s", $pointNo);
+        $ok = $deleteStmt->execute();
+        $deleteStmt->close();
+
+        $stmt = $this->db->prepare("INSERT INTO point_details (Driver_ID, Student_ID, Point_no, Route) VALUES (?, ?, ?, ?)");
+        $stmt->bind_param("ssss", $driverId, $studentId, $pointNo, $route);
+        $ok = $ok && $stmt->execute();
+        $error = $ok ? '' : $stmt->error;
+        $stmt->close();
+
+        if (!$ok || !$this->refresh('Point_no', $pointNo)) {
+            $error = $error ?: $this->db->error;
+            $this->db->rollback();
+            return $error;
+        }
+        $this->db->commit();
+        return true;
+    }
+
+    /**
+     * Take a point off its route
+     *
+     * @return bool|string True on success, the error message otherwise
+     */
+    public function unassign($pointNo)
+    {
+        $this->db->begin_transaction();
+        $stmt = $this->db->prepare("DELETE FROM point_details WHERE Point_no = ?");
+        $stmt->bind_param("s", $pointNo);
+        if (!$stmt->execute() || !$this->refresh('Point_no', $pointNo)) {
+            $error = $stmt->error ?: $this->db->error;
+            $stmt->close();
+            $this->db->rollback();
+            return $error;
+        }
+        $stmt->close();
+        $this->db->commit();
+        return true;
+    }
+
+    /**
+     * Every point on one route, in Point_no order
+     *
+     * @return array List of rows keyed by COLUMNS
+     */
+    public function route($route)
+    {
+        $stmt = $this->db->prepare(
+            "SELECT Route, Point_no, Student_ID, Student_Name, Student_Phone, Fee_Status, Driver_ID, Driver_Name, Driver_Phone
+             FROM route_roster WHERE Route = ? ORDER BY Point_no"
+        );
+        $stmt->bind_param("s", $route);
+        $stmt->execute();
+        $rows = $stmt->get_result()->fetch_all(MYSQLI_ASSOC);
+        $stmt->close();
+        return $rows;
+    }
+
+    /**
+     * Who rides and who drives one point
+     *
+     * @return array|null The roster row, null when the point is not on any route
+     */
+    public function point($pointNo)
+    {
+        $stmt = $this->db->prepare(
+            "SELECT Route, Point_no, Student_ID, Student_Name, Student_Phone, Fee_Status, Driver_ID, Driver_Name, Driver_Phone
+             FROM route_roster WHERE Point_no = ?"
+        );
+        $stmt->bind_param("s", $pointNo);
+        $stmt->execute();
+        $row = $stmt->get_result()->fetch_assoc();
+        $stmt->close();
+        return $row;
+    }
+
+    /**
+     * Recompute the whole roster from point_details, student and driver
+     *
+     * For repairing it after writes that bypassed this class.
+     */
+    public function rebuild()
+    {
+        $this->db->begin_transaction();
+        $this->db->query("DELETE FROM route_roster");
+        $this->db->query("INSERT INTO route_roster (" . implode(", ", self::COLUMNS) . ") " . self::SOURCE);
+        $this->db->commit();
+    }
+}
@@ -0,0 +1,197 @@
+<?php
+require_once __DIR__ . '/RouteRoster.php';
+require_once __DIR__ . '/TableVersion.php';
+
+/**
+ * Student counts per Fee_Status, Point_no and Driver_ID
+ *
+ * The counts live in the student_summary table and are adjusted by every
+ * write to the student table, inside the same transaction, so reading them
+ * is a primary-key lookup instead of a scan of the student table. The same
+ * transaction records the student table version (see TableVersion) and
+ * refreshes the student's route roster row (see RouteRoster).
+ */
+class StudentSummary
+{
+    // Counter rows are always locked in this order to avoid deadlocks
+    const DIMENSIONS = ['Driver_ID', 'Fee_Status', 'Point_no'];
+
+    // Student table version recorded by the last addStudent/deleteStudent, null if it changed nothing
+    public $version = null;
+
+    private $db;
+    private $versions;
+    private $roster;
+
+    /**
+     * Constructor accepts a database connection
+     */
+    public function __construct($dbConnection)
+    {
+        $this->db = $dbConnection;
+        $this->versions = new TableVersion($dbConnection, 'student');
+        $this->roster = new RouteRoster($dbConnection);
+    }
+
+    /**
+     * Add $delta to the counters of one student's values
+     *
+     * Must run in the transaction that inserts or deletes the student.
+     *
+     * @param array $student Row with Driver_ID, Fee_Status and Point_no
+     * @param int $delta 1 for an insert, -1 for a delete
+     * @return bool False when the update failed and the transaction must be rolled back
+     */
+    public function adjust($student, $delta)
+    {
+        $stmt = $this->db->prepare(
+            "INSERT INTO student_summary (dimension, value, students) VALUES (?, ?, ?), (?, ?, ?), (?, ?, ?)
+             ON DUPLICATE KEY UPDATE students = students + VALUES(students)"
+        );
+        $params = [];
+        foreach (self::DIMENSIONS as $dimension) {
+            array_push($params, $dimension, (string) $student[$dimension], $delta);
+        }
+        $stmt->bind_param("ssississi", ...$params);
+        $ok = $stmt->execute();
+        $stmt->close();
+        return $ok;
+    }
+
+    /**
+     * Insert a student and count it
+     *
+     * @return bool|string True on success, the error message otherwise
+     */
+    public function addStudent($studentId, $name, $pointNo, $phone, $feeStatus, $driverId)
+    {
+        $this->version = null;
+        $this->db->begin_transaction();
+        $stmt = $this->db->prepare("INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) VALUES (?, ?, ?, ?, ?, ?)");
+        $stmt->bind_param("ssssss", $studentId, $name, $pointNo, $phone, $feeStatus, $driverId);
+        if (!$stmt->execute()) {
+            $error = $stmt->error;
+            $stmt->close();
+            $this->db->rollback();
+            return $error;
+        }
+        $stmt->close();
+
+        if (!$this->adjust(['Driver_ID' => $driverId, 'Fee_Status' => $feeStatus, 'Point_no' => $pointNo], 1)) {
+            $error = $this->db->error;
+            $this->db->rollback();
+            return $error;
+        }
+        $version = $this->versions->record([$studentId], false);
+        if ($version === false || !$this->roster->refresh('Student_ID', $studentId)) {
+            $error = $this->db->error;
+            $this->db->rollback();
+            return $error;
+        }
+        $this->db->commit();
+        $this->version = $version;
+        return true;
+    }
+
+    /**
+     * Delete a student and uncount it
+     *
+     * @return bool|string True on success, the error message otherwise
+     */
+    public function deleteStudent($studentId)
+    {
+        $this->version = null;
+        $this->db->begin_transaction();
+        $stmt = $this->db->prepare("SELECT Driver_ID, Fee_Status, Point_no FROM student WHERE Student_ID = ? FOR UPDATE");
+        $stmt->bind_param("s", $studentId);
+        $stmt->execute();
+        $student = $stmt->get_result()->fetch_assoc();
+        $stmt->close();
+
+        $deleteStmt = $this->db->prepare("DELETE FROM student WHERE Student_ID = ?");
+        $deleteStmt->bind_param("s", $studentId);
+        if (!$deleteStmt->execute()) {
+            $error = $deleteStmt->error;
+            $deleteStmt->close();
+            $this->db->rollback();
+            return $error;
+        }
+        $deleteStmt->close();
+
+        if ($student) {
+            $version = $this->adjust($student, -1) ? $this->versions->record([$studentId], true) : false;
+            if ($version === false || !$this->roster->refresh('Student_ID', $studentId)) {
+                $error = $this->db->error;
+                $this->db->rollback();
+                return $error;
+            }
+        }
+        $this->db->commit();
+        $this->version = $student ? $version : null;
+        return true;
+    }
+
+    /**
+     * Counts for one dimension, or for all of them
+     *
+     * @param string|null $dimension Driver_ID, Fee_Status or Point_no
+     * @return array dimension => [value => students]
+     */
+    public function counts($dimension = null)
+    {
+        if ($dimension === null) {
+            $result = $this->db->query("SELECT dimension, value, students FROM student_summary WHERE students > 0");
+        } else {
+            $stmt = $this->db->prepare("SELECT dimension, value, students FROM student_summary WHERE dimension = ? AND students > 0");
+            $stmt->bind_param("s", $dimension);
+            $stmt->execute();
+            $result = $stmt->get_result();
+        }
+
+        $counts = [];
+        foreach (self::DIMENSIONS as $name) {
+            if ($dimension === null || $dimension === $name) {
+                $counts[$name] = [];
+            }
+        }
+        while ($row = $result->fetch_assoc()) {
+            $counts[$row['dimension']][$row['value']] = (int) $row['students'];
+        }
+        return $counts;
+    }
+
+    /**
+     * Students with one value, e.g. count('Fee_Status', 'Pending')
+     */
+    public function count($dimension, $value)
+    {
+        $stmt = $this->db->prepare("SELECT students FROM student_summary WHERE dimension = ? AND value = ?");
+        $stmt->bind_param("ss", $dimension, $value);
+        $stmt->execute();
+        $row = $stmt->get_result()->fetch_row();
+        $stmt->close();
+
+        return $row ? (int) $row[0] : 0;
+    }
+
+    /**
+     * Recount everything from the student table
+     *
+     * For filling the table the first time and repairing it after writes
+     * that bypassed this class.
+     */
+    public function rebuild()
+    {
+        $this->db->begin_transaction();
+        // Lock the student table's rows so no write slips between the delete and the recount
+        $this->db->query("SELECT COUNT(*) FROM student FOR UPDATE");
+        $this->db->query("DELETE FROM student_summary");
+        foreach (self::DIMENSIONS as $dimension) {
+            $this->db->query(
+                "INSERT INTO student_summary (dimension, value, students)
+                 SELECT '$dimension', `$dimension`, COUNT(*) FROM student GROUP BY `$dimension`"
+            );
+        }
+        $this->db->commit();
+    }
+}
@@ -0,0 +1,130 @@
+<?php
+/**
+ * Change versions for the admin tables
+ *
+ * Every write to the driver or student table takes the next version from
+ * table_version and records it against the written row in table_change,
+ * inside the writing transaction. The admin pages keep the version they
+ * were loaded at and ask for changesSince() that version instead of
+ * reloading the whole table.
+ */
+class TableVersion
+{
+    // Table => primary key column
+    const TABLES = [
+        'driver' => 'Driver_ID',
+        'student' => 'Student_ID',
+    ];
+
+    // Columns the admin pages show, in the order fetch_data_*.php returns them
+    const COLUMNS = [
+        'driver' => ['Driver_ID', 'Name', 'Route', 'Point_no', 'Phone'],
+        'student' => ['Student_ID', 'Name', 'Point_no', 'Phone', 'Fee_Status', 'Driver_ID'],
+    ];
+
+    private $db;
+    private $table;
+
+    /**
+     * @param mysqli $dbConnection
+     * @param string $table driver or student
+     */
+    public function __construct($dbConnection, $table)
+    {
+        if (!isset(self::TABLES[$table])) {
+            throw new InvalidArgumentException("Unversioned table: $table");
+        }
+        $this->db = $dbConnection;
+        $this->table = $table;
+    }
+
+    /**
+     * Take the next version and record it against these rows
+     *
+     * Must run in the transaction that writes the rows. The version row stays
+     * locked until commit, so versions become visible in order.
+     *
+     * @param string[] $ids Primary keys of the written rows
+     * @param bool $deleted True when the rows were deleted
+     * @return int|false The new version, false when the transaction must be rolled back
+     */
+    public function record($ids, $deleted)
+    {
+        $stmt = $this->db->prepare("UPDATE table_version SET version = LAST_INSERT_ID(version + 1) WHERE table_name = ?");
+        $stmt->bind_param("s", $this->table);
+        $ok = $stmt->execute();
+        $stmt->close();
+        if (!$ok) {
+            return false;
+        }
+        $version = $this->db->insert_id;
+
+        $changeStmt = $this->db->prepare(
+            "INSERT INTO table_change (table_name, Row_ID, deleted, version) VALUES (?, ?, ?, ?)
+             ON DUPLICATE KEY UPDATE deleted = VALUES(deleted), version = VALUES(version)"
+        );
+        $flag = $deleted ? 1 : 0;
+        foreach ($ids as $id) {
+            $changeStmt->bind_param("ssii", $this->table, $id, $flag, $version);
+            if (!$changeStmt->execute()) {
+                $changeStmt->close();
+                return false;
+            }
+        }
+        $changeStmt->close();
+        return $version;
+    }
+
+    /**
+     * The latest committed version
+     */
+    public function current()
+    {
+        $stmt = $this->db->prepare("SELECT version FROM table_version WHERE table_name = ?");
+        $stmt->bind_param("s", $this->table);
+        $stmt->execute();
+        $row = $stmt->get_result()->fetch_row();
+        $stmt->close();
+
+        return $row ? (int) $row[0] : 0;
+    }
+
+    /**
+     * Rows changed after $since
+     *
+     * @param int $since Version the caller holds
+     * @return array ["v" => current version, "deleted" => [ids], "rows" => [rows added or changed]]
+     */
+    public function changesSince($since)
+    {
+        // Read the version first: changes committed after this point are picked up next time
+        $current = $this->current();
+        $changes = ["v" => $current, "deleted" => [], "rows" => []];
+        if ($since >= $current) {
+            return $changes;
+        }
+
+        $key = self::TABLES[$this->table];
+        $columns = implode(', ', array_map(function ($column) {
+            return "t.`$column`";
+        }, self::COLUMNS[$this->table]));
+        $stmt = $this->db->prepare(
+            "SELECT c.Row_ID, c.deleted, $columns FROM table_change c
+             LEFT JOIN `{$this->table}` t ON t.`$key` = c.Row_ID
+             WHERE c.table_name = ? AND c.version > ? AND c.version <= ?"
+        );
+        $stmt->bind_param("sii", $this->table, $since, $current);
+        $stmt->execute();
+        $result = $stmt->get_result();
+        while ($row = $result->fetch_assoc()) {
+            if ($row['deleted'] || $row[$key] === null) {
+                $changes["deleted"][] = $row['Row_ID'];
+            } else {
+                unset($row['Row_ID'], $row['deleted']);
+                $changes["rows"][] = $row;
+            }
+        }
+        $stmt->close();
+        return $changes;
+    }
+}
@@ -1,9 +1,11 @@
 <?php
+require_once 'StudentSummary.php';
+
 if ($_SERVER["REQUEST_METHOD"] == "POST") {
     $servername = "localhost";
     $username = "root";
     $password = "";
-    $dbname = 'point_management';
+    $db_name = 'point_management';
 
     $port = 3307;  
 
@@ -33,20 +35,18 @@ if ($_SERVER["REQUEST_METHOD"] == "POST") {
     if ($checkStmt->num_rows > 0) {
         echo "Error: Student ID already exists.";
     } else {
-        // Prepare and bind
-        $stmt = $conn->prepare("INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) VALUES (?, ?, ?, ?, ?, ?)");
-        $stmt->bind_param("sssiss", $studentID, $studentName, $pointnumber, $contactnumber, $feestatus, $driverid);
+        // Insert the student and update the dashboard counters in one transaction
+        $summary = new StudentSummary($conn);
+        $added = $summary->addStudent($studentID, $studentName, $pointnumber, $contactnumber, $feestatus, $driverid);
 
-        // Execute and check for success
-        if ($stmt->execute()) {
+        // Check for success
+        if ($added === true) {
             echo "New student added successfully";
             // Optionally, redirect back to a confirmation page or the student list
             // header('Location: student_list.php');
         } else {
-            echo "Error: " . $stmt->error;
+            echo "Error: " . $added;
         }
-
-        $stmt->close();
     }
 
     $checkStmt->close();
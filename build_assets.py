@@ -0,0 +1,542 @@
+"""
+Build step for the page images.
+
+background.jpg (5080x6350, 1.8 MB) is the background of every student and
+admin page, and image.jpeg is the bus marker on the tracking map. This
+script writes resized, recompressed copies of both into static/:
+
+    static/background.<hash>.jpg / .webp / .avif
+    static/image.<hash>.jpg / .webp / .avif
+
+Each file name carries a hash of its own contents, so a changed image gets a
+new URL and the old one can be cached for a year (static/.htaccess sets
+Cache-Control: immutable). The pages are then rewritten to use them:
+
+  - background-image: url(background.jpg) becomes a hashed JPEG fallback
+    followed by an image-set() offering AVIF, then WebP, then JPEG;
+  - the Leaflet marker iconUrl points at the hashed WebP.
+
+The front-end libraries are vendored rather than loaded from unpkg. The
+versions in VENDORED are fetched once into assets/vendor/ (--fetch) and
+committed together with assets/vendor.lock.json, which records the sha256
+of every file; the build refuses a vendored file that does not match. Each
+page in PAGE_BUNDLES then gets one script and one stylesheet:
+
+    static/<page>.<hash>.js   the page's libraries and local scripts
+    static/<page>.<hash>.css  the libraries' stylesheets
+
+Files the stylesheets point at (Leaflet's marker and layer icons, the
+routing icons) are copied to static/<package>@<version>/, where the version
+in the path plays the part of the hash.
+
+Pages whose libraries have not been fetched yet keep their CDN tags.
+
+Finally the service worker (sw.js) gets the list of files to precache,
+SHELL_PAGES and every local file they load, and a VERSION hashed from
+their contents, so each deploy that changes the shell replaces the
+offline cache.
+
+Rewriting is idempotent: running the build again after changing an image
+or a script only swaps the hashes. static/manifest.json lists what was
+written.
+
+Usage:
+    python build_assets.py            # build and rewrite the pages
+    python build_assets.py --dry-run  # print what would change
+    python build_assets.py --fetch    # download the pinned libraries
+"""
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import posixpath
+import re
+import sys
+import urllib.request
+
+from PIL import Image
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = "static"
+
+# Source image -> largest width served. The marker is drawn at 35 and 70 px.
+SOURCE_IMAGES = {
+    "background.jpg": 1920,
+    "image.jpeg": 70,
+}
+
+# Output format -> (extension, Pillow save options)
+FORMATS = {
+    "jpeg": ("jpg", {"quality": 80, "optimize": True, "progressive": True}),
+    "webp": ("webp", {"quality": 75, "method": 6}),
+    "avif": ("avif", {"quality": 50, "speed": 4}),
+}
+
+HASH_LEN = 10
+
+VENDOR_DIR = os.path.join("assets", "vendor")
+VENDOR_LOCK = os.path.join("assets", "vendor.lock.json")
+VENDOR_URL = "https://unpkg.com/{package}@{version}/{path}"
+
+# Package -> (pinned version, files used). aos@next resolved to 3.0.0-beta.6
+# and leaflet-routing-machine@latest to 3.2.12 when they were pinned.
+VENDORED = {
+    "aos": ("3.0.0-beta.6", [
+        "dist/aos.js",
+        "dist/aos.css",
+    ]),
+    "leaflet": ("1.8.0", [
+        "dist/leaflet.js",
+        "dist/leaflet.css",
+        "dist/images/layers.png",
+        "dist/images/layers-2x.png",
+        "dist/images/marker-icon.png",
+        "dist/images/marker-icon-2x.png",
+        "dist/images/marker-shadow.png",
+    ]),
+    "leaflet-routing-machine": ("3.2.12", [
+        "dist/leaflet-routing-machine.min.js",
+        "dist/leaflet-routing-machine.css",
+        "dist/leaflet.routing.icons.png",
+        "dist/leaflet.routing.icons.svg",
+        "dist/routing-icon.png",
+    ]),
+}
+
+# Page -> what goes into its bundles, in load order. A package of None is a
+# script from this repo.
+PAGE_BUNDLES = {
+    "index.html": {
+        "css": [("aos", "dist/aos.css")],
+        "js": [("aos", "dist/aos.js")],
+    },
+    "student.html": {
+        "css": [("aos", "dist/aos.css")],
+        "js": [("aos", "dist/aos.js")],
+    },
+    "real_time_tracking.html": {
+        "css": [
+            ("leaflet", "dist/leaflet.css"),
+            ("leaflet-routing-machine", "dist/leaflet-routing-machine.css"),
+        ],
+        "js": [
+            ("leaflet", "dist/leaflet.js"),
+            ("leaflet-routing-machine", "dist/leaflet-routing-machine.min.js"),
+            (None, "marker_animator.js"),
+            (None, "fleet_map.js"),
+        ],
+    },
+}
+
+# Pages that are not served to users (the test report) are left alone.
+EXCLUDED_PAGES = {"GroupC_report.html", "report.html"}
+
+SERVICE_WORKER = "sw.js"
+
+# Student portal pages the service worker keeps available offline
+SHELL_PAGES = ["student.html", "routes.html", "fee.html", "real_time_tracking.html"]
+
+CACHE_HEADERS = """\
+# Written by build_assets.py. Every file here has a content hash in its
+# name, so it never changes under the same URL.
+<IfModule mod_headers.c>
+    Header set Cache-Control "public, max-age=31536000, immutable"
+</IfModule>
+<IfModule mod_mime.c>
+    AddType image/avif .avif
+    AddType image/webp .webp
+</IfModule>
+"""
+
+
+def stem(source):
+    return os.path.splitext(source)[0]
+
+
+def encode(image, fmt):
+    options = FORMATS[fmt][1]
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def hashed_name(source, data, extension):
+    digest = hashlib.sha1(data).hexdigest()[:HASH_LEN]
+    return f"{stem(source)}.{digest}.{extension}"
+
+
+def build_image(source, max_width, repo_dir=REPO_DIR):
+    """Encode one source image in every format; returns {format: (name, bytes)}."""
+    with Image.open(os.path.join(repo_dir, source)) as image:
+        image = image.convert("RGB")
+        if image.width > max_width:
+            height = round(image.height * max_width / image.width)
+            image = image.resize((max_width, height), Image.LANCZOS)
+        variants = {}
+        for fmt, (extension, _) in FORMATS.items():
+            data = encode(image, fmt)
+            variants[fmt] = (hashed_name(source, data, extension), data)
+        return variants
+
+
+def asset_pattern(source, extensions):
+    """A reference to `source` or to any earlier hashed build of it."""
+    name = re.escape(stem(source))
+    original = re.escape(os.path.splitext(source)[1][1:])
+    alternatives = "|".join(sorted({original, *extensions}))
+    return rf"(?:{STATIC_DIR}/)?{name}(?:\.[0-9a-f]{{{HASH_LEN}}})?\.(?:{alternatives})"
+
+
+def background_pattern(source):
+    url = asset_pattern(source, ["jpg"])
+    return re.compile(
+        rf"background-image:\s*url\((['\"]?){url}\1\);"
+        rf"(?P<set>\s*background-image:\s*image-set\([^;]*\);)?"
+    )
+
+
+def marker_pattern(source):
+    return re.compile(rf"iconUrl:\s*'{asset_pattern(source, ['webp'])}'")
+
+
+def rewrite_text(text, urls):
+    """
+    Point every page image reference at the built files.
+
+    `urls` maps each source image to {format: "static/<hashed name>"}.
+    """
+    background = urls.get("background.jpg")
+    if background:
+        def declaration(match):
+            # Keep the indentation of the original line for the image-set() line
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            indent = re.match(r"[ \t]*", text[line_start:]).group()
+            image_set = ", ".join(
+                f'url({background[fmt]}) type("image/{fmt}")' for fmt in ("avif", "webp", "jpeg")
+            )
+            return (f"background-image: url({background['jpeg']});\n"
+                    f"{indent}background-image: image-set({image_set});")
+        text = background_pattern("background.jpg").sub(declaration, text)
+
+    marker = urls.get("image.jpeg")
+    if marker:
+        text = marker_pattern("image.jpeg").sub(f"iconUrl: '{marker['webp']}'", text)
+    return text
+
+
+def pages(repo_dir=REPO_DIR):
+    found = glob.glob(os.path.join(repo_dir, "*.html")) + glob.glob(os.path.join(repo_dir, "*.css"))
+    return sorted(p for p in found if os.path.basename(p) not in EXCLUDED_PAGES)
+
+
+def vendor_key(package, path):
+    return f"{package}@{VENDORED[package][0]}/{path}"
+
+
+def cdn_url(package, path):
+    return VENDOR_URL.format(package=package, version=VENDORED[package][0], path=path)
+
+
+def integrity(data):
+    return "sha256-" + hashlib.sha256(data).hexdigest()
+
+
+def load_lock(repo_dir=REPO_DIR):
+    try:
+        with open(os.path.join(repo_dir, VENDOR_LOCK)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def fetch_vendor(repo_dir=REPO_DIR):
+    """Download every pinned file into assets/vendor/ and record its hash."""
+    lock = load_lock(repo_dir)
+    for package, (_, paths) in VENDORED.items():
+        for path in paths:
+            key = vendor_key(package, path)
+            with urllib.request.urlopen(cdn_url(package, path), timeout=30) as response:
+                data = response.read()
+            # A pinned version never changes, so a different hash means a tampered download
+            if lock.get(key, integrity(data)) != integrity(data):
+                raise SystemExit(f"{key} does not match {VENDOR_LOCK}")
+            lock[key] = integrity(data)
+            target = vendored_path(package, path, repo_dir)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(data)
+    with open(os.path.join(repo_dir, VENDOR_LOCK), "w") as f:
+        json.dump(lock, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return lock
+
+
+def vendored_path(package, path, repo_dir=REPO_DIR):
+    return os.path.join(repo_dir, VENDOR_DIR, vendor_key(package, path))
+
+
+def read_vendored(package, path, lock, repo_dir=REPO_DIR):
+    key = vendor_key(package, path)
+    try:
+        with open(vendored_path(package, path, repo_dir), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        raise SystemExit(f"{key} is not vendored; run python build_assets.py --fetch")
+    if lock.get(key) != integrity(data):
+        raise SystemExit(f"{key} does not match {VENDOR_LOCK}")
+    return data
+
+
+def minify_js(text):
+    """
+    Drop comments that start a line, blank lines and indentation.
+
+    Line breaks are kept, so automatic semicolon insertion is unaffected.
+    Only used for this repo's scripts; the vendored ones ship minified.
+    """
+    lines = []
+    in_comment = False
+    for line in text.splitlines():
+        line = line.strip()
+        if in_comment or line.startswith("/*"):
+            end = line.find("*/")
+            in_comment = end == -1
+            line = "" if in_comment else line[end + 2:].strip()
+        if line and not line.startswith("//"):
+            lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def minify_css(text):
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    return re.sub(r"\s*([{};,>])\s*", r"\1", text).strip() + "\n"
+
+
+def relocate_urls(css, package, path):
+    """Point the relative url()s of a vendored stylesheet at static/<package>@<version>/."""
+    base = posixpath.dirname(path)
+
+    def relocate(match):
+        url = match.group(2)
+        if re.match(r"(?:[a-z]+:|/|#)", url):
+            return match.group(0)
+        return f"url({vendor_key(package, posixpath.normpath(posixpath.join(base, url)))})"
+    return re.sub(r"url\((['\"]?)([^'\")]+)\1\)", relocate, css)
+
+
+def bundle(page, kind, lock, repo_dir=REPO_DIR):
+    """The contents of one page's script or stylesheet bundle."""
+    parts = []
+    for package, path in PAGE_BUNDLES[page][kind]:
+        if package is None:
+            with open(os.path.join(repo_dir, path), encoding="utf-8") as f:
+                parts.append(minify_js(f.read()))
+            continue
+        text = read_vendored(package, path, lock, repo_dir).decode("utf-8")
+        # The source maps are not vendored
+        text = re.sub(r"^//# sourceMappingURL=.*$", "", text, flags=re.M)
+        parts.append(minify_css(relocate_urls(text, package, path)) if kind == "css" else text)
+    # A script that ends without a semicolon must not run into the next one
+    return (";\n" if kind == "js" else "").join(parts).encode("utf-8")
+
+
+def reference_pattern(package, path):
+    """How a page refers to a bundled file: unpkg at any version, or a local path."""
+    if package is None:
+        return re.escape(path)
+    name, extension = posixpath.splitext(path)
+    name = name[:-len(".min")] if name.endswith(".min") else name
+    return rf"https://unpkg\.com/{re.escape(package)}@[^/\"]+/{re.escape(name)}(?:\.min)?{re.escape(extension)}"
+
+
+def rewrite_bundles(text, page, urls):
+    """
+    Replace the <script> and <link> tags of everything in a page's bundles
+    with one tag per bundle, at the position of the first one.
+
+    `urls` maps "js" and "css" to "static/<hashed name>".
+    """
+    for kind, entries in PAGE_BUNDLES[page].items():
+        references = [reference_pattern(package, path) for package, path in entries]
+        references.append(rf"{STATIC_DIR}/{re.escape(stem(page))}\.[0-9a-f]{{{HASH_LEN}}}\.{kind}")
+        alternatives = "|".join(references)
+        if kind == "js":
+            tag = rf'<script[^>]*\bsrc="(?:{alternatives})"[^>]*>\s*</script>'
+            replacement = f'<script src="{urls[kind]}"></script>'
+        else:
+            tag = rf'<link[^>]*\bhref="(?:{alternatives})"[^>]*>'
+            replacement = f'<link rel="stylesheet" href="{urls[kind]}" />'
+        matches = list(re.finditer(rf"^([ \t]*){tag}[ \t]*\n", text, flags=re.M))
+        if not matches:
+            continue
+        kept = [text[:matches[0].start()], matches[0].group(1), replacement, "\n"]
+        for previous, match in zip(matches, matches[1:]):
+            kept.append(text[previous.end():match.start()])
+        kept.append(text[matches[-1].end():])
+        text = "".join(kept)
+    return text
+
+
+def local_references(path, repo_dir=REPO_DIR):
+    """Same-origin files a page or stylesheet loads, as paths relative to the repo."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    found = re.findall(r"""(?:href|src)=["']([^"'#?]+)["']""", text)
+    found += [url for _, url in re.findall(r"""url\((['"]?)([^'")]+)\1\)""", text)]
+    # Paths handed to scripts, such as the map marker's iconUrl
+    found += re.findall(rf"""['"]({STATIC_DIR}/[^'"]+)['"]""", text)
+    base = posixpath.dirname(os.path.relpath(path, repo_dir).replace(os.sep, "/"))
+    return {
+        posixpath.normpath(posixpath.join(base, ref)) for ref in found
+        if not re.match(r"(?:[a-z]+:|/|#)", ref) and not ref.endswith((".php", ".html"))
+    }
+
+
+def shell_files(repo_dir=REPO_DIR):
+    """SHELL_PAGES plus everything they load from this site, following stylesheets."""
+    files = set(SHELL_PAGES)
+    pending = list(SHELL_PAGES)
+    while pending:
+        path = pending.pop()
+        if not path.endswith((".html", ".css")):
+            continue
+        for ref in local_references(os.path.join(repo_dir, path), repo_dir):
+            # One missing file would fail the whole install, so only existing ones are listed
+            if ref not in files and os.path.isfile(os.path.join(repo_dir, ref)):
+                files.add(ref)
+                pending.append(ref)
+    return sorted(files)
+
+
+def write_service_worker(repo_dir=REPO_DIR, dry_run=False):
+    """Stamp the precache list and its content hash into sw.js. Returns (version, files)."""
+    files = shell_files(repo_dir)
+    digest = hashlib.sha1()
+    for name in files:
+        with open(os.path.join(repo_dir, name), "rb") as f:
+            digest.update(name.encode("utf-8") + b"\0" + f.read())
+    version = digest.hexdigest()[:HASH_LEN]
+
+    path = os.path.join(repo_dir, SERVICE_WORKER)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    entries = ",\n".join(f"    '{name}'" for name in files)
+    rewritten = re.sub(r"^var VERSION = '[^']*';", f"var VERSION = '{version}';", text, flags=re.M)
+    rewritten = re.sub(r"^var PRECACHE = \[[^\]]*\];", f"var PRECACHE = [\n{entries}\n];", rewritten, flags=re.M)
+    if rewritten != text and not dry_run:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(rewritten)
+    return version, files
+
+
+def write_static(static_dir, source, files):
+    """Write `files` ({name: bytes}) and drop earlier builds of `source`."""
+    os.makedirs(static_dir, exist_ok=True)
+    # Drop earlier builds so static/ only holds what the pages use
+    for old in glob.glob(os.path.join(static_dir, f"{glob.escape(stem(source))}.*.*")):
+        if os.path.basename(old) not in files:
+            os.remove(old)
+    for name, data in files.items():
+        with open(os.path.join(static_dir, name), "wb") as f:
+            f.write(data)
+
+
+def build(repo_dir=REPO_DIR, dry_run=False):
+    """Write static/ and rewrite the pages. Returns the manifest and the rewritten pages."""
+    static_dir = os.path.join(repo_dir, STATIC_DIR)
+    manifest = {}
+    urls = {}
+    for source, max_width in SOURCE_IMAGES.items():
+        variants = build_image(source, max_width, repo_dir)
+        manifest[source] = {
+            "bytes": os.path.getsize(os.path.join(repo_dir, source)),
+            "variants": {fmt: {"file": name, "bytes": len(data)} for fmt, (name, data) in variants.items()},
+        }
+        urls[source] = {fmt: f"{STATIC_DIR}/{name}" for fmt, (name, _) in variants.items()}
+        if not dry_run:
+            write_static(static_dir, source, dict(variants.values()))
+
+    lock = load_lock(repo_dir)
+    bundle_urls = {}
+    manifest["bundles"] = {}
+    for page, entries in PAGE_BUNDLES.items():
+        missing = [vendor_key(package, path) for kind in entries for package, path in entries[kind]
+                   if package is not None and not os.path.isfile(vendored_path(package, path, repo_dir))]
+        if missing:
+            print(f"{page}: not bundled, {', '.join(missing)} not vendored (run with --fetch)", file=sys.stderr)
+            continue
+        files = {}
+        for kind in entries:
+            data = bundle(page, kind, lock, repo_dir)
+            files[hashed_name(page, data, kind)] = data
+        names = {name.rsplit(".", 1)[1]: name for name in files}
+        manifest["bundles"][page] = {kind: {"file": name, "bytes": len(files[name])} for kind, name in names.items()}
+        bundle_urls[page] = {kind: f"{STATIC_DIR}/{name}" for kind, name in names.items()}
+        if not dry_run:
+            write_static(static_dir, page, files)
+
+    # Images and fonts the bundled stylesheets point at, under their versioned path
+    if not dry_run:
+        for page in bundle_urls:
+            packages = {package for package, _ in PAGE_BUNDLES[page].get("css", [])}
+            for package in sorted(packages):
+                for path in VENDORED[package][1]:
+                    if posixpath.splitext(path)[1] in (".js", ".css"):
+                        continue
+                    target = os.path.join(static_dir, vendor_key(package, path))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with open(target, "wb") as f:
+                        f.write(read_vendored(package, path, lock, repo_dir))
+
+    changed = []
+    for path in pages(repo_dir):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        rewritten = rewrite_text(text, urls)
+        if os.path.basename(path) in bundle_urls:
+            rewritten = rewrite_bundles(rewritten, os.path.basename(path), bundle_urls[os.path.basename(path)])
+        if rewritten == text:
+            continue
+        changed.append(os.path.basename(path))
+        if not dry_run:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(rewritten)
+
+    version, precache = write_service_worker(repo_dir, dry_run)
+    manifest["service_worker"] = {"version": version, "precache": precache}
+
+    if not dry_run:
+        with open(os.path.join(static_dir, ".htaccess"), "w") as f:
+            f.write(CACHE_HEADERS)
+        with open(os.path.join(static_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+    return manifest, changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="print the sizes and pages without writing")
+    parser.add_argument("--fetch", action="store_true", help="download the pinned libraries into assets/vendor first")
+    args = parser.parse_args(argv)
+
+    if args.fetch:
+        print(f"vendored {len(fetch_vendor())} files")
+    manifest, changed = build(dry_run=args.dry_run)
+    for source in SOURCE_IMAGES:
+        entry = manifest[source]
+        sizes = ", ".join(f"{v['file']} {v['bytes']:,} B" for v in entry["variants"].values())
+        print(f"{source} ({entry['bytes']:,} B): {sizes}")
+    for page, files in manifest["bundles"].items():
+        print(f"{page}: " + ", ".join(f"{v['file']} {v['bytes']:,} B" for v in files.values()))
+    print(f"pages rewritten: {', '.join(changed) or 'none'}")
+    worker = manifest["service_worker"]
+    print(f"{SERVICE_WORKER} {worker['version']}: {len(worker['precache'])} files precached")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
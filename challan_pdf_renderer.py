@@ -0,0 +1,219 @@
+"""
+Bulk PDF rendering of fee challans with a pool of headless Chrome workers.
+
+ChallanGenerator only writes HTML. This service keeps one headless Chrome
+per worker open for the whole run, loads each challan into it with
+Page.setDocumentContent and prints it with the DevTools Page.printToPDF
+command. Each Chrome is its own process, so the pool spreads rendering over
+the available cores while Python only hands out work.
+
+Input is a directory of *_challan.html files (e.g. the output of
+generate_challans.php) or a .tar archive of them. PDFs are written next to
+the same relative paths under the output directory; a PDF newer than its
+HTML is left alone.
+
+Usage:
+    python challan_pdf_renderer.py challans/ pdfs/
+    python challan_pdf_renderer.py challans.tar pdfs/ --workers 8
+"""
+import argparse
+import base64
+import os
+import queue
+import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The Chrome build shipped for the Selenium suite, when running on Windows.
+BUNDLED_CHROME = os.path.join(REPO_DIR, "chrome-win64", "chrome.exe")
+
+# A4. The challan template's @page rule sets the exact size and no margins,
+# and its print body (border-box, padding included) fills that one page;
+# the paper size here only applies to HTML without an @page rule.
+PRINT_OPTIONS = {
+    "paperWidth": 8.27,
+    "paperHeight": 11.69,
+    "marginTop": 0,
+    "marginBottom": 0,
+    "marginLeft": 0,
+    "marginRight": 0,
+    "preferCSSPageSize": True,
+    "printBackground": True,
+}
+
+
+class RenderStats:
+    def __init__(self):
+        self.rendered = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.per_worker = {}
+        self.lock = threading.Lock()
+
+    def record(self, worker, size):
+        with self.lock:
+            self.rendered += 1
+            self.bytes += size
+            self.per_worker[worker] = self.per_worker.get(worker, 0) + 1
+
+    @property
+    def pages_per_second(self):
+        return self.rendered / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            "rendered": self.rendered,
+            "skipped": self.skipped,
+            "bytes": self.bytes,
+            "seconds": round(self.seconds, 3),
+            "pages_per_second": round(self.pages_per_second, 1),
+            "workers": len(self.per_worker),
+            "per_worker": self.per_worker,
+        }
+
+
+class ChromePool:
+    """A fixed set of headless Chrome instances, each used by one job at a time."""
+
+    def __init__(self, size=None, chrome_binary=None):
+        self.size = size or os.cpu_count() or 1
+        if chrome_binary is None and os.path.exists(BUNDLED_CHROME):
+            chrome_binary = BUNDLED_CHROME
+        self.chrome_binary = chrome_binary
+        self.idle = queue.Queue()
+        self.drivers = []
+        # Start the browsers in parallel; each takes a second or so.
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for worker in executor.map(self._start, range(self.size)):
+                self.drivers.append(worker[1])
+                self.idle.put(worker)
+
+    def _start(self, number):
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-extensions")
+        if self.chrome_binary:
+            options.binary_location = self.chrome_binary
+        driver = webdriver.Chrome(options=options)
+        driver.get("about:blank")
+        frame_id = driver.execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]["frame"]["id"]
+        return number, driver, frame_id
+
+    def render(self, html):
+        """Print one HTML document to PDF. Returns (worker number, PDF bytes)."""
+        number, driver, frame_id = self.idle.get()
+        try:
+            driver.execute_cdp_cmd("Page.setDocumentContent", {"frameId": frame_id, "html": html})
+            result = driver.execute_cdp_cmd("Page.printToPDF", PRINT_OPTIONS)
+        finally:
+            self.idle.put((number, driver, frame_id))
+        return number, base64.b64decode(result["data"])
+
+    def close(self):
+        for driver in self.drivers:
+            driver.quit()
+        self.drivers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -------------------- Input --------------------
+def pdf_path(output_dir, relative):
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + ".pdf")
+
+
+def directory_jobs(source_dir, output_dir, stats):
+    """(relative path, loader) for every challan whose PDF is missing or stale."""
+    for root, _, files in os.walk(source_dir):
+        for name in sorted(files):
+            if not name.endswith("_challan.html"):
+                continue
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, source_dir)
+            target = pdf_path(output_dir, relative)
+            if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                stats.skipped += 1
+                continue
+            yield relative, (lambda path=source: open(path, encoding="utf-8").read())
+
+
+def archive_jobs(archive, output_dir, stats):
+    with tarfile.open(archive) as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.endswith("_challan.html"):
+                continue
+            target = pdf_path(output_dir, member.name)
+            if os.path.exists(target) and os.path.getmtime(target) >= member.mtime:
+                stats.skipped += 1
+                continue
+            html = tar.extractfile(member).read().decode("utf-8")
+            yield member.name, (lambda text=html: text)
+
+
+# -------------------- Rendering --------------------
+def render_all(jobs, output_dir, pool, stats):
+    """Render every job through the pool, keeping at most two jobs per worker queued."""
+    def work(relative, load):
+        worker, pdf = pool.render(load())
+        target = pdf_path(output_dir, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as handle:
+            handle.write(pdf)
+        stats.record(worker, len(pdf))
+
+    started = time.perf_counter()
+    in_flight = threading.BoundedSemaphore(pool.size * 2)
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        futures = []
+        for relative, load in jobs:
+            in_flight.acquire()
+            future = executor.submit(work, relative, load)
+            future.add_done_callback(lambda _: in_flight.release())
+            futures.append(future)
+        for future in futures:
+            future.result()
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def render(source, output_dir, workers=None, chrome_binary=None, pool=None):
+    """Render a challan directory or .tar archive to PDFs under output_dir."""
+    stats = RenderStats()
+    if os.path.isdir(source):
+        jobs = directory_jobs(source, output_dir, stats)
+    else:
+        jobs = archive_jobs(source, output_dir, stats)
+
+    if pool is not None:
+        return render_all(jobs, output_dir, pool, stats)
+    with ChromePool(workers, chrome_binary) as own_pool:
+        return render_all(jobs, output_dir, own_pool, stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory of challan HTML files or a .tar archive")
+    parser.add_argument("output", help="directory for the PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="Chrome instances (default: CPU count)")
+    parser.add_argument("--chrome", default=None, help="path to the Chrome binary")
+    args = parser.parse_args(argv)
+
+    stats = render(args.source, args.output, args.workers, args.chrome)
+    print(f"Rendered {stats.rendered} PDFs ({stats.skipped} up to date) in {stats.seconds:.2f}s "
+          f"with {len(stats.per_worker)} workers: {stats.pages_per_second:.1f} pages/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
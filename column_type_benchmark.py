@@ -0,0 +1,144 @@
+"""
+Before/after benchmark for migrations/002_compact_column_types.sql.
+
+Builds a scratch database with migrate.py as point_management.sql and the
+earlier migrations leave it, empties student and driver and fills both with
+--rows synthetic rows, then applies the column type migration and measures
+again:
+
+  * data and index size   - information_schema.TABLES after ANALYZE TABLE
+  * average row length
+  * full-scan time        - median of --runs warm reads of every row's
+                            migrated columns through the clustered index
+
+Examples:
+    python column_type_benchmark.py                  # 1M rows
+    python column_type_benchmark.py --rows 100000 --runs 3
+    python column_type_benchmark.py --json
+"""
+import argparse
+import json
+import statistics
+import time
+
+import migrate
+from db_config import connect
+
+MIGRATION_VERSION = 2
+SCRATCH_DB = "point_management_bench"
+
+# MariaDB's sequence engine provides seq_1_to_N without a helper table.
+# student.Phone starts as an int, so its synthetic numbers stay below 2^31.
+FILL = {
+    "student": (
+        "INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) "
+        "SELECT CONCAT('K', seq), CONCAT('Student ', seq), CONCAT('P', seq), 300000000 + seq, "
+        "ELT(1 + seq % 3, 'Paid', 'Pending', 'Unpaid'), CONCAT('D_', seq) FROM seq_1_to_{rows}"
+    ),
+    "driver": (
+        "INSERT INTO driver (Name, Route, Point_no, Phone, Driver_ID) "
+        "SELECT CONCAT('Driver ', seq), ELT(1 + seq % 4, 'Gulshan', 'Clifton', 'Saddar', 'Malir'), "
+        "CONCAT('P', seq), CONCAT('03', LPAD(seq, 8, '0')), CONCAT('D_', seq) FROM seq_1_to_{rows}"
+    ),
+}
+
+# Columns the migration changes, read by the scan
+SCAN = {
+    "student": "SELECT SUM(CHAR_LENGTH(Point_no) + CHAR_LENGTH(Phone) + CHAR_LENGTH(Fee_Status)) FROM student",
+    "driver": "SELECT SUM(CHAR_LENGTH(Point_no) + CHAR_LENGTH(Phone)) FROM driver",
+}
+
+
+# -------------------- Measurement --------------------
+def measure(conn, table, runs):
+    with conn.cursor() as cursor:
+        cursor.execute(f"ANALYZE TABLE `{table}`")
+        cursor.fetchall()
+        cursor.execute(
+            "SELECT DATA_LENGTH, INDEX_LENGTH, AVG_ROW_LENGTH FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table,)
+        )
+        data, index, avg_row = cursor.fetchone()
+
+        cursor.execute(SCAN[table])  # warm the buffer pool
+        cursor.fetchall()
+        times = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            cursor.execute(SCAN[table])
+            cursor.fetchall()
+            times.append((time.perf_counter() - started) * 1000)
+    return {"data_bytes": data, "index_bytes": index, "avg_row_bytes": avg_row,
+            "scan_ms": statistics.median(times)}
+
+
+def create_scratch(conn, database=SCRATCH_DB):
+    """(Re)create `database` as it is before the migration, with empty FILL tables, and switch to it."""
+    migrate.build_database(conn, database, to=MIGRATION_VERSION - 1)
+    with conn.cursor() as cursor:
+        for table in FILL:
+            cursor.execute(f"TRUNCATE TABLE `{table}`")
+
+
+def apply_migration(conn):
+    """Run the column type migration; return how long it took in ms."""
+    started = time.perf_counter()
+    migrate.up(conn, to=MIGRATION_VERSION)
+    return (time.perf_counter() - started) * 1000
+
+
+def run(conn, rows, runs, database=SCRATCH_DB, keep=False):
+    """Build, fill, migrate and measure; return {table: {"before": ..., "after": ...}}."""
+    create_scratch(conn, database)
+    with conn.cursor() as cursor:
+        for fill in FILL.values():
+            cursor.execute(fill.format(rows=rows))
+    conn.commit()
+
+    report = {table: {"before": measure(conn, table, runs)} for table in FILL}
+    report["migration_ms"] = apply_migration(conn)
+    for table in FILL:
+        report[table]["after"] = measure(conn, table, runs)
+
+    if not keep:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE `{database}`")
+    return report
+
+
+def print_report(report, rows):
+    mb = 1024 * 1024
+    print(f"{rows} rows per table, migration took {report['migration_ms'] / 1000:.1f} s")
+    print(f"{'table':<8} {'':<7} {'data MB':>9} {'index MB':>9} {'row B':>6} {'scan ms':>9}")
+    for table in FILL:
+        for stage in ("before", "after"):
+            m = report[table][stage]
+            print(f"{table:<8} {stage:<7} {m['data_bytes'] / mb:>9.1f} {m['index_bytes'] / mb:>9.1f} "
+                  f"{m['avg_row_bytes']:>6} {m['scan_ms']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5, help="timed scans per table and stage")
+    parser.add_argument("--database", default=SCRATCH_DB, help="scratch database, dropped and recreated")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database afterwards")
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args(argv)
+
+    conn = connect(database=None)
+    try:
+        report = run(conn, args.rows, args.runs, args.database, args.keep)
+    finally:
+        conn.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,2 @@
+# Pytest plugins shared by every test module
+pytest_plugins = ["sql_profile", "phase_timing", "page_timing", "wait_diagnostics", "impact_map"]
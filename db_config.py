@@ -0,0 +1,37 @@
+"""
+Shared configuration for the Python tools.
+
+Settings live in config.ini next to this file. Every value can be overridden
+with an environment variable named PM_<SECTION>_<KEY>, e.g. PM_DATABASE_PORT.
+"""
+import configparser
+import os
+
+import pymysql
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.ini")
+
+
+def load_config(path=CONFIG_PATH):
+    config = configparser.ConfigParser()
+    config.read(path)
+    for section in config.sections():
+        for key in config[section]:
+            override = os.environ.get(f"PM_{section.upper()}_{key.upper()}")
+            if override is not None:
+                config[section][key] = override
+    return config
+
+
+def connect(config=None, **overrides):
+    """Open a pymysql connection using the [database] section."""
+    db = (config or load_config())["database"]
+    options = {
+        "host": db.get("host", "localhost"),
+        "port": db.getint("port", 3307),
+        "user": db.get("user", "root"),
+        "password": db.get("password", ""),
+        "database": db.get("name", "point_management"),
+    }
+    options.update(overrides)
+    return pymysql.connect(**options)
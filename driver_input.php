@@ -1,4 +1,7 @@
 <?php
+require_once 'RouteRoster.php';
+require_once 'TableVersion.php';
+
 if ($_SERVER["REQUEST_METHOD"] == "POST") {
     $servername = "localhost";
     $username = "root";
@@ -37,14 +40,20 @@ if ($_SERVER["REQUEST_METHOD"] == "POST") {
             echo "A driver with this ID already exists.";
         } else {
             // If no record exists, prepare the SQL statement to insert the driver's details
+            $conn->begin_transaction();
             $stmt = $conn->prepare("INSERT INTO driver (Name, Route, Point_no, Phone, Driver_ID) VALUES (?, ?, ?, ?, ?)");
-            $stmt->bind_param("sssis", $driverName, $driverRoute, $pointNo, $driverPhone, $driverID);
+            $stmt->bind_param("sssss", $driverName, $driverRoute, $pointNo, $driverPhone, $driverID);
 
-            // Execute the statement and check if the insertion was successful
-            if ($stmt->execute()) {
+            // Execute the statement and record the driver table version and route roster with it
+            $versions = new TableVersion($conn, 'driver');
+            $roster = new RouteRoster($conn);
+            if ($stmt->execute() && $versions->record([$driverID], false) !== false && $roster->refresh('Driver_ID', $driverID)) {
+                $conn->commit();
                 echo "New driver added successfully";
             } else {
-                echo "Error: " . $stmt->error;
+                $error = $stmt->error ?: $conn->error;
+                $conn->rollback();
+                echo "Error: " . $error;
             }
 
             // Close the prepared statement
@@ -0,0 +1,37 @@
+<?php
+header('Content-Type: application/json');
+require_once 'EtaService.php';
+
+$servername = "localhost";
+$username = "root";
+$password = "";
+$db_name = "point_management";
+$port = 3307;
+
+// Create connection
+$conn = new mysqli($servername, $username, $password, $db_name, $port);
+
+// Check connection
+if ($conn->connect_error) {
+    http_response_code(500);
+    die(json_encode(["error" => "Connection failed: " . $conn->connect_error]));
+}
+
+$service = new EtaService($conn);
+
+if (isset($_GET['Driver_ID'])) {
+    // ETAs for one bus
+    $eta = $service->etaForDriver($_GET['Driver_ID']);
+    if ($eta === false) {
+        http_response_code(404);
+        echo json_encode(["error" => "No position or stops for this driver"]);
+    } else {
+        echo json_encode($eta);
+    }
+} else {
+    // ETAs for every bus that has reported a position
+    echo json_encode($service->etaForFleet());
+}
+
+$conn->close();
+?>
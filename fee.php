@@ -1,5 +1,6 @@
 <?php
 session_start();
+require_once 'ChallanLedger.php';
 
 $servername = "localhost";
 $username = "root";
@@ -16,34 +17,48 @@ if ($conn->connect_error) {
     die("Connection failed: " . $conn->connect_error);
 }
 
+/**
+ * Print a challan from the ledger
+ */
+function showChallan($challan, $message)
+{
+    echo '<div id="challanToPrint" style="text-align: center; position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); width: 100%;">';
+    echo "<h1>FAST UNIVERSITY</h1>";
+    echo "<p><strong>Challan No:</strong> " . $challan['Challan_no'] . "</p>";
+    echo "<p><strong>Student Name:</strong> " . htmlspecialchars($challan['Name']) . "</p>";
+    echo "<p><strong>Student ID:</strong> " . htmlspecialchars($challan['Student_ID']) . "</p>";
+    echo "<p><strong>Point Number:</strong> " . htmlspecialchars($challan['Point_no']) . "</p>";
+    echo "<p><strong>Fee Amount:</strong> Rs " . $challan['Amount'] . "</p>";
+    echo "<p><strong>$message</strong></p>";
+    echo '<button onclick="printChallan()">Print Challan</button>';
+    echo '</div>';
+}
+
+// fee.php issues one challan per request, so it reserves numbers one at a time
+$ledger = new ChallanLedger($conn, 1);
+
 if ($_SERVER["REQUEST_METHOD"] == "POST") {
-    // Assign variables and sanitize input
-    $studentName = htmlspecialchars($_POST['name']);
-    $studentId = htmlspecialchars($_POST['student-id']);
-    $pointnumber = htmlspecialchars($_POST['point-number']);
+    // Assign variables; values are escaped when printed
+    $studentName = trim($_POST['name']);
+    $studentId = trim($_POST['student-id']);
+    $pointnumber = trim($_POST['point-number']);
 
     // Basic validation (in real-world scenarios, more complex validation and security measures are required)
     if (empty($studentName) || empty($studentId) || empty($pointnumber)) {
         echo "Please fill in all fields correctly.";
     } else {
-        // Print the data here; in a real scenario, you might also insert data into the database
-        echo '<div id="challanToPrint" style="text-align: center; position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); width: 100%;">';
-        echo "<h1>FAST UNIVERSITY</h1>";
-        echo "<p><strong>Student Name:</strong> $studentName</p>";
-        echo "<p><strong>Student ID:</strong> $studentId</p>";
-        echo "<p><strong>Point Number:</strong> $pointnumber</p>";
-        echo "<p><strong>Fee Amount:</strong> Rs 35000</p>";
-        echo "<p><strong>Fee Challan generated successfully</strong></p>";
-        echo '<button onclick="printChallan()">Print Challan</button>';
-        echo '</div>';
+        $challan = $ledger->issue($studentId, $studentName, $pointnumber);
+        $ledger->flush();
 
-        // Example of inserting data into a table (commented out)
-        /*
-        $stmt = $conn->prepare("INSERT INTO students (student_id, student_name, point_number) VALUES (?, ?, ?)");
-        $stmt->bind_param("sss", $studentId, $studentName, $pointnumber);
-        $stmt->execute();
-        $stmt->close();
-        */
+        showChallan($challan, "Fee Challan generated successfully");
+    }
+} elseif (isset($_GET['student-id'])) {
+    // Reprint the latest challan straight from the ledger
+    $challan = $ledger->latestFor($_GET['student-id']);
+    if ($challan === null) {
+        echo "No challan has been issued for this student.";
+    } else {
+        showChallan($challan, "Fee Challan reprinted");
     }
 }
 
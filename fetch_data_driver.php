@@ -1,6 +1,8 @@
 <?php
 header("Access-Control-Allow-Origin: *");
 header('Content-Type: application/json');
+require_once 'RouteRoster.php';
+require_once 'TableVersion.php';
 
 $servername = "localhost";
 $username = "root";
@@ -19,17 +21,37 @@ if ($conn->connect_error) {
 if ($_SERVER["REQUEST_METHOD"] == "POST" && isset($_POST['action']) && $_POST['action'] == 'delete' && isset($_POST['Driver_ID'])) {
     // Process the delete action
     $driverID = $conn->real_escape_string($_POST['Driver_ID']);
+    $versions = new TableVersion($conn, 'driver');
+    $roster = new RouteRoster($conn);
+    // The delete, its version and the route roster are written together
+    $conn->begin_transaction();
     $deleteSql = "DELETE FROM driver WHERE Driver_ID = ?";
     $deleteStmt = $conn->prepare($deleteSql);
     $deleteStmt->bind_param("s", $driverID);
-    if ($deleteStmt->execute()) {
-        echo json_encode(["success" => "Driver deleted successfully"]);
+    $version = null;
+    if ($deleteStmt->execute() && ($deleteStmt->affected_rows == 0
+            || (($version = $versions->record([$driverID], true)) !== false && $roster->refresh('Driver_ID', $driverID)))) {
+        $conn->commit();
+        // The page applies the delete itself when it holds version "from", otherwise it fetches ?since=
+        if ($version !== null) {
+            $patch = ["deleted" => [$driverID], "from" => $version - 1, "v" => $version];
+        } else {
+            $current = $versions->current();
+            $patch = ["deleted" => [], "from" => $current, "v" => $current];
+        }
+        echo json_encode(["success" => "Driver deleted successfully"] + $patch);
     } else {
-        echo json_encode(["error" => "Error deleting driver: " . $deleteStmt->error]);
+        $error = $deleteStmt->error ?: $conn->error;
+        $conn->rollback();
+        echo json_encode(["error" => "Error deleting driver: " . $error]);
     }
     $deleteStmt->close();
+} elseif (isset($_GET['since'])) {
+    // Rows changed after the version the page holds
+    echo json_encode((new TableVersion($conn, 'driver'))->changesSince((int) $_GET['since']));
 } else {
-    // Fetch and return all drivers' data
+    // Fetch and return all drivers' data, with the version it is at (read first, so it is never ahead of the rows)
+    header('X-Table-Version: ' . (new TableVersion($conn, 'driver'))->current());
     $sql = "SELECT Driver_ID, Name, Route, Point_no, Phone FROM driver";
     $result = $conn->query($sql);
     $drivers = [];
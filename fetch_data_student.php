@@ -1,5 +1,8 @@
 <?php
 header('Content-Type: application/json');
+require_once 'StudentSummary.php';
+require_once 'TableVersion.php';
+
 $servername = "localhost";
 $username = "root";
 $password = "";
@@ -18,17 +21,27 @@ if ($conn->connect_error) {
 if ($_SERVER["REQUEST_METHOD"] == "POST" && isset($_POST['action']) && $_POST['action'] == 'delete' && isset($_POST['Student_ID'])) {
     // Process the delete action for a student
     $studentID = $conn->real_escape_string($_POST['Student_ID']);
-    $deleteSql = "DELETE FROM student WHERE Student_ID = ?";
-    $deleteStmt = $conn->prepare($deleteSql);
-    $deleteStmt->bind_param("s", $studentID);
-    if ($deleteStmt->execute()) {
-        echo json_encode(["success" => "Student deleted successfully"]);
+    // Deletes the row and decrements the dashboard counters in one transaction
+    $summary = new StudentSummary($conn);
+    $deleted = $summary->deleteStudent($studentID);
+    if ($deleted === true) {
+        // The page applies the delete itself when it holds version "from", otherwise it fetches ?since=
+        if ($summary->version !== null) {
+            $patch = ["deleted" => [$studentID], "from" => $summary->version - 1, "v" => $summary->version];
+        } else {
+            $version = (new TableVersion($conn, 'student'))->current();
+            $patch = ["deleted" => [], "from" => $version, "v" => $version];
+        }
+        echo json_encode(["success" => "Student deleted successfully"] + $patch);
     } else {
-        echo json_encode(["error" => "Error deleting student: " . $deleteStmt->error]);
+        echo json_encode(["error" => "Error deleting student: " . $deleted]);
     }
-    $deleteStmt->close();
+} elseif (isset($_GET['since'])) {
+    // Rows changed after the version the page holds
+    echo json_encode((new TableVersion($conn, 'student'))->changesSince((int) $_GET['since']));
 } else {
-    // Fetch and return all students' data
+    // Fetch and return all students' data, with the version it is at (read first, so it is never ahead of the rows)
+    header('X-Table-Version: ' . (new TableVersion($conn, 'student'))->current());
     $sql = "SELECT Student_ID, Name, Point_no, Phone, Fee_Status , Driver_ID FROM student";
     $result = $conn->query($sql);
     $students = [];
@@ -0,0 +1,93 @@
+/**
+ * Live fleet layer for the tracking map.
+ *
+ * Polls fleet_positions.php with the last version it has seen, decodes the
+ * delta-encoded rows and moves one marker per driver through MarkerAnimator.
+ * A single request per poll keeps every bus on the map current.
+ */
+var FleetMap = (function () {
+    var POLL_MS = 1000;
+
+    function FleetMap(map, options) {
+        options = options || {};
+        this.map = map;
+        this.url = options.url || 'fleet_positions.php';
+        this.pollMs = options.pollMs || POLL_MS;
+        this.icon = options.icon;
+        this.version = 0;
+        this.markers = new Map();   // Driver_ID -> L.Marker
+        this.layer = L.layerGroup().addTo(map);
+        this.timer = null;
+        this.running = false;
+        this.stats = { requests: 0, bytes: 0, updates: 0 };
+    }
+
+    /**
+     * Turn a payload from fleet_positions.php into absolute positions.
+     *
+     * @param {{v: number, q: number, d: Array}} payload Response body
+     * @return {Array<{id: string, lat: number, lng: number}>}
+     */
+    FleetMap.decode = function (payload) {
+        var lat = 0;
+        var lng = 0;
+        return payload.d.map(function (row) {
+            lat += row[1];
+            lng += row[2];
+            return { id: row[0], lat: lat / payload.q, lng: lng / payload.q };
+        });
+    };
+
+    FleetMap.prototype.start = function () {
+        this.running = true;
+        this.poll();
+    };
+
+    FleetMap.prototype.stop = function () {
+        this.running = false;
+        clearTimeout(this.timer);
+        this.timer = null;
+    };
+
+    FleetMap.prototype.poll = function () {
+        var self = this;
+        fetch(this.url + '?since=' + this.version)
+            .then(function (response) { return response.text(); })
+            .then(function (body) {
+                self.stats.requests += 1;
+                self.stats.bytes += body.length;
+                self.apply(JSON.parse(body));
+            })
+            .catch(function (error) {
+                console.error('Error fetching fleet positions:', error);
+            })
+            .then(function () {
+                if (!self.running) {
+                    return;
+                }
+                self.timer = setTimeout(function () { self.poll(); }, self.pollMs);
+            });
+    };
+
+    FleetMap.prototype.apply = function (payload) {
+        var self = this;
+        var now = performance.now();
+
+        FleetMap.decode(payload).forEach(function (position) {
+            var marker = self.markers.get(position.id);
+            if (!marker) {
+                marker = L.marker([position.lat, position.lng], self.icon ? { icon: self.icon } : {})
+                    .bindTooltip(position.id)
+                    .addTo(self.layer);
+                self.markers.set(position.id, marker);
+            } else {
+                MarkerAnimator.push(marker, { lat: position.lat, lng: position.lng, t: now });
+            }
+            self.stats.updates += 1;
+        });
+
+        this.version = payload.v;
+    };
+
+    return FleetMap;
+})();
@@ -0,0 +1,67 @@
+<?php
+/**
+ * Fleet-wide position feed for the tracking map.
+ *
+ * GET fleet_positions.php?since=<version> returns every driver whose position
+ * changed after <version>, in one compact payload:
+ *
+ *   {"v": 1234, "q": 100000, "d": [["D_10", 2496428, 6712880], ["D_5", -31, 412], ...]}
+ *
+ * "v" is the version to send as `since` on the next poll. Coordinates are
+ * integers in units of 1/q degrees. The first row carries absolute values;
+ * every following row carries the difference from the row before it, which
+ * keeps the numbers short because rows are sorted by latitude.
+ */
+header('Content-Type: application/json');
+header('Cache-Control: no-store');
+
+$servername = "localhost";
+$username = "root";
+$password = "";
+$db_name = "point_management";
+$port = 3307;
+
+// Create connection
+$conn = new mysqli($servername, $username, $password, $db_name, $port);
+
+// Check connection
+if ($conn->connect_error) {
+    http_response_code(500);
+    die(json_encode(["error" => "Connection failed: " . $conn->connect_error]));
+}
+
+$since = isset($_GET['since']) ? max(0, (int) $_GET['since']) : 0;
+
+// Compress the body when the client accepts it
+ob_start('ob_gzhandler');
+
+// Read the version first: rows committed after this point are picked up by the next poll
+$versionResult = $conn->query("SELECT version FROM tracking_version WHERE id = 1");
+$current = (int) $versionResult->fetch_row()[0];
+
+$rows = [];
+if ($since < $current) {
+    $stmt = $conn->prepare(
+        "SELECT Driver_ID, lat_e5, lng_e5 FROM driver_location WHERE version > ? AND version <= ? ORDER BY lat_e5"
+    );
+    $stmt->bind_param("ii", $since, $current);
+    $stmt->execute();
+    $result = $stmt->get_result();
+
+    $prevLat = 0;
+    $prevLng = 0;
+    while ($row = $result->fetch_row()) {
+        $lat = (int) $row[1];
+        $lng = (int) $row[2];
+        $rows[] = [$row[0], $lat - $prevLat, $lng - $prevLng];
+        $prevLat = $lat;
+        $prevLng = $lng;
+    }
+    $stmt->close();
+}
+
+echo json_encode(["v" => $current, "q" => 100000, "d" => $rows]);
+
+ob_end_flush();
+$conn->close();
+?>
@@ -0,0 +1,516 @@
+"""
+GPS fleet simulator for load-testing the tracking ingest and read paths.
+
+Every driver in the `driver` table gets a bus that drives from its Route's
+neighbourhood to campus and posts fixes to tracking.php, all on one asyncio
+event loop. A reader task polls fleet_positions.php at the same time so the
+report covers both paths:
+
+  * ingest latency      - from when a fix was due until tracking.php answered
+  * service time        - POST tracking.php round trip alone
+  * visibility latency  - from sending a fix until the fleet feed shows it
+  * read latency        - fleet_positions.php round trip
+
+Each bus sends on a fixed clock whether or not its previous fix has been
+answered, so a slow server shows up as ingest latency instead of quietly
+lowering the offered load.
+
+tracking.php only accepts fixes from drivers in the driver table, so
+--synthetic buses are added to it for the run and removed afterwards.
+
+Examples:
+    python fleet_simulator.py --drivers 100 --rate 1 --duration 60
+    python fleet_simulator.py --ramp 1,2,4,8,16 --step-duration 15
+    python fleet_simulator.py --replay --duration 120
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pymysql
+import requests
+
+BASE_URL = "http://localhost/SE"
+
+# Same point real_time_tracking.html centres the map on.
+CAMPUS = (24.964289848222037, 67.12880401129567)
+
+# Rough centre of every Route used in the driver table.
+ROUTE_ANCHORS = {
+    "Clifton": (24.8138, 67.0300),
+    "Defence": (24.8125, 67.0650),
+    "FB Area": (24.9300, 67.0800),
+    "Gulshan": (24.9200, 67.0950),
+    "Johar": (24.9140, 67.1270),
+    "Korangi": (24.8300, 67.1300),
+    "Landhi": (24.8450, 67.2100),
+    "Madras": (24.9250, 67.1400),
+    "Malir": (24.8950, 67.2000),
+    "Model Colony": (24.8800, 67.1800),
+    "Nazimabad": (24.9100, 67.0300),
+    "North Karachi": (24.9750, 67.0650),
+    "Orangi": (24.9500, 66.9900),
+    "Saddar": (24.8600, 67.0100),
+    "Scheme 33": (24.9500, 67.1500),
+    "Surjani": (25.0300, 67.0600),
+}
+
+METERS_PER_DEGREE = 111320.0
+QUANTUM = 100000
+
+SATURATION_P95_MS = 500.0
+SATURATION_ERROR_RATE = 0.01
+SATURATION_THROUGHPUT_RATIO = 0.9
+
+
+# -------------------- Movement --------------------
+class BusPath:
+    """A bent polyline from a Route anchor to campus, walked at bus speed."""
+
+    def __init__(self, start, end, rng, bends=6, speed_mps=None, gps_noise_m=5.0):
+        self.rng = rng
+        self.speed = speed_mps or rng.uniform(7.0, 12.0)
+        self.gps_noise = gps_noise_m / METERS_PER_DEGREE
+        self.points = [start]
+        for i in range(1, bends):
+            f = i / bends
+            self.points.append((
+                start[0] + (end[0] - start[0]) * f + rng.uniform(-0.004, 0.004),
+                start[1] + (end[1] - start[1]) * f + rng.uniform(-0.004, 0.004),
+            ))
+        self.points.append(end)
+
+        self.cumulative = [0.0]
+        for a, b in zip(self.points, self.points[1:]):
+            self.cumulative.append(self.cumulative[-1] + _distance_m(a, b))
+        # Each bus starts somewhere along its run so the fleet is spread out.
+        self.offset = rng.uniform(0, self.cumulative[-1])
+
+    def position(self, elapsed):
+        """Noisy position after `elapsed` seconds; buses loop back to their start."""
+        travelled = (self.offset + elapsed * self.speed) % self.cumulative[-1]
+        index = 1
+        while self.cumulative[index] < travelled:
+            index += 1
+        a, b = self.points[index - 1], self.points[index]
+        span = self.cumulative[index] - self.cumulative[index - 1]
+        f = (travelled - self.cumulative[index - 1]) / span if span else 0.0
+        return (
+            a[0] + (b[0] - a[0]) * f + self.rng.gauss(0, self.gps_noise),
+            a[1] + (b[1] - a[1]) * f + self.rng.gauss(0, self.gps_noise),
+        )
+
+
+class ReplayPath:
+    """Replays fixes recorded in location_history, keeping their original spacing."""
+
+    def __init__(self, fixes):
+        self.fixes = fixes   # [(seconds_from_first_fix, lat, lng)]
+        self.length = fixes[-1][0] or 1.0
+
+    def position(self, elapsed):
+        t = elapsed % self.length
+        lo, hi = 0, len(self.fixes) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.fixes[mid][0] <= t:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.fixes[lo][1], self.fixes[lo][2]
+
+
+def _distance_m(a, b):
+    dlat = (b[0] - a[0]) * METERS_PER_DEGREE
+    dlng = (b[1] - a[1]) * METERS_PER_DEGREE * math.cos(math.radians(a[0]))
+    return math.hypot(dlat, dlng)
+
+
+# -------------------- Fleet setup --------------------
+def get_connection(host='localhost', port=3307):
+    return pymysql.connect(
+        host=host,
+        user='root',
+        password='',  # Empty password for XAMPP
+        database='point_management',
+        port=port
+    )
+
+
+def load_drivers(conn, limit=None):
+    """(Driver_ID, Route) for every driver, optionally capped at `limit`."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT Driver_ID, Route FROM driver ORDER BY Driver_ID")
+        rows = cursor.fetchall()
+    return list(rows[:limit] if limit else rows)
+
+
+def synthetic_drivers(count, start=0):
+    routes = sorted(ROUTE_ANCHORS)
+    return [(f"SIM_{start + i:05d}", routes[i % len(routes)]) for i in range(count)]
+
+
+def add_drivers(conn, drivers):
+    """Register synthetic drivers; tracking.php rejects fixes from unknown ones."""
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            "INSERT IGNORE INTO driver (Name, Route, Point_no, Phone, Driver_ID) VALUES (%s, %s, %s, '', %s)",
+            [(driver_id, route, driver_id, driver_id) for driver_id, route in drivers]
+        )
+    conn.commit()
+
+
+def remove_drivers(conn, drivers):
+    """Remove synthetic drivers again, with every fix they sent."""
+    ids = [(driver_id,) for driver_id, _ in drivers]
+    with conn.cursor() as cursor:
+        cursor.executemany("DELETE FROM location_history WHERE Driver_ID = %s", ids)
+        cursor.executemany("DELETE FROM driver_location WHERE Driver_ID = %s", ids)
+        cursor.executemany("DELETE FROM driver WHERE Driver_ID = %s", ids)
+    conn.commit()
+
+
+def build_paths(drivers, rng):
+    paths = {}
+    for driver_id, route in drivers:
+        anchor = ROUTE_ANCHORS.get(route)
+        if anchor is None:
+            anchor = (CAMPUS[0] + rng.uniform(-0.1, 0.1), CAMPUS[1] + rng.uniform(-0.1, 0.1))
+        paths[driver_id] = BusPath(anchor, CAMPUS, rng)
+    return paths
+
+
+def load_replay_paths(conn, drivers):
+    """Recorded movement per driver; drivers without history are skipped."""
+    paths = {}
+    with conn.cursor() as cursor:
+        for driver_id, _ in drivers:
+            cursor.execute(
+                "SELECT recorded_at, lat, lng FROM location_history "
+                "WHERE Driver_ID = %s ORDER BY recorded_at LIMIT 5000",
+                (driver_id,)
+            )
+            rows = cursor.fetchall()
+            if len(rows) < 2:
+                continue
+            first = rows[0][0]
+            paths[driver_id] = ReplayPath([
+                ((at - first).total_seconds(), float(lat), float(lng)) for at, lat, lng in rows
+            ])
+    return paths
+
+
+# -------------------- Measurement --------------------
+class LatencyRecorder:
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds * 1000.0)
+
+    def summary(self):
+        if not self.samples:
+            return {"count": 0, "errors": self.errors}
+        ordered = sorted(self.samples)
+        return {
+            "count": len(ordered),
+            "errors": self.errors,
+            "mean_ms": statistics.fmean(ordered),
+            "p50_ms": _percentile(ordered, 50),
+            "p95_ms": _percentile(ordered, 95),
+            "p99_ms": _percentile(ordered, 99),
+            "max_ms": ordered[-1],
+        }
+
+
+def _percentile(ordered, pct):
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+# -------------------- Simulation --------------------
+class FleetSimulator:
+    """Drives a fleet of simulated buses against tracking.php on one event loop.
+
+    :param paths: Driver_ID -> object with a ``position(elapsed)`` method
+    :param rate: fixes per second per bus
+    :param jitter: fraction of the send interval each send is randomly shifted by
+    :param reconnect_probability: chance per fix that a bus drops its connection
+    :param outage_fixes: how many fixes a dropped bus buffers before it reconnects
+        and flushes them all at once
+    """
+
+    def __init__(self, paths, base_url=BASE_URL, rate=1.0, jitter=0.2,
+                 reconnect_probability=0.002, outage_fixes=(5, 30),
+                 read_interval=1.0, max_workers=None, seed=None):
+        self.paths = paths
+        self.base_url = base_url.rstrip('/')
+        self.rate = rate
+        self.jitter = jitter
+        self.reconnect_probability = reconnect_probability
+        self.outage_fixes = outage_fixes
+        self.read_interval = read_interval
+        self.rng = random.Random(seed)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or min(256, len(paths) + 8))
+        self._local = threading.local()
+
+        self.ingest = LatencyRecorder()
+        self.service = LatencyRecorder()
+        self.visibility = LatencyRecorder()
+        self.read = LatencyRecorder()
+        self.bursts = 0
+        self.sent = 0
+        self._pending = {}   # Driver_ID -> (lat_e5, lng_e5, sent_at)
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _post_fix(self, driver_id, lat, lng):
+        started = time.perf_counter()
+        try:
+            response = self._session().post(
+                f"{self.base_url}/tracking.php",
+                data={"Driver_ID": driver_id, "lat": f"{lat:.6f}", "lng": f"{lng:.6f}"},
+                timeout=30,
+            )
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return ok, time.perf_counter() - started
+
+    def _get_fleet(self, since):
+        started = time.perf_counter()
+        try:
+            response = self._session().get(
+                f"{self.base_url}/fleet_positions.php", params={"since": since}, timeout=30
+            )
+            payload = response.json() if response.status_code == 200 else None
+        except (requests.RequestException, ValueError):
+            payload = None
+        return payload, time.perf_counter() - started
+
+    async def _send(self, driver_id, lat, lng, due):
+        """Post one fix; its ingest latency counts from `due`, when it should have gone out."""
+        loop = asyncio.get_running_loop()
+        self._pending[driver_id] = (round(lat * QUANTUM), round(lng * QUANTUM), time.perf_counter())
+        ok, elapsed = await loop.run_in_executor(self.executor, self._post_fix, driver_id, lat, lng)
+        self.sent += 1
+        if ok:
+            self.ingest.add(time.perf_counter() - due)
+            self.service.add(elapsed)
+        else:
+            self.ingest.errors += 1
+
+    async def _bus(self, driver_id, path, started, deadline):
+        interval = 1.0 / self.rate
+        first = started + self.rng.uniform(0, interval)   # spread the first sends
+        in_flight = set()
+        buffered = []
+        outage_left = 0
+
+        for k in itertools.count():
+            # Fix k is due at an absolute time, however long the earlier ones took
+            due = first + interval * (k + self.rng.uniform(-self.jitter, self.jitter))
+            if due >= deadline:
+                break
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            fix = path.position(due - started)
+
+            if outage_left == 0 and self.rng.random() < self.reconnect_probability:
+                outage_left = self.rng.randint(*self.outage_fixes)
+
+            if outage_left > 0:
+                buffered.append(fix)
+                outage_left -= 1
+                if outage_left == 0:
+                    # Reconnected: flush everything that was queued at once.
+                    self.bursts += 1
+                    sends, buffered = [self._send(driver_id, *f, due) for f in buffered], []
+                else:
+                    sends = []
+            else:
+                sends = [self._send(driver_id, *fix, due)]
+
+            for send in sends:
+                task = asyncio.ensure_future(send)
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+        # Fixes still unanswered at the deadline count towards this run
+        await asyncio.gather(*in_flight)
+
+    async def _reader(self, deadline):
+        loop = asyncio.get_running_loop()
+        version = 0
+        while time.perf_counter() < deadline:
+            payload, elapsed = await loop.run_in_executor(self.executor, self._get_fleet, version)
+            seen_at = time.perf_counter()
+            if payload is None:
+                self.read.errors += 1
+            else:
+                self.read.add(elapsed)
+                version = payload["v"]
+                lat = lng = 0
+                for driver_id, d_lat, d_lng in payload["d"]:
+                    lat += d_lat
+                    lng += d_lng
+                    pending = self._pending.get(driver_id)
+                    if pending and pending[0] == lat and pending[1] == lng:
+                        self.visibility.add(seen_at - pending[2])
+                        del self._pending[driver_id]
+            await asyncio.sleep(self.read_interval)
+
+    async def run(self, duration):
+        """Simulate for `duration` seconds and return the report."""
+        started = time.perf_counter()
+        deadline = started + duration
+        tasks = [self._bus(driver_id, path, started, deadline) for driver_id, path in self.paths.items()]
+        tasks.append(self._reader(deadline))
+        await asyncio.gather(*tasks)
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        target = len(self.paths) * self.rate
+        return {
+            "buses": len(self.paths),
+            "target_fixes_per_sec": target,
+            "achieved_fixes_per_sec": self.sent / elapsed if elapsed else 0.0,
+            "reconnect_bursts": self.bursts,
+            "ingest": self.ingest.summary(),
+            "service": self.service.summary(),
+            "visibility": self.visibility.summary(),
+            "read": self.read.summary(),
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def is_saturated(report, p95_ms=SATURATION_P95_MS):
+    """True once the stack stops keeping up with the offered load."""
+    ingest = report["ingest"]
+    total = ingest["count"] + ingest["errors"]
+    if total == 0:
+        return True
+    if ingest["errors"] / total > SATURATION_ERROR_RATE:
+        return True
+    if ingest.get("p95_ms", float("inf")) > p95_ms:
+        return True
+    return report["achieved_fixes_per_sec"] < SATURATION_THROUGHPUT_RATIO * report["target_fixes_per_sec"]
+
+
+def find_saturation(paths, rates, step_duration, p95_ms=SATURATION_P95_MS, **options):
+    """Run one step per per-bus rate until the stack saturates.
+
+    Returns (steps, saturating_step); the latter is None if every step kept up.
+    """
+    steps = []
+    for rate in rates:
+        simulator = FleetSimulator(paths, rate=rate, **options)
+        try:
+            report = asyncio.run(simulator.run(step_duration))
+        finally:
+            simulator.close()
+        report["rate"] = rate
+        steps.append(report)
+        if is_saturated(report, p95_ms):
+            return steps, report
+    return steps, None
+
+
+# -------------------- CLI --------------------
+def _format(report):
+    ingest, service = report["ingest"], report["service"]
+    visibility, read = report["visibility"], report["read"]
+    return (
+        f"buses={report['buses']} target={report['target_fixes_per_sec']:.1f}/s "
+        f"achieved={report['achieved_fixes_per_sec']:.1f}/s bursts={report['reconnect_bursts']} | "
+        f"ingest p50={ingest.get('p50_ms', 0):.1f} p95={ingest.get('p95_ms', 0):.1f} "
+        f"errors={ingest['errors']} service p95={service.get('p95_ms', 0):.1f} | visibility p95={visibility.get('p95_ms', 0):.1f} | "
+        f"read p95={read.get('p95_ms', 0):.1f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--db-host", default="localhost")
+    parser.add_argument("--db-port", type=int, default=3307)
+    parser.add_argument("--drivers", type=int, help="use only the first N drivers from the driver table")
+    parser.add_argument("--synthetic", type=int, default=0, help="add N synthetic buses on top of the table")
+    parser.add_argument("--replay", action="store_true", help="replay location_history instead of synthesizing")
+    parser.add_argument("--rate", type=float, default=1.0, help="fixes per second per bus")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--reconnect-probability", type=float, default=0.002)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--ramp", help="comma-separated per-bus rates to step through until saturation")
+    parser.add_argument("--step-duration", type=float, default=15.0)
+    parser.add_argument("--p95-ms", type=float, default=SATURATION_P95_MS)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    conn = get_connection(args.db_host, args.db_port)
+    try:
+        drivers = load_drivers(conn, args.drivers)
+        synthetic = synthetic_drivers(args.synthetic)
+        add_drivers(conn, synthetic)
+        try:
+            drivers += synthetic
+            paths = load_replay_paths(conn, drivers) if args.replay else build_paths(drivers, rng)
+            if not paths:
+                parser.error("no buses to simulate")
+            return simulate(args, paths)
+        finally:
+            remove_drivers(conn, synthetic)
+    finally:
+        conn.close()
+
+
+def simulate(args, paths):
+    """Run the simulation or the ramp `args` asks for and print the report."""
+    options = {
+        "base_url": args.base_url,
+        "jitter": args.jitter,
+        "reconnect_probability": args.reconnect_probability,
+        "seed": args.seed,
+    }
+
+    if args.ramp:
+        rates = [float(r) for r in args.ramp.split(",")]
+        steps, saturated = find_saturation(paths, rates, args.step_duration, args.p95_ms, **options)
+        if args.json:
+            print(json.dumps({"steps": steps, "saturated_at": saturated and saturated["rate"]}, indent=2))
+        else:
+            for step in steps:
+                print(f"rate={step['rate']:g}/bus  {_format(step)}")
+            if saturated:
+                print(f"Saturated at {saturated['target_fixes_per_sec']:.1f} fixes/s "
+                      f"({saturated['rate']:g} per bus)")
+            else:
+                print("No saturation within the tested rates")
+        return 0
+
+    simulator = FleetSimulator(paths, rate=args.rate, **options)
+    try:
+        report = asyncio.run(simulator.run(args.duration))
+    finally:
+        simulator.close()
+    print(json.dumps(report, indent=2) if args.json else _format(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+<?php
+/**
+ * Generates fee challans for the whole student table in one pass
+ *
+ * Usage: php generate_challans.php [--issue] <output.tar|output.zip|directory>
+ *
+ * --issue also records a challan for every student in the challan ledger.
+ */
+require_once 'ChallanGenerator.php';
+require_once 'ChallanLedger.php';
+
+$args = array_slice($argv ?? [], 1);
+$issue = in_array('--issue', $args);
+$args = array_values(array_diff($args, ['--issue']));
+
+if (PHP_SAPI !== 'cli' || count($args) < 1) {
+    fwrite(STDERR, "Usage: php generate_challans.php [--issue] <output.tar|output.zip|directory>\n");
+    exit(1);
+}
+
+$servername = "localhost";
+$username = "root";
+$password = "";
+$db_name = "point_management";
+$port = 3307;
+
+// Create connection
+$conn = new mysqli($servername, $username, $password, $db_name, $port);
+
+// Check connection
+if ($conn->connect_error) {
+    fwrite(STDERR, "Connection failed: " . $conn->connect_error . "\n");
+    exit(1);
+}
+
+// The ledger writes on a second connection while the first one streams students
+$ledgerConn = null;
+$ledger = null;
+if ($issue) {
+    $ledgerConn = new mysqli($servername, $username, $password, $db_name, $port);
+    if ($ledgerConn->connect_error) {
+        fwrite(STDERR, "Connection failed: " . $ledgerConn->connect_error . "\n");
+        exit(1);
+    }
+    $ledger = new ChallanLedger($ledgerConn);
+}
+
+$stats = ChallanGenerator::generateBulk($conn, $args[0], $ledger);
+$conn->close();
+if ($ledgerConn !== null) {
+    $ledgerConn->close();
+}
+
+printf(
+    "Generated %d challans (%.1f MB) into %s in %.2f s (%.0f challans/s)\n",
+    $stats['count'], $stats['bytes'] / 1048576, $stats['output'], $stats['seconds'], $stats['per_second']
+);
+echo json_encode($stats) . "\n";
+?>
@@ -0,0 +1,336 @@
+"""
+Run only the tests a change can affect.
+
+A pytest plugin, loaded by conftest.py, with a command line for the same
+selection.
+
+`pytest --impact-record` records, for every test, the files of this site
+it requested: pages, scripts, stylesheets and images the browser loaded,
+PHP endpoints it called from forms and fetch(), and URLs the test called
+with requests. Browser requests come from Chrome's performance log, so
+form submissions and XHRs count, not just driver.get(). The map goes to
+[impact] map in config.ini; a partial run updates only the tests it ran.
+
+`pytest --impact-since REF` then runs the tests affected by the files
+changed since the git ref REF, including uncommitted and untracked files:
+
+  * a changed test module runs all of its tests
+  * a changed page, script, stylesheet or image runs the tests that
+    requested it; a changed PHP class runs the tests that requested an
+    endpoint that includes it, directly or through another class
+  * tests the map does not know yet always run, and so do tests that
+    requested nothing: they reach the code without HTTP, running PHP
+    through a subprocess or reading the sources from disk
+
+Anything else that changed (Python helpers, conftest.py, config.ini, the
+schema, migrations, a PHP file no test requested and nothing includes)
+can affect any test, so the whole suite runs, as it does when there is
+no map. The reason is printed either way.
+
+Examples:
+    pytest --impact-record                       # full run, writes the map
+    pytest --impact-since origin/main
+    python impact_map.py --since HEAD~3          # which tests, and why
+    python impact_map.py --file driver_input.php
+"""
+import argparse
+import datetime
+import json
+import os
+import re
+import subprocess
+import sys
+import weakref
+from urllib.parse import unquote, urlparse
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST = os.path.join(REPO_DIR, "static", "manifest.json")
+
+# Files the web server serves; a change to anything else runs the whole suite
+WEB_FILES = (".php", ".html", ".css", ".js", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".avif", ".ico")
+INCLUDE = re.compile(r"""\b(?:require|include)(?:_once)?\s*\(?\s*(?:__DIR__\s*\.\s*)?['"]/?([^'"]+)['"]""")
+
+
+def settings(config=None):
+    if config is None:
+        from db_config import load_config
+        config = load_config()
+    return (config.get("impact", "base_url", fallback="http://localhost/SE").rstrip("/"),
+            os.path.join(REPO_DIR, config.get("impact", "map", fallback="test_impact.json")))
+
+
+# -------------------- Recording --------------------
+def asset_sources(manifest_path=MANIFEST):
+    """{static/<hashed file>: source image} from the build_assets manifest."""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    return {f"static/{variant['file']}": source
+            for source, entry in manifest.items() for variant in entry.get("variants", {}).values()}
+
+
+def local_path(url, base_url, repo_dir=REPO_DIR):
+    """Repository path `url` is served from, None for URLs outside the site."""
+    parsed, base = urlparse(url), urlparse(base_url)
+    prefix = base.path.rstrip("/")
+    if parsed.netloc != base.netloc or not (parsed.path == prefix or parsed.path.startswith(prefix + "/")):
+        return None
+    path = unquote(parsed.path[len(prefix):]).strip("/")
+    if not path or os.path.isdir(os.path.join(repo_dir, path)):
+        # The directory index Apache serves
+        for index in ("index.php", "index.html"):
+            if os.path.exists(os.path.join(repo_dir, path, index)):
+                return f"{path}/{index}".lstrip("/")
+    return path
+
+
+class ImpactRecorder:
+    """Site files each test requested, from requests and every live Chrome's performance log."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.nodeid = None
+        self.drivers = weakref.WeakSet()
+        self.sources = asset_sources()
+        self.deps = {}
+        # Tests that ran, as opposed to being skipped before they could request anything
+        self.ran = set()
+
+    def add(self, url):
+        path = local_path(url, self.base_url)
+        if path is None or self.nodeid is None:
+            return
+        paths = self.deps.setdefault(self.nodeid, set())
+        paths.add(path)
+        if path in self.sources:
+            paths.add(self.sources[path])
+
+    def drain(self, driver):
+        """Add the requests `driver` made since the last drain."""
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            # Quit, crashed, or not a Chrome with the performance log
+            return
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            if message["method"] == "Network.requestWillBeSent":
+                self.add(message["params"]["request"]["url"])
+
+    def drain_all(self):
+        for driver in list(self.drivers):
+            self.drain(driver)
+
+
+def instrument(recorder):
+    """Turn on Chrome's performance log and wrap requests; returns a function that undoes it."""
+    # Imported here so the plugin loads, and the pure tests run, without Selenium or requests
+    import requests
+    from selenium.webdriver import ChromeOptions
+    from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+
+    chrome_init, chrome_quit, request = Chrome.__init__, Chrome.quit, requests.Session.request
+
+    def init(self, options=None, service=None, keep_alive=True):
+        options = options or ChromeOptions()
+        prefs = options.to_capabilities().get("goog:loggingPrefs") or {}
+        options.set_capability("goog:loggingPrefs", dict(prefs, performance="ALL"))
+        chrome_init(self, options=options, service=service, keep_alive=keep_alive)
+        recorder.drivers.add(self)
+
+    def quit(self):
+        recorder.drain(self)
+        recorder.drivers.discard(self)
+        return chrome_quit(self)
+
+    def session_request(self, method, url, *args, **kwargs):
+        recorder.add(url)
+        return request(self, method, url, *args, **kwargs)
+
+    Chrome.__init__, Chrome.quit, requests.Session.request = init, quit, session_request
+
+    def undo():
+        Chrome.__init__, Chrome.quit, requests.Session.request = chrome_init, chrome_quit, request
+    return undo
+
+
+# -------------------- The map --------------------
+def load_map(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_map(path, deps, commit, nodeids):
+    """Replace the entries of the tests in `nodeids` with what they requested this run."""
+    impact = load_map(path) or {"tests": {}}
+    for nodeid in nodeids:
+        impact["tests"][nodeid] = sorted(deps.get(nodeid, ()))
+    impact["commit"] = commit
+    impact["recorded_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+    with open(path, "w") as f:
+        json.dump(impact, f, indent=1, sort_keys=True)
+
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout
+
+
+def changed_files(ref):
+    """Files changed since `ref`, committed or not, and files git does not track yet."""
+    changed = git("diff", "--name-only", ref, "--").splitlines()
+    changed += git("ls-files", "--others", "--exclude-standard").splitlines()
+    return sorted(set(changed))
+
+
+def includers(repo_dir=REPO_DIR):
+    """{php file: PHP files that require or include it}."""
+    included_by = {}
+    for name in os.listdir(repo_dir):
+        if name.endswith(".php"):
+            with open(os.path.join(repo_dir, name), encoding="utf-8", errors="replace") as f:
+                for included in INCLUDE.findall(f.read()):
+                    included_by.setdefault(included, set()).add(name)
+    return included_by
+
+
+def served_by(path, included_by):
+    """`path` and every PHP file that includes it, directly or not."""
+    found, pending = {path}, [path]
+    while pending:
+        for parent in included_by.get(pending.pop(), ()):
+            if parent not in found:
+                found.add(parent)
+                pending.append(parent)
+    return found
+
+
+def select(impact, changed, nodeids, included_by):
+    """(node ids to run, reason), or (None, reason) when the whole suite must run."""
+    if impact is None:
+        return None, "no dependency map; record one with pytest --impact-record"
+    tests = impact["tests"]
+    requested = set().union(*tests.values())
+    selected = {nodeid: "not in the dependency map" for nodeid in nodeids if nodeid not in tests}
+    selected.update((nodeid, "requested nothing over HTTP") for nodeid in nodeids if tests.get(nodeid) == [])
+    for path in changed:
+        name = os.path.basename(path)
+        if name.startswith("test_") and name.endswith(".py"):
+            for nodeid in nodeids:
+                if nodeid.split("::")[0] == path:
+                    selected.setdefault(nodeid, f"{path} changed")
+        elif path.endswith(".php") and path not in requested and path not in included_by:
+            return None, f"{path} changed and no test requested it or anything that includes it"
+        elif path.endswith(WEB_FILES):
+            files = served_by(path, included_by)
+            for nodeid in nodeids:
+                hit = files.intersection(tests.get(nodeid, ()))
+                if hit:
+                    selected.setdefault(nodeid, f"requested {', '.join(sorted(hit))}")
+        else:
+            return None, f"{path} changed and is not a page, asset or test module"
+    return selected, f"{len(changed)} changed files, map recorded at {(impact.get('commit') or 'unknown')[:10]}"
+
+
+# -------------------- Pytest plugin --------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("impact", "test impact analysis")
+    group.addoption("--impact-record", action="store_true",
+                    help="record the site files each test requests into the dependency map")
+    group.addoption("--impact-since", metavar="REF",
+                    help="run only the tests affected by files changed since git REF")
+
+
+def pytest_configure(config):
+    if config.getoption("impact_record"):
+        base_url, _ = settings()
+        config._impact_recorder = ImpactRecorder(base_url)
+        config._impact_undo = instrument(config._impact_recorder)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_unconfigure(config):
+    if getattr(config, "_impact_recorder", None) is not None:
+        config._impact_undo()
+
+
+def pytest_collection_modifyitems(session, config, items):
+    ref = config.getoption("impact_since")
+    if not ref:
+        return
+    _, map_path = settings()
+    selected, reason = select(load_map(map_path), changed_files(ref), [item.nodeid for item in items], includers())
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if selected is None:
+        reporter.write_line(f"impact: running every test, {reason}")
+        return
+    reporter.write_line(f"impact: {len(selected)} of {len(items)} tests affected, {reason}")
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid in selected]
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    recorder = getattr(item.config, "_impact_recorder", None)
+    if recorder is None:
+        yield
+        return
+    # Whatever the open browsers did between tests belongs to neither
+    recorder.nodeid = None
+    recorder.drain_all()
+    recorder.nodeid = item.nodeid
+    yield
+    recorder.drain_all()
+    recorder.nodeid = None
+
+
+def pytest_runtest_makereport(item, call):
+    recorder = getattr(item.config, "_impact_recorder", None)
+    if recorder is not None and call.when == "call":
+        recorder.ran.add(item.nodeid)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    recorder = getattr(session.config, "_impact_recorder", None)
+    if recorder is None or not recorder.ran:
+        return
+    _, map_path = settings()
+    save_map(map_path, recorder.deps, git("rev-parse", "HEAD").strip(), recorder.ran)
+
+
+# -------------------- CLI --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    what = parser.add_mutually_exclusive_group(required=True)
+    what.add_argument("--since", metavar="REF", help="list the mapped tests affected by changes since git REF")
+    what.add_argument("--file", help="list the tests that depend on this file")
+    args = parser.parse_args(argv)
+
+    _, map_path = settings()
+    impact = load_map(map_path)
+    if impact is None:
+        print(f"No dependency map at {map_path}; run pytest --impact-record first", file=sys.stderr)
+        return 1
+
+    if args.file:
+        changed = [args.file]
+    else:
+        changed = changed_files(args.since)
+    selected, reason = select(impact, changed, sorted(impact["tests"]), includers())
+    print(reason, file=sys.stderr)
+    if selected is None:
+        print("whole suite", file=sys.stderr)
+        return 0
+    for nodeid in sorted(selected):
+        print(f"{nodeid}  # {selected[nodeid]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
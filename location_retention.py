@@ -0,0 +1,179 @@
+"""
+Retention and rollup for the GPS location history.
+
+location_history and location_minute are partitioned by day (see
+point_management.sql). One run of this job:
+
+  1. creates daily partitions up to `future_days` ahead of today, split off
+     the catch-all `p_future` partition;
+  2. rolls every raw day older than `raw_days` up into per-minute rows in
+     location_minute;
+  3. drops those raw days with ALTER TABLE ... DROP PARTITION, which removes
+     a whole day without touching the rows of any other day;
+  4. drops rollup days older than `rollup_days` the same way.
+
+Retention periods come from the [retention] section of config.ini.
+
+Usage:
+    python location_retention.py            # run against today
+    python location_retention.py --dry-run  # print the plan only
+"""
+import argparse
+import datetime
+
+from db_config import connect, load_config
+
+HISTORY_TABLE = "location_history"
+ROLLUP_TABLE = "location_minute"
+CATCH_ALL = "p_future"
+
+
+def partition_name(day):
+    return day.strftime("p%Y%m%d")
+
+
+def partition_day(name):
+    return datetime.datetime.strptime(name, "p%Y%m%d").date()
+
+
+def daily_partitions(conn, table):
+    """Dates of the daily partitions of `table`, oldest first."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION",
+            (table,)
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return [partition_day(name) for name in names if name != CATCH_ALL]
+
+
+def ensure_partitions(conn, table, column, first_day, through_day, dry_run=False):
+    """Split daily partitions off p_future so every day up to `through_day` has its own.
+
+    On a table that has no daily partitions yet, they start at `first_day` or
+    at the oldest row already in the catch-all, whichever is earlier.
+    """
+    existing = daily_partitions(conn, table)
+    if existing:
+        start = existing[-1] + datetime.timedelta(days=1)
+    else:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT MIN(`{column}`) FROM `{table}`")
+            oldest = cursor.fetchone()[0]
+        start = min(oldest.date(), first_day) if oldest else first_day
+
+    days = []
+    day = start
+    while day <= through_day:
+        days.append(day)
+        day += datetime.timedelta(days=1)
+    if not days:
+        return []
+
+    definitions = ", ".join(
+        f"PARTITION {partition_name(d)} VALUES LESS THAN (TO_DAYS('{d + datetime.timedelta(days=1)}'))"
+        for d in days
+    )
+    statement = (
+        f"ALTER TABLE `{table}` REORGANIZE PARTITION {CATCH_ALL} INTO "
+        f"({definitions}, PARTITION {CATCH_ALL} VALUES LESS THAN MAXVALUE)"
+    )
+    if not dry_run:
+        with conn.cursor() as cursor:
+            cursor.execute(statement)
+    return days
+
+
+def rollup_day(conn, day, dry_run=False):
+    """Aggregate one raw day into location_minute. Safe to run more than once."""
+    # The newest fix of each minute is the one numbered 1; picking it with
+    # GROUP_CONCAT would fail on a busy minute longer than group_concat_max_len
+    statement = (
+        f"INSERT INTO `{ROLLUP_TABLE}` (Driver_ID, `minute`, fixes, lat_avg, lng_avg, lat_last, lng_last) "
+        f"SELECT Driver_ID, `minute`, COUNT(*), AVG(lat), AVG(lng), "
+        f"MAX(CASE WHEN newest = 1 THEN lat END), MAX(CASE WHEN newest = 1 THEN lng END) "
+        f"FROM (SELECT Driver_ID, lat, lng, DATE_FORMAT(recorded_at, '%%Y-%%m-%%d %%H:%%i:00') AS `minute`, "
+        f"ROW_NUMBER() OVER (PARTITION BY Driver_ID, DATE_FORMAT(recorded_at, '%%Y-%%m-%%d %%H:%%i:00') "
+        f"ORDER BY recorded_at DESC) AS newest "
+        f"FROM `{HISTORY_TABLE}` PARTITION ({partition_name(day)})) AS ranked "
+        f"GROUP BY Driver_ID, `minute` "
+        f"ON DUPLICATE KEY UPDATE fixes = VALUES(fixes), lat_avg = VALUES(lat_avg), lng_avg = VALUES(lng_avg), "
+        f"lat_last = VALUES(lat_last), lng_last = VALUES(lng_last)"
+    )
+    if dry_run:
+        return 0
+    with conn.cursor() as cursor:
+        cursor.execute(statement, ())
+        rows = cursor.rowcount
+    conn.commit()
+    return rows
+
+
+def drop_days(conn, table, days, dry_run=False):
+    if not days or dry_run:
+        return
+    names = ", ".join(partition_name(day) for day in days)
+    with conn.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE `{table}` DROP PARTITION {names}")
+
+
+def run(conn, config=None, today=None, dry_run=False):
+    """Run one retention pass and return what it did."""
+    settings = (config or load_config())["retention"]
+    raw_days = settings.getint("raw_days", 7)
+    rollup_days = settings.getint("rollup_days", 180)
+    future_days = settings.getint("future_days", 3)
+    today = today or datetime.date.today()
+    horizon = today + datetime.timedelta(days=future_days)
+
+    raw_cutoff = today - datetime.timedelta(days=raw_days)
+
+    created_raw = ensure_partitions(conn, HISTORY_TABLE, "recorded_at", today, horizon, dry_run)
+    # Give every raw day a rollup partition of its own before it is copied in.
+    raw_partitions = daily_partitions(conn, HISTORY_TABLE)
+    rollup_start = min(raw_partitions[0], raw_cutoff) if raw_partitions else raw_cutoff
+    created_rollup = ensure_partitions(conn, ROLLUP_TABLE, "minute", rollup_start, horizon, dry_run)
+
+    expired_raw = [day for day in daily_partitions(conn, HISTORY_TABLE) if day < raw_cutoff]
+    rolled_up = sum(rollup_day(conn, day, dry_run) for day in expired_raw)
+    drop_days(conn, HISTORY_TABLE, expired_raw, dry_run)
+
+    rollup_cutoff = today - datetime.timedelta(days=rollup_days)
+    expired_rollup = [day for day in daily_partitions(conn, ROLLUP_TABLE) if day < rollup_cutoff]
+    drop_days(conn, ROLLUP_TABLE, expired_rollup, dry_run)
+
+    return {
+        "today": today,
+        "created_raw_partitions": created_raw,
+        "created_rollup_partitions": created_rollup,
+        "rolled_up_days": expired_raw,
+        "rolled_up_rows": rolled_up,
+        "dropped_raw_partitions": expired_raw,
+        "dropped_rollup_partitions": expired_rollup,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--today", type=datetime.date.fromisoformat, help="pretend today is this date")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    conn = connect(config)
+    try:
+        summary = run(conn, config, args.today, args.dry_run)
+    finally:
+        conn.close()
+
+    for key, value in summary.items():
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value) or "-"
+        print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
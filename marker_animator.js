@@ -0,0 +1,189 @@
+/**
+ * Marker animation engine for the tracking map.
+ *
+ * All animated markers share one requestAnimationFrame loop. Each marker owns
+ * a track of timestamped fixes ({lat, lng, t} with t in milliseconds) and is
+ * moved to the position interpolated between the two fixes around the current
+ * track time. Starting a new track on a marker replaces the old one, so a
+ * second click never produces two animations fighting over the same marker.
+ * The loop stops as soon as no track is active.
+ */
+var MarkerAnimator = (function () {
+    var LIVE_GLIDE_MS = 1000;
+
+    var tracks = new Map();   // marker -> track
+    var frameId = null;
+    var lastFrame = null;
+
+    var stats = {
+        frames: 0,
+        totalFrameMs: 0,
+        maxFrameMs: 0,
+        markerUpdates: 0,
+        cancelled: 0
+    };
+
+    function now() {
+        return performance.now();
+    }
+
+    function schedule() {
+        if (frameId === null) {
+            frameId = requestAnimationFrame(step);
+        }
+    }
+
+    function step(timestamp) {
+        var started = now();
+        frameId = null;
+
+        // Clamp huge gaps (background tab, debugger) so tracks don't jump.
+        var elapsed = lastFrame === null ? 0 : Math.min(timestamp - lastFrame, 250);
+        lastFrame = timestamp;
+
+        tracks.forEach(function (track, marker) {
+            track.clock += elapsed;
+            advance(track, marker);
+            if (track.done) {
+                tracks.delete(marker);
+            }
+        });
+
+        var spent = now() - started;
+        stats.frames += 1;
+        stats.totalFrameMs += spent;
+        if (spent > stats.maxFrameMs) {
+            stats.maxFrameMs = spent;
+        }
+
+        if (tracks.size > 0) {
+            schedule();
+        } else {
+            lastFrame = null;
+        }
+    }
+
+    function advance(track, marker) {
+        var fixes = track.fixes;
+        var time = track.origin + track.clock;
+
+        // The cursor only moves forward, so a frame costs O(1) amortized
+        // no matter how long the route is.
+        while (track.cursor < fixes.length - 1 && fixes[track.cursor + 1].t <= time) {
+            track.cursor += 1;
+        }
+
+        var from = fixes[track.cursor];
+        var lat = from.lat;
+        var lng = from.lng;
+
+        if (track.cursor < fixes.length - 1) {
+            var to = fixes[track.cursor + 1];
+            var span = to.t - from.t;
+            var ratio = span > 0 ? (time - from.t) / span : 1;
+            lat = from.lat + (to.lat - from.lat) * ratio;
+            lng = from.lng + (to.lng - from.lng) * ratio;
+        } else {
+            // Parked on the last fix: drop the track so an idle map costs
+            // nothing. A later push() starts a fresh glide from here.
+            track.done = true;
+        }
+
+        // Skip sub-pixel moves; setLatLng triggers a Leaflet reposition.
+        if (Math.abs(lat - track.lat) > 1e-7 || Math.abs(lng - track.lng) > 1e-7) {
+            marker.setLatLng([lat, lng]);
+            track.lat = lat;
+            track.lng = lng;
+            stats.markerUpdates += 1;
+        }
+    }
+
+    function newTrack(fixes) {
+        return {
+            fixes: fixes,
+            origin: fixes[0].t,
+            cursor: 0,
+            clock: 0,
+            lat: NaN,
+            lng: NaN,
+            done: false
+        };
+    }
+
+    /**
+     * Animate a marker through a list of fixes, replacing any animation that
+     * is already running on it.
+     *
+     * @param {L.Marker} marker Marker to move
+     * @param {Array<{lat: number, lng: number, t: number}>} fixes Fixes sorted by t
+     */
+    function animate(marker, fixes) {
+        if (!fixes || fixes.length === 0) {
+            return;
+        }
+        cancel(marker);
+        tracks.set(marker, newTrack(fixes.slice()));
+        schedule();
+    }
+
+    /**
+     * Append a live fix to a marker's track. The marker glides from where it
+     * currently is to the new fix instead of jumping to it.
+     *
+     * @param {L.Marker} marker Marker to move
+     * @param {{lat: number, lng: number, t: number}} fix Latest fix
+     */
+    function push(marker, fix) {
+        var track = tracks.get(marker);
+        if (!track) {
+            var current = marker.getLatLng();
+            track = newTrack([{ lat: current.lat, lng: current.lng, t: fix.t - LIVE_GLIDE_MS }]);
+            tracks.set(marker, track);
+        } else if (fix.t <= track.fixes[track.fixes.length - 1].t) {
+            return;
+        }
+
+        track.fixes.push(fix);
+        // Fixes the marker has already passed are no longer needed.
+        if (track.cursor > 0) {
+            track.fixes.splice(0, track.cursor);
+            track.cursor = 0;
+        }
+        schedule();
+    }
+
+    /**
+     * Stop the animation running on a marker, if any.
+     *
+     * @param {L.Marker} marker Marker whose animation should stop
+     */
+    function cancel(marker) {
+        if (tracks.delete(marker)) {
+            stats.cancelled += 1;
+        }
+        if (tracks.size === 0 && frameId !== null) {
+            cancelAnimationFrame(frameId);
+            frameId = null;
+            lastFrame = null;
+        }
+    }
+
+    /**
+     * Convert an untimed list of route coordinates into fixes spaced
+     * `intervalMs` apart.
+     */
+    function fixesFromCoordinates(coordinates, intervalMs) {
+        return coordinates.map(function (coord, index) {
+            return { lat: coord.lat, lng: coord.lng, t: intervalMs * index };
+        });
+    }
+
+    return {
+        animate: animate,
+        push: push,
+        cancel: cancel,
+        fixesFromCoordinates: fixesFromCoordinates,
+        activeCount: function () { return tracks.size; },
+        stats: stats
+    };
+})();
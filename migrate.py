@@ -0,0 +1,536 @@
+"""
+Versioned schema migrations for point_management.
+
+Migrations live in migrations/ and run in version order:
+
+  NNN_name.sql       plain SQL, one statement per ";" at the end of a line
+  NNN_name.down.sql  optional, undoes NNN_name.sql for `down`
+  NNN_name.py        Python: up(conn) and optionally down(conn)
+
+Every applied migration gets a row in schema_migration with the SHA-256 of
+its file. Each run first checks that no applied file has been edited since;
+change the schema with a new migration instead.
+
+A SQL migration made only of DML (INSERT, UPDATE, DELETE, REPLACE) runs in
+one transaction together with its schema_migration row, so it applies
+completely or not at all. MariaDB commits every CREATE, ALTER, DROP, RENAME
+and TRUNCATE on its own, so a migration containing DDL runs statement by
+statement: if one fails, the error names it and the statements before it
+stay applied. Write those so they can run again (ADD INDEX IF NOT EXISTS).
+A Python migration runs in one transaction, up to its first DDL statement.
+
+With --online, ALTER TABLE on a table of at least --online-min-rows rows
+does not rebuild the table in place, which would block its writers for the
+whole copy. The rows are copied in short --chunk-rows transactions into an
+altered shadow table while triggers replay concurrent writes, and the two
+tables are swapped with one atomic RENAME TABLE. The table needs a single
+column primary or unique key to copy by.
+
+build_database() creates a database from point_management.sql and the
+migrations; the test fixtures build their scratch databases with it.
+
+Examples:
+    python migrate.py status
+    python migrate.py up                         # apply everything pending
+    python migrate.py up --to 1 --dry-run
+    python migrate.py up --online --chunk-rows 2000
+    python migrate.py down --to 1                # roll back to version 1
+    python migrate.py baseline --to 2            # 001-002 were applied by hand
+    python migrate.py build point_management_dev
+"""
+import argparse
+import contextlib
+import hashlib
+import importlib.util
+import os
+import re
+import time
+from collections import namedtuple
+
+import pymysql
+
+from db_config import connect
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(REPO_DIR, "migrations")
+BASELINE = os.path.join(REPO_DIR, "point_management.sql")
+
+ONLINE_CHUNK_ROWS = 5000
+ONLINE_MIN_ROWS = 100_000
+# A chunk that collides with rows a trigger copied meanwhile is retried
+CHUNK_RETRIES = 5
+DUPLICATE_KEY = 1062
+
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.(sql|py)$")
+DDL = re.compile(r"^(CREATE|ALTER|DROP|RENAME|TRUNCATE)\b", re.I)
+ALTER_TABLE = re.compile(r"^ALTER\s+TABLE\s+`?(\w+)`?\s+(.+)$", re.I | re.S)
+
+Migration = namedtuple("Migration", "version name path checksum")
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+def plain_cursor(conn):
+    """A tuple cursor, whatever cursorclass the connection was opened with."""
+    return conn.cursor(pymysql.cursors.Cursor)
+
+
+def elapsed_ms(started):
+    return int((time.perf_counter() - started) * 1000)
+
+
+# -------------------- Files --------------------
+def statements(text):
+    """Split a SQL script into statements, dropping -- comments."""
+    lines = [line for line in text.splitlines() if not line.lstrip().startswith("--")]
+    return [s.strip() for s in re.split(r";\s*$", "\n".join(lines), flags=re.M) if s.strip()]
+
+
+def read_statements(path):
+    with open(path, encoding="utf-8") as f:
+        return statements(f.read())
+
+
+def checksum(path):
+    """SHA-256 of the file, the same for CRLF and LF checkouts."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read().replace(b"\r\n", b"\n")).hexdigest()
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """The migrations in `directory`, oldest first."""
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"{filename} and {os.path.basename(migrations[version].path)} "
+                                 f"both have version {version}")
+        path = os.path.join(directory, filename)
+        migrations[version] = Migration(version, match.group(2), path, checksum(path))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def label(migration):
+    return os.path.basename(migration.path)
+
+
+def load_module(migration):
+    spec = importlib.util.spec_from_file_location(f"migration_{migration.version:03d}", migration.path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def down_step(migration):
+    """What undoes `migration`: a list of statements, a down(conn) function, or None."""
+    if migration.path.endswith(".py"):
+        return getattr(load_module(migration), "down", None)
+    path = migration.path[:-len(".sql")] + ".down.sql"
+    return read_statements(path) if os.path.exists(path) else None
+
+
+# -------------------- Version table --------------------
+def ensure_version_table(conn):
+    with plain_cursor(conn) as cursor:
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS `schema_migration` ("
+            "`version` int(11) NOT NULL, "
+            "`name` varchar(100) NOT NULL, "
+            "`checksum` char(64) CHARACTER SET ascii COLLATE ascii_bin NOT NULL, "
+            "`applied_at` datetime NOT NULL DEFAULT current_timestamp(), "
+            "`duration_ms` int(11) NOT NULL, "
+            "PRIMARY KEY (`version`)"
+            ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci"
+        )
+
+
+def applied(conn):
+    """{version: (name, checksum, applied_at)} for the current database."""
+    ensure_version_table(conn)
+    with plain_cursor(conn) as cursor:
+        cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migration ORDER BY version")
+        return {row[0]: row[1:] for row in cursor.fetchall()}
+
+
+def check(conn, migrations):
+    """Return what is applied; raise MigrationError if it no longer matches the files."""
+    done = applied(conn)
+    files = {migration.version: migration for migration in migrations}
+    for version, (name, digest, _) in done.items():
+        migration = files.get(version)
+        if migration is None:
+            raise MigrationError(f"Version {version} ({name}) is applied but its file is missing")
+        if migration.checksum != digest:
+            raise MigrationError(f"{label(migration)} was edited after it was applied; add a new migration instead")
+    newest = max(done, default=0)
+    skipped = [label(m) for m in migrations if m.version < newest and m.version not in done]
+    if skipped:
+        raise MigrationError(f"{', '.join(skipped)} would run after version {newest}; renumber it")
+    return done
+
+
+@contextlib.contextmanager
+def migration_lock(conn):
+    """Keep two runs from migrating the same database at once."""
+    with plain_cursor(conn) as cursor:
+        cursor.execute("SELECT GET_LOCK(CONCAT('schema_migration.', DATABASE()), 0)")
+        if cursor.fetchone()[0] != 1:
+            raise MigrationError("Another migration run holds the lock on this database")
+    try:
+        yield
+    finally:
+        with plain_cursor(conn) as cursor:
+            cursor.execute("SELECT RELEASE_LOCK(CONCAT('schema_migration.', DATABASE()))")
+
+
+# -------------------- Running --------------------
+def execute_statement(conn, statement):
+    with plain_cursor(conn) as cursor:
+        cursor.execute(statement)
+
+
+def run_step(conn, name, step, record, execute=execute_statement):
+    """Run a list of statements or a function of conn, then record(cursor) the result.
+
+    All-DML lists and functions run in one transaction with record(). A list
+    with DDL is committed statement by statement, as MariaDB would anyway.
+    """
+    transactional = callable(step) or not any(DDL.match(statement) for statement in step)
+    conn.begin()
+    try:
+        if callable(step):
+            step(conn)
+        else:
+            for number, statement in enumerate(step, 1):
+                try:
+                    execute(conn, statement)
+                except pymysql.MySQLError as e:
+                    kept = "" if transactional or number == 1 else f"; statements 1-{number - 1} stay applied"
+                    raise MigrationError(f"{name}: statement {number} failed: {e}{kept}") from e
+                if not transactional:
+                    conn.commit()
+        with plain_cursor(conn) as cursor:
+            record(cursor)
+        conn.commit()
+    except pymysql.MySQLError as e:
+        conn.rollback()
+        raise MigrationError(f"{name}: {e}") from e
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def up(conn, to=None, directory=MIGRATIONS_DIR, dry_run=False, online=False,
+       chunk_rows=ONLINE_CHUNK_ROWS, min_rows=ONLINE_MIN_ROWS, progress=None):
+    """Apply the pending migrations up to version `to` (default: all).
+
+    Returns [(migration, ms)] in the order they ran; ms is None on a dry run.
+    progress(table, rows_copied) is called after every online chunk.
+    """
+    migrations = discover(directory)
+
+    def execute(conn, statement):
+        match = ALTER_TABLE.match(statement)
+        if (online and match and "PARTITION" not in match.group(2).upper()
+                and estimated_rows(conn, match.group(1)) >= min_rows):
+            online_alter(conn, match.group(1), match.group(2), chunk_rows, progress)
+        else:
+            execute_statement(conn, statement)
+
+    with migration_lock(conn):
+        done = check(conn, migrations)
+        pending = [m for m in migrations if m.version not in done and (to is None or m.version <= to)]
+        if dry_run:
+            return [(migration, None) for migration in pending]
+
+        results = []
+        for migration in pending:
+            started = time.perf_counter()
+            if migration.path.endswith(".py"):
+                step = load_module(migration).up
+            else:
+                step = read_statements(migration.path)
+
+            def record(cursor):
+                cursor.execute(
+                    "INSERT INTO schema_migration (version, name, checksum, duration_ms) VALUES (%s, %s, %s, %s)",
+                    (migration.version, migration.name, migration.checksum, elapsed_ms(started))
+                )
+
+            run_step(conn, label(migration), step, record, execute)
+            results.append((migration, elapsed_ms(started)))
+        return results
+
+
+def down(conn, to, directory=MIGRATIONS_DIR, dry_run=False):
+    """Roll back the applied migrations above version `to`, newest first; returns [(migration, ms)]."""
+    migrations = discover(directory)
+    with migration_lock(conn):
+        done = check(conn, migrations)
+        rollback = [m for m in reversed(migrations) if m.version in done and m.version > to]
+        steps = [(migration, down_step(migration)) for migration in rollback]
+        irreversible = [label(migration) for migration, step in steps if step is None]
+        if irreversible:
+            raise MigrationError(f"No down migration for {', '.join(irreversible)}")
+        if dry_run:
+            return [(migration, None) for migration in rollback]
+
+        results = []
+        for migration, step in steps:
+            started = time.perf_counter()
+            run_step(conn, label(migration), step,
+                     lambda cursor: cursor.execute("DELETE FROM schema_migration WHERE version = %s",
+                                                   (migration.version,)))
+            results.append((migration, elapsed_ms(started)))
+        return results
+
+
+def baseline(conn, to, directory=MIGRATIONS_DIR):
+    """Record the migrations up to `to` as applied without running them; returns them."""
+    migrations = discover(directory)
+    with migration_lock(conn):
+        done = check(conn, migrations)
+        marked = [m for m in migrations if m.version <= to and m.version not in done]
+        with plain_cursor(conn) as cursor:
+            cursor.executemany(
+                "INSERT INTO schema_migration (version, name, checksum, duration_ms) VALUES (%s, %s, %s, 0)",
+                [(m.version, m.name, m.checksum) for m in marked]
+            )
+        conn.commit()
+        return marked
+
+
+def status(conn, directory=MIGRATIONS_DIR):
+    """[(migration, applied_at or None)], oldest first."""
+    migrations = discover(directory)
+    done = check(conn, migrations)
+    return [(migration, done[migration.version][2] if migration.version in done else None)
+            for migration in migrations]
+
+
+# -------------------- Building --------------------
+def load_baseline(conn, path=BASELINE):
+    """Run the phpMyAdmin dump against the current database."""
+    script = read_statements(path)
+    with plain_cursor(conn) as cursor:
+        cursor.execute("SET @migrate_sql_mode = @@SESSION.sql_mode")
+        cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        try:
+            for statement in script:
+                cursor.execute(statement)
+        finally:
+            # The dump relaxes sql_mode for its session; migrations must run strict
+            cursor.execute("SET SESSION sql_mode = @migrate_sql_mode, unique_checks = 1, foreign_key_checks = 1")
+    conn.commit()
+
+
+def build_database(conn, database, to=None, directory=MIGRATIONS_DIR):
+    """(Re)create `database` from point_management.sql and the migrations up to `to`, and switch to it."""
+    with plain_cursor(conn) as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+        cursor.execute(f"CREATE DATABASE `{database}` DEFAULT CHARSET utf8mb4 COLLATE utf8mb4_general_ci")
+    conn.select_db(database)
+    load_baseline(conn)
+    return up(conn, to, directory)
+
+
+# -------------------- Online ALTER --------------------
+def estimated_rows(conn, table):
+    with plain_cursor(conn) as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table,)
+        )
+        row = cursor.fetchone()
+    return (row[0] or 0) if row else 0
+
+
+def copy_key(conn, table):
+    """(index, column) of the single-column, NOT NULL primary or unique key to copy `table` by."""
+    with plain_cursor(conn) as cursor:
+        cursor.execute(
+            "SELECT INDEX_NAME, COLUMN_NAME, NULLABLE FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND NON_UNIQUE = 0 "
+            "ORDER BY INDEX_NAME <> 'PRIMARY', INDEX_NAME, SEQ_IN_INDEX",
+            (table,)
+        )
+        indexes = {}
+        for index, column, nullable in cursor.fetchall():
+            indexes.setdefault(index, []).append((column, nullable))
+    for index, columns in indexes.items():
+        if len(columns) == 1 and columns[0][1] != "YES":
+            return index, columns[0][0]
+    raise MigrationError(f"{table} has no single-column primary or unique key to copy by")
+
+
+def table_columns(conn, table):
+    with plain_cursor(conn) as cursor:
+        cursor.execute(
+            "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND IS_GENERATED = 'NEVER' "
+            "ORDER BY ORDINAL_POSITION",
+            (table,)
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def drop_online_copy(conn, tables, triggers):
+    with plain_cursor(conn) as cursor:
+        for trigger in triggers:
+            cursor.execute(f"DROP TRIGGER IF EXISTS `{trigger}`")
+        for table in tables:
+            cursor.execute(f"DROP TABLE IF EXISTS `{table}`")
+
+
+def copy_chunks(conn, table, shadow, key, columns, chunk_rows, progress=None):
+    """Copy `table` into `shadow` in key order, one short transaction per chunk; returns rows copied."""
+    names = ", ".join(f"`{column}`" for column in columns)
+    values = ", ".join(f"t.`{column}`" for column in columns)
+    copied, last = 0, None
+    with plain_cursor(conn) as cursor:
+        while True:
+            conditions, params = [], []
+            if last is not None:
+                conditions.append(f"t.`{key}` > %s")
+                params.append(last)
+            cursor.execute(
+                f"SELECT t.`{key}` FROM `{table}` t"
+                + "".join(f" {'AND' if i else 'WHERE'} {c}" for i, c in enumerate(conditions))
+                + f" ORDER BY t.`{key}` LIMIT 1 OFFSET {chunk_rows - 1}",
+                params
+            )
+            bound = cursor.fetchone()
+            if bound is not None:
+                conditions.append(f"t.`{key}` <= %s")
+                params.append(bound[0])
+
+            # Rows a trigger already copied are newer than the source read; skip them
+            insert = (f"INSERT INTO `{shadow}` ({names}) SELECT {values} FROM `{table}` t "
+                      f"LEFT JOIN `{shadow}` n ON n.`{key}` = t.`{key}` WHERE n.`{key}` IS NULL"
+                      + "".join(f" AND {c}" for c in conditions) + " LOCK IN SHARE MODE")
+            for attempt in range(CHUNK_RETRIES):
+                try:
+                    cursor.execute(insert, params)
+                    conn.commit()
+                    break
+                except pymysql.err.IntegrityError as e:
+                    conn.rollback()
+                    if e.args[0] != DUPLICATE_KEY or attempt == CHUNK_RETRIES - 1:
+                        raise
+            copied += cursor.rowcount
+            if progress:
+                progress(table, copied)
+            if bound is None:
+                return copied
+            last = bound[0]
+
+
+def online_alter(conn, table, clauses, chunk_rows=ONLINE_CHUNK_ROWS, progress=None):
+    """ALTER TABLE `table` `clauses` without blocking writers for the whole copy; returns rows copied.
+
+    The altered shadow table is filled chunk by chunk while AFTER INSERT,
+    UPDATE and DELETE triggers on `table` apply every concurrent write to it
+    as well. RENAME TABLE then swaps both tables in one step.
+    """
+    shadow, old = f"_{table}_new", f"_{table}_old"
+    triggers = [f"_{table}_online_{event}" for event in ("ins", "upd", "del")]
+    _, key = copy_key(conn, table)
+
+    drop_online_copy(conn, [shadow, old], triggers)  # left over from an interrupted run
+    try:
+        with plain_cursor(conn) as cursor:
+            cursor.execute(f"CREATE TABLE `{shadow}` LIKE `{table}`")
+            cursor.execute(f"ALTER TABLE `{shadow}` {clauses}")
+            kept = set(table_columns(conn, shadow))
+            columns = [column for column in table_columns(conn, table) if column in kept]
+            if key not in columns:
+                raise MigrationError(f"Online ALTER of {table} cannot drop or rename its key {key}")
+
+            names = ", ".join(f"`{column}`" for column in columns)
+            new_row = ", ".join(f"NEW.`{column}`" for column in columns)
+            cursor.execute(f"CREATE TRIGGER `{triggers[0]}` AFTER INSERT ON `{table}` "
+                           f"FOR EACH ROW REPLACE INTO `{shadow}` ({names}) VALUES ({new_row})")
+            cursor.execute(f"CREATE TRIGGER `{triggers[1]}` AFTER UPDATE ON `{table}` "
+                           f"FOR EACH ROW BEGIN DELETE FROM `{shadow}` WHERE `{key}` = OLD.`{key}`; "
+                           f"REPLACE INTO `{shadow}` ({names}) VALUES ({new_row}); END")
+            cursor.execute(f"CREATE TRIGGER `{triggers[2]}` AFTER DELETE ON `{table}` "
+                           f"FOR EACH ROW DELETE FROM `{shadow}` WHERE `{key}` = OLD.`{key}`")
+
+        copied = copy_chunks(conn, table, shadow, key, columns, chunk_rows, progress)
+
+        with plain_cursor(conn) as cursor:
+            cursor.execute(f"RENAME TABLE `{table}` TO `{old}`, `{shadow}` TO `{table}`")
+    except Exception:
+        conn.rollback()
+        drop_online_copy(conn, [shadow], triggers)
+        raise
+    drop_online_copy(conn, [old], triggers)
+    return copied
+
+
+# -------------------- Command line --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=MIGRATIONS_DIR, help="migrations directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="list migrations and when they were applied")
+
+    up_parser = commands.add_parser("up", help="apply pending migrations")
+    up_parser.add_argument("--to", type=int, help="stop after this version")
+    up_parser.add_argument("--dry-run", action="store_true", help="list what would run")
+    up_parser.add_argument("--online", action="store_true", help="copy large tables in chunks instead of in place")
+    up_parser.add_argument("--chunk-rows", type=int, default=ONLINE_CHUNK_ROWS)
+    up_parser.add_argument("--online-min-rows", type=int, default=ONLINE_MIN_ROWS,
+                           help="smaller tables are altered in place")
+
+    down_parser = commands.add_parser("down", help="roll back to a version")
+    down_parser.add_argument("--to", type=int, required=True, help="version to keep; 0 undoes everything")
+    down_parser.add_argument("--dry-run", action="store_true", help="list what would be rolled back")
+
+    baseline_parser = commands.add_parser("baseline", help="record migrations as applied without running them")
+    baseline_parser.add_argument("--to", type=int, required=True)
+
+    build_parser = commands.add_parser("build", help="(re)create a database from the dump and the migrations")
+    build_parser.add_argument("database")
+    build_parser.add_argument("--to", type=int, help="stop after this version")
+    args = parser.parse_args(argv)
+
+    conn = connect(database=None) if args.command == "build" else connect()
+    try:
+        if args.command == "status":
+            for migration, applied_at in status(conn, args.dir):
+                print(f"{label(migration):<40} {applied_at or 'pending'}")
+            return 0
+        if args.command == "baseline":
+            for migration in baseline(conn, args.to, args.dir):
+                print(f"recorded {label(migration)}")
+            return 0
+
+        if args.command == "up":
+            results = up(conn, args.to, args.dir, args.dry_run, args.online, args.chunk_rows, args.online_min_rows,
+                         lambda table, rows: print(f"  {table}: {rows} rows copied"))
+        elif args.command == "down":
+            results = down(conn, args.to, args.dir, args.dry_run)
+        else:
+            results = build_database(conn, args.database, args.to, args.dir)
+    except MigrationError as e:
+        parser.exit(1, f"{e}\n")
+    finally:
+        conn.close()
+
+    verb = "rolled back" if args.command == "down" else "applied"
+    for migration, ms in results:
+        print(f"{verb} {label(migration)}" + ("" if ms is None else f" ({ms} ms)"))
+    if not results:
+        print("nothing to do")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,13 @@
+--
+-- Undo 001_query_indexes.sql
+--
+
+ALTER TABLE `driver`
+  DROP INDEX IF EXISTS `Route_Driver_ID`;
+
+ALTER TABLE `point_details`
+  DROP INDEX IF EXISTS `Student_ID`,
+  DROP INDEX IF EXISTS `Route_Point_no`;
+
+ALTER TABLE `student`
+  DROP INDEX IF EXISTS `Fee_Status`;
@@ -0,0 +1,27 @@
+--
+-- Secondary indexes for the queries the endpoints and tools actually run
+--
+-- point_management.sql only has primary and unique keys. InnoDB appends the
+-- primary key to every secondary index, so each index below also covers
+-- lookups that only need the key columns plus the primary key.
+--
+-- Logins need nothing new: student_login and admin_login are clustered on
+-- Student_ID and email, so "WHERE Student_ID = ? AND student_password = ?"
+-- is a single primary-key read.
+--
+-- test_query_plans.py runs EXPLAIN on every statement and fails on a full
+-- table scan no index could have avoided.
+--
+
+-- Drivers by Route (route rosters, the fleet simulator), with their IDs
+ALTER TABLE `driver`
+  ADD INDEX IF NOT EXISTS `Route_Driver_ID` (`Route`, `Driver_ID`);
+
+-- A student's point, and every point on a route
+ALTER TABLE `point_details`
+  ADD INDEX IF NOT EXISTS `Student_ID` (`Student_ID`),
+  ADD INDEX IF NOT EXISTS `Route_Point_no` (`Route`, `Point_no`);
+
+-- Students by Fee_Status (pending fee lists, challan runs)
+ALTER TABLE `student`
+  ADD INDEX IF NOT EXISTS `Fee_Status` (`Fee_Status`);
@@ -0,0 +1,27 @@
+--
+-- Undo 002_compact_column_types.sql
+--
+-- Restores the types of point_management.sql. Driver phones keep the
+-- leading zero they got back. Fails, rather than truncating, while a student
+-- phone or an admin password is not a number that fits an int: those are
+-- exactly the values the old types could not hold.
+--
+
+ALTER TABLE `student`
+  MODIFY `Point_no` varchar(50) NOT NULL,
+  MODIFY `Phone` int(50) NOT NULL,
+  MODIFY `Fee_Status` varchar(30) NOT NULL;
+
+ALTER TABLE `driver`
+  MODIFY `Point_no` varchar(50) NOT NULL,
+  MODIFY `Phone` varchar(50) NOT NULL;
+
+ALTER TABLE `point_details`
+  MODIFY `Point_no` varchar(50) NOT NULL;
+
+ALTER TABLE `challan`
+  MODIFY `Point_no` varchar(50) NOT NULL;
+
+ALTER TABLE `admin_login`
+  MODIFY `email` varchar(20) NOT NULL,
+  MODIFY `admin_password` int(11) NOT NULL;
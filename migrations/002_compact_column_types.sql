@@ -0,0 +1,40 @@
+--
+-- Compact, correct column types
+--
+-- Phone numbers are text: student.Phone was an int, which dropped the
+-- leading zero of every number and clipped mobile numbers to 2147483647.
+-- Both tables now keep phones as short ASCII strings. Clipped student
+-- numbers cannot be recovered; driver numbers get their zero back below.
+--
+-- Point numbers are short ASCII codes ("21", "P100") kept in varchar(50)
+-- utf8mb4, which sizes every sort buffer and temporary table for 200 bytes.
+-- Fee_Status takes one of three values and becomes a one-byte ENUM.
+--
+-- Every ALTER fails, rather than truncating, if a stored value does not fit:
+-- fix the row and run the migration again.
+-- column_type_benchmark.py measures the effect at 1M rows.
+--
+
+ALTER TABLE `student`
+  MODIFY `Point_no` varchar(10) CHARACTER SET ascii COLLATE ascii_general_ci NOT NULL,
+  MODIFY `Phone` varchar(16) CHARACTER SET ascii COLLATE ascii_general_ci NOT NULL,
+  MODIFY `Fee_Status` enum('Paid','Pending','Unpaid') NOT NULL;
+
+ALTER TABLE `driver`
+  MODIFY `Point_no` varchar(10) CHARACTER SET ascii COLLATE ascii_general_ci NOT NULL,
+  MODIFY `Phone` varchar(16) CHARACTER SET ascii COLLATE ascii_general_ci NOT NULL;
+
+-- driver_input.php accepts exactly 10 digits but bound them as an integer,
+-- so a 9-digit phone is a 10-digit one that lost its zero
+UPDATE `driver` SET `Phone` = CONCAT('0', `Phone`) WHERE `Phone` REGEXP '^[1-9][0-9]{8}$';
+
+ALTER TABLE `point_details`
+  MODIFY `Point_no` varchar(10) CHARACTER SET ascii COLLATE ascii_general_ci NOT NULL;
+
+ALTER TABLE `challan`
+  MODIFY `Point_no` varchar(10) CHARACTER SET ascii COLLATE ascii_general_ci NOT NULL;
+
+-- Emails can be 254 characters; passwords are text, not numbers
+ALTER TABLE `admin_login`
+  MODIFY `email` varchar(254) NOT NULL,
+  MODIFY `admin_password` varchar(255) NOT NULL;
@@ -0,0 +1,5 @@
+--
+-- Undo 003_route_roster.sql
+--
+
+DROP TABLE IF EXISTS `route_roster`;
@@ -0,0 +1,37 @@
+--
+-- Precomputed route roster
+--
+-- "Who rides point 102 and who drives it" is a join of point_details,
+-- student and driver on string keys. route_roster keeps the result, one row
+-- per point, clustered on (Route, Point_no): a route's roster is a single
+-- primary-key range read. RouteRoster.php refreshes the affected rows in
+-- every transaction that writes a student, a driver or a point.
+--
+-- test_route_roster.py compares it with the join at 100k students.
+--
+
+CREATE TABLE IF NOT EXISTS `route_roster` (
+  `Route` varchar(50) NOT NULL,
+  `Point_no` varchar(10) CHARACTER SET ascii COLLATE ascii_general_ci NOT NULL,
+  `Student_ID` varchar(50) NOT NULL,
+  `Student_Name` varchar(50) DEFAULT NULL,
+  `Student_Phone` varchar(16) CHARACTER SET ascii COLLATE ascii_general_ci DEFAULT NULL,
+  `Fee_Status` enum('Paid','Pending','Unpaid') DEFAULT NULL,
+  `Driver_ID` varchar(50) NOT NULL,
+  `Driver_Name` varchar(50) DEFAULT NULL,
+  `Driver_Phone` varchar(16) CHARACTER SET ascii COLLATE ascii_general_ci DEFAULT NULL,
+  PRIMARY KEY (`Route`, `Point_no`),
+  UNIQUE KEY `Point_no` (`Point_no`),
+  KEY `Student_ID` (`Student_ID`),
+  KEY `Driver_ID` (`Driver_ID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Fill it from what is already there; safe to run again
+DELETE FROM `route_roster`;
+
+INSERT INTO `route_roster`
+  (`Route`, `Point_no`, `Student_ID`, `Student_Name`, `Student_Phone`, `Fee_Status`, `Driver_ID`, `Driver_Name`, `Driver_Phone`)
+SELECT p.Route, p.Point_no, p.Student_ID, s.Name, s.Phone, s.Fee_Status, p.Driver_ID, d.Name, d.Phone
+FROM point_details p
+LEFT JOIN student s ON s.Student_ID = p.Student_ID
+LEFT JOIN driver d ON d.Driver_ID = p.Driver_ID;
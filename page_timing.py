@@ -0,0 +1,166 @@
+"""
+Navigation and resource timing of every page a page object loads.
+
+Page objects call capture(driver) at the end of load()/open(). One
+execute_script reads the page's navigation entry, its resource entries and,
+where the browser reports them, Largest Contentful Paint and Cumulative
+Layout Shift. From those it keeps:
+
+  ttfb_ms                 navigation start to the first byte of the document
+  dom_content_loaded_ms   navigation start to the end of DOMContentLoaded
+  load_ms                 navigation start to the end of the load event
+  transfer_bytes          bytes over the network, document and resources
+  requests                document plus resources
+  lcp_ms, cls             None when the browser does not report them
+
+As a pytest plugin, loaded by conftest.py, it adds each test's captures to
+its report (a "Page timing" section and the `page_timing` user property)
+and checks them against the budget in config.ini: [page_budget] for every
+page, [page_budget <page>] to override one page. `--page-budget` chooses
+what an over-budget page does: warn (the default), fail the test, or off.
+"""
+import json
+import warnings
+from urllib.parse import urlparse
+
+import pytest
+
+METRICS = ("ttfb_ms", "dom_content_loaded_ms", "transfer_bytes")
+
+CAPTURE = """
+    function buffered(type) {
+        // Entries the page already produced; null when the browser does not support the type
+        try {
+            var observer = new PerformanceObserver(function () {});
+            observer.observe({type: type, buffered: true});
+            var entries = observer.takeRecords();
+            observer.disconnect();
+            return entries;
+        } catch (e) {
+            return null;
+        }
+    }
+    var nav = performance.getEntriesByType('navigation')[0];
+    var lcp = buffered('largest-contentful-paint'), shifts = buffered('layout-shift');
+    return {
+        url: location.href,
+        navigation: nav ? {responseStart: nav.responseStart, domContentLoaded: nav.domContentLoadedEventEnd,
+                           load: nav.loadEventEnd, transfer: nav.transferSize} : null,
+        resources: performance.getEntriesByType('resource').map(function (e) {
+            return {name: e.name, type: e.initiatorType, duration: e.duration, transfer: e.transferSize};
+        }),
+        lcp: lcp && lcp.length ? lcp[lcp.length - 1].startTime : null,
+        cls: shifts ? shifts.reduce(function (sum, e) { return e.hadRecentInput ? sum : sum + e.value; }, 0) : null
+    };
+"""
+
+# Captures of the test that is running
+captured = []
+
+
+class PageBudgetWarning(UserWarning):
+    pass
+
+
+def page_name(url):
+    return urlparse(url).path.rsplit("/", 1)[-1] or "index"
+
+
+def summarize(raw):
+    nav = raw["navigation"] or {}
+    resources = raw["resources"]
+    return {
+        "page": page_name(raw["url"]),
+        "url": raw["url"],
+        "ttfb_ms": nav.get("responseStart"),
+        "dom_content_loaded_ms": nav.get("domContentLoaded"),
+        "load_ms": nav.get("load"),
+        "transfer_bytes": (nav.get("transfer") or 0) + sum(r["transfer"] or 0 for r in resources),
+        "requests": (1 if nav else 0) + len(resources),
+        "lcp_ms": raw["lcp"],
+        "cls": raw["cls"],
+        "slowest": sorted(resources, key=lambda r: r["duration"], reverse=True)[:3],
+    }
+
+
+def capture(driver):
+    """Timing of the page `driver` is on; also kept for the running test's report."""
+    timing = summarize(driver.execute_script(CAPTURE))
+    captured.append(timing)
+    return timing
+
+
+# -------------------- Budgets --------------------
+def budget(page, config=None):
+    """{metric: limit} for `page`: [page_budget], overridden by [page_budget <page>]."""
+    if config is None:
+        from db_config import load_config
+        config = load_config()
+    limits = {}
+    for section in ("page_budget", f"page_budget {page}"):
+        if config.has_section(section):
+            limits.update({metric: config.getfloat(section, metric) for metric in METRICS
+                           if config.has_option(section, metric)})
+    return limits
+
+
+def over_budget(timing, limits):
+    """One message per metric of `timing` above its limit."""
+    return [f"{timing['page']}: {metric} {timing[metric]:,.0f} > {limit:,.0f}"
+            for metric, limit in limits.items() if timing.get(metric) is not None and timing[metric] > limit]
+
+
+def format_timings(timings):
+    lines = []
+    for t in timings:
+        lcp = f"{t['lcp_ms']:.0f} ms" if t["lcp_ms"] is not None else "n/a"
+        cls = f"{t['cls']:.3f}" if t["cls"] is not None else "n/a"
+        lines.append(f"{t['page']}: TTFB {t['ttfb_ms'] or 0:.0f} ms, DOMContentLoaded "
+                     f"{t['dom_content_loaded_ms'] or 0:.0f} ms, load {t['load_ms'] or 0:.0f} ms, "
+                     f"{t['transfer_bytes']:,} B in {t['requests']} requests, LCP {lcp}, CLS {cls}")
+        for r in t["slowest"]:
+            lines.append(f"    {r['duration']:>7.0f} ms {r['transfer'] or 0:>9,} B  {r['name']}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------- Pytest plugin --------------------
+def pytest_addoption(parser):
+    parser.getgroup("page-timing", "page load timing").addoption(
+        "--page-budget", choices=("warn", "fail", "off"), default="warn",
+        help="what a page over its [page_budget] in config.ini does (default warn)")
+
+
+def check_budget(item, report):
+    """Fail a passed test whose pages are over budget (--page-budget fail), else warn."""
+    mode = item.config.getoption("page_budget")
+    if mode == "off" or not captured:
+        return
+    from db_config import load_config
+    config = load_config()
+    problems = [problem for timing in captured for problem in over_budget(timing, budget(timing["page"], config))]
+    if problems and mode == "fail" and report.passed:
+        report.outcome = "failed"
+        report.longrepr = "Page over budget:\n" + "\n".join(problems)
+        return
+    for problem in problems:
+        warnings.warn(PageBudgetWarning(problem))
+
+
+@pytest.fixture(autouse=True)
+def _page_timing(request):
+    del captured[:]
+    yield
+    request.node.page_timing = list(captured)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "call":
+        # Here, not after the fixture's yield, so an over-budget page fails the test instead of erroring its teardown
+        check_budget(item, report)
+    timings = getattr(item, "page_timing", None)
+    if report.when == "teardown" and timings:
+        report.sections.append(("Page timing", format_timings(timings)))
+        report.user_properties.append(("page_timing", json.dumps(timings)))
@@ -0,0 +1,312 @@
+"""
+Where each test's time goes, and how that changes from run to run.
+
+A pytest plugin, loaded by conftest.py. `pytest --timing` wraps the calls
+the tests spend their time in and splits every test's duration into:
+
+  browser     starting and quitting Chrome (webdriver.Chrome(), quit())
+  navigation  driver.get(), back(), forward(), refresh()
+  wait        WebDriverWait(...).until() and until_not()
+  sleep       time.sleep()
+  db          pymysql connects, queries, commits and rollbacks
+  http        requests.get(), post(), ... against the endpoints
+  other       everything else: element lookups and clicks, assertions
+
+Time is counted once, by the outermost wrapped call: the sleeps inside a
+WebDriverWait are wait time, not sleep time. Only calls on the thread
+running the test are counted; work a test hands to other threads shows up
+as whatever that thread waits on, or as other. A test's duration covers its
+setup, call and teardown, so a module-scoped browser is charged to the
+first test that uses it.
+
+Each test's phases go into its report (a "Phase timing" section and the
+`phase_timing` user property) and into a SQLite history, [timing] history
+in config.ini, one row per test and phase per run. Run this module to
+read the history back.
+
+Examples:
+    pytest test_fetch_driver.py --timing
+    python phase_timing.py                        # phase totals of the last 10 runs
+    python phase_timing.py --test test_add_student --runs 20
+    python phase_timing.py --slowest wait         # tests with the most wait time in the last run
+"""
+import argparse
+import datetime
+import functools
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+PHASES = ("browser", "navigation", "wait", "sleep", "db", "http", "other")
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS run (id INTEGER PRIMARY KEY, started_at TEXT NOT NULL, git_commit TEXT, args TEXT)",
+    "CREATE TABLE IF NOT EXISTS test (run_id INTEGER NOT NULL REFERENCES run(id), nodeid TEXT NOT NULL, "
+    "outcome TEXT NOT NULL, total_ms REAL NOT NULL, PRIMARY KEY (run_id, nodeid))",
+    "CREATE TABLE IF NOT EXISTS phase (run_id INTEGER NOT NULL, nodeid TEXT NOT NULL, phase TEXT NOT NULL, "
+    "ms REAL NOT NULL, calls INTEGER NOT NULL, PRIMARY KEY (run_id, nodeid, phase))",
+    "CREATE INDEX IF NOT EXISTS phase_by_test ON phase (nodeid, phase)",
+]
+
+
+def history_path(config=None):
+    from db_config import load_config
+
+    config = config or load_config()
+    history = config.get("timing", "history", fallback="timing_history.sqlite")
+    return os.path.join(REPO_DIR, history)
+
+
+# -------------------- Recording --------------------
+class PhaseTimer:
+    """Accumulates wrapped-call time per phase for the test that is running."""
+
+    def __init__(self):
+        self.depth = 0
+        self.started = None
+        self.thread = None
+        self.ms = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+
+    def start(self):
+        self.thread = threading.get_ident()
+        self.started = time.perf_counter()
+        self.ms = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+
+    def timed(self, phase, function, *args, **kwargs):
+        # depth is only ever touched by the test's own thread
+        if self.depth or self.started is None or threading.get_ident() != self.thread:
+            return function(*args, **kwargs)
+        self.depth += 1
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.ms[phase] += (time.perf_counter() - started) * 1000
+            self.calls[phase] += 1
+            self.depth -= 1
+
+    def stop(self):
+        """{phase: (ms, calls)} since start(), with the unwrapped remainder as `other`."""
+        total = (time.perf_counter() - self.started) * 1000
+        self.started = None
+        self.ms["other"] = max(total - sum(self.ms.values()), 0.0)
+        return total, {phase: (self.ms[phase], self.calls[phase]) for phase in PHASES}
+
+
+def instrumented():
+    """(owner, attribute, phase) of every wrapped call."""
+    # Imported here so the plugin loads without them when --timing is off
+    import pymysql
+    import requests
+    from selenium.webdriver.chromium.webdriver import ChromiumDriver
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.support.wait import WebDriverWait
+
+    return [
+        (ChromiumDriver, "__init__", "browser"),
+        (WebDriver, "__init__", "browser"),
+        (WebDriver, "quit", "browser"),
+        (WebDriver, "get", "navigation"),
+        (WebDriver, "back", "navigation"),
+        (WebDriver, "forward", "navigation"),
+        (WebDriver, "refresh", "navigation"),
+        (WebDriverWait, "until", "wait"),
+        (WebDriverWait, "until_not", "wait"),
+        (time, "sleep", "sleep"),
+        (pymysql.connections.Connection, "connect", "db"),
+        (pymysql.connections.Connection, "query", "db"),
+        (pymysql.connections.Connection, "commit", "db"),
+        (pymysql.connections.Connection, "rollback", "db"),
+        (requests.Session, "request", "http"),
+    ]
+
+
+def instrument(timer):
+    """Wrap every instrumented() call; returns a function that undoes it."""
+    originals = []
+    for owner, name, phase in instrumented():
+        original = getattr(owner, name)
+
+        def wrapper(*args, _original=original, _phase=phase, **kwargs):
+            return timer.timed(_phase, _original, *args, **kwargs)
+
+        setattr(owner, name, functools.wraps(original)(wrapper))
+        originals.append((owner, name, original))
+
+    def undo():
+        for owner, name, original in reversed(originals):
+            setattr(owner, name, original)
+    return undo
+
+
+def format_phases(total, phases):
+    lines = [f"{total:.0f} ms"]
+    for phase in PHASES:
+        ms, calls = phases[phase]
+        if ms >= 0.5:
+            share = ms / total * 100 if total else 0
+            detail = f"{calls} calls" if phase != "other" else ""
+            lines.append(f"  {phase:<11} {ms:>9.0f} ms {share:>5.1f}%  {detail}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------- History --------------------
+def open_history(path):
+    db = sqlite3.connect(path)
+    for statement in SCHEMA:
+        db.execute(statement)
+    return db
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record_run(db, args):
+    cursor = db.execute("INSERT INTO run (started_at, git_commit, args) VALUES (?, ?, ?)",
+                        (datetime.datetime.now().isoformat(timespec="seconds"), git_commit(), " ".join(args)))
+    db.commit()
+    return cursor.lastrowid
+
+
+def record_test(db, run_id, nodeid, outcome, total, phases):
+    db.execute("INSERT OR REPLACE INTO test (run_id, nodeid, outcome, total_ms) VALUES (?, ?, ?, ?)",
+               (run_id, nodeid, outcome, total))
+    db.executemany("INSERT OR REPLACE INTO phase (run_id, nodeid, phase, ms, calls) VALUES (?, ?, ?, ?, ?)",
+                   [(run_id, nodeid, phase, ms, calls) for phase, (ms, calls) in phases.items()])
+    db.commit()
+
+
+def trend(db, runs=10, test=None):
+    """[(run_id, started_at, git_commit, tests, {phase: ms})] of the last `runs` runs, oldest first."""
+    pattern = f"%{test}%" if test else "%"
+    rows = db.execute(
+        "SELECT r.id, r.started_at, r.git_commit, COUNT(DISTINCT p.nodeid), p.phase, SUM(p.ms) "
+        "FROM run r JOIN phase p ON p.run_id = r.id "
+        "WHERE r.id IN (SELECT id FROM run ORDER BY id DESC LIMIT ?) AND p.nodeid LIKE ? "
+        "GROUP BY r.id, p.phase ORDER BY r.id",
+        (runs, pattern)
+    ).fetchall()
+    result = {}
+    for run_id, started_at, commit, tests, phase, ms in rows:
+        result.setdefault(run_id, (run_id, started_at, commit, tests, {}))[4][phase] = ms
+    return list(result.values())
+
+
+def slowest(db, phase, limit=15):
+    """[(nodeid, ms, calls)] with the most `phase` time in the last run."""
+    return db.execute(
+        "SELECT nodeid, ms, calls FROM phase WHERE run_id = (SELECT MAX(id) FROM run) AND phase = ? "
+        "ORDER BY ms DESC LIMIT ?",
+        (phase, limit)
+    ).fetchall()
+
+
+# -------------------- Pytest plugin --------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("timing", "per-phase test timing")
+    group.addoption("--timing", action="store_true",
+                    help="split each test's time into browser, navigation, wait, sleep, db, http and other")
+    group.addoption("--timing-history", default=None,
+                    help="SQLite file the phases are appended to (default: [timing] history in config.ini)")
+
+
+def pytest_configure(config):
+    if not config.getoption("timing"):
+        return
+    timer = PhaseTimer()
+    config._phase_timer = timer
+    config._phase_timing_undo = instrument(timer)
+    config._phase_history = open_history(config.getoption("timing_history") or history_path())
+    config._phase_run = record_run(config._phase_history, config.invocation_params.args)
+
+
+def pytest_unconfigure(config):
+    if getattr(config, "_phase_timer", None) is None:
+        return
+    config._phase_timing_undo()
+    config._phase_history.close()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    timer = getattr(item.config, "_phase_timer", None)
+    if timer is not None:
+        timer.start()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    timer = getattr(item.config, "_phase_timer", None)
+    if timer is None:
+        return
+    # The call decides the outcome, unless setup skipped or failed the test or teardown failed it
+    if report.when == "setup" or report.when == "call" and item._phase_outcome == "passed" or report.failed:
+        item._phase_outcome = report.outcome
+    if report.when == "teardown" and timer.started is not None:
+        total, phases = timer.stop()
+        report.sections.append(("Phase timing", format_phases(total, phases)))
+        report.user_properties.append(
+            ("phase_timing", json.dumps({phase: round(ms, 1) for phase, (ms, _) in phases.items()})))
+        record_test(item.config._phase_history, item.config._phase_run, item.nodeid, item._phase_outcome, total, phases)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if getattr(config, "_phase_timer", None) is None:
+        return
+    rows = trend(config._phase_history, runs=1)
+    if not rows:
+        return
+    terminalreporter.section("Phase timing")
+    _, _, _, tests, phases = rows[-1]
+    total = sum(phases.values())
+    for phase in sorted((p for p in phases if phases[p] >= 0.5), key=phases.get, reverse=True):
+        share = phases[phase] / total * 100 if total else 0
+        terminalreporter.write_line(f"{phase:<11} {phases[phase] / 1000:>9.1f} s {share:>5.1f}%")
+    terminalreporter.write_line(f"{tests} tests, history in {config.getoption('timing_history') or history_path()}")
+
+
+# -------------------- CLI --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", default=None, help="SQLite history file (default: [timing] history in config.ini)")
+    parser.add_argument("--runs", type=int, default=10, help="how many recent runs to show")
+    parser.add_argument("--test", help="only tests whose node id contains this")
+    parser.add_argument("--slowest", choices=PHASES, help="list the tests with the most time in this phase in the last run")
+    args = parser.parse_args(argv)
+
+    path = args.history or history_path()
+    if not os.path.exists(path):
+        print(f"No timing history at {path}; run pytest --timing first", file=sys.stderr)
+        return 1
+    db = open_history(path)
+
+    if args.slowest:
+        for nodeid, ms, calls in slowest(db, args.slowest):
+            print(f"{ms:>9.0f} ms {calls:>5} calls  {nodeid}")
+        return 0
+
+    print(f"{'run':>5} {'started':<19} {'commit':<8} {'tests':>5} " + " ".join(f"{p:>10}" for p in PHASES) + "  (s)")
+    for run_id, started_at, commit, tests, phases in trend(db, args.runs, args.test):
+        print(f"{run_id:>5} {started_at:<19} {commit or '':<8} {tests:>5} "
+              + " ".join(f"{phases.get(p, 0) / 1000:>10.1f}" for p in PHASES))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
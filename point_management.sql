@@ -41,6 +41,45 @@ INSERT INTO `admin_login` (`email`, `admin_password`) VALUES
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `challan`
+--
+-- Ledger of issued fee challans. Challan numbers come from
+-- `challan_sequence` in blocks, so they are unique but may have gaps.
+--
+
+CREATE TABLE `challan` (
+  `Challan_no` bigint(20) UNSIGNED NOT NULL,
+  `Student_ID` varchar(50) NOT NULL,
+  `Name` varchar(50) NOT NULL,
+  `Point_no` varchar(50) NOT NULL,
+  `Amount` int(11) NOT NULL,
+  `Issued_at` datetime NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `challan_sequence`
+--
+-- `next_value` is the first challan number not yet handed out. Writers
+-- reserve a block with UPDATE ... LAST_INSERT_ID(next_value + n).
+--
+
+CREATE TABLE `challan_sequence` (
+  `id` tinyint(4) NOT NULL,
+  `next_value` bigint(20) UNSIGNED NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+--
+-- Dumping data for table `challan_sequence`
+--
+
+INSERT INTO `challan_sequence` (`id`, `next_value`) VALUES
+(1, 100001);
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `driver`
 --
@@ -171,6 +210,24 @@ INSERT INTO `driver` (`Name`, `Route`, `Point_no`, `Phone`, `Driver_ID`) VALUES
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `driver_location`
+--
+-- Latest fix per driver. Coordinates are quantized to 1e-5 degrees (~1 m)
+-- and `version` is taken from `tracking_version` on every update so the
+-- fleet endpoint can return only the drivers that moved.
+--
+
+CREATE TABLE `driver_location` (
+  `Driver_ID` varchar(50) NOT NULL,
+  `lat_e5` int(11) NOT NULL,
+  `lng_e5` int(11) NOT NULL,
+  `recorded_at` datetime(3) NOT NULL,
+  `version` bigint(20) UNSIGNED NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `driver_login`
 --
@@ -182,6 +239,46 @@ CREATE TABLE `driver_login` (
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `location_history`
+--
+-- Raw fixes, one partition per day. location_retention.py creates the
+-- daily partitions ahead of time, rolls expiring days up into
+-- `location_minute` and drops them with DROP PARTITION.
+--
+
+CREATE TABLE `location_history` (
+  `id` bigint(20) UNSIGNED NOT NULL,
+  `Driver_ID` varchar(50) NOT NULL,
+  `lat` decimal(9,6) NOT NULL,
+  `lng` decimal(9,6) NOT NULL,
+  `recorded_at` datetime(3) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+PARTITION BY RANGE (TO_DAYS(`recorded_at`))
+(PARTITION p_future VALUES LESS THAN MAXVALUE ENGINE=InnoDB);
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `location_minute`
+--
+-- Per-minute rollup of location_history, partitioned by day like it.
+--
+
+CREATE TABLE `location_minute` (
+  `Driver_ID` varchar(50) NOT NULL,
+  `minute` datetime NOT NULL,
+  `fixes` smallint(5) UNSIGNED NOT NULL,
+  `lat_avg` decimal(9,6) NOT NULL,
+  `lng_avg` decimal(9,6) NOT NULL,
+  `lat_last` decimal(9,6) NOT NULL,
+  `lng_last` decimal(9,6) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+PARTITION BY RANGE (TO_DAYS(`minute`))
+(PARTITION p_future VALUES LESS THAN MAXVALUE ENGINE=InnoDB);
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `point_details`
 --
@@ -195,6 +292,124 @@ CREATE TABLE `point_details` (
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `route_stop`
+--
+-- Ordered stops of every Route, ending at campus. Read by EtaService.
+--
+
+CREATE TABLE `route_stop` (
+  `Route` varchar(50) NOT NULL,
+  `Stop_seq` smallint(6) NOT NULL,
+  `Stop_name` varchar(50) NOT NULL,
+  `lat` decimal(9,6) NOT NULL,
+  `lng` decimal(9,6) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+--
+-- Dumping data for table `route_stop`
+--
+
+INSERT INTO `route_stop` (`Route`, `Stop_seq`, `Stop_name`, `lat`, `lng`) VALUES
+('Clifton', 1, 'Clifton Stop 1', 24.813800, 67.030000),
+('Clifton', 2, 'Clifton Stop 2', 24.845661, 67.047997),
+('Clifton', 3, 'Clifton Stop 3', 24.876849, 67.066668),
+('Clifton', 4, 'Clifton Stop 4', 24.906947, 67.086429),
+('Clifton', 5, 'Clifton Stop 5', 24.935955, 67.107280),
+('Clifton', 6, 'Campus', 24.964290, 67.128804),
+('Defence', 1, 'Defence Stop 1', 24.812500, 67.065000),
+('Defence', 2, 'Defence Stop 2', 24.844621, 67.075997),
+('Defence', 3, 'Defence Stop 3', 24.876069, 67.087668),
+('Defence', 4, 'Defence Stop 4', 24.906427, 67.100429),
+('Defence', 5, 'Defence Stop 5', 24.935695, 67.114280),
+('Defence', 6, 'Campus', 24.964290, 67.128804),
+('FB Area', 1, 'FB Area Stop 1', 24.930000, 67.080000),
+('FB Area', 2, 'FB Area Stop 2', 24.938621, 67.087997),
+('FB Area', 3, 'FB Area Stop 3', 24.946569, 67.096668),
+('FB Area', 4, 'FB Area Stop 4', 24.953427, 67.106429),
+('FB Area', 5, 'FB Area Stop 5', 24.959195, 67.117280),
+('FB Area', 6, 'Campus', 24.964290, 67.128804),
+('Gulshan', 1, 'Gulshan Stop 1', 24.920000, 67.095000),
+('Gulshan', 2, 'Gulshan Stop 2', 24.930621, 67.099997),
+('Gulshan', 3, 'Gulshan Stop 3', 24.940569, 67.105668),
+('Gulshan', 4, 'Gulshan Stop 4', 24.949427, 67.112429),
+('Gulshan', 5, 'Gulshan Stop 5', 24.957195, 67.120280),
+('Gulshan', 6, 'Campus', 24.964290, 67.128804),
+('Johar', 1, 'Johar Stop 1', 24.914000, 67.127000),
+('Johar', 2, 'Johar Stop 2', 24.925821, 67.125597),
+('Johar', 3, 'Johar Stop 3', 24.936969, 67.124868),
+('Johar', 4, 'Johar Stop 4', 24.947027, 67.125229),
+('Johar', 5, 'Johar Stop 5', 24.955995, 67.126680),
+('Johar', 6, 'Campus', 24.964290, 67.128804),
+('Korangi', 1, 'Korangi Stop 1', 24.830000, 67.130000),
+('Korangi', 2, 'Korangi Stop 2', 24.858621, 67.127997),
+('Korangi', 3, 'Korangi Stop 3', 24.886569, 67.126668),
+('Korangi', 4, 'Korangi Stop 4', 24.913427, 67.126429),
+('Korangi', 5, 'Korangi Stop 5', 24.939195, 67.127280),
+('Korangi', 6, 'Campus', 24.964290, 67.128804),
+('Landhi', 1, 'Landhi Stop 1', 24.845000, 67.210000),
+('Landhi', 2, 'Landhi Stop 2', 24.870621, 67.191997),
+('Landhi', 3, 'Landhi Stop 3', 24.895569, 67.174668),
+('Landhi', 4, 'Landhi Stop 4', 24.919427, 67.158429),
+('Landhi', 5, 'Landhi Stop 5', 24.942195, 67.143280),
+('Landhi', 6, 'Campus', 24.964290, 67.128804),
+('Madras', 1, 'Madras Stop 1', 24.925000, 67.140000),
+('Madras', 2, 'Madras Stop 2', 24.934621, 67.135997),
+('Madras', 3, 'Madras Stop 3', 24.943569, 67.132668),
+('Madras', 4, 'Madras Stop 4', 24.951427, 67.130429),
+('Madras', 5, 'Madras Stop 5', 24.958195, 67.129280),
+('Madras', 6, 'Campus', 24.964290, 67.128804),
+('Malir', 1, 'Malir Stop 1', 24.895000, 67.200000),
+('Malir', 2, 'Malir Stop 2', 24.910621, 67.183997),
+('Malir', 3, 'Malir Stop 3', 24.925569, 67.168668),
+('Malir', 4, 'Malir Stop 4', 24.939427, 67.154429),
+('Malir', 5, 'Malir Stop 5', 24.952195, 67.141280),
+('Malir', 6, 'Campus', 24.964290, 67.128804),
+('Model Colony', 1, 'Model Colony Stop 1', 24.880000, 67.180000),
+('Model Colony', 2, 'Model Colony Stop 2', 24.898621, 67.167997),
+('Model Colony', 3, 'Model Colony Stop 3', 24.916569, 67.156668),
+('Model Colony', 4, 'Model Colony Stop 4', 24.933427, 67.146429),
+('Model Colony', 5, 'Model Colony Stop 5', 24.949195, 67.137280),
+('Model Colony', 6, 'Campus', 24.964290, 67.128804),
+('Nazimabad', 1, 'Nazimabad Stop 1', 24.910000, 67.030000),
+('Nazimabad', 2, 'Nazimabad Stop 2', 24.922621, 67.047997),
+('Nazimabad', 3, 'Nazimabad Stop 3', 24.934569, 67.066668),
+('Nazimabad', 4, 'Nazimabad Stop 4', 24.945427, 67.086429),
+('Nazimabad', 5, 'Nazimabad Stop 5', 24.955195, 67.107280),
+('Nazimabad', 6, 'Campus', 24.964290, 67.128804),
+('North Karachi', 1, 'North Karachi Stop 1', 24.975000, 67.065000),
+('North Karachi', 2, 'North Karachi Stop 2', 24.974621, 67.075997),
+('North Karachi', 3, 'North Karachi Stop 3', 24.973569, 67.087668),
+('North Karachi', 4, 'North Karachi Stop 4', 24.971427, 67.100429),
+('North Karachi', 5, 'North Karachi Stop 5', 24.968195, 67.114280),
+('North Karachi', 6, 'Campus', 24.964290, 67.128804),
+('Orangi', 1, 'Orangi Stop 1', 24.950000, 66.990000),
+('Orangi', 2, 'Orangi Stop 2', 24.954621, 67.015997),
+('Orangi', 3, 'Orangi Stop 3', 24.958569, 67.042668),
+('Orangi', 4, 'Orangi Stop 4', 24.961427, 67.070429),
+('Orangi', 5, 'Orangi Stop 5', 24.963195, 67.099280),
+('Orangi', 6, 'Campus', 24.964290, 67.128804),
+('Saddar', 1, 'Saddar Stop 1', 24.860000, 67.010000),
+('Saddar', 2, 'Saddar Stop 2', 24.882621, 67.031997),
+('Saddar', 3, 'Saddar Stop 3', 24.904569, 67.054668),
+('Saddar', 4, 'Saddar Stop 4', 24.925427, 67.078429),
+('Saddar', 5, 'Saddar Stop 5', 24.945195, 67.103280),
+('Saddar', 6, 'Campus', 24.964290, 67.128804),
+('Scheme 33', 1, 'Scheme 33 Stop 1', 24.950000, 67.150000),
+('Scheme 33', 2, 'Scheme 33 Stop 2', 24.954621, 67.143997),
+('Scheme 33', 3, 'Scheme 33 Stop 3', 24.958569, 67.138668),
+('Scheme 33', 4, 'Scheme 33 Stop 4', 24.961427, 67.134429),
+('Scheme 33', 5, 'Scheme 33 Stop 5', 24.963195, 67.131280),
+('Scheme 33', 6, 'Campus', 24.964290, 67.128804),
+('Surjani', 1, 'Surjani Stop 1', 25.030000, 67.060000),
+('Surjani', 2, 'Surjani Stop 2', 25.018621, 67.071997),
+('Surjani', 3, 'Surjani Stop 3', 25.006569, 67.084668),
+('Surjani', 4, 'Surjani Stop 4', 24.993427, 67.098429),
+('Surjani', 5, 'Surjani Stop 5', 24.979195, 67.113280),
+('Surjani', 6, 'Campus', 24.964290, 67.128804);
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `student`
 --
@@ -235,6 +450,89 @@ CREATE TABLE `student_login` (
 INSERT INTO `student_login` (`Student_ID`, `student_password`) VALUES
 ('k214947', '123');
 
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `student_summary`
+--
+-- Number of students per Driver_ID, Fee_Status and Point_no, kept up to
+-- date by StudentSummary in the same transaction as every student write.
+--
+
+CREATE TABLE `student_summary` (
+  `dimension` varchar(20) NOT NULL,
+  `value` varchar(50) NOT NULL,
+  `students` int(11) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+--
+-- Dumping data for table `student_summary`
+--
+
+INSERT INTO `student_summary` (`dimension`, `value`, `students`) VALUES
+('Driver_ID', '12', 1),
+('Driver_ID', '13', 1),
+('Driver_ID', '78', 1),
+('Fee_Status', 'Paid', 3),
+('Point_no', '13', 1),
+('Point_no', '21', 1),
+('Point_no', '23', 1);
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `table_change`
+--
+-- Latest change per row of the admin tables (driver, student). `version`
+-- comes from `table_version`, so the admin pages can fetch only the rows
+-- that changed after the version they hold. Deleted rows stay as
+-- tombstones with `deleted` = 1.
+--
+
+CREATE TABLE `table_change` (
+  `table_name` varchar(32) NOT NULL,
+  `Row_ID` varchar(50) NOT NULL,
+  `deleted` tinyint(1) NOT NULL,
+  `version` bigint(20) UNSIGNED NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `table_version`
+--
+
+CREATE TABLE `table_version` (
+  `table_name` varchar(32) NOT NULL,
+  `version` bigint(20) UNSIGNED NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+--
+-- Dumping data for table `table_version`
+--
+
+INSERT INTO `table_version` (`table_name`, `version`) VALUES
+('driver', 0),
+('student', 0);
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `tracking_version`
+--
+
+CREATE TABLE `tracking_version` (
+  `id` tinyint(4) NOT NULL,
+  `version` bigint(20) UNSIGNED NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+--
+-- Dumping data for table `tracking_version`
+--
+
+INSERT INTO `tracking_version` (`id`, `version`) VALUES
+(1, 0);
+
 --
 -- Indexes for dumped tables
 --
@@ -245,6 +543,19 @@ INSERT INTO `student_login` (`Student_ID`, `student_password`) VALUES
 ALTER TABLE `admin_login`
   ADD PRIMARY KEY (`email`);
 
+--
+-- Indexes for table `challan`
+--
+ALTER TABLE `challan`
+  ADD PRIMARY KEY (`Challan_no`),
+  ADD KEY `Student_ID_Issued_at` (`Student_ID`,`Issued_at`);
+
+--
+-- Indexes for table `challan_sequence`
+--
+ALTER TABLE `challan_sequence`
+  ADD PRIMARY KEY (`id`);
+
 --
 -- Indexes for table `driver`
 --
@@ -252,12 +563,32 @@ ALTER TABLE `driver`
   ADD UNIQUE KEY `Driver_ID` (`Driver_ID`),
   ADD UNIQUE KEY `Point_no` (`Point_no`);
 
+--
+-- Indexes for table `driver_location`
+--
+ALTER TABLE `driver_location`
+  ADD PRIMARY KEY (`Driver_ID`),
+  ADD KEY `version` (`version`);
+
 --
 -- Indexes for table `driver_login`
 --
 ALTER TABLE `driver_login`
   ADD PRIMARY KEY (`Driver_ID`);
 
+--
+-- Indexes for table `location_history`
+--
+ALTER TABLE `location_history`
+  ADD PRIMARY KEY (`id`,`recorded_at`),
+  ADD KEY `Driver_ID_recorded_at` (`Driver_ID`,`recorded_at`);
+
+--
+-- Indexes for table `location_minute`
+--
+ALTER TABLE `location_minute`
+  ADD PRIMARY KEY (`Driver_ID`,`minute`);
+
 --
 -- Indexes for table `point_details`
 --
@@ -265,6 +596,12 @@ ALTER TABLE `point_details`
   ADD PRIMARY KEY (`Point_no`),
   ADD UNIQUE KEY `Driver_ID` (`Driver_ID`,`Student_ID`);
 
+--
+-- Indexes for table `route_stop`
+--
+ALTER TABLE `route_stop`
+  ADD PRIMARY KEY (`Route`,`Stop_seq`);
+
 --
 -- Indexes for table `student`
 --
@@ -278,6 +615,41 @@ ALTER TABLE `student`
 --
 ALTER TABLE `student_login`
   ADD PRIMARY KEY (`Student_ID`);
+
+--
+-- Indexes for table `student_summary`
+--
+ALTER TABLE `student_summary`
+  ADD PRIMARY KEY (`dimension`,`value`);
+
+--
+-- Indexes for table `table_change`
+--
+ALTER TABLE `table_change`
+  ADD PRIMARY KEY (`table_name`,`Row_ID`),
+  ADD KEY `table_name_version` (`table_name`,`version`);
+
+--
+-- Indexes for table `table_version`
+--
+ALTER TABLE `table_version`
+  ADD PRIMARY KEY (`table_name`);
+
+--
+-- Indexes for table `tracking_version`
+--
+ALTER TABLE `tracking_version`
+  ADD PRIMARY KEY (`id`);
+
+--
+-- AUTO_INCREMENT for dumped tables
+--
+
+--
+-- AUTO_INCREMENT for table `location_history`
+--
+ALTER TABLE `location_history`
+  MODIFY `id` bigint(20) UNSIGNED NOT NULL AUTO_INCREMENT;
 COMMIT;
 
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
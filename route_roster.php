@@ -0,0 +1,59 @@
+<?php
+header('Content-Type: application/json');
+require_once 'RouteRoster.php';
+
+$servername = "localhost";
+$username = "root";
+$password = "";
+$db_name = "point_management";
+$port = 3307;
+
+// Create connection
+$conn = new mysqli($servername, $username, $password, $db_name, $port);
+
+// Check connection
+if ($conn->connect_error) {
+    http_response_code(500);
+    die(json_encode(["error" => "Connection failed: " . $conn->connect_error]));
+}
+
+$roster = new RouteRoster($conn);
+$action = $_POST['action'] ?? null;
+
+if ($_SERVER["REQUEST_METHOD"] == "POST" && $action == 'assign'
+        && isset($_POST['Point_no'], $_POST['Route'], $_POST['Student_ID'], $_POST['Driver_ID'])) {
+    // Put a student and a driver on a point
+    $result = $roster->assign($_POST['Point_no'], $_POST['Route'], $_POST['Student_ID'], $_POST['Driver_ID']);
+    if ($result === true) {
+        echo json_encode(["success" => "Point assigned"] + $roster->point($_POST['Point_no']));
+    } else {
+        http_response_code(409);
+        echo json_encode(["error" => "Error assigning point: " . $result]);
+    }
+} elseif ($_SERVER["REQUEST_METHOD"] == "POST" && $action == 'unassign' && isset($_POST['Point_no'])) {
+    $result = $roster->unassign($_POST['Point_no']);
+    if ($result === true) {
+        echo json_encode(["success" => "Point unassigned"]);
+    } else {
+        http_response_code(500);
+        echo json_encode(["error" => "Error unassigning point: " . $result]);
+    }
+} elseif (isset($_GET['Point_no'])) {
+    // Who rides and who drives one point
+    $row = $roster->point($_GET['Point_no']);
+    if ($row === null) {
+        http_response_code(404);
+        echo json_encode(["error" => "This point is not on any route"]);
+    } else {
+        echo json_encode($row);
+    }
+} elseif (isset($_GET['Route'])) {
+    // Every point on one route, one indexed read
+    echo json_encode(["Route" => $_GET['Route'], "points" => $roster->route($_GET['Route'])]);
+} else {
+    http_response_code(400);
+    echo json_encode(["error" => "Pass Route or Point_no"]);
+}
+
+$conn->close();
+?>
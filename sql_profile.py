@@ -0,0 +1,269 @@
+"""
+Per-test SQL profile from performance_schema and the slow query log.
+
+A pytest plugin, loaded by conftest.py. Profiling is opt in: request the
+`sql_profile` fixture in a test, or run `pytest --sql-profile` to profile
+every test. Around each profiled test the plugin snapshots
+performance_schema.events_statements_summary_by_digest for the
+point_management schema and attributes the difference to the test:
+
+  * statements run, per normalized statement (digest)
+  * rows examined and rows sent
+  * total latency
+  * statements that used no index
+
+Statements that ran at least --sql-n-plus-one times and returned at most
+one row each are flagged as N+1 candidates: one query per row of an
+earlier result instead of one query for all of them. Statements slower
+than --sql-slow-ms come from mysql.slow_log, which the plugin switches on
+for the run and restores afterwards.
+
+The profile is added to the test report as a "SQL profile" section, so
+pytest-html shows it under the test and a failing test prints it, and as
+the `sql_profile` user property for --junitxml. A summary of the most
+expensive tests ends the terminal output.
+
+The digests are server-wide, so the PHP endpoints a test calls are
+included. Statements from other clients running at the same time would
+be counted as well; profile on a quiet server.
+
+MariaDB ships with performance_schema off. Add `performance_schema=ON` to
+the [mysqld] section of my.ini and restart MariaDB; without it the
+profile says so and the tests run unprofiled.
+
+Examples:
+    pytest test_fetch_driver.py --sql-profile
+    pytest --sql-profile --sql-n-plus-one 5 --sql-slow-ms 50 --html=report.html
+"""
+import json
+from collections import namedtuple
+
+import pytest
+
+N_PLUS_ONE_CALLS = 10
+SLOW_MS = 100.0
+SUMMARY_TESTS = 10
+
+Digest = namedtuple("Digest", "text calls latency_ms rows_examined rows_sent no_index")
+
+
+# -------------------- Snapshots --------------------
+def snapshot(conn, schema):
+    """{digest: Digest} of every statement performance_schema has summarized for `schema`."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT DIGEST, DIGEST_TEXT, COUNT_STAR, SUM_TIMER_WAIT, SUM_ROWS_EXAMINED, SUM_ROWS_SENT, SUM_NO_INDEX_USED "
+            "FROM performance_schema.events_statements_summary_by_digest WHERE SCHEMA_NAME = %s",
+            (schema,)
+        )
+        # SUM_TIMER_WAIT is in picoseconds
+        return {row[0]: Digest(row[1], row[2], row[3] / 1e9, row[4], row[5], row[6]) for row in cursor.fetchall()}
+
+
+def difference(before, after):
+    """Digests that ran between two snapshots, with their counters for that interval, slowest first."""
+    ran = []
+    for digest, now in after.items():
+        then = before.get(digest)
+        if then is not None:
+            now = Digest(now.text, *(a - b for a, b in zip(now[1:], then[1:])))
+        if now.calls > 0:
+            ran.append(now)
+    return sorted(ran, key=lambda d: d.latency_ms, reverse=True)
+
+
+def n_plus_one(digests, min_calls=N_PLUS_ONE_CALLS):
+    """Lookups run once per row of some other result: many calls, at most one row each."""
+    return [d for d in digests
+            if d.calls >= min_calls and d.rows_sent <= d.calls and (d.text or "").lstrip().upper().startswith("SELECT")]
+
+
+def totals(digests):
+    return {
+        "statements": sum(d.calls for d in digests),
+        "rows_examined": sum(d.rows_examined for d in digests),
+        "rows_sent": sum(d.rows_sent for d in digests),
+        "latency_ms": round(sum(d.latency_ms for d in digests), 3),
+        "no_index": sum(d.no_index for d in digests),
+    }
+
+
+# -------------------- Slow query log --------------------
+def enable_slow_log(conn, slow_ms):
+    """Log statements slower than `slow_ms` to mysql.slow_log; returns the settings to restore."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT @@GLOBAL.slow_query_log, @@GLOBAL.long_query_time, @@GLOBAL.log_output")
+        previous = cursor.fetchone()
+        cursor.execute("SET GLOBAL slow_query_log = 1, long_query_time = %s, log_output = %s",
+                       (slow_ms / 1000, "TABLE" if "TABLE" in previous[2].upper() else previous[2] + ",TABLE"))
+    return previous
+
+
+def restore_slow_log(conn, previous):
+    with conn.cursor() as cursor:
+        cursor.execute("SET GLOBAL slow_query_log = %s, long_query_time = %s, log_output = %s", previous)
+
+
+def slow_statements(conn, schema, since):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT start_time, query_time, rows_examined, sql_text FROM mysql.slow_log "
+            "WHERE start_time >= %s AND db = %s ORDER BY query_time DESC LIMIT 20",
+            (since, schema)
+        )
+        rows = cursor.fetchall()
+    return [{"at": str(start), "ms": query_time.total_seconds() * 1000, "rows_examined": examined,
+             "sql": text.decode("utf-8", "replace") if isinstance(text, bytes) else text}
+            for start, query_time, examined, text in rows]
+
+
+# -------------------- Profiles --------------------
+class SqlProfiler:
+    """One connection for the whole run; start() and stop() bracket each profiled test."""
+
+    def __init__(self, slow_ms=SLOW_MS, min_calls=N_PLUS_ONE_CALLS, config=None):
+        # pymysql is only needed once something is profiled, not to load the plugin
+        from db_config import load_config
+
+        config = config or load_config()
+        self.schema = config["database"].get("name", "point_management")
+        self.slow_ms = slow_ms
+        self.min_calls = min_calls
+        self.conn = None
+        self.unavailable = None
+        self.slow_log = None
+        self.results = {}
+
+    def open(self):
+        import pymysql
+        from db_config import connect
+
+        if self.conn is not None or self.unavailable:
+            return
+        try:
+            # No default database: the snapshots only cover statements run in
+            # the profiled schema, so the profiler's own never show up in them
+            self.conn = connect(database=None, autocommit=True)
+            with self.conn.cursor() as cursor:
+                cursor.execute("SELECT @@performance_schema")
+                if not cursor.fetchone()[0]:
+                    self.unavailable = "performance_schema is OFF; set performance_schema=ON in my.ini"
+                    return
+            try:
+                self.slow_log = enable_slow_log(self.conn, self.slow_ms)
+            except pymysql.MySQLError as e:
+                # Profiles still work without the slow log, e.g. without the SUPER privilege
+                self.slow_log = e
+        except pymysql.MySQLError as e:
+            self.unavailable = f"cannot profile: {e}"
+
+    def close(self):
+        if self.conn is None:
+            return
+        if isinstance(self.slow_log, tuple):
+            restore_slow_log(self.conn, self.slow_log)
+        self.conn.close()
+        self.conn = None
+
+    def start(self):
+        """Snapshot before a test; returns the state stop() needs."""
+        self.open()
+        if self.unavailable:
+            return None
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT NOW(6)")
+            started_at = cursor.fetchone()[0]
+        return started_at, snapshot(self.conn, self.schema)
+
+    def stop(self, nodeid, state):
+        """Attribute what ran since start() to the test `nodeid`; returns the profile dict."""
+        if state is None:
+            profile = {"unavailable": self.unavailable}
+        else:
+            started_at, before = state
+            digests = difference(before, snapshot(self.conn, self.schema))
+            profile = totals(digests)
+            profile["digests"] = [d._asdict() for d in digests]
+            profile["n_plus_one"] = [d._asdict() for d in n_plus_one(digests, self.min_calls)]
+            profile["slow"] = (slow_statements(self.conn, self.schema, started_at)
+                               if isinstance(self.slow_log, tuple) else [])
+        self.results[nodeid] = profile
+        return profile
+
+
+def format_profile(profile, limit=15):
+    if profile.get("unavailable"):
+        return f"Not profiled: {profile['unavailable']}\n"
+    lines = [f"{profile['statements']} statements, {profile['rows_examined']} rows examined, "
+             f"{profile['rows_sent']} rows sent, {profile['latency_ms']:.1f} ms in MySQL, "
+             f"{profile['no_index']} without an index", ""]
+    lines.append(f"{'calls':>6} {'ms':>9} {'examined':>9} {'sent':>7}  statement")
+    for d in profile["digests"][:limit]:
+        lines.append(f"{d['calls']:>6} {d['latency_ms']:>9.2f} {d['rows_examined']:>9} {d['rows_sent']:>7}  {d['text']}")
+    if len(profile["digests"]) > limit:
+        lines.append(f"  ... {len(profile['digests']) - limit} more")
+    for d in profile["n_plus_one"]:
+        lines.append(f"N+1? {d['calls']} calls returning {d['rows_sent']} rows: {d['text']}")
+    for slow in profile["slow"]:
+        lines.append(f"Slow: {slow['ms']:.0f} ms, {slow['rows_examined']} rows examined: {slow['sql']}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------- Pytest plugin --------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("sql-profile", "per-test SQL profile")
+    group.addoption("--sql-profile", action="store_true", help="profile the SQL of every test")
+    group.addoption("--sql-slow-ms", type=float, default=SLOW_MS,
+                    help=f"report statements slower than this from the slow query log (default {SLOW_MS:g})")
+    group.addoption("--sql-n-plus-one", type=int, default=N_PLUS_ONE_CALLS,
+                    help=f"flag single-row lookups run at least this often (default {N_PLUS_ONE_CALLS})")
+
+
+@pytest.fixture(scope="session")
+def sql_profiler(request):
+    profiler = SqlProfiler(request.config.getoption("sql_slow_ms"), request.config.getoption("sql_n_plus_one"))
+    request.config._sql_profiler = profiler
+    yield profiler
+    profiler.close()
+
+
+@pytest.fixture
+def sql_profile(request, sql_profiler):
+    """Profile this test's SQL; the profile goes into the test report."""
+    state = sql_profiler.start()
+    yield sql_profiler
+    request.node.sql_profile = sql_profiler.stop(request.node.nodeid, state)
+
+
+@pytest.fixture(autouse=True)
+def _sql_profile_every_test(request):
+    if request.config.getoption("sql_profile") and "sql_profile" not in request.fixturenames:
+        request.getfixturevalue("sql_profile")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    profile = getattr(item, "sql_profile", None)
+    # The fixture finishes the profile during teardown
+    if report.when == "teardown" and profile is not None:
+        report.sections.append(("SQL profile", format_profile(profile)))
+        summary = {key: value for key, value in profile.items() if key != "digests"}
+        report.user_properties.append(("sql_profile", json.dumps(summary, default=str)))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    profiler = getattr(config, "_sql_profiler", None)
+    if profiler is None or not profiler.results:
+        return
+    terminalreporter.section("SQL profile")
+    if profiler.unavailable:
+        terminalreporter.write_line(f"Not profiled: {profiler.unavailable}")
+        return
+    ranked = sorted(profiler.results.items(), key=lambda item: item[1]["latency_ms"], reverse=True)
+    for nodeid, profile in ranked[:SUMMARY_TESTS]:
+        flags = f", {len(profile['n_plus_one'])} N+1" if profile["n_plus_one"] else ""
+        terminalreporter.write_line(
+            f"{profile['latency_ms']:>9.1f} ms {profile['statements']:>6} statements "
+            f"{profile['rows_examined']:>9} rows examined{flags}  {nodeid}")
@@ -1,4 +1,6 @@
 <?php
+require_once 'StudentSummary.php';
+
 if ($_SERVER["REQUEST_METHOD"] == "POST") {
     $servername = "localhost";
     $username = "root";
@@ -34,20 +36,18 @@ if ($_SERVER["REQUEST_METHOD"] == "POST") {
         echo "<script>alert('Error: Student ID already exists!'); window.location.href='student_input.html';</script>";
         exit();
     } else {
-        // Prepare and bind
-        $stmt = $conn->prepare("INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) VALUES (?, ?, ?, ?, ?, ?)");
-        $stmt->bind_param("sssiss", $studentID, $studentName, $pointnumber, $contactnumber, $feestatus, $driverid);
+        // Insert the student and update the dashboard counters in one transaction
+        $summary = new StudentSummary($conn);
+        $added = $summary->addStudent($studentID, $studentName, $pointnumber, $contactnumber, $feestatus, $driverid);
 
-        // Execute and check for success
-        if ($stmt->execute()) {
+        // Check for success
+        if ($added === true) {
             echo "New student added successfully";
             // Optionally, redirect back to a confirmation page or the student list
             header('Location: fetch_data_student.html');
         } else {
-            echo "Error: " . $stmt->error;
+            echo "Error: " . $added;
         }
-
-        $stmt->close();
     }
 
     $checkStmt->close();
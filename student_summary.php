@@ -0,0 +1,35 @@
+<?php
+header('Content-Type: application/json');
+require_once 'StudentSummary.php';
+
+$servername = "localhost";
+$username = "root";
+$password = "";
+$db_name = "point_management";
+$port = 3307;
+
+// Create connection
+$conn = new mysqli($servername, $username, $password, $db_name, $port);
+
+// Check connection
+if ($conn->connect_error) {
+    http_response_code(500);
+    die(json_encode(["error" => "Connection failed: " . $conn->connect_error]));
+}
+
+$summary = new StudentSummary($conn);
+$dimension = $_GET['dimension'] ?? null;
+
+if ($dimension !== null && !in_array($dimension, StudentSummary::DIMENSIONS, true)) {
+    http_response_code(400);
+    echo json_encode(["error" => "dimension must be one of " . implode(", ", StudentSummary::DIMENSIONS)]);
+} elseif ($dimension !== null && isset($_GET['value'])) {
+    // One counter, e.g. ?dimension=Fee_Status&value=Pending
+    echo json_encode(["dimension" => $dimension, "value" => $_GET['value'], "students" => $summary->count($dimension, $_GET['value'])]);
+} else {
+    // Values such as Point_no "1", "2" must stay object keys
+    echo json_encode($summary->counts($dimension), JSON_FORCE_OBJECT);
+}
+
+$conn->close();
+?>
@@ -0,0 +1,157 @@
+/**
+ * Service worker for the student portal pages.
+ *
+ * The shell (PRECACHE: the student pages and every local file they load) is
+ * cached on install and served from the cache, so a repeat visit needs no
+ * network at all. JSON endpoints are live data, so they always go to the
+ * network; their last complete response is kept and only served when the
+ * network cannot be reached. Scripts, stylesheets and fonts from other
+ * origins (the CDN libraries) are stale-while-revalidate: the last response
+ * is returned at once and a fresh one replaces it in the background.
+ *
+ * VERSION and PRECACHE are written by build_assets.py. VERSION is a hash of
+ * the shell, so a deploy that changes any shell file installs a new worker,
+ * which deletes the previous version's caches when it activates.
+ */
+var VERSION = 'ff512ad5d1';
+var PRECACHE = [
+    'fee.html',
+    'fleet_map.js',
+    'marker_animator.js',
+    'real_time_tracking.html',
+    'routes.html',
+    'static/background.03d04aedb4.jpg',
+    'static/background.58747f0da2.webp',
+    'static/background.e3d344013b.avif',
+    'static/image.f7a9b15152.webp',
+    'student.html',
+    'style.css'
+];
+
+var SHELL_CACHE = 'shell-' + VERSION;
+var RUNTIME_CACHE = 'runtime-' + VERSION;
+
+// Endpoint -> query parameters that make a response partial. fleet_positions.php
+// with a `since` only has the buses that moved after it, which is no answer to
+// a poll from another version, so only the full feed (no `since`, or 0) is kept.
+var JSON_ENDPOINTS = {
+    'fleet_positions.php': ['since'],
+    'eta.php': []
+};
+
+var CROSS_ORIGIN_TYPES = ['script', 'style', 'font'];
+
+var SHELL = new Set(PRECACHE.map(function (path) {
+    return new URL(path, self.location).href;
+}));
+
+self.addEventListener('install', function (event) {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(function (cache) {
+                // Bypass the HTTP cache so the shell matches this deploy
+                return cache.addAll(PRECACHE.map(function (path) {
+                    return new Request(path, { cache: 'reload' });
+                }));
+            })
+            .then(function () { return self.skipWaiting(); })
+    );
+});
+
+self.addEventListener('activate', function (event) {
+    event.waitUntil(
+        caches.keys()
+            .then(function (names) {
+                return Promise.all(names.filter(function (name) {
+                    return name !== SHELL_CACHE && name !== RUNTIME_CACHE;
+                }).map(function (name) {
+                    return caches.delete(name);
+                }));
+            })
+            .then(function () { return self.clients.claim(); })
+    );
+});
+
+/**
+ * Cache key for a JSON endpoint request, or null if `url` is not one. The key
+ * is the URL of the complete response, which answers the request offline.
+ */
+function jsonKey(url) {
+    if (url.origin !== self.location.origin) {
+        return null;
+    }
+    var endpoint = url.pathname.split('/').pop();
+    if (!JSON_ENDPOINTS.hasOwnProperty(endpoint)) {
+        return null;
+    }
+    var key = new URL(url.href);
+    JSON_ENDPOINTS[endpoint].forEach(function (param) {
+        key.searchParams.delete(param);
+    });
+    return key.href;
+}
+
+function isComplete(url) {
+    var endpoint = url.pathname.split('/').pop();
+    return JSON_ENDPOINTS[endpoint].every(function (param) {
+        var value = url.searchParams.get(param);
+        return value === null || value === '' || value === '0';
+    });
+}
+
+function networkFirst(event, key, complete) {
+    return fetch(event.request).then(function (response) {
+        if (complete && response.ok) {
+            var copy = response.clone();
+            event.waitUntil(caches.open(RUNTIME_CACHE).then(function (cache) {
+                return cache.put(key, copy);
+            }));
+        }
+        return response;
+    }).catch(function (error) {
+        return caches.match(key, { cacheName: RUNTIME_CACHE }).then(function (cached) {
+            return cached || Promise.reject(error);
+        });
+    });
+}
+
+function staleWhileRevalidate(event, key) {
+    return caches.open(RUNTIME_CACHE).then(function (cache) {
+        return cache.match(key).then(function (cached) {
+            var refresh = fetch(event.request).then(function (response) {
+                // Opaque responses (no-cors CDN files) can't be inspected, only kept
+                if (response.ok || response.type === 'opaque') {
+                    return cache.put(key, response.clone()).then(function () { return response; });
+                }
+                return response;
+            });
+            if (cached) {
+                event.waitUntil(refresh.catch(function () {}));
+                return cached;
+            }
+            return refresh;
+        });
+    });
+}
+
+self.addEventListener('fetch', function (event) {
+    var request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+    var url = new URL(request.url);
+
+    if (SHELL.has(url.href)) {
+        event.respondWith(caches.match(request, { cacheName: SHELL_CACHE }).then(function (cached) {
+            return cached || fetch(request);
+        }));
+        return;
+    }
+
+    var key = jsonKey(url);
+    if (key !== null) {
+        event.respondWith(networkFirst(event, key, isComplete(url)));
+    } else if (url.origin !== self.location.origin && CROSS_ORIGIN_TYPES.indexOf(request.destination) !== -1) {
+        event.respondWith(staleWhileRevalidate(event, request.url));
+    }
+});
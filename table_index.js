@@ -0,0 +1,289 @@
+/**
+ * In-memory search and sort index for the admin tables.
+ *
+ * Built once when the rows arrive:
+ *   - a prefix map from the first PREFIX_LEN characters of every word of the
+ *     search fields to the rows containing such a word. A query looks up its
+ *     own first characters and only checks the rows in that bucket;
+ *   - one pre-sorted permutation of row positions per column, so sorting is
+ *     a walk over an existing array instead of a new sort.
+ *
+ * query() returns the matching rows in the requested order without touching
+ * the network, and the result goes straight into VirtualTable.setRows().
+ * Deleted rows are tombstoned by remove() and skipped by query(), so a
+ * delete does not rebuild the index.
+ */
+var TableIndex = (function () {
+    var PREFIX_LEN = 3;
+
+    function text(value) {
+        return value === null || value === undefined ? '' : String(value);
+    }
+
+    function words(value) {
+        return text(value).toLowerCase().split(/\s+/).filter(Boolean);
+    }
+
+    /**
+     * @param {Object[]} rows Records keyed by column name
+     * @param {string[]} searchFields Fields matched by query text
+     * @param {string[]} sortFields Fields that can be sorted on
+     */
+    function TableIndex(rows, searchFields, sortFields) {
+        var started = performance.now();
+        this.rows = rows;
+        this.searchFields = searchFields;
+        this.prefixes = new Map();   // prefix -> row positions, ascending
+        this.words = [];             // row position -> lowercase words of the search fields
+        this.sorted = {};            // field -> row positions in ascending order
+        this.removed = new Uint8Array(rows.length);  // row position -> 1 once deleted
+        this.removedCount = 0;
+
+        for (var i = 0; i < rows.length; i++) {
+            var rowWords = [];
+            for (var f = 0; f < searchFields.length; f++) {
+                Array.prototype.push.apply(rowWords, words(rows[i][searchFields[f]]));
+            }
+            this.words.push(rowWords);
+            for (var w = 0; w < rowWords.length; w++) {
+                var word = rowWords[w];
+                for (var len = 1; len <= Math.min(PREFIX_LEN, word.length); len++) {
+                    var bucket = this.prefixes.get(word.slice(0, len));
+                    if (bucket === undefined) {
+                        this.prefixes.set(word.slice(0, len), [i]);
+                    } else if (bucket[bucket.length - 1] !== i) {
+                        bucket.push(i);
+                    }
+                }
+            }
+        }
+
+        for (var s = 0; s < sortFields.length; s++) {
+            this.sorted[sortFields[s]] = this.sortBy(sortFields[s]);
+        }
+        this.buildMs = performance.now() - started;
+    }
+
+    TableIndex.prototype.sortBy = function (field) {
+        var rows = this.rows;
+        var keys = rows.map(function (row) { return text(row[field]).toLowerCase(); });
+        // Columns such as Point_no and Phone sort as numbers when every value is one
+        var numeric = keys.every(function (key) { return key !== '' && isFinite(key); });
+        if (numeric) {
+            keys = keys.map(Number);
+        }
+        var order = new Int32Array(rows.length);
+        for (var i = 0; i < order.length; i++) {
+            order[i] = i;
+        }
+        // Ties keep the server's order
+        return order.sort(function (a, b) {
+            return keys[a] < keys[b] ? -1 : keys[a] > keys[b] ? 1 : a - b;
+        });
+    };
+
+    /**
+     * Row positions whose search fields contain a word starting with every query word.
+     *
+     * @return {Int32Array|null} Null for an empty query (every row matches)
+     */
+    TableIndex.prototype.match = function (query) {
+        var terms = words(query);
+        if (terms.length === 0) {
+            return null;
+        }
+        // Start from the smallest bucket, then check the full terms against each candidate
+        var candidates = null;
+        for (var t = 0; t < terms.length; t++) {
+            var bucket = this.prefixes.get(terms[t].slice(0, PREFIX_LEN)) || [];
+            if (candidates === null || bucket.length < candidates.length) {
+                candidates = bucket;
+            }
+        }
+
+        var matches = [];
+        for (var c = 0; c < candidates.length; c++) {
+            var rowWords = this.words[candidates[c]];
+            var all = true;
+            for (var q = 0; q < terms.length && all; q++) {
+                var found = false;
+                for (var w = 0; w < rowWords.length && !found; w++) {
+                    found = rowWords[w].startsWith(terms[q]);
+                }
+                all = found;
+            }
+            if (all) {
+                matches.push(candidates[c]);
+            }
+        }
+        return Int32Array.from(matches);
+    };
+
+    /**
+     * Tombstone the rows whose `field` is one of `ids`.
+     *
+     * @return {number} Rows removed
+     */
+    TableIndex.prototype.remove = function (field, ids) {
+        var wanted = new Set(ids.map(String));
+        var count = 0;
+        for (var i = 0; i < this.rows.length && count < wanted.size; i++) {
+            if (!this.removed[i] && wanted.has(text(this.rows[i][field]))) {
+                this.removed[i] = 1;
+                count += 1;
+            }
+        }
+        this.removedCount += count;
+        return count;
+    };
+
+    /**
+     * Rows not removed, in server order.
+     */
+    TableIndex.prototype.live = function () {
+        var removed = this.removed;
+        return this.removedCount === 0 ? this.rows.slice() : this.rows.filter(function (row, i) {
+            return !removed[i];
+        });
+    };
+
+    /**
+     * Rows matching `query`, ordered by `sortField`.
+     *
+     * @param {string} query Search text; empty matches every row
+     * @param {string|null} sortField Column to order by, null for server order
+     * @param {boolean} descending Reverse the order
+     * @return {Object[]}
+     */
+    TableIndex.prototype.query = function (query, sortField, descending) {
+        var matches = this.match(query);
+        var order = sortField ? this.sorted[sortField] : null;
+        var removed = this.removed;
+        var result = [];
+        var i;
+
+        if (order && matches) {
+            var wanted = new Uint8Array(this.rows.length);
+            for (i = 0; i < matches.length; i++) {
+                wanted[matches[i]] = 1;
+            }
+            for (i = 0; i < order.length; i++) {
+                if (wanted[order[i]] && !removed[order[i]]) {
+                    result.push(this.rows[order[i]]);
+                }
+            }
+        } else if (order) {
+            for (i = 0; i < order.length; i++) {
+                if (!removed[order[i]]) {
+                    result.push(this.rows[order[i]]);
+                }
+            }
+        } else if (matches) {
+            for (i = 0; i < matches.length; i++) {
+                if (!removed[matches[i]]) {
+                    result.push(this.rows[matches[i]]);
+                }
+            }
+        } else {
+            result = this.live();
+        }
+        return descending ? result.reverse() : result;
+    };
+
+    /**
+     * Wire a search box and sortable headers to a VirtualTable.
+     *
+     * Headers with a data-field attribute sort on click; a second click
+     * reverses the order. Returns an object whose setRows() indexes new data,
+     * remove() drops rows in place and merge() applies a change set.
+     *
+     * @param {VirtualTable} table Table to render into
+     * @param {HTMLInputElement} input Search box
+     * @param {HTMLElement} headerRow Row holding the <th> elements
+     * @param {string[]} searchFields Fields matched by the search box
+     */
+    TableIndex.connect = function (table, input, headerRow, searchFields) {
+        var view = {
+            index: null,
+            sortField: null,
+            descending: false,
+            stats: { updates: 0, lastUpdateMs: 0, maxUpdateMs: 0 }
+        };
+
+        // keepScroll: the rows changed under the user, so patch them where they are
+        view.refresh = function (keepScroll) {
+            if (view.index === null) {
+                return;
+            }
+            var started = performance.now();
+            var rows = view.index.query(input.value, view.sortField, view.descending);
+            if (keepScroll === true) {
+                table.update(rows);
+            } else {
+                table.scroller.scrollTop = 0;
+                table.setRows(rows);
+            }
+            var elapsed = performance.now() - started;
+            view.stats.updates += 1;
+            view.stats.lastUpdateMs = elapsed;
+            view.stats.maxUpdateMs = Math.max(view.stats.maxUpdateMs, elapsed);
+        };
+
+        view.setRows = function (rows) {
+            view.index = new TableIndex(rows, searchFields, table.columns);
+            view.refresh();
+        };
+
+        /**
+         * Drop the rows whose `field` is in `ids` without rebuilding the index.
+         */
+        view.remove = function (field, ids) {
+            if (view.index !== null && view.index.remove(field, ids) > 0) {
+                view.refresh(true);
+            }
+        };
+
+        /**
+         * Apply a change set: drop `deleted`, replace or append `rows` by `field`.
+         */
+        view.merge = function (field, deleted, rows) {
+            if (view.index === null || (deleted.length === 0 && rows.length === 0)) {
+                return;
+            }
+            var changed = new Map(rows.map(function (row) { return [text(row[field]), row]; }));
+            var gone = new Set(deleted.map(String));
+            var merged = [];
+            view.index.live().forEach(function (row) {
+                var key = text(row[field]);
+                if (changed.has(key)) {
+                    merged.push(changed.get(key));
+                    changed.delete(key);
+                } else if (!gone.has(key)) {
+                    merged.push(row);
+                }
+            });
+            changed.forEach(function (row) { merged.push(row); });
+            view.index = new TableIndex(merged, searchFields, table.columns);
+            view.refresh(true);
+        };
+
+        input.addEventListener('input', function () { view.refresh(); });
+
+        headerRow.querySelectorAll('th[data-field]').forEach(function (th) {
+            th.addEventListener('click', function () {
+                var field = th.getAttribute('data-field');
+                view.descending = view.sortField === field ? !view.descending : false;
+                view.sortField = field;
+                headerRow.querySelectorAll('th').forEach(function (other) {
+                    other.removeAttribute('aria-sort');
+                });
+                th.setAttribute('aria-sort', view.descending ? 'descending' : 'ascending');
+                view.refresh();
+            });
+        });
+
+        return view;
+    };
+
+    return TableIndex;
+})();
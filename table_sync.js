@@ -0,0 +1,90 @@
+/**
+ * Keeps an admin table in step with the server after deletes.
+ *
+ * load() fetches the full list once and remembers the table version the
+ * server sent with it (X-Table-Version). A delete answers with the IDs it
+ * removed and the versions before and after it ("from" and "v"): when
+ * "from" is the version this page holds, nobody else changed the table in
+ * between and the rows are dropped in place. Otherwise the page asks for
+ * the rows changed since its version (?since=) and merges them, which is
+ * still one small request instead of reloading the list.
+ */
+var TableSync = (function () {
+    /**
+     * @param {Object} view Result of TableIndex.connect()
+     * @param {Object} options url: list endpoint, keyField: primary key column
+     */
+    function TableSync(view, options) {
+        this.view = view;
+        this.url = options.url;
+        this.keyField = options.keyField;
+        this.version = null;
+        this.stats = { requests: 0, deltaFetches: 0, lastPatchMs: 0 };
+    }
+
+    TableSync.prototype.load = function () {
+        var self = this;
+        self.stats.requests += 1;
+        return fetch(self.url)
+            .then(function (response) {
+                var version = response.headers.get('X-Table-Version');
+                self.version = version === null ? null : Number(version);
+                return response.json();
+            })
+            .then(function (data) {
+                self.view.setRows(Array.isArray(data) ? data : []);
+                return data;
+            });
+    };
+
+    /**
+     * Delete one row on the server, then patch the table.
+     *
+     * @return {Promise<Object>} The server's answer: success or error
+     */
+    TableSync.prototype.remove = function (id) {
+        var self = this;
+        var body = new FormData();
+        body.append('action', 'delete');
+        body.append(self.keyField, id);
+        self.stats.requests += 1;
+        return fetch(self.url, { method: 'POST', body: body })
+            .then(function (response) { return response.json(); })
+            .then(function (result) {
+                if (result.error) {
+                    return result;
+                }
+                if (self.version !== null && result.from === self.version) {
+                    var started = performance.now();
+                    self.view.remove(self.keyField, result.deleted);
+                    self.stats.lastPatchMs = performance.now() - started;
+                    self.version = result.v;
+                    return result;
+                }
+                return self.sync().then(function () { return result; });
+            });
+    };
+
+    /**
+     * Merge every change made after the version this page holds.
+     */
+    TableSync.prototype.sync = function () {
+        var self = this;
+        if (self.version === null) {
+            return self.load();
+        }
+        self.stats.requests += 1;
+        self.stats.deltaFetches += 1;
+        return fetch(self.url + '?since=' + encodeURIComponent(self.version))
+            .then(function (response) { return response.json(); })
+            .then(function (changes) {
+                var started = performance.now();
+                self.view.merge(self.keyField, changes.deleted, changes.rows);
+                self.stats.lastPatchMs = performance.now() - started;
+                self.version = changes.v;
+                return changes;
+            });
+    };
+
+    return TableSync;
+})();
@@ -10,6 +10,8 @@ import re
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 
+import page_timing
+
 # Base Page class
 class BasePage:
     """Base page class that all page objects will inherit from."""
@@ -70,7 +72,6 @@ class StudentRegistrationPage(BasePage):
             self.wait_for_element(self.LOCATORS["student_id"])
             # Also check for the name field which was causing NoSuchElementException
             self.wait_for_element(self.LOCATORS["name"])
-            return True
         except:
             print("ERROR: Form did not load correctly. Check if application is running.")
             # Take screenshot for debugging
@@ -80,6 +81,8 @@ class StudentRegistrationPage(BasePage):
             # Print page source for debugging
             print(f"Page source excerpt: {self.driver.page_source[:500]}...")
             return False
+        page_timing.capture(self.driver)
+        return True
         
     def enter_student_id(self, student_id):
         self.driver.find_element(*self.LOCATORS["student_id"]).send_keys(student_id)
@@ -0,0 +1,133 @@
+import json
+import os
+import subprocess
+import tarfile
+import time
+import zipfile
+import pytest
+
+from db_config import connect
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+PHP = os.environ.get("PHP_BINARY", "php")
+
+STUDENTS = 50000
+BASELINE_SAMPLE = 1000
+
+
+# -------------------- Helpers --------------------
+def run_php(args, cwd=REPO_DIR):
+    completed = subprocess.run([PHP] + args, cwd=cwd, capture_output=True, text=True, check=True)
+    return completed.stdout
+
+
+def bulk_generate(output):
+    """Run generate_challans.php and return its stats line."""
+    stdout = run_php(["generate_challans.php", str(output)])
+    print("\n" + stdout.splitlines()[0], end="")
+    return json.loads(stdout.splitlines()[-1])
+
+
+def per_student_seconds(workdir):
+    """Time the one-file-per-call path on a sample of students."""
+    script = (
+        "require '" + os.path.join(REPO_DIR, "ChallanGenerator.php").replace("\\", "/") + "';"
+        f"$t = hrtime(true);"
+        f"for ($i = 0; $i < {BASELINE_SAMPLE}; $i++) {{ ChallanGenerator::generateChallan('BULKCH_' . $i, 'Student ' . $i); }}"
+        "echo (hrtime(true) - $t) / 1e9;"
+    )
+    return float(run_php(["-r", script], cwd=workdir)) / BASELINE_SAMPLE
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def students():
+    """Seed 50k synthetic students and remove them afterwards.
+
+    Point_no and Driver_ID are unique in the student table, so each student gets its own.
+    """
+    conn = connect(autocommit=True)
+    rows = [
+        (f"BULKCH_{i:05d}", f"Student {i}", f"BULKCH_P{i}", 3000000 + i, "Unpaid", f"BULKCH_D{i}")
+        for i in range(STUDENTS)
+    ]
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM student WHERE Student_ID LIKE 'BULKCH%'")
+        for start in range(0, len(rows), 5000):
+            cursor.executemany(
+                "INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                rows[start:start + 5000]
+            )
+        cursor.execute("SELECT COUNT(*) FROM student")
+        total = cursor.fetchone()[0]
+    yield total
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM student WHERE Student_ID LIKE 'BULKCH%'")
+    conn.close()
+
+
+# -------------------- Tests --------------------
+def test_bulk_tar_contains_every_student(students, tmp_path):
+    archive = tmp_path / "challans.tar"
+    stats = bulk_generate(archive)
+
+    with tarfile.open(archive) as tar:
+        names = tar.getnames()
+        sample = tar.extractfile(next(n for n in names if n.endswith("BULKCH_00042_challan.html"))).read().decode()
+
+    assert stats["count"] == students
+    assert len(names) == students
+    assert max(len([n for n in names if n.startswith(f"{shard:04d}/")]) for shard in range(students // 1000 + 1)) <= 1000
+    assert "Student Name: Student 42" in sample
+
+
+def test_bulk_zip_contains_every_student(students, tmp_path):
+    archive = tmp_path / "challans.zip"
+    stats = bulk_generate(archive)
+
+    with zipfile.ZipFile(archive) as zipped:
+        assert len(zipped.namelist()) == students
+    assert stats["count"] == students
+
+
+def test_bulk_directory_is_sharded(students, tmp_path):
+    output = tmp_path / "challans"
+    stats = bulk_generate(output)
+
+    shards = sorted(os.listdir(output))
+    assert stats["count"] == students
+    assert len(shards) == -(-students // 1000)
+    assert all(len(os.listdir(output / shard)) <= 1000 for shard in shards)
+
+
+def test_rerun_over_unchanged_students_is_served_from_cache(students, tmp_path):
+    output = tmp_path / "challans"
+    first = bulk_generate(output)
+    second = bulk_generate(output)
+
+    print(f"\nFirst run {first['seconds']:.2f}s, re-run {second['seconds']:.2f}s "
+          f"({second['hits']} hits, {second['misses']} misses)", end="")
+    assert first["misses"] == students
+    assert second["hits"] == students
+    assert second["misses"] == 0
+    assert second["bytes"] == 0
+    assert second["seconds"] < first["seconds"]
+
+
+def test_benchmark_bulk_beats_per_student_generation(students, tmp_path):
+    baseline_dir = tmp_path / "baseline"
+    baseline_dir.mkdir()
+    per_student = per_student_seconds(baseline_dir)
+
+    started = time.perf_counter()
+    stats = bulk_generate(tmp_path / "challans.tar")
+    wall = time.perf_counter() - started
+
+    projected = per_student * students
+    print(f"\nBulk: {stats['count']} challans in {stats['seconds']:.2f}s "
+          f"({stats['per_second']:.0f}/s, {wall:.2f}s wall incl. PHP start-up); "
+          f"per-student generateChallan projected at {projected:.2f}s "
+          f"({1 / per_student:.0f}/s)", end="")
+    assert stats["per_second"] > 1 / per_student
+    assert wall < 60
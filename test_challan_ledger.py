@@ -0,0 +1,134 @@
+import json
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import requests
+
+from db_config import connect
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+PHP = os.environ.get("PHP_BINARY", "php")
+FEE_URL = "http://localhost/SE/fee.php"
+
+STUDENTS = 5000
+
+
+# -------------------- Helpers --------------------
+def issue_through_fee_page(student_id, name="Ledger Student", point="P7"):
+    response = requests.post(FEE_URL, data={"name": name, "student-id": student_id, "point-number": point})
+    response.raise_for_status()
+    return response.text
+
+
+def challan_number(html):
+    match = re.search(r"<strong>Challan No:</strong> (\d+)", html)
+    assert match, html
+    return int(match.group(1))
+
+
+def bulk_issue(output):
+    stdout = subprocess.run([PHP, "generate_challans.php", "--issue", str(output)],
+                            cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout
+    return json.loads(stdout.splitlines()[-1])
+
+
+def ledger_rows(conn, pattern):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT Challan_no, Student_ID FROM challan WHERE Student_ID LIKE %s", (pattern,))
+        return cursor.fetchall()
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def conn():
+    conn = connect(autocommit=True)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT next_value FROM challan_sequence WHERE id = 1")
+        first_number = cursor.fetchone()[0]
+    yield conn
+    # Bulk runs issue challans for every student, not only the LEDGER_ ones
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM challan WHERE Challan_no >= %s", (first_number,))
+        cursor.execute("DELETE FROM student WHERE Student_ID LIKE 'LEDGER%'")
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def students(conn):
+    rows = [(f"LEDGER_{i:05d}", f"Student {i}", f"LEDGER_P{i}", 3100000 + i, "Unpaid", f"LEDGER_D{i}")
+            for i in range(STUDENTS)]
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM student WHERE Student_ID LIKE 'LEDGER%'")
+        cursor.executemany(
+            "INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            rows
+        )
+    return rows
+
+
+# -------------------- Tests --------------------
+def test_fee_page_records_challan_and_reprints_it(conn):
+    issued = issue_through_fee_page("LEDGER_FEE_1", name="Ali <b>Khan</b>")
+    number = challan_number(issued)
+
+    reprint = requests.get(FEE_URL, params={"student-id": "LEDGER_FEE_1"}).text
+
+    assert challan_number(reprint) == number
+    assert "Fee Challan reprinted" in reprint
+    assert "Ali &lt;b&gt;Khan&lt;/b&gt;" in reprint
+    assert "Rs 35000" in reprint
+    assert (number, "LEDGER_FEE_1") in ledger_rows(conn, "LEDGER_FEE_1")
+
+
+def test_reprint_serves_the_latest_challan(conn):
+    first = challan_number(issue_through_fee_page("LEDGER_FEE_2"))
+    time.sleep(1.1)
+    second = challan_number(issue_through_fee_page("LEDGER_FEE_2", point="P8"))
+
+    reprint = requests.get(FEE_URL, params={"student-id": "LEDGER_FEE_2"}).text
+
+    assert second != first
+    assert challan_number(reprint) == second
+    assert "P8" in reprint
+
+
+def test_reprint_uses_student_index(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "EXPLAIN SELECT Challan_no FROM challan WHERE Student_ID = %s "
+            "ORDER BY Issued_at DESC, Challan_no DESC LIMIT 1",
+            ("LEDGER_FEE_1",)
+        )
+        columns = [c[0] for c in cursor.description]
+        plan = dict(zip(columns, cursor.fetchone()))
+    assert plan["key"] == "Student_ID_Issued_at"
+
+
+def test_concurrent_bulk_runs_get_unique_numbers(conn, students, tmp_path):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        runs = list(executor.map(bulk_issue, [tmp_path / "a.tar", tmp_path / "b.tar"]))
+
+    rows = ledger_rows(conn, "LEDGER\\_0%")
+    numbers = [row[0] for row in rows]
+    print(f"\nBulk issue: {runs[0]['count']} challans in {runs[0]['seconds']:.2f}s "
+          f"and {runs[1]['count']} in {runs[1]['seconds']:.2f}s concurrently", end="")
+    assert all(run["issued"] == run["count"] for run in runs)
+    assert len(rows) == 2 * STUDENTS
+    assert len(set(numbers)) == len(numbers)
+
+
+def test_fee_page_numbers_never_collide_with_bulk_blocks(conn, students, tmp_path):
+    with ThreadPoolExecutor(max_workers=9) as executor:
+        bulk = executor.submit(bulk_issue, tmp_path / "c.tar")
+        singles = list(executor.map(lambda i: challan_number(issue_through_fee_page(f"LEDGER_FEE_C{i}")), range(40)))
+        bulk.result()
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*), COUNT(DISTINCT Challan_no) FROM challan WHERE Student_ID LIKE 'LEDGER%'")
+        total, distinct = cursor.fetchone()
+    assert total == distinct
+    assert len(set(singles)) == 40
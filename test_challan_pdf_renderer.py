@@ -0,0 +1,97 @@
+import os
+import re
+import subprocess
+import tarfile
+import pytest
+
+import challan_pdf_renderer
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+PHP = os.environ.get("PHP_BINARY", "php")
+
+CHALLANS = 1000
+WORKERS = min(os.cpu_count() or 1, 8)
+
+PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+
+
+# -------------------- Helpers --------------------
+def write_challans(directory, count):
+    """Render challan HTML with ChallanGenerator, sharded like generateBulk."""
+    script = (
+        "require '" + os.path.join(REPO_DIR, "ChallanGenerator.php").replace("\\", "/") + "';"
+        "$dir = $argv[1];"
+        f"for ($i = 0; $i < {count}; $i++) {{"
+        "  $shard = $dir . '/' . sprintf('%04d', intdiv($i, 1000));"
+        "  if (!is_dir($shard)) { mkdir($shard, 0777, true); }"
+        "  file_put_contents(\"$shard/PDF_$i\" . '_challan.html',"
+        "    ChallanGenerator::render('PDF_' . $i, 'Student ' . $i, date('Y-m-d H:i:s')));"
+        "}"
+    )
+    subprocess.run([PHP, "-r", script, "--", str(directory)], cwd=REPO_DIR, check=True)
+
+
+def pdf_files(directory):
+    found = []
+    for root, _, files in os.walk(directory):
+        found.extend(os.path.join(root, name) for name in files if name.endswith(".pdf"))
+    return found
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def pool():
+    with challan_pdf_renderer.ChromePool(WORKERS) as pool:
+        yield pool
+
+
+@pytest.fixture(scope="module")
+def challan_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("challans")
+    write_challans(directory, CHALLANS)
+    return directory
+
+
+# -------------------- Tests --------------------
+def test_renders_1000_challans_to_single_page_pdfs(pool, challan_dir, tmp_path):
+    stats = challan_pdf_renderer.render(str(challan_dir), str(tmp_path), pool=pool)
+    print(f"\n{stats.rendered} PDFs in {stats.seconds:.2f}s with {WORKERS} workers: "
+          f"{stats.pages_per_second:.1f} pages/s, {stats.bytes / stats.rendered:.0f} bytes/PDF", end="")
+
+    pdfs = pdf_files(tmp_path)
+    assert stats.rendered == CHALLANS
+    assert len(pdfs) == CHALLANS
+    assert os.path.exists(tmp_path / "0000" / "PDF_999_challan.pdf")
+    for path in pdfs:
+        with open(path, "rb") as handle:
+            data = handle.read()
+        assert data.startswith(b"%PDF-")
+        assert data.rstrip().endswith(b"%%EOF")
+        assert len(PAGE_OBJECT.findall(data)) == 1
+
+
+def test_work_is_spread_over_every_worker(pool, challan_dir, tmp_path):
+    stats = challan_pdf_renderer.render(str(challan_dir), str(tmp_path), pool=pool)
+
+    assert len(stats.per_worker) == WORKERS
+    assert min(stats.per_worker.values()) > CHALLANS / WORKERS / 4
+
+
+def test_up_to_date_pdfs_are_skipped(pool, challan_dir, tmp_path):
+    challan_pdf_renderer.render(str(challan_dir), str(tmp_path), pool=pool)
+    stats = challan_pdf_renderer.render(str(challan_dir), str(tmp_path), pool=pool)
+
+    assert stats.rendered == 0
+    assert stats.skipped == CHALLANS
+
+
+def test_renders_from_tar_archive(pool, challan_dir, tmp_path):
+    archive = tmp_path / "challans.tar"
+    with tarfile.open(archive, "w") as tar:
+        tar.add(challan_dir / "0000", arcname="0000")
+    output = tmp_path / "pdfs"
+
+    stats = challan_pdf_renderer.render(str(archive), str(output), pool=pool)
+
+    assert stats.rendered == CHALLANS
+    assert len(pdf_files(output)) == CHALLANS
@@ -0,0 +1,83 @@
+import pytest
+
+import migrate
+from column_type_benchmark import MIGRATION_VERSION, apply_migration, create_scratch, run
+from db_config import connect
+
+TEST_DB = "point_management_typetest"
+ROWS = 50000
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture
+def conn():
+    conn = connect(database=None)
+    yield conn
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{TEST_DB}`")
+    conn.close()
+
+
+@pytest.fixture
+def scratch(conn):
+    create_scratch(conn, TEST_DB)
+    return conn
+
+
+# -------------------- Tests --------------------
+def test_migration_backfills_phones(scratch):
+    with scratch.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) VALUES (%s, 'S', %s, %s, 'Paid', %s)",
+            [("K1", "21", 2147483647, "D1"), ("K2", "22", 90078601, "D2")])
+        cursor.executemany(
+            "INSERT INTO driver (Name, Route, Point_no, Phone, Driver_ID) VALUES ('D', 'Gulshan', %s, %s, %s)",
+            [("21", "300000000", "D1"), ("22", "0311111111", "D2")])
+    scratch.commit()
+
+    apply_migration(scratch)
+
+    with scratch.cursor() as cursor:
+        cursor.execute("SELECT Student_ID, Phone FROM student ORDER BY Student_ID")
+        students = dict(cursor.fetchall())
+        cursor.execute("SELECT Driver_ID, Phone FROM driver ORDER BY Driver_ID")
+        drivers = dict(cursor.fetchall())
+    # Student numbers only change type; a clipped one cannot be restored
+    assert students == {"K1": "2147483647", "K2": "90078601"}
+    # A 10-digit phone that lost its zero gets it back
+    assert drivers == {"D1": "0300000000", "D2": "0311111111"}
+
+
+def test_migrated_columns_keep_leading_zeros(scratch):
+    apply_migration(scratch)
+    with scratch.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) "
+            "VALUES ('K3', 'S', 'P100', '03001234567', 'Pending', 'D3')")
+        cursor.execute("SELECT Phone, Point_no, Fee_Status FROM student WHERE Student_ID = 'K3'")
+        assert cursor.fetchone() == ("03001234567", "P100", "Pending")
+
+
+def test_migration_rejects_unknown_fee_status(scratch):
+    with scratch.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) "
+            "VALUES ('K4', 'S', '21', 1, 'Waived', 'D4')")
+    scratch.commit()
+
+    # Strict mode: the ALTER fails instead of blanking the value
+    with pytest.raises(migrate.MigrationError, match="statement 1 failed"):
+        apply_migration(scratch)
+    assert MIGRATION_VERSION not in migrate.applied(scratch)
+
+
+def test_benchmark_before_and_after(conn):
+    report = run(conn, ROWS, runs=3, database=TEST_DB)
+
+    for table in ("student", "driver"):
+        before, after = report[table]["before"], report[table]["after"]
+        print(f"\n{table} at {ROWS} rows: data {before['data_bytes']} -> {after['data_bytes']} B, "
+              f"index {before['index_bytes']} -> {after['index_bytes']} B, "
+              f"scan {before['scan_ms']:.1f} -> {after['scan_ms']:.1f} ms", end="")
+    # The one-byte Fee_Status shrinks its index; other sizes may move either way by a page
+    assert report["student"]["after"]["index_bytes"] < report["student"]["before"]["index_bytes"]
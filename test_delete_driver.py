@@ -14,6 +14,8 @@ from selenium.webdriver.common.action_chains import ActionChains
 from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 
+import page_timing
+
 
 # Base Page class
 class BasePage:
@@ -95,6 +97,7 @@ class DriverManagementPage(BasePage):
         self.navigate_to(self.URL)
         self.wait_for_element_safely(self.LOCATORS["driver_table_body"])
         time.sleep(2)  # Wait for AJAX
+        page_timing.capture(self.driver)
         return self
         
     def get_driver_count(self):
@@ -435,7 +438,7 @@ def test_background_image(driver_page):
     # Check if background image is applied to body
     body = driver_page.driver.find_element(By.TAG_NAME, "body")
     bg_image = body.value_of_css_property("background-image")
-    assert "background.jpg" in bg_image
+    assert "static/background." in bg_image
 
 def test_button_hover_effect(driver_page):
     """Test case for button hover effects."""
@@ -12,6 +12,8 @@ from selenium.common.exceptions import NoSuchElementException
 from selenium.common.exceptions import TimeoutException
 import requests
 
+import page_timing
+
 
 
 
@@ -26,6 +28,7 @@ class DriverFormPage:
 
     def open(self):
         self.driver.get(self.url)
+        page_timing.capture(self.driver)
 
     def fill_form(self, name, route, point_no, phone, driver_id):
         self.driver.find_element(By.ID, "Name").clear()
@@ -415,7 +418,8 @@ def test_driver_update_integrity():
     conn.close()
     delete_driver(driver_id)
 
-    assert result == ("NewName", int("0399999999")), "Update integrity failed!"
+    # Phones are text, so the leading zero survives
+    assert result == ("NewName", "0399999999"), "Update integrity failed!"
 
 
 def test_special_characters_in_name():
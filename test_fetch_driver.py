@@ -18,6 +18,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 
+import page_timing
+
 BASE_URL = "http://localhost/SE/fetch_data_driver.html"
 
 
@@ -40,6 +42,7 @@ class DriverManagementPage:
 
     def load(self, url=None):
         self.driver.get(url or self.url)
+        page_timing.capture(self.driver)
 
 
     def refresh_page(self):
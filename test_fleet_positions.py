@@ -0,0 +1,173 @@
+import gzip
+import json
+import random
+import pytest
+import pymysql
+import requests
+
+FLEET_URL = "http://localhost/SE/fleet_positions.php"
+TRACKING_URL = "http://localhost/SE/tracking.php"
+
+QUANTUM = 100000
+
+
+# -------------------- Helpers --------------------
+def get_connection():
+    return pymysql.connect(
+        host='localhost',
+        user='root',
+        password='',  # Empty password for XAMPP
+        database='point_management',
+        port=3307,
+        autocommit=True
+    )
+
+
+def decode(payload):
+    """Mirror of FleetMap.decode in fleet_map.js."""
+    positions = {}
+    lat = lng = 0
+    for driver_id, d_lat, d_lng in payload["d"]:
+        lat += d_lat
+        lng += d_lng
+        positions[driver_id] = (lat / payload["q"], lng / payload["q"])
+    return positions
+
+
+def fetch_fleet(since=0):
+    """Fetch the fleet feed and return (payload, bytes on the wire)."""
+    response = requests.get(FLEET_URL, params={"since": since},
+                            headers={"Accept-Encoding": "gzip"}, stream=True)
+    response.raise_for_status()
+    raw = response.raw.read(decode_content=False)
+    body = gzip.decompress(raw) if response.headers.get("Content-Encoding") == "gzip" else raw
+    return json.loads(body), len(raw)
+
+
+def move_buses(conn, positions):
+    """Write positions the way tracking.php does, one version per driver."""
+    with conn.cursor() as cursor:
+        cursor.execute("UPDATE tracking_version SET version = LAST_INSERT_ID(version + %s) WHERE id = 1",
+                       (len(positions),))
+        cursor.execute("SELECT LAST_INSERT_ID()")
+        last = cursor.fetchone()[0]
+        first = last - len(positions) + 1
+        rows = [
+            (driver_id, round(lat * QUANTUM), round(lng * QUANTUM), first + i)
+            for i, (driver_id, (lat, lng)) in enumerate(positions.items())
+        ]
+        cursor.executemany(
+            "INSERT INTO driver_location (Driver_ID, lat_e5, lng_e5, recorded_at, version) "
+            "VALUES (%s, %s, %s, NOW(3), %s) "
+            "ON DUPLICATE KEY UPDATE lat_e5 = VALUES(lat_e5), lng_e5 = VALUES(lng_e5), "
+            "recorded_at = VALUES(recorded_at), version = VALUES(version)",
+            rows
+        )
+    return last
+
+
+def random_fleet(count):
+    return {
+        f"BENCH_{i:04d}": (24.85 + random.uniform(0, 0.2), 66.95 + random.uniform(0, 0.25))
+        for i in range(count)
+    }
+
+
+def per_driver_baseline(positions):
+    """
+    Estimated requests and bytes if every driver were polled through its own
+    endpoint: JSON bodies only, without the headers and round trips each of
+    those requests would add, so the real cost is higher.
+    """
+    bodies = [
+        json.dumps({"Driver_ID": driver_id, "lat": lat, "lng": lng})
+        for driver_id, (lat, lng) in positions.items()
+    ]
+    return len(bodies), sum(len(body) for body in bodies)
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture
+def db():
+    conn = get_connection()
+    yield conn
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM driver_location WHERE Driver_ID LIKE 'BENCH%'")
+        cursor.execute("DELETE FROM location_history WHERE Driver_ID LIKE 'BENCH%'")
+        cursor.execute("DELETE FROM driver WHERE Driver_ID LIKE 'BENCH%'")
+    conn.close()
+
+
+# -------------------- Tests --------------------
+def test_delta_contains_only_moved_drivers(db):
+    fleet = random_fleet(50)
+    since = move_buses(db, fleet)
+
+    moved = dict(list(fleet.items())[:5])
+    moved = {driver_id: (lat + 0.001, lng - 0.001) for driver_id, (lat, lng) in moved.items()}
+    move_buses(db, moved)
+
+    payload, _ = fetch_fleet(since)
+    positions = decode(payload)
+
+    assert set(positions) == set(moved)
+    for driver_id, (lat, lng) in moved.items():
+        assert positions[driver_id] == pytest.approx((lat, lng), abs=1 / QUANTUM)
+
+
+def test_unchanged_fleet_returns_empty_delta(db):
+    version = move_buses(db, random_fleet(10))
+    payload, _ = fetch_fleet(version)
+    assert payload["v"] >= version
+    assert payload["d"] == []
+
+
+def test_tracking_post_reaches_fleet_feed(db):
+    with db.cursor() as cursor:
+        cursor.execute("INSERT INTO driver (Name, Route, Point_no, Phone, Driver_ID) "
+                       "VALUES ('Bench', 'Saddar', 'BENCH_POST', '', 'BENCH_POST')")
+    before, _ = fetch_fleet(0)
+    response = requests.post(TRACKING_URL, data={"Driver_ID": "BENCH_POST", "lat": "24.9", "lng": "67.1"})
+    assert response.status_code == 200
+
+    payload, _ = fetch_fleet(before["v"])
+    positions = decode(payload)
+    assert positions["BENCH_POST"] == pytest.approx((24.9, 67.1), abs=1 / QUANTUM)
+
+
+def test_tracking_rejects_unknown_driver(db):
+    before, _ = fetch_fleet(0)
+    response = requests.post(TRACKING_URL, data={"Driver_ID": "BENCH_UNKNOWN", "lat": "24.9", "lng": "67.1"})
+    assert response.status_code == 404
+
+    payload, _ = fetch_fleet(before["v"])
+    assert "BENCH_UNKNOWN" not in decode(payload)
+    with db.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM location_history WHERE Driver_ID = 'BENCH_UNKNOWN'")
+        assert cursor.fetchone()[0] == 0
+
+
+@pytest.mark.parametrize("bus_count", [100, 1000])
+def test_fleet_payload_benchmark(db, bus_count):
+    fleet = random_fleet(bus_count)
+    since = move_buses(db, fleet) - bus_count
+
+    snapshot, snapshot_bytes = fetch_fleet(since)
+    assert len(snapshot["d"]) == bus_count
+
+    # A typical poll: one bus in ten has moved since the last one.
+    moved = {driver_id: (lat + 0.0005, lng + 0.0005)
+             for driver_id, (lat, lng) in list(fleet.items())[::10]}
+    version = snapshot["v"]
+    move_buses(db, moved)
+    delta, delta_bytes = fetch_fleet(version)
+    assert len(delta["d"]) == len(moved)
+
+    baseline_requests, baseline_bytes = per_driver_baseline(fleet)
+
+    print(f"\n{bus_count} buses: per-driver polling {baseline_requests} requests / {baseline_bytes} B (payload estimate); "
+          f"fleet snapshot 1 request / {snapshot_bytes} B; "
+          f"fleet delta ({len(moved)} moved) 1 request / {delta_bytes} B")
+
+    assert snapshot_bytes < baseline_bytes
+    assert delta_bytes < snapshot_bytes
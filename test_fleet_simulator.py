@@ -0,0 +1,133 @@
+import asyncio
+import random
+import pytest
+import pymysql
+
+from fleet_simulator import (
+    CAMPUS,
+    ROUTE_ANCHORS,
+    BusPath,
+    FleetSimulator,
+    ReplayPath,
+    _distance_m,
+    build_paths,
+    find_saturation,
+    is_saturated,
+    load_drivers,
+    main,
+    synthetic_drivers,
+)
+
+LOAD_TEST_SECONDS = 10
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def db():
+    connection = pymysql.connect(
+        host='localhost',
+        user='root',
+        password='',  # Empty password for XAMPP
+        database='point_management',
+        port=3307,
+        autocommit=True
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT NOW(3)")
+        started = cursor.fetchone()[0]
+    yield connection
+    # Drop the fixes the simulator wrote during this module, and only those:
+    # the load tests and the CLI test drive the first 50 drivers.
+    driver_ids = [driver_id for driver_id, _ in load_drivers(connection, 50)]
+    if driver_ids:
+        placeholders = ", ".join(["%s"] * len(driver_ids))
+        with connection.cursor() as cursor:
+            for table in ("driver_location", "location_history"):
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE recorded_at >= %s AND Driver_ID IN ({placeholders})",
+                    (started, *driver_ids)
+                )
+    connection.close()
+
+
+@pytest.fixture(scope="module")
+def fleet_paths(db):
+    rng = random.Random(42)
+    return build_paths(load_drivers(db, 50), rng)
+
+
+# -------------------- Movement Tests --------------------
+def test_bus_path_stays_between_route_and_campus():
+    rng = random.Random(1)
+    start = ROUTE_ANCHORS["Korangi"]
+    path = BusPath(start, CAMPUS, rng, gps_noise_m=0)
+
+    lat_lo, lat_hi = sorted((start[0], CAMPUS[0]))
+    lng_lo, lng_hi = sorted((start[1], CAMPUS[1]))
+    for second in range(0, 3600, 30):
+        lat, lng = path.position(second)
+        assert lat_lo - 0.005 <= lat <= lat_hi + 0.005
+        assert lng_lo - 0.005 <= lng <= lng_hi + 0.005
+
+
+def test_bus_path_moves_at_bus_speed():
+    path = BusPath(ROUTE_ANCHORS["Saddar"], CAMPUS, random.Random(2), speed_mps=10, gps_noise_m=0)
+    a = path.position(100)
+    b = path.position(110)
+    assert 50 < _distance_m(a, b) <= 101
+
+
+def test_replay_path_returns_recorded_fix():
+    path = ReplayPath([(0.0, 24.9, 67.1), (5.0, 24.91, 67.11), (10.0, 24.92, 67.12)])
+    assert path.position(0) == (24.9, 67.1)
+    assert path.position(6) == (24.91, 67.11)
+    assert path.position(12) == (24.9, 67.1)
+
+
+def test_synthetic_drivers_cover_known_routes():
+    drivers = synthetic_drivers(40)
+    assert len({driver_id for driver_id, _ in drivers}) == 40
+    assert all(route in ROUTE_ANCHORS for _, route in drivers)
+
+
+def test_saturation_rules():
+    healthy = {
+        "target_fixes_per_sec": 100, "achieved_fixes_per_sec": 98,
+        "ingest": {"count": 1000, "errors": 0, "p95_ms": 40},
+    }
+    assert not is_saturated(healthy)
+    assert is_saturated({**healthy, "achieved_fixes_per_sec": 60})
+    assert is_saturated({**healthy, "ingest": {"count": 1000, "errors": 50, "p95_ms": 40}})
+    assert is_saturated({**healthy, "ingest": {"count": 1000, "errors": 0, "p95_ms": 900}})
+
+
+# -------------------- Load Tests --------------------
+def test_load_fleet_ingest_and_read(fleet_paths):
+    simulator = FleetSimulator(fleet_paths, rate=1.0, reconnect_probability=0.02, seed=7)
+    try:
+        report = asyncio.run(simulator.run(LOAD_TEST_SECONDS))
+    finally:
+        simulator.close()
+
+    print(f"\n{report}")
+    assert report["ingest"]["count"] > 0
+    assert report["ingest"]["errors"] == 0
+    assert report["read"]["count"] > 0
+    assert report["visibility"]["count"] > 0
+    assert report["ingest"]["p95_ms"] < 1000
+
+
+def test_load_finds_saturation_point(fleet_paths):
+    steps, saturated = find_saturation(fleet_paths, [1, 4, 16, 64], step_duration=5, seed=7)
+    for step in steps:
+        print(f"\nrate={step['rate']}/bus achieved={step['achieved_fixes_per_sec']:.1f}/s "
+              f"ingest p95={step['ingest'].get('p95_ms', 0):.1f}ms")
+    if saturated:
+        print(f"Saturated at {saturated['target_fixes_per_sec']:.0f} fixes/s")
+    # The lightest step must always keep up; otherwise the stack is misconfigured.
+    assert not is_saturated(steps[0])
+
+
+def test_cli_runs_short_simulation(db, capsys):
+    assert main(["--drivers", "5", "--duration", "3", "--seed", "1"]) == 0
+    assert "ingest p50=" in capsys.readouterr().out
@@ -0,0 +1,121 @@
+import json
+import pytest
+
+import impact_map
+
+BASE_URL = "http://localhost/SE"
+
+MAP = {
+    "commit": "b7a02961c0ffee",
+    "tests": {
+        "test_driver_input.py::TestDriverForm::test_submit": ["driver_input.html", "driver_input.php", "style.css"],
+        "test_student_page.py::test_rows": ["fetch_data_student.html", "fetch_data_student.php"],
+        "test_route_roster.py::test_assign": ["route_roster.php"],
+        "test_migrate.py::test_build": [],
+    },
+}
+NODEIDS = sorted(MAP["tests"]) + ["test_new.py::test_new"]
+INCLUDED_BY = {
+    "StudentSummary.php": {"add_student.php", "fetch_data_student.php", "student_input.php"},
+    "RouteRoster.php": {"StudentSummary.php", "driver_input.php", "route_roster.php"},
+}
+
+
+# -------------------- Helpers --------------------
+def selected(changed):
+    result, _ = impact_map.select(MAP, changed, NODEIDS, INCLUDED_BY)
+    return result if result is None else sorted(result)
+
+
+class FakeDriver:
+    def __init__(self, urls):
+        self.urls = urls
+
+    def get_log(self, kind):
+        assert kind == "performance"
+        urls, self.urls = self.urls, []
+        return [{"message": json.dumps({"message": {"method": "Network.requestWillBeSent",
+                                                    "params": {"request": {"url": url}}}})} for url in urls]
+
+
+# -------------------- Tests --------------------
+@pytest.mark.parametrize("url, path", [
+    (f"{BASE_URL}/driver_input.php?x=1#top", "driver_input.php"),
+    (f"{BASE_URL}/static/background.03d04aedb4.jpg", "static/background.03d04aedb4.jpg"),
+    (f"{BASE_URL}/", "index.php"),
+    (BASE_URL, "index.php"),
+    ("http://localhost/SEcond/page.html", None),
+    ("https://tile.openstreetmap.org/3/4/2.png", None),
+])
+def test_urls_map_to_repository_files(url, path):
+    assert impact_map.local_path(url, BASE_URL) == path
+
+
+def test_recorder_drains_browser_requests_into_the_running_test():
+    recorder = impact_map.ImpactRecorder(BASE_URL)
+    recorder.sources = {"static/background.03d04aedb4.jpg": "background.jpg"}
+    driver = FakeDriver([f"{BASE_URL}/driver_input.html", "https://unpkg.com/leaflet.js"])
+
+    recorder.drain(driver)
+    assert recorder.deps == {}
+
+    recorder.nodeid = "test_a.py::test_a"
+    driver.urls = [f"{BASE_URL}/driver_input.php", f"{BASE_URL}/static/background.03d04aedb4.jpg"]
+    recorder.drain(driver)
+    recorder.add(f"{BASE_URL}/fetch_data_driver.php")
+
+    assert recorder.deps == {"test_a.py::test_a": {
+        "driver_input.php", "static/background.03d04aedb4.jpg", "background.jpg", "fetch_data_driver.php"}}
+
+
+def test_includes_are_followed_through_classes(tmp_path):
+    (tmp_path / "StudentSummary.php").write_text("<?php\nrequire_once __DIR__ . '/RouteRoster.php';\n")
+    (tmp_path / "student_input.php").write_text("<?php\nrequire_once 'StudentSummary.php';\n")
+    (tmp_path / "RouteRoster.php").write_text("<?php\nclass RouteRoster {}\n")
+
+    included_by = impact_map.includers(str(tmp_path))
+
+    assert impact_map.served_by("RouteRoster.php", included_by) == {
+        "RouteRoster.php", "StudentSummary.php", "student_input.php"}
+
+
+def test_changed_endpoint_selects_the_tests_that_requested_it():
+    assert selected(["driver_input.php"]) == [
+        "test_driver_input.py::TestDriverForm::test_submit", "test_migrate.py::test_build", "test_new.py::test_new"]
+
+
+def test_changed_class_selects_the_tests_of_every_endpoint_including_it():
+    assert selected(["RouteRoster.php"]) == [
+        "test_driver_input.py::TestDriverForm::test_submit", "test_migrate.py::test_build", "test_new.py::test_new",
+        "test_route_roster.py::test_assign", "test_student_page.py::test_rows"]
+
+
+def test_tests_that_requested_nothing_always_run():
+    # They run PHP through a subprocess or read the sources, so no change can be ruled out
+    assert selected(["fetch_data_student.html"]) == [
+        "test_migrate.py::test_build", "test_new.py::test_new", "test_student_page.py::test_rows"]
+
+
+def test_changed_test_module_selects_its_tests():
+    assert selected(["test_migrate.py", "routes.html"]) == ["test_migrate.py::test_build", "test_new.py::test_new"]
+
+
+@pytest.mark.parametrize("changed", [["db_config.py"], ["migrations/003_route_roster.sql"], ["style.css", "conftest.py"],
+                                     ["tests/RouteRosterTest.php"], ["ChallanGenerator.php"]])
+def test_anything_else_runs_the_whole_suite(changed):
+    assert selected(changed) is None
+
+
+def test_without_a_map_the_whole_suite_runs():
+    result, reason = impact_map.select(None, ["style.css"], NODEIDS, INCLUDED_BY)
+    assert result is None and "--impact-record" in reason
+
+
+def test_saving_replaces_only_the_tests_that_ran(tmp_path):
+    path = str(tmp_path / "impact.json")
+    impact_map.save_map(path, {"t.py::a": {"a.php"}, "t.py::b": {"b.php"}}, "c1", ["t.py::a", "t.py::b"])
+    impact_map.save_map(path, {"t.py::a": {"a.html", "a.php"}}, "c2", ["t.py::a", "t.py::c"])
+
+    saved = impact_map.load_map(path)
+    assert saved["commit"] == "c2"
+    assert saved["tests"] == {"t.py::a": ["a.html", "a.php"], "t.py::b": ["b.php"], "t.py::c": []}
@@ -0,0 +1,190 @@
+import configparser
+import datetime
+import statistics
+import time
+import pytest
+
+import location_retention
+import migrate
+from db_config import connect
+
+SCRATCH_DB = "point_management_retention_test"
+
+BUSES = 20
+FIX_INTERVAL_MINUTES = 5
+FIXES_PER_DAY = BUSES * 24 * 60 // FIX_INTERVAL_MINUTES
+SIMULATED_DAYS = 30
+FIRST_DAY = datetime.date(2026, 1, 1)
+
+RAW_DAYS = 7
+ROLLUP_DAYS = 14
+FUTURE_DAYS = 2
+
+
+# -------------------- Helpers --------------------
+def retention_config():
+    config = configparser.ConfigParser()
+    config.read_dict({"retention": {
+        "raw_days": str(RAW_DAYS),
+        "rollup_days": str(ROLLUP_DAYS),
+        "future_days": str(FUTURE_DAYS),
+    }})
+    return config
+
+
+def insert_day(conn, day):
+    """One fix per bus every FIX_INTERVAL_MINUTES for the whole day."""
+    start = datetime.datetime.combine(day, datetime.time())
+    rows = []
+    for minute in range(0, 24 * 60, FIX_INTERVAL_MINUTES):
+        at = start + datetime.timedelta(minutes=minute, seconds=17)
+        for bus in range(BUSES):
+            rows.append((f"RET_{bus:02d}", 24.85 + bus * 0.001 + minute * 1e-5, 67.05 + minute * 1e-5, at))
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO location_history (Driver_ID, lat, lng, recorded_at) VALUES (%s, %s, %s, %s)", rows
+        )
+    conn.commit()
+
+
+def latest_position_latency_ms(conn):
+    """The latest-position fallback query, once per bus."""
+    started = time.perf_counter()
+    with conn.cursor() as cursor:
+        for bus in range(BUSES):
+            cursor.execute(
+                "SELECT lat, lng FROM location_history WHERE Driver_ID = %s ORDER BY recorded_at DESC LIMIT 1",
+                (f"RET_{bus:02d}",)
+            )
+            assert cursor.fetchone() is not None
+    return (time.perf_counter() - started) * 1000 / BUSES
+
+
+def table_stats(conn, table):
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
+        rows = cursor.fetchone()[0]
+    return rows, len(location_retention.daily_partitions(conn, table))
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def scratch_db():
+    """A throwaway database built like point_management, partitioned tables included."""
+    admin = connect(database=None)
+    migrate.build_database(admin, SCRATCH_DB)
+    conn = connect(database=SCRATCH_DB)
+    yield conn
+    conn.close()
+    with admin.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{SCRATCH_DB}`")
+    admin.close()
+
+
+@pytest.fixture(scope="module")
+def simulation(scratch_db):
+    """Run 30 days of ingest with a retention pass at the start of each day."""
+    config = retention_config()
+    history = []
+    for offset in range(SIMULATED_DAYS):
+        day = FIRST_DAY + datetime.timedelta(days=offset)
+
+        started = time.perf_counter()
+        summary = location_retention.run(scratch_db, config, today=day)
+        retention_ms = (time.perf_counter() - started) * 1000
+
+        insert_day(scratch_db, day)
+        raw_rows, raw_partitions = table_stats(scratch_db, location_retention.HISTORY_TABLE)
+        rollup_rows, rollup_partitions = table_stats(scratch_db, location_retention.ROLLUP_TABLE)
+        history.append({
+            "day": day,
+            "summary": summary,
+            "retention_ms": retention_ms,
+            "query_ms": latest_position_latency_ms(scratch_db),
+            "raw_rows": raw_rows,
+            "raw_partitions": raw_partitions,
+            "rollup_rows": rollup_rows,
+            "rollup_partitions": rollup_partitions,
+        })
+    for entry in history:
+        print(f"\n{entry['day']} raw={entry['raw_rows']} ({entry['raw_partitions']} parts) "
+              f"rollup={entry['rollup_rows']} ({entry['rollup_partitions']} parts) "
+              f"query={entry['query_ms']:.3f}ms retention={entry['retention_ms']:.1f}ms", end="")
+    return history
+
+
+# -------------------- Tests --------------------
+def test_raw_table_size_stays_bounded(simulation):
+    # Today plus RAW_DAYS full days of raw fixes, never the whole month.
+    for entry in simulation:
+        assert entry["raw_rows"] <= (RAW_DAYS + 1) * FIXES_PER_DAY
+        assert entry["raw_partitions"] <= RAW_DAYS + FUTURE_DAYS + 1
+    assert simulation[-1]["raw_rows"] == (RAW_DAYS + 1) * FIXES_PER_DAY
+
+
+def test_rollup_table_size_stays_bounded(simulation):
+    minutes_per_day = BUSES * 24 * 60 // FIX_INTERVAL_MINUTES
+    for entry in simulation:
+        assert entry["rollup_rows"] <= ROLLUP_DAYS * minutes_per_day
+        assert entry["rollup_partitions"] <= ROLLUP_DAYS + RAW_DAYS + FUTURE_DAYS + 1
+
+
+def test_expired_days_are_rolled_up_before_drop(simulation, scratch_db):
+    last_day = simulation[-1]["day"]
+    rolled_day = last_day - datetime.timedelta(days=RAW_DAYS + 1)
+
+    with scratch_db.cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(fixes), COUNT(DISTINCT Driver_ID) FROM location_minute "
+            "WHERE `minute` >= %s AND `minute` < %s",
+            (rolled_day, rolled_day + datetime.timedelta(days=1))
+        )
+        fixes, drivers = cursor.fetchone()
+        cursor.execute(
+            "SELECT COUNT(*) FROM location_history WHERE recorded_at < %s",
+            (rolled_day + datetime.timedelta(days=1),)
+        )
+        raw_left = cursor.fetchone()[0]
+
+    assert fixes == FIXES_PER_DAY
+    assert drivers == BUSES
+    assert raw_left == 0
+
+
+def test_drops_are_partition_operations(simulation):
+    dropped = [entry for entry in simulation if entry["summary"]["dropped_raw_partitions"]]
+    assert dropped, "No raw partition was ever dropped"
+    # Dropping a day must not get slower as more days have passed through.
+    first = statistics.median(entry["retention_ms"] for entry in dropped[:5])
+    last = statistics.median(entry["retention_ms"] for entry in dropped[-5:])
+    assert last < first * 3 + 50
+
+
+def test_latest_position_query_latency_stays_flat(simulation):
+    early = statistics.median(entry["query_ms"] for entry in simulation[RAW_DAYS:RAW_DAYS + 5])
+    late = statistics.median(entry["query_ms"] for entry in simulation[-5:])
+    assert late < early * 3 + 2, f"Latest-position query went from {early:.3f}ms to {late:.3f}ms"
+
+
+def test_busy_minute_rolls_up_its_newest_fix(simulation, scratch_db):
+    day = simulation[-1]["day"]
+    minute = datetime.datetime.combine(day, datetime.time(8, 0))
+    # A fix every 60 ms, well past the 1024 bytes a GROUP_CONCAT may hold by default
+    rows = [("RET_BUSY", 24.9 + i * 1e-6, 67.1 + i * 1e-6, minute + datetime.timedelta(milliseconds=60 * i))
+            for i in range(960)]
+    with scratch_db.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO location_history (Driver_ID, lat, lng, recorded_at) VALUES (%s, %s, %s, %s)", rows
+        )
+    scratch_db.commit()
+
+    location_retention.rollup_day(scratch_db, day)
+
+    with scratch_db.cursor() as cursor:
+        cursor.execute(
+            "SELECT fixes, lat_last, lng_last FROM location_minute WHERE Driver_ID = %s AND `minute` = %s",
+            ("RET_BUSY", minute)
+        )
+        fixes, lat_last, lng_last = cursor.fetchone()
+    assert fixes == 960
+    assert (float(lat_last), float(lng_last)) == pytest.approx((24.9 + 959e-6, 67.1 + 959e-6))
@@ -0,0 +1,231 @@
+import shutil
+import time
+
+import pytest
+
+import migrate
+from db_config import connect
+
+TEST_DB = "point_management_migrate_test"
+ROWS = 20000
+CHUNK_ROWS = 1000
+
+# First version after the repo's own migrations, for the ones tests add
+NEXT = migrate.discover()[-1].version + 1
+
+# Student columns that exist before and after every migration
+STUDENT_COLUMNS = "Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID"
+
+
+# -------------------- Helpers --------------------
+def write(directory, filename, text):
+    (directory / filename).write_text(text, encoding="utf-8")
+
+
+def indexes(conn, table):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,))
+        return {row[0] for row in cursor.fetchall()}
+
+
+def column_type(conn, table, column):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT COLUMN_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s", (table, column))
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def fill_students(conn, rows):
+    with conn.cursor() as cursor:
+        cursor.execute("TRUNCATE TABLE student")
+        cursor.execute(
+            f"INSERT INTO student ({STUDENT_COLUMNS}) "
+            "SELECT CONCAT('S', LPAD(seq, 6, '0')), CONCAT('Student ', seq), CONCAT('P', seq), 300000000 + seq, "
+            f"ELT(1 + seq % 3, 'Paid', 'Pending', 'Unpaid'), CONCAT('DR', seq) FROM seq_1_to_{rows}")
+    conn.commit()
+
+
+def students(conn, table="student"):
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT {STUDENT_COLUMNS} FROM `{table}` ORDER BY Student_ID")
+        return [tuple(str(value) for value in row) for row in cursor.fetchall()]
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture
+def conn():
+    conn = connect(database=None)
+    yield conn
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{TEST_DB}`")
+    conn.close()
+
+
+@pytest.fixture
+def migrations(tmp_path):
+    """A copy of migrations/ the test can add to."""
+    directory = tmp_path / "migrations"
+    shutil.copytree(migrate.MIGRATIONS_DIR, directory)
+    return directory
+
+
+# -------------------- Tests --------------------
+def test_build_applies_every_migration(conn):
+    started = time.perf_counter()
+    results = migrate.build_database(conn, TEST_DB)
+    print(f"\nbuilt {TEST_DB} in {(time.perf_counter() - started) * 1000:.0f} ms", end="")
+
+    expected = migrate.discover()
+    assert [migration for migration, _ in results] == expected
+    assert {v: checksum for v, (_, checksum, _) in migrate.applied(conn).items()} == \
+        {m.version: m.checksum for m in expected}
+    assert {"Fee_Status", "PRIMARY"} <= indexes(conn, "student")
+    assert migrate.up(conn) == []
+
+
+def test_build_keeps_strict_sql_mode(conn):
+    migrate.build_database(conn, TEST_DB)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT @@SESSION.sql_mode = @@GLOBAL.sql_mode")
+        assert cursor.fetchone()[0] == 1
+
+
+def test_down_and_up_again(conn):
+    migrate.build_database(conn, TEST_DB)
+
+    rolled_back = migrate.down(conn, to=0)
+
+    assert [m.version for m, _ in rolled_back] == [m.version for m in reversed(migrate.discover())]
+    assert migrate.applied(conn) == {}
+    assert "Fee_Status" not in indexes(conn, "student")
+    assert column_type(conn, "student", "Phone") == "int(50)"
+
+    migrate.up(conn)
+    assert "Fee_Status" in indexes(conn, "student")
+    assert column_type(conn, "student", "Phone") == "varchar(16)"
+
+
+def test_edited_migration_is_refused(conn, migrations):
+    migrate.build_database(conn, TEST_DB, directory=migrations)
+    with open(migrations / "001_query_indexes.sql", "a", encoding="utf-8") as f:
+        f.write("\n-- an innocent comment\n")
+
+    with pytest.raises(migrate.MigrationError, match="001_query_indexes.sql was edited"):
+        migrate.up(conn, directory=migrations)
+
+
+def test_dml_migration_is_all_or_nothing(conn, migrations):
+    migrate.build_database(conn, TEST_DB, directory=migrations)
+    write(migrations, f"{NEXT:03d}_rename_route.sql",
+          "UPDATE driver SET Route = 'Gulshan-e-Iqbal' WHERE Route = 'Gulshan';\n"
+          "INSERT INTO driver (Name, Route, Point_no, Phone, Driver_ID) "
+          "VALUES ('Dup', 'Gulshan', 'X1', '0300', 'D_12');\n")
+
+    with pytest.raises(migrate.MigrationError, match=f"{NEXT:03d}_rename_route.sql: statement 2 failed"):
+        migrate.up(conn, directory=migrations)
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM driver WHERE Route = 'Gulshan-e-Iqbal'")
+        assert cursor.fetchone()[0] == 0
+    assert NEXT not in migrate.applied(conn)
+
+
+def test_python_migration_up_and_down(conn, migrations):
+    write(migrations, f"{NEXT:03d}_student_email.py",
+          "def up(conn):\n"
+          "    with conn.cursor() as cursor:\n"
+          "        cursor.execute(\"ALTER TABLE student ADD COLUMN Email varchar(254) NULL\")\n"
+          "        cursor.execute(\"UPDATE student SET Email = CONCAT(Student_ID, '@nu.edu.pk')\")\n"
+          "\n\n"
+          "def down(conn):\n"
+          "    with conn.cursor() as cursor:\n"
+          "        cursor.execute(\"ALTER TABLE student DROP COLUMN Email\")\n")
+    migrate.build_database(conn, TEST_DB, directory=migrations)
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT Email FROM student WHERE Student_ID = 'k213199'")
+        assert cursor.fetchone() == ("k213199@nu.edu.pk",)
+
+    migrate.down(conn, to=NEXT - 1, directory=migrations)
+    assert list(migrate.applied(conn)) == [m.version for m in migrate.discover()]
+    assert column_type(conn, "student", "Email") is None
+
+
+def test_baseline_records_without_running(conn):
+    migrate.build_database(conn, TEST_DB, to=0)
+
+    marked = migrate.baseline(conn, to=1)
+
+    assert [m.version for m in marked] == [1]
+    assert "Fee_Status" not in indexes(conn, "student")
+    assert [m.version for m, _ in migrate.up(conn, dry_run=True)] == [m.version for m in migrate.discover()[1:]]
+
+
+def test_online_alter_keeps_concurrent_writes(conn, migrations):
+    write(migrations, f"{NEXT:03d}_longer_names.sql",
+          "ALTER TABLE `student` MODIFY `Name` varchar(100) NOT NULL, ADD INDEX `Name` (`Name`);\n")
+    migrate.build_database(conn, TEST_DB, directory=migrations, to=NEXT - 1)
+    fill_students(conn, ROWS)
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE TABLE student_expected LIKE student")
+        cursor.execute("INSERT INTO student_expected SELECT * FROM student")
+    conn.commit()
+
+    # Between chunks another session writes to rows already copied, rows not
+    # copied yet and rows that did not exist; the same writes go to the reference
+    writer = connect(database=TEST_DB, autocommit=True)
+    chunks = []
+
+    def concurrent_writes(table, copied):
+        n = len(chunks)
+        chunks.append(copied)
+        with writer.cursor() as cursor:
+            for target in ("student", "student_expected"):
+                cursor.execute(f"UPDATE `{target}` SET Name = %s WHERE Student_ID IN (%s, %s)",
+                               (f"renamed {n}", f"S{n * CHUNK_ROWS + 1:06d}", f"S{ROWS - n:06d}"))
+                cursor.execute(f"DELETE FROM `{target}` WHERE Student_ID IN (%s, %s)",
+                               (f"S{n * CHUNK_ROWS + 2:06d}", f"S{ROWS - 100 - n:06d}"))
+                cursor.execute(f"INSERT INTO `{target}` ({STUDENT_COLUMNS}) VALUES (%s, 'late', %s, 1, 'Paid', %s)",
+                               (f"T{n:06d}", f"Q{n}", f"DQ{n}"))
+
+    try:
+        results = migrate.up(conn, directory=migrations, online=True, chunk_rows=CHUNK_ROWS, min_rows=0,
+                             progress=concurrent_writes)
+    finally:
+        writer.close()
+
+    assert [m.version for m, _ in results] == [NEXT]
+    assert len(chunks) >= ROWS // CHUNK_ROWS
+    assert column_type(conn, "student", "Name") == "varchar(100)"
+    assert "Name" in indexes(conn, "student")
+    assert students(conn) == students(conn, "student_expected")
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()")
+        assert cursor.fetchone()[0] == 0
+        cursor.execute("SHOW TABLES LIKE '\\_student\\_%'")
+        assert not cursor.fetchall()
+
+
+def test_failed_online_alter_leaves_table_alone(conn, migrations):
+    migrate.build_database(conn, TEST_DB, directory=migrations, to=1)
+    fill_students(conn, 5000)
+
+    # 002 turns Fee_Status into an ENUM; a stray value fails the copy
+    with conn.cursor() as cursor:
+        cursor.execute("UPDATE student SET Fee_Status = 'Waived' WHERE Student_ID = 'S004000'")
+    conn.commit()
+    before = students(conn)
+
+    with pytest.raises(migrate.MigrationError, match="002_compact_column_types.sql: statement 1 failed"):
+        migrate.up(conn, directory=migrations, online=True, chunk_rows=CHUNK_ROWS, min_rows=0)
+
+    assert students(conn) == before
+    assert column_type(conn, "student", "Phone") == "int(50)"
+    assert 2 not in migrate.applied(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()")
+        assert cursor.fetchone()[0] == 0
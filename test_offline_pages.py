@@ -0,0 +1,137 @@
+import os
+import re
+import pytest
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from build_assets import PAGE_BUNDLES, REPO_DIR, VENDOR_LOCK, cdn_url, reference_pattern
+
+BASE_URL = "http://localhost/SE"
+
+# Script that must have run for each page to work
+READY_CHECKS = {
+    "index.html": "return typeof AOS === 'object'",
+    "student.html": "return typeof AOS === 'object'",
+    "real_time_tracking.html": "return typeof L === 'object' && typeof L.Routing === 'object' && typeof FleetMap === 'function'",
+}
+
+LOAD_RUNS = 5
+
+# Until `python build_assets.py --fetch` has been run and its output committed,
+# the pages load the pinned versions from unpkg
+vendored = pytest.mark.xfail(not os.path.isfile(os.path.join(REPO_DIR, VENDOR_LOCK)), strict=True,
+                             reason="libraries are not vendored yet; run python build_assets.py --fetch")
+
+
+# -------------------- Helpers --------------------
+def chrome(offline):
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    if offline:
+        # Same as the air-gapped CI box: nothing but localhost resolves
+        options.add_argument("--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE localhost")
+    driver = webdriver.Chrome(options=options)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    # Measure the bundles, not the service worker's copy of them
+    driver.execute_cdp_cmd("Network.setBypassServiceWorker", {"bypass": True})
+    return driver
+
+
+def cdn_page(page):
+    """The page as it was before bundling: one unpkg tag per library."""
+    with open(os.path.join(REPO_DIR, page), encoding="utf-8") as f:
+        text = f.read()
+    for kind, entries in PAGE_BUNDLES[page].items():
+        if kind == "js":
+            tags = [f'<script src="{cdn_url(p, path) if p else path}"></script>' for p, path in entries]
+            pattern = r'^([ \t]*)<script src="static/[^"]+\.js"></script>$'
+        else:
+            tags = [f'<link rel="stylesheet" href="{cdn_url(p, path)}" />' for p, path in entries]
+            pattern = r'^([ \t]*)<link rel="stylesheet" href="static/[^"]+\.css" />$'
+        text = re.sub(pattern, lambda m: "\n".join(m.group(1) + tag for tag in tags), text, count=1, flags=re.M)
+    return text
+
+
+def load_time(driver, url, runs=LOAD_RUNS):
+    """Median time to the load event with an empty cache, in ms."""
+    times = []
+    for _ in range(runs):
+        driver.get(url)
+        times.append(driver.execute_script(
+            "return performance.getEntriesByType('navigation')[0].loadEventEnd"))
+    return sorted(times)[len(times) // 2]
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def offline_driver():
+    driver = chrome(offline=True)
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture(scope="module")
+def online_driver():
+    driver = chrome(offline=False)
+    yield driver
+    driver.quit()
+
+
+# -------------------- Tests --------------------
+@pytest.mark.parametrize("page", PAGE_BUNDLES)
+def test_cdn_references_are_pinned(page):
+    with open(os.path.join(REPO_DIR, page), encoding="utf-8") as f:
+        text = f.read()
+    for entries in PAGE_BUNDLES[page].values():
+        for package, path in entries:
+            if package is not None:
+                for url in re.findall(reference_pattern(package, path), text):
+                    assert url == cdn_url(package, path), f"{url} is not the pinned {cdn_url(package, path)}"
+
+
+@vendored
+@pytest.mark.parametrize("page", PAGE_BUNDLES)
+def test_pages_have_no_cdn_references(page):
+    with open(os.path.join(REPO_DIR, page), encoding="utf-8") as f:
+        text = f.read()
+    assert "unpkg.com" not in text
+    for entries in PAGE_BUNDLES[page].values():
+        for package, path in entries:
+            assert not re.search(reference_pattern(package, path), text), f"{path} is loaded outside the bundle"
+
+
+@vendored
+@pytest.mark.parametrize("page", PAGE_BUNDLES)
+def test_page_works_offline(offline_driver, page):
+    offline_driver.get(f"{BASE_URL}/{page}")
+
+    assert offline_driver.execute_script(READY_CHECKS[page])
+    resources = offline_driver.execute_script(
+        "return performance.getEntriesByType('resource').map(function (e) { return e.name; })")
+    bundled = [r for r in resources if re.search(r"/static/[^/]+\.[0-9a-f]+\.(js|css)$", r)]
+    assert len(bundled) == len(PAGE_BUNDLES[page])
+
+
+@vendored
+@pytest.mark.parametrize("page", PAGE_BUNDLES)
+def test_load_time_before_and_after(offline_driver, online_driver, page):
+    after = load_time(offline_driver, f"{BASE_URL}/{page}")
+    assert offline_driver.execute_script(READY_CHECKS[page])
+
+    # The CDN version needs the internet; write it next to the page so relative URLs still work
+    before_page = f"_cdn_{page}"
+    with open(os.path.join(REPO_DIR, before_page), "w", encoding="utf-8") as f:
+        f.write(cdn_page(page))
+    try:
+        online_driver.get(f"{BASE_URL}/{before_page}")
+        if not online_driver.execute_script(READY_CHECKS[page]):
+            pytest.skip(f"{page}: unpkg is not reachable, bundled load {after:.0f} ms")
+        before = load_time(online_driver, f"{BASE_URL}/{before_page}")
+    except WebDriverException:
+        pytest.skip(f"{page}: unpkg is not reachable, bundled load {after:.0f} ms")
+    finally:
+        os.remove(os.path.join(REPO_DIR, before_page))
+
+    print(f"\n{page}: unpkg {before:.0f} ms -> bundled {after:.0f} ms (median of {LOAD_RUNS} cold loads)", end="")
+    assert after < before
@@ -0,0 +1,88 @@
+import configparser
+import pytest
+from selenium import webdriver
+
+import page_timing
+
+BASE_URL = "http://localhost/SE"
+
+RAW = {
+    "url": "http://localhost/SE/fetch_data_driver.html?x=1",
+    "navigation": {"responseStart": 12.5, "domContentLoaded": 140.0, "load": 310.0, "transfer": 4200},
+    "resources": [
+        {"name": f"{BASE_URL}/style.css", "type": "link", "duration": 20.0, "transfer": 3000},
+        {"name": f"{BASE_URL}/fetch_data_driver.php", "type": "fetch", "duration": 95.0, "transfer": 51000},
+        {"name": f"{BASE_URL}/table_sync.js", "type": "script", "duration": 8.0, "transfer": 0},
+        {"name": f"{BASE_URL}/virtual_table.js", "type": "script", "duration": 30.0, "transfer": 6000},
+    ],
+    "lcp": 180.0,
+    "cls": 0.02,
+}
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    driver = webdriver.Chrome(options=options)
+    yield driver
+    driver.quit()
+
+
+# -------------------- Tests --------------------
+def test_summary_adds_up_the_document_and_its_resources():
+    timing = page_timing.summarize(RAW)
+
+    assert timing["page"] == "fetch_data_driver.html"
+    assert (timing["ttfb_ms"], timing["dom_content_loaded_ms"], timing["load_ms"]) == (12.5, 140.0, 310.0)
+    assert timing["transfer_bytes"] == 4200 + 3000 + 51000 + 6000
+    assert timing["requests"] == 5
+    assert [r["name"].rsplit("/", 1)[-1] for r in timing["slowest"]] == [
+        "fetch_data_driver.php", "virtual_table.js", "style.css"]
+
+
+def test_page_budget_overrides_the_defaults():
+    config = configparser.ConfigParser()
+    config.read_string("""
+        [page_budget]
+        ttfb_ms = 300
+        transfer_bytes = 50000
+        [page_budget fetch_data_driver.html]
+        transfer_bytes = 100000
+    """)
+
+    assert page_timing.budget("fetch_data_driver.html", config) == {"ttfb_ms": 300.0, "transfer_bytes": 100000.0}
+    assert page_timing.budget("fee.html", config) == {"ttfb_ms": 300.0, "transfer_bytes": 50000.0}
+
+
+def test_over_budget_names_each_metric_over_its_limit():
+    timing = page_timing.summarize(RAW)
+
+    assert page_timing.over_budget(timing, {"ttfb_ms": 300, "dom_content_loaded_ms": 100, "transfer_bytes": 10000}) == [
+        "fetch_data_driver.html: dom_content_loaded_ms 140 > 100",
+        "fetch_data_driver.html: transfer_bytes 64,200 > 10,000",
+    ]
+    assert page_timing.over_budget(dict(timing, lcp_ms=None, ttfb_ms=None), {"ttfb_ms": 1}) == []
+
+
+def test_format_lists_each_page_and_its_slowest_resources():
+    lines = page_timing.format_timings([page_timing.summarize(dict(RAW, lcp=None, cls=None))]).splitlines()
+
+    assert lines[0] == ("fetch_data_driver.html: TTFB 12 ms, DOMContentLoaded 140 ms, load 310 ms, "
+                        "64,200 B in 5 requests, LCP n/a, CLS n/a")
+    assert lines[1].endswith(f"{BASE_URL}/fetch_data_driver.php")
+    assert len(lines) == 4
+
+
+def test_capture_reads_a_loaded_page(driver):
+    driver.get(f"{BASE_URL}/fetch_data_driver.html")
+
+    timing = page_timing.capture(driver)
+
+    assert timing["page"] == "fetch_data_driver.html"
+    assert 0 < timing["ttfb_ms"] <= timing["dom_content_loaded_ms"] <= timing["load_ms"]
+    assert timing["transfer_bytes"] > 0
+    assert timing["requests"] > 1
+    assert timing["cls"] is not None
+    assert page_timing.captured == [timing]
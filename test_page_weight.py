@@ -0,0 +1,130 @@
+import json
+import os
+import pytest
+import requests
+from selenium import webdriver
+
+from build_assets import REPO_DIR, STATIC_DIR, SOURCE_IMAGES, pages, rewrite_text
+
+BASE_URL = "http://localhost/SE"
+
+PAGES = [
+    "admin.html",
+    "admin_login.html",
+    "fee.html",
+    "fetch_data_driver.html",
+    "fetch_data_student.html",
+    "routes.html",
+    "student_input.html",
+    "student_login.html",
+    "real_time_tracking.html",
+]
+
+# Budget for everything served from this site on one cold page load
+MAX_LOCAL_BYTES = 300_000
+
+
+def load_manifest():
+    with open(os.path.join(REPO_DIR, STATIC_DIR, "manifest.json")) as f:
+        return json.load(f)
+
+
+# -------------------- Page Object --------------------
+class PageWeight:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def load(self, page, cold=True):
+        """Load `page` and return its resource timing entries (document included)."""
+        self.driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": cold})
+        # The student pages register a service worker; a cold load must not go through it
+        self.driver.execute_cdp_cmd("Network.setBypassServiceWorker", {"bypass": cold})
+        self.driver.get(f"{BASE_URL}/{page}")
+        self.driver.execute_async_script("""
+            var done = arguments[arguments.length - 1];
+            if (document.readyState === 'complete') { done(); } else { window.addEventListener('load', function () { done(); }); }
+        """)
+        return self.driver.execute_script("""
+            return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+                .map(function (e) { return {name: e.name, type: e.initiatorType, transfer: e.transferSize, body: e.encodedBodySize}; });
+        """)
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    driver = webdriver.Chrome(options=options)
+    driver.set_script_timeout(30)
+    driver.execute_cdp_cmd("Network.enable", {})
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def weight(driver):
+    return PageWeight(driver)
+
+
+# -------------------- Tests --------------------
+def test_build_output_is_much_smaller_than_the_sources():
+    manifest = load_manifest()
+    for source in SOURCE_IMAGES:
+        entry = manifest[source]
+        for variant in entry["variants"].values():
+            path = os.path.join(REPO_DIR, STATIC_DIR, variant["file"])
+            assert os.path.getsize(path) == variant["bytes"]
+        print(f"\n{source}: {entry['bytes']:,} B -> "
+              + ", ".join(f"{fmt} {v['bytes']:,} B" for fmt, v in entry["variants"].items()), end="")
+    assert manifest["background.jpg"]["variants"]["avif"]["bytes"] * 20 < manifest["background.jpg"]["bytes"]
+
+
+def test_pages_reference_only_the_current_build():
+    manifest = load_manifest()
+    urls = {source: {fmt: f"{STATIC_DIR}/{v['file']}" for fmt, v in manifest[source]["variants"].items()}
+            for source in SOURCE_IMAGES}
+    for path in pages():
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        assert rewrite_text(text, urls) == text, f"{os.path.basename(path)} is stale; run build_assets.py"
+        assert "url(background.jpg)" not in text and "url('background.jpg')" not in text
+        assert "'image.jpeg'" not in text
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_cold_page_weight(weight, page):
+    entries = weight.load(page)
+    local = [e for e in entries if e["name"].startswith(BASE_URL)]
+    images = [e for e in local if e["name"].split("?")[0].rsplit(".", 1)[-1] in ("jpg", "jpeg", "webp", "avif")]
+    total = sum(e["transfer"] for e in local)
+
+    print(f"\n{page}: {total:,} B from this site ({len(local)} requests), "
+          f"images {sum(e['transfer'] for e in images):,} B", end="")
+    assert all(f"/{STATIC_DIR}/" in e["name"] for e in images)
+    assert total < MAX_LOCAL_BYTES
+
+
+@pytest.mark.parametrize("page", ["student_login.html", "fetch_data_student.html"])
+def test_repeat_visit_serves_images_from_cache(weight, page):
+    # The first visit fills the cache (a cold load bypasses it entirely)
+    weight.load(page, cold=False)
+    entries = weight.load(page, cold=False)
+    images = [e for e in entries if f"/{STATIC_DIR}/" in e["name"]]
+
+    assert images
+    # transferSize is 0 when the response came from the HTTP cache without revalidation
+    assert all(e["transfer"] == 0 for e in images)
+
+
+def test_static_assets_have_long_lived_cache_headers():
+    manifest = load_manifest()
+    content_types = {"jpeg": "image/jpeg", "webp": "image/webp", "avif": "image/avif"}
+    for source in SOURCE_IMAGES:
+        for fmt, variant in manifest[source]["variants"].items():
+            response = requests.get(f"{BASE_URL}/{STATIC_DIR}/{variant['file']}")
+            assert response.status_code == 200
+            assert response.headers["Content-Type"] == content_types[fmt]
+            cache_control = response.headers.get("Cache-Control", "")
+            assert "immutable" in cache_control
+            assert "max-age=31536000" in cache_control
@@ -0,0 +1,107 @@
+import threading
+import time
+import pytest
+
+import phase_timing
+from phase_timing import PHASES, PhaseTimer
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture
+def timer():
+    timer = PhaseTimer()
+    undo = phase_timing.instrument(timer)
+    yield timer
+    undo()
+
+
+@pytest.fixture
+def history(tmp_path):
+    db = phase_timing.open_history(str(tmp_path / "history.sqlite"))
+    yield db
+    db.close()
+
+
+def phases(**ms):
+    return {phase: (ms.get(phase, 0.0), 1 if ms.get(phase) else 0) for phase in PHASES}
+
+
+# -------------------- Tests --------------------
+def test_sleep_is_charged_to_the_sleep_phase(timer):
+    timer.start()
+    time.sleep(0.05)
+    total, result = timer.stop()
+
+    assert result["sleep"][1] == 1
+    assert 45 <= result["sleep"][0] <= total
+    assert result["other"][0] == pytest.approx(total - result["sleep"][0], abs=0.01)
+
+
+def test_nested_calls_are_charged_to_the_outermost(timer):
+    timer.start()
+    timer.timed("wait", time.sleep, 0.02)
+    total, result = timer.stop()
+
+    assert result["wait"][1] == 1 and result["wait"][0] >= 15
+    assert result["sleep"] == (0.0, 0)
+
+
+def test_other_threads_neither_count_nor_block_the_test(timer):
+    timer.start()
+    worker = threading.Thread(target=time.sleep, args=(0.1,))
+    worker.start()
+    time.sleep(0.02)
+    worker.join()
+    _, result = timer.stop()
+
+    assert result["sleep"][1] == 1 and result["sleep"][0] < 90
+    assert timer.depth == 0
+
+
+def test_nothing_is_recorded_between_tests(timer):
+    time.sleep(0.01)
+    timer.start()
+    _, result = timer.stop()
+
+    assert result["sleep"] == (0.0, 0)
+
+
+def test_instrumentation_is_undone():
+    sleep = time.sleep
+    undo = phase_timing.instrument(PhaseTimer())
+    assert time.sleep is not sleep
+    undo()
+    assert time.sleep is sleep
+
+
+def test_history_trend_sums_phases_per_run(history):
+    first = phase_timing.record_run(history, ["test_add_student.py"])
+    phase_timing.record_test(history, first, "test_add_student.py::test_a", "passed", 900.0,
+                             phases(browser=500.0, sleep=300.0, other=100.0))
+    phase_timing.record_test(history, first, "test_add_student.py::test_b", "failed", 400.0,
+                             phases(sleep=100.0, http=250.0, other=50.0))
+    second = phase_timing.record_run(history, ["test_add_student.py"])
+    phase_timing.record_test(history, second, "test_add_student.py::test_a", "passed", 600.0,
+                             phases(browser=500.0, other=100.0))
+
+    runs = phase_timing.trend(history)
+    assert [run[0] for run in runs] == [first, second]
+    assert runs[0][3] == 2
+    assert runs[0][4]["sleep"] == 400.0 and runs[0][4]["http"] == 250.0
+    assert runs[1][4]["sleep"] == 0.0
+
+    only_b = phase_timing.trend(history, test="test_b")
+    assert [(run[0], run[3]) for run in only_b] == [(first, 1)]
+
+    assert phase_timing.slowest(history, "browser") == [("test_add_student.py::test_a", 500.0, 1)]
+
+
+def test_format_phases_lists_phases_with_time():
+    text = phase_timing.format_phases(1000.0, phases(navigation=250.0, wait=700.0, other=50.0))
+
+    assert text.splitlines() == [
+        "1000 ms",
+        "  navigation        250 ms  25.0%  1 calls",
+        "  wait              700 ms  70.0%  1 calls",
+        "  other              50 ms   5.0%  ",
+    ]
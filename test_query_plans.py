@@ -0,0 +1,293 @@
+import glob
+import os
+import re
+from collections import namedtuple
+import pymysql
+import pytest
+
+import migrate
+from db_config import connect
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION = "migrations/001_query_indexes.sql"
+PLANS_DB = "point_management_plans"
+
+# Plan types that read every row of a table (or of one of its indexes)
+SCAN_TYPES = ("ALL", "index")
+
+# A statement as the code sends it, with sample parameters. `full_read` says
+# why the statement reads a whole table by design; `broken` says why it
+# cannot run against this schema at all.
+Statement = namedtuple("Statement", "sources sql params full_read broken", defaults=(None, None))
+
+# RouteRoster::SOURCE, the join the roster precomputes
+ROSTER_SOURCE = ("SELECT p.Route, p.Point_no, p.Student_ID, s.Name, s.Phone, s.Fee_Status, p.Driver_ID, d.Name, d.Phone "
+                 "FROM point_details p LEFT JOIN student s ON s.Student_ID = p.Student_ID "
+                 "LEFT JOIN driver d ON d.Driver_ID = p.Driver_ID")
+
+STATEMENTS = [
+    # -- Logins --
+    Statement(["admin_login.php"],
+              "SELECT email, admin_password FROM admin_login WHERE email = ? AND admin_password = ?",
+              ("k214947@nu", 123)),
+    Statement(["student_login.php"],
+              "SELECT Student_ID, student_password FROM student_login WHERE Student_ID = ? AND student_password = ?",
+              ("k214947", "123")),
+    Statement(["AuthenticationService.php", "student.php"],
+              "SELECT * FROM student WHERE Student_ID = ? AND student_password = ?",
+              ("k214947", "123"),
+              broken="student has no student_password column; logins are in student_login"),
+
+    # -- Admin tables --
+    Statement(["fetch_data_driver.php"],
+              "SELECT Driver_ID, Name, Route, Point_no, Phone FROM driver", (),
+              full_read="the admin page lists every driver"),
+    Statement(["fetch_data_driver.php"], "DELETE FROM driver WHERE Driver_ID = ?", ("D_12",)),
+    Statement(["driver_input.php"], "SELECT * FROM driver WHERE Driver_ID = ?", ("D_12",)),
+    Statement(["fetch_data_student.php"],
+              "SELECT Student_ID, Name, Point_no, Phone, Fee_Status , Driver_ID FROM student", (),
+              full_read="the admin page lists every student"),
+    Statement(["add_student.php", "student_input.php"],
+              "SELECT Student_ID FROM student WHERE Student_ID = ?", ("k213199",)),
+    Statement(["TableVersion.php"],
+              "UPDATE table_version SET version = LAST_INSERT_ID(version + 1) WHERE table_name = ?", ("driver",)),
+    Statement(["TableVersion.php"], "SELECT version FROM table_version WHERE table_name = ?", ("driver",)),
+    Statement(["TableVersion.php"],
+              "SELECT c.Row_ID, c.deleted, t.`Driver_ID`, t.`Name`, t.`Route`, t.`Point_no`, t.`Phone` FROM table_change c "
+              "LEFT JOIN `driver` t ON t.`Driver_ID` = c.Row_ID "
+              "WHERE c.table_name = ? AND c.version > ? AND c.version <= ?",
+              ("driver", 0, 10)),
+
+    # -- Student summary --
+    Statement(["StudentSummary.php"],
+              "SELECT Driver_ID, Fee_Status, Point_no FROM student WHERE Student_ID = ? FOR UPDATE", ("k213199",)),
+    Statement(["StudentSummary.php"], "DELETE FROM student WHERE Student_ID = ?", ("k213199",)),
+    Statement(["StudentSummary.php"],
+              "SELECT dimension, value, students FROM student_summary WHERE students > 0", (),
+              full_read="returns every count"),
+    Statement(["StudentSummary.php"],
+              "SELECT dimension, value, students FROM student_summary WHERE dimension = ? AND students > 0",
+              ("Fee_Status",)),
+    Statement(["StudentSummary.php"],
+              "SELECT students FROM student_summary WHERE dimension = ? AND value = ?", ("Fee_Status", "Paid")),
+    Statement(["StudentSummary.php"], "SELECT COUNT(*) FROM student FOR UPDATE", (),
+              full_read="rebuild() locks every student before recounting"),
+    Statement(["StudentSummary.php"], "DELETE FROM student_summary", (),
+              full_read="rebuild() empties the summary"),
+    Statement(["StudentSummary.php"],
+              "INSERT INTO student_summary (dimension, value, students) "
+              "SELECT 'Fee_Status', `Fee_Status`, COUNT(*) FROM student GROUP BY `Fee_Status`", (),
+              full_read="rebuild() recounts every student"),
+
+    # -- Route roster --
+    *[Statement(["RouteRoster.php"], ROSTER_SOURCE + f" WHERE p.`{column}` = ?", (value,))
+      for column, value in (("Student_ID", "k213199"), ("Driver_ID", "D_12"), ("Point_no", "21"))],
+    Statement(["RouteRoster.php"], ROSTER_SOURCE, (), full_read="rebuild() recomputes every point"),
+    *[Statement(["RouteRoster.php"], f"DELETE FROM route_roster WHERE `{column}` = ?", (value,))
+      for column, value in (("Student_ID", "k213199"), ("Driver_ID", "D_12"), ("Point_no", "21"))],
+    Statement(["RouteRoster.php"], "DELETE FROM route_roster", (), full_read="rebuild() empties the roster"),
+    Statement(["RouteRoster.php"], "DELETE FROM point_details WHERE Point_no = ?", ("21",)),
+    Statement(["RouteRoster.php"],
+              "SELECT Route, Point_no, Student_ID, Student_Name, Student_Phone, Fee_Status, Driver_ID, Driver_Name, "
+              "Driver_Phone FROM route_roster WHERE Route = ? ORDER BY Point_no", ("Gulshan",)),
+    Statement(["RouteRoster.php"],
+              "SELECT Route, Point_no, Student_ID, Student_Name, Student_Phone, Fee_Status, Driver_ID, Driver_Name, "
+              "Driver_Phone FROM route_roster WHERE Point_no = ?", ("21",)),
+
+    # -- Challans --
+    Statement(["ChallanGenerator.php"], "SELECT Student_ID, Name, Point_no FROM student", (),
+              full_read="one challan per student"),
+    Statement(["ChallanLedger.php"],
+              "UPDATE challan_sequence SET next_value = LAST_INSERT_ID(next_value + ?) WHERE id = 1", (100,)),
+    Statement(["ChallanLedger.php"],
+              "SELECT Challan_no, Student_ID, Name, Point_no, Amount, Issued_at FROM challan "
+              "WHERE Student_ID = ? ORDER BY Issued_at DESC, Challan_no DESC LIMIT 1", ("k213199",)),
+
+    # -- Tracking and ETAs --
+    Statement(["tracking.php"], "SELECT Driver_ID FROM driver WHERE Driver_ID = ?", ("D_12",)),
+    Statement(["tracking.php"], "UPDATE tracking_version SET version = LAST_INSERT_ID(version + 1) WHERE id = 1", ()),
+    Statement(["fleet_positions.php"], "SELECT version FROM tracking_version WHERE id = 1", ()),
+    Statement(["fleet_positions.php"],
+              "SELECT Driver_ID, lat_e5, lng_e5 FROM driver_location WHERE version > ? AND version <= ? ORDER BY lat_e5",
+              (0, 10)),
+    Statement(["EtaService.php"], "SELECT Stop_name, lat, lng FROM route_stop WHERE Route = ? ORDER BY Stop_seq",
+              ("Gulshan",)),
+    Statement(["EtaService.php"],
+              "SELECT d.Route, l.lat_e5, l.lng_e5 FROM driver d JOIN driver_location l ON l.Driver_ID = d.Driver_ID "
+              "WHERE d.Driver_ID = ?", ("D_12",)),
+    Statement(["EtaService.php"],
+              "SELECT d.Driver_ID, d.Route, l.lat_e5, l.lng_e5 FROM driver d JOIN driver_location l ON l.Driver_ID = d.Driver_ID",
+              (), full_read="ETAs for every bus that reported a position"),
+    Statement(["frontend.php"], "SELECT latitude, longitude FROM locations ORDER BY timestamp DESC LIMIT 1", (),
+              broken="there is no locations table; positions are in driver_location"),
+
+    # -- Python tools --
+    Statement(["fleet_simulator.py"], "SELECT Driver_ID, Route FROM driver ORDER BY Driver_ID", (),
+              full_read="simulates every driver"),
+    Statement(["fleet_simulator.py"],
+              "SELECT recorded_at, lat, lng FROM location_history WHERE Driver_ID = %s ORDER BY recorded_at LIMIT 5000",
+              ("D_12",)),
+    Statement(["fleet_simulator.py"], "DELETE FROM location_history WHERE Driver_ID = %s", ("SIM_00001",)),
+    Statement(["fleet_simulator.py"], "DELETE FROM driver_location WHERE Driver_ID = %s", ("SIM_00001",)),
+    Statement(["fleet_simulator.py"], "DELETE FROM driver WHERE Driver_ID = %s", ("SIM_00001",)),
+    Statement(["location_retention.py"],
+              "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+              "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+              "ORDER BY PARTITION_ORDINAL_POSITION", ("location_history",),
+              full_read="information_schema has no indexes"),
+    Statement(["location_retention.py"], "SELECT MIN(`recorded_at`) FROM `location_history`", (),
+              full_read="runs once, before the first daily partition exists"),
+    Statement(["location_retention.py"],
+              "INSERT INTO `location_minute` (Driver_ID, `minute`, fixes, lat_avg, lng_avg, lat_last, lng_last) "
+              "SELECT Driver_ID, `minute`, COUNT(*), AVG(lat), AVG(lng), "
+              "MAX(CASE WHEN newest = 1 THEN lat END), MAX(CASE WHEN newest = 1 THEN lng END) "
+              "FROM (SELECT Driver_ID, lat, lng, DATE_FORMAT(recorded_at, '%%Y-%%m-%%d %%H:%%i:00') AS `minute`, "
+              "ROW_NUMBER() OVER (PARTITION BY Driver_ID, DATE_FORMAT(recorded_at, '%%Y-%%m-%%d %%H:%%i:00') "
+              "ORDER BY recorded_at DESC) AS newest "
+              "FROM `location_history` PARTITION (p_future)) AS ranked "
+              "GROUP BY Driver_ID, `minute` "
+              "ON DUPLICATE KEY UPDATE fixes = VALUES(fixes), lat_avg = VALUES(lat_avg), lng_avg = VALUES(lng_avg), "
+              "lat_last = VALUES(lat_last), lng_last = VALUES(lng_last)", (),
+              full_read="aggregates a whole day partition"),
+    Statement(["migrate.py"], "SELECT GET_LOCK(CONCAT('schema_migration.', DATABASE()), 0)", ()),
+    Statement(["migrate.py"], "SELECT RELEASE_LOCK(CONCAT('schema_migration.', DATABASE()))", ()),
+    Statement(["migrate.py"], "SELECT version, name, checksum, applied_at FROM schema_migration ORDER BY version", (),
+              full_read="lists every applied migration"),
+    Statement(["migrate.py"], "DELETE FROM schema_migration WHERE version = %s", (2,)),
+    Statement(["migrate.py"],
+              "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+              ("student",), full_read="information_schema has no indexes"),
+    Statement(["migrate.py"],
+              "SELECT INDEX_NAME, COLUMN_NAME, NULLABLE FROM information_schema.STATISTICS "
+              "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND NON_UNIQUE = 0 "
+              "ORDER BY INDEX_NAME <> 'PRIMARY', INDEX_NAME, SEQ_IN_INDEX",
+              ("student",), full_read="information_schema has no indexes"),
+    Statement(["migrate.py"],
+              "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+              "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND IS_GENERATED = 'NEVER' "
+              "ORDER BY ORDINAL_POSITION",
+              ("student",), full_read="information_schema has no indexes"),
+    Statement(["migrate.py"],
+              "SELECT t.`Student_ID` FROM `student` t WHERE t.`Student_ID` > %s ORDER BY t.`Student_ID` LIMIT 1 OFFSET 4999",
+              ("k213199",)),
+    Statement(["sql_profile.py"], "SELECT @@performance_schema", ()),
+    Statement(["sql_profile.py"], "SELECT NOW(6)", ()),
+    Statement(["sql_profile.py"], "SELECT @@GLOBAL.slow_query_log, @@GLOBAL.long_query_time, @@GLOBAL.log_output", ()),
+    Statement(["sql_profile.py"],
+              "SELECT DIGEST, DIGEST_TEXT, COUNT_STAR, SUM_TIMER_WAIT, SUM_ROWS_EXAMINED, SUM_ROWS_SENT, SUM_NO_INDEX_USED "
+              "FROM performance_schema.events_statements_summary_by_digest WHERE SCHEMA_NAME = %s",
+              ("point_management",), full_read="performance_schema has no indexes"),
+    Statement(["sql_profile.py"],
+              "SELECT start_time, query_time, rows_examined, sql_text FROM mysql.slow_log "
+              "WHERE start_time >= %s AND db = %s ORDER BY query_time DESC LIMIT 20",
+              ("2024-01-01 00:00:00", "point_management"), full_read="the CSV slow log has no indexes"),
+]
+
+# Indexes migrations/001_query_indexes.sql adds
+MIGRATION_INDEXES = {
+    ("driver", "Route_Driver_ID"),
+    ("point_details", "Student_ID"),
+    ("point_details", "Route_Point_no"),
+    ("student", "Fee_Status"),
+}
+
+# Tools that only touch a scratch database, or a SQLite file, of their own
+SCRATCH_TOOLS = {"column_type_benchmark.py", "phase_timing.py"}
+
+# String literals that start a SELECT, UPDATE or DELETE
+SQL_LITERAL = re.compile(r'"((?:SELECT|UPDATE|DELETE)\b[^"]*)"')
+# PHP and f-string interpolation: $var, {$this->x}, {name}
+INTERPOLATION = re.compile(r"\{\$[^}]*\}|\$\w+|\{\w+\}")
+
+
+# -------------------- Helpers --------------------
+def normalize(sql):
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def source_files():
+    files = glob.glob(os.path.join(REPO_DIR, "*.php"))
+    files += [f for f in glob.glob(os.path.join(REPO_DIR, "*.py"))
+              if not os.path.basename(f).startswith("test_") and os.path.basename(f) not in SCRATCH_TOOLS]
+    return sorted(files)
+
+
+def literals(path):
+    """SQL string literals in `path`, split into the parts between interpolations."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    return [[normalize(part) for part in INTERPOLATION.split(match) if normalize(part)]
+            for match in SQL_LITERAL.findall(text)]
+
+
+def explain(conn, statement):
+    with conn.cursor() as cursor:
+        cursor.execute("EXPLAIN " + statement.sql.replace("?", "%s"), statement.params)
+        return cursor.fetchall()
+
+
+def scans(plan):
+    """Plan rows that read a whole table, whether or not the optimizer had a key it could have used."""
+    # <derived2>, <subquery2>: rows the statement itself produced, not a table
+    return [row for row in plan
+            if row["table"] and not row["table"].startswith("<") and row["type"] in SCAN_TYPES]
+
+
+def statement_id(statement):
+    return f"{statement.sources[0]}:{normalize(statement.sql)[:60]}"
+
+
+def statement_params():
+    return [
+        pytest.param(statement, id=statement_id(statement), marks=pytest.mark.xfail(
+            reason=statement.broken, raises=pymysql.MySQLError, strict=True) if statement.broken else ())
+        for statement in STATEMENTS
+    ]
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def conn():
+    """A fresh database with every migration applied."""
+    conn = connect(database=None, cursorclass=pymysql.cursors.DictCursor)
+    migrate.build_database(conn, PLANS_DB)
+    yield conn
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{PLANS_DB}`")
+    conn.close()
+
+
+# -------------------- Tests --------------------
+def test_every_statement_is_checked():
+    catalogued = {}
+    for statement in STATEMENTS:
+        for source in statement.sources:
+            catalogued.setdefault(source, []).append(normalize(statement.sql))
+
+    missing = []
+    for path in source_files():
+        name = os.path.basename(path)
+        for parts in literals(path):
+            if not any(all(part in sql for part in parts) for sql in catalogued.get(name, [])):
+                missing.append(f"{name}: {' ... '.join(parts)}")
+    assert not missing, "Add these statements to STATEMENTS:\n" + "\n".join(missing)
+
+
+def test_migration_indexes_exist(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()")
+        indexes = {(row["TABLE_NAME"], row["INDEX_NAME"]) for row in cursor.fetchall()}
+    assert MIGRATION_INDEXES <= indexes, f"{MIGRATION} did not apply"
+
+
+@pytest.mark.parametrize("statement", statement_params())
+def test_statement_uses_an_index(conn, statement):
+    plan = explain(conn, statement)
+    scanned = scans(plan)
+
+    if statement.full_read:
+        # The one table read in full by design; every other table must be reached through an index
+        assert len(scanned) <= 1, f"More than one table scanned: {plan}"
+    else:
+        assert not scanned, f"Full scan of {[row['table'] for row in scanned]}: {plan}"
@@ -0,0 +1,164 @@
+import time
+import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+import page_timing
+
+BASE_URL = "http://localhost/SE/real_time_tracking.html"
+
+ROUTE_POINTS = 5000
+
+
+# -------------------- Page Object --------------------
+class TrackingPage:
+    def __init__(self, driver):
+        self.driver = driver
+        self.url = BASE_URL
+
+    def load(self):
+        self.driver.get(self.url)
+        WebDriverWait(self.driver, 15).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#map .leaflet-marker-icon"))
+        )
+        WebDriverWait(self.driver, 10).until(
+            lambda d: d.execute_script("return typeof MarkerAnimator !== 'undefined'")
+        )
+        page_timing.capture(self.driver)
+
+    def install_timer_counter(self):
+        """Count every setTimeout/setInterval the page schedules from now on."""
+        self.driver.execute_script("""
+            window.__timerCount = 0;
+            var originalTimeout = window.setTimeout;
+            var originalInterval = window.setInterval;
+            window.setTimeout = function () {
+                window.__timerCount += 1;
+                return originalTimeout.apply(this, arguments);
+            };
+            window.setInterval = function () {
+                window.__timerCount += 1;
+                return originalInterval.apply(this, arguments);
+            };
+        """)
+
+    def stop_fleet_feed(self):
+        """Stop the live fleet poller so only the click-route marker animates."""
+        self.driver.execute_script("if (window.fleet) { fleet.stop(); }")
+
+    def timer_count(self):
+        return self.driver.execute_script("return window.__timerCount;")
+
+    def animate_synthetic_route(self, points, interval_ms):
+        """Feed a straight synthetic route to the animator, like a routesfound event would."""
+        self.driver.execute_script("""
+            var points = arguments[0], interval = arguments[1];
+            var coordinates = [];
+            for (var i = 0; i < points; i++) {
+                coordinates.push({ lat: 24.9642 + i * 1e-5, lng: 67.1288 + i * 1e-5 });
+            }
+            MarkerAnimator.animate(marker, MarkerAnimator.fixesFromCoordinates(coordinates, interval));
+        """, points, interval_ms)
+
+    def animator_stats(self):
+        return self.driver.execute_script("""
+            var s = MarkerAnimator.stats;
+            return {
+                frames: s.frames,
+                totalFrameMs: s.totalFrameMs,
+                maxFrameMs: s.maxFrameMs,
+                markerUpdates: s.markerUpdates,
+                cancelled: s.cancelled,
+                active: MarkerAnimator.activeCount()
+            };
+        """)
+
+    def marker_position(self):
+        return self.driver.execute_script(
+            "var p = marker.getLatLng(); return [p.lat, p.lng];"
+        )
+
+    def cdp_metrics(self):
+        metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+        return {m["name"]: m["value"] for m in metrics}
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    driver = webdriver.Chrome(options=options)
+    driver.execute_cdp_cmd("Performance.enable", {})
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def tracking_page(driver):
+    page = TrackingPage(driver)
+    page.load()
+    page.stop_fleet_feed()
+    return page
+
+
+# -------------------- Tests --------------------
+def test_long_route_uses_no_timers(tracking_page):
+    """A 5,000-point route must not queue one timer per coordinate."""
+    tracking_page.install_timer_counter()
+    tracking_page.animate_synthetic_route(ROUTE_POINTS, 100)
+    time.sleep(2)
+
+    assert tracking_page.timer_count() == 0
+    assert tracking_page.animator_stats()["active"] == 1
+
+
+def test_frame_time_stays_bounded(tracking_page):
+    """Per-frame work must not grow with the route length."""
+    before = tracking_page.cdp_metrics()
+    tracking_page.animate_synthetic_route(ROUTE_POINTS, 1)
+    time.sleep(3)
+    after = tracking_page.cdp_metrics()
+
+    stats = tracking_page.animator_stats()
+    mean_frame_ms = stats["totalFrameMs"] / max(stats["frames"], 1)
+    script_seconds = after["ScriptDuration"] - before["ScriptDuration"]
+    task_seconds = after["TaskDuration"] - before["TaskDuration"]
+
+    print(f"\nframes={stats['frames']} mean={mean_frame_ms:.3f}ms max={stats['maxFrameMs']:.3f}ms "
+          f"updates={stats['markerUpdates']} script={script_seconds:.3f}s task={task_seconds:.3f}s")
+
+    assert stats["frames"] > 0
+    assert mean_frame_ms < 4, f"Mean animation frame took {mean_frame_ms:.3f}ms"
+    # Marker updates are capped by the frame rate, not by the number of points.
+    assert stats["markerUpdates"] <= stats["frames"]
+    # Well under half of the 3s window spent in the renderer's main thread.
+    assert task_seconds < 1.5
+
+
+def test_animation_reaches_end_and_stops(tracking_page):
+    tracking_page.animate_synthetic_route(200, 1)
+    WebDriverWait(tracking_page.driver, 5).until(
+        lambda d: tracking_page.animator_stats()["active"] == 0
+    )
+    lat, lng = tracking_page.marker_position()
+    assert lat == pytest.approx(24.9642 + 199 * 1e-5)
+    assert lng == pytest.approx(67.1288 + 199 * 1e-5)
+
+    frames = tracking_page.animator_stats()["frames"]
+    time.sleep(1)
+    assert tracking_page.animator_stats()["frames"] == frames, "Loop kept running with no active track"
+
+
+def test_new_route_cancels_running_animation(tracking_page):
+    tracking_page.animate_synthetic_route(ROUTE_POINTS, 100)
+    cancelled = tracking_page.animator_stats()["cancelled"]
+
+    tracking_page.animate_synthetic_route(ROUTE_POINTS, 100)
+    time.sleep(0.5)
+
+    stats = tracking_page.animator_stats()
+    assert stats["cancelled"] == cancelled + 1
+    assert stats["active"] == 1
@@ -0,0 +1,188 @@
+import statistics
+import time
+import pytest
+import requests
+
+import migrate
+from db_config import connect
+
+BASE_URL = "http://localhost/SE"
+ROSTER_URL = f"{BASE_URL}/route_roster.php"
+ADD_STUDENT_URL = f"{BASE_URL}/add_student.php"
+STUDENT_URL = f"{BASE_URL}/fetch_data_student.php"
+ADD_DRIVER_URL = f"{BASE_URL}/driver_input.php"
+DRIVER_URL = f"{BASE_URL}/fetch_data_driver.php"
+
+ROUTE = "Roster Test"
+POINT = "RT1"
+
+BENCH_DB = "point_management_roster_bench"
+STUDENTS = 100_000
+ROUTES = 200
+SAMPLED_ROUTES = 20
+RUNS = 5
+
+# The join route_roster precomputes, for one route
+JOIN = (
+    "SELECT p.Route, p.Point_no, p.Student_ID, s.Name, s.Phone, s.Fee_Status, p.Driver_ID, d.Name, d.Phone "
+    "FROM point_details p LEFT JOIN student s ON s.Student_ID = p.Student_ID "
+    "LEFT JOIN driver d ON d.Driver_ID = p.Driver_ID WHERE p.Route = %s ORDER BY p.Point_no"
+)
+ROSTER = (
+    "SELECT Route, Point_no, Student_ID, Student_Name, Student_Phone, Fee_Status, Driver_ID, Driver_Name, Driver_Phone "
+    "FROM route_roster WHERE Route = %s ORDER BY Point_no"
+)
+
+# One point per student, as student.Point_no is unique; every student has their own driver
+FILL = [
+    "INSERT INTO student (Student_ID, Name, Point_no, Phone, Fee_Status, Driver_ID) "
+    "SELECT CONCAT('R', LPAD(seq, 6, '0')), CONCAT('Student ', seq), CONCAT('P', seq), CONCAT('0300', LPAD(seq, 7, '0')), "
+    "ELT(1 + seq % 3, 'Paid', 'Pending', 'Unpaid'), CONCAT('RD', seq) FROM seq_1_to_{rows}",
+    "INSERT INTO driver (Name, Route, Point_no, Phone, Driver_ID) "
+    "SELECT CONCAT('Driver ', seq), CONCAT('Route ', seq % {routes}), CONCAT('P', seq), CONCAT('0311', LPAD(seq, 6, '0')), "
+    "CONCAT('RD', seq) FROM seq_1_to_{rows}",
+    "INSERT INTO point_details (Driver_ID, Student_ID, Point_no, Route) "
+    "SELECT CONCAT('RD', seq), CONCAT('R', LPAD(seq, 6, '0')), CONCAT('P', seq), CONCAT('Route ', seq % {routes}) "
+    "FROM seq_1_to_{rows}",
+]
+
+
+# -------------------- Helpers --------------------
+def add_student(student_id, name="Roster Student"):
+    return requests.post(ADD_STUDENT_URL, data={
+        "Student_ID": student_id, "Name": name, "Point_no": POINT, "Phone": "03001112223",
+        "Fee_Status": "Pending", "Driver_ID": "RT_D1",
+    }).text
+
+
+def add_driver(driver_id, name="Roster Driver"):
+    return requests.post(ADD_DRIVER_URL, data={
+        "Name": name, "Route": ROUTE, "Point_no": POINT, "Phone": "0311222333", "Driver_ID": driver_id,
+    }).text
+
+
+def roster_point(point_no):
+    response = requests.get(ROSTER_URL, params={"Point_no": point_no})
+    return response.status_code, response.json()
+
+
+def timed(cursor, sql, params):
+    """(rows, median ms of RUNS executions, handler reads of one execution)."""
+    times = []
+    for _ in range(RUNS):
+        cursor.execute("FLUSH STATUS")
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        times.append((time.perf_counter() - started) * 1000)
+    cursor.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+    reads = sum(int(value) for _, value in cursor.fetchall())
+    return rows, statistics.median(times), reads
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture
+def assigned_point():
+    """RT_S1 and RT_D1 on point RT1 of the test route, added through the endpoints."""
+    add_driver("RT_D1")
+    add_student("RT_S1")
+    response = requests.post(ROSTER_URL, data={
+        "action": "assign", "Point_no": POINT, "Route": ROUTE, "Student_ID": "RT_S1", "Driver_ID": "RT_D1",
+    })
+    assert response.status_code == 200, response.text
+    yield response.json()
+    requests.post(ROSTER_URL, data={"action": "unassign", "Point_no": POINT})
+    requests.post(STUDENT_URL, data={"action": "delete", "Student_ID": "RT_S1"})
+    requests.post(DRIVER_URL, data={"action": "delete", "Driver_ID": "RT_D1"})
+
+
+@pytest.fixture(scope="module")
+def bench():
+    """A database with STUDENTS students, drivers and points over ROUTES routes, then the roster migration."""
+    conn = connect(database=None)
+    roster_version = next(m.version for m in migrate.discover() if m.name == "route_roster")
+    migrate.build_database(conn, BENCH_DB, to=roster_version - 1)
+    with conn.cursor() as cursor:
+        for fill in FILL:
+            cursor.execute(fill.format(rows=STUDENTS, routes=ROUTES))
+    conn.commit()
+
+    started = time.perf_counter()
+    migrate.up(conn, to=roster_version)
+    print(f"\nroster built for {STUDENTS} students in {(time.perf_counter() - started) * 1000:.0f} ms", end="")
+    with conn.cursor() as cursor:
+        cursor.execute("ANALYZE TABLE point_details, student, driver, route_roster")
+        cursor.fetchall()
+    yield conn
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{BENCH_DB}`")
+    conn.close()
+
+
+# -------------------- Tests --------------------
+def test_assigned_point_lists_rider_and_driver(assigned_point):
+    assert assigned_point["Student_Name"] == "Roster Student"
+    assert assigned_point["Driver_Name"] == "Roster Driver"
+
+    status, point = roster_point(POINT)
+    assert status == 200
+    assert (point["Route"], point["Student_ID"], point["Driver_ID"]) == (ROUTE, "RT_S1", "RT_D1")
+
+    route = requests.get(ROSTER_URL, params={"Route": ROUTE}).json()
+    assert [p["Point_no"] for p in route["points"]] == [POINT]
+
+
+def test_roster_follows_student_and_driver_writes(assigned_point):
+    requests.post(STUDENT_URL, data={"action": "delete", "Student_ID": "RT_S1"})
+    _, point = roster_point(POINT)
+    assert point["Student_ID"] == "RT_S1" and point["Student_Name"] is None
+
+    add_student("RT_S1", name="Back Again")
+    _, point = roster_point(POINT)
+    assert point["Student_Name"] == "Back Again"
+    assert point["Fee_Status"] == "Pending"
+
+    requests.post(DRIVER_URL, data={"action": "delete", "Driver_ID": "RT_D1"})
+    _, point = roster_point(POINT)
+    assert point["Driver_Name"] is None
+
+
+def test_unassigned_point_is_not_found(assigned_point):
+    requests.post(ROSTER_URL, data={"action": "unassign", "Point_no": POINT})
+
+    status, _ = roster_point(POINT)
+    assert status == 404
+    assert requests.get(ROSTER_URL, params={"Route": ROUTE}).json()["points"] == []
+
+
+def test_roster_read_is_a_primary_key_range(bench):
+    with bench.cursor() as cursor:
+        cursor.execute("EXPLAIN " + ROSTER, ("Route 7",))
+        columns = [c[0] for c in cursor.description]
+        plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    assert len(plan) == 1
+    assert plan[0]["key"] == "PRIMARY"
+    assert plan[0]["type"] in ("ref", "range")
+    assert "filesort" not in (plan[0]["Extra"] or "")
+
+
+def test_roster_beats_the_join_at_100k_students(bench):
+    join_ms, roster_ms, join_reads, roster_reads = [], [], 0, 0
+    with bench.cursor() as cursor:
+        for route in range(0, ROUTES, ROUTES // SAMPLED_ROUTES):
+            name = f"Route {route}"
+            joined, ms, reads = timed(cursor, JOIN, (name,))
+            join_ms.append(ms)
+            join_reads += reads
+            rostered, ms, reads = timed(cursor, ROSTER, (name,))
+            roster_ms.append(ms)
+            roster_reads += reads
+
+            assert len(rostered) == STUDENTS // ROUTES
+            assert [tuple(map(str, row)) for row in rostered] == [tuple(map(str, row)) for row in joined]
+
+    print(f"\none route of {STUDENTS // ROUTES} points: join {statistics.median(join_ms):.2f} ms, "
+          f"{join_reads // SAMPLED_ROUTES} handler reads; roster {statistics.median(roster_ms):.2f} ms, "
+          f"{roster_reads // SAMPLED_ROUTES} handler reads", end="")
+    assert roster_reads < join_reads
+    assert statistics.median(roster_ms) < statistics.median(join_ms)
@@ -0,0 +1,183 @@
+import os
+import re
+import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from build_assets import REPO_DIR, SERVICE_WORKER, SHELL_PAGES, write_service_worker
+
+BASE_URL = "http://localhost/SE"
+
+# A slow mobile connection, roughly "Slow 3G" in DevTools
+SLOW_NETWORK = {"offline": False, "latency": 400, "downloadThroughput": 50_000, "uploadThroughput": 50_000}
+OFFLINE = {"offline": True, "latency": 0, "downloadThroughput": -1, "uploadThroughput": -1}
+ONLINE = {"offline": False, "latency": 0, "downloadThroughput": -1, "uploadThroughput": -1}
+
+# Element that shows each page rendered
+PAGE_MARKERS = {
+    "student.html": (By.CSS_SELECTOR, ".button-container"),
+    "routes.html": (By.TAG_NAME, "table"),
+    "fee.html": (By.ID, "point-number"),
+    "real_time_tracking.html": (By.ID, "map"),
+}
+
+
+# -------------------- Page Object --------------------
+class PortalPage:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def network(self, conditions):
+        self.driver.execute_cdp_cmd("Network.emulateNetworkConditions", conditions)
+
+    def open(self, page):
+        """Load `page` and return the time to its load event in ms."""
+        self.driver.get(f"{BASE_URL}/{page}")
+        WebDriverWait(self.driver, 60).until(lambda d: d.execute_script(
+            "return performance.getEntriesByType('navigation')[0].loadEventEnd > 0"))
+        return self.driver.execute_script("return performance.getEntriesByType('navigation')[0].loadEventEnd")
+
+    def reset(self):
+        """Unregister the worker and delete its caches, as for a first-time visitor."""
+        self.driver.execute_async_script("""
+            var done = arguments[arguments.length - 1];
+            navigator.serviceWorker.getRegistrations()
+                .then(function (registrations) {
+                    return Promise.all(registrations.map(function (r) { return r.unregister(); }));
+                })
+                .then(function () { return caches.keys(); })
+                .then(function (names) { return Promise.all(names.map(function (n) { return caches.delete(n); })); })
+                .then(function () { done(); });
+        """)
+
+    def wait_until_controlled(self):
+        """Wait for the worker to install, then reload so it controls the page."""
+        self.driver.execute_async_script("""
+            var done = arguments[arguments.length - 1];
+            navigator.serviceWorker.ready.then(function () { done(); });
+        """)
+        self.driver.refresh()
+        WebDriverWait(self.driver, 10).until(
+            lambda d: d.execute_script("return navigator.serviceWorker.controller !== null"))
+
+    def cache_names(self):
+        return self.driver.execute_async_script("""
+            var done = arguments[arguments.length - 1];
+            caches.keys().then(done);
+        """)
+
+    def fetch_json(self, url):
+        return self.driver.execute_async_script("""
+            var done = arguments[arguments.length - 1];
+            fetch(arguments[0]).then(function (r) { return r.json(); })
+                .then(function (body) { done({ok: true, body: body}); })
+                .catch(function (error) { done({ok: false, error: String(error)}); });
+        """, url)
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    driver = webdriver.Chrome(options=options)
+    driver.set_script_timeout(60)
+    driver.execute_cdp_cmd("Network.enable", {})
+    # Keep the HTTP cache out of the comparison; only the service worker may help
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture(scope="module")
+def portal(driver):
+    return PortalPage(driver)
+
+
+# -------------------- Tests --------------------
+def test_service_worker_matches_the_build():
+    version, files = write_service_worker(dry_run=True)
+    with open(os.path.join(REPO_DIR, SERVICE_WORKER), encoding="utf-8") as f:
+        text = f.read()
+
+    assert f"var VERSION = '{version}';" in text, "sw.js is stale; run build_assets.py"
+    assert set(SHELL_PAGES) <= set(files)
+    assert re.findall(r"^    '([^']+)',?$", text, flags=re.M) == files
+
+
+@pytest.mark.parametrize("page", ["student.html", "real_time_tracking.html"])
+def test_repeat_visit_load_time(portal, page):
+    portal.open(page)
+    portal.reset()
+    portal.network(SLOW_NETWORK)
+    try:
+        first = portal.open(page)
+        portal.wait_until_controlled()
+        repeat = min(portal.open(page) for _ in range(3))
+    finally:
+        portal.network(ONLINE)
+
+    print(f"\n{page} on a slow connection: first visit {first:.0f} ms, repeat visit {repeat:.0f} ms", end="")
+    assert repeat * 3 < first
+
+
+def test_deploy_replaces_the_caches(portal):
+    portal.open("student.html")
+    portal.wait_until_controlled()
+    path = os.path.join(REPO_DIR, SERVICE_WORKER)
+    with open(path, encoding="utf-8") as f:
+        original = f.read()
+    version = re.search(r"var VERSION = '([^']*)';", original).group(1)
+    assert f"shell-{version}" in portal.cache_names()
+
+    # What a deploy does: sw.js comes back with a new VERSION
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(original.replace(f"var VERSION = '{version}';", "var VERSION = 'deploytest';"))
+    try:
+        portal.driver.execute_async_script("""
+            var done = arguments[arguments.length - 1];
+            navigator.serviceWorker.getRegistration().then(function (r) { return r.update(); }).then(function () { done(); });
+        """)
+        WebDriverWait(portal.driver, 30).until(
+            lambda d: all(name.endswith("-deploytest") for name in portal.cache_names()))
+    finally:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(original)
+
+    assert "shell-deploytest" in portal.cache_names()
+
+
+def test_fleet_polls_go_to_the_network(portal):
+    portal.open("student.html")
+    portal.wait_until_controlled()
+    full = portal.fetch_json("fleet_positions.php?since=0")
+    assert full["ok"]
+
+    # Nothing moved since, so the network answer is empty; the cached full feed is not
+    delta = portal.fetch_json(f"fleet_positions.php?since={full['body']['v']}")
+    assert delta["ok"] and delta["body"]["d"] == []
+
+
+def test_pages_work_offline(portal):
+    # A first-time visitor: everything offline must come from the install alone
+    portal.open("student.html")
+    portal.reset()
+    portal.open("student.html")
+    portal.wait_until_controlled()
+    # The full fleet feed is kept when it is fetched online, as the map's first poll does
+    assert portal.fetch_json("fleet_positions.php?since=0")["ok"]
+
+    portal.network(OFFLINE)
+    try:
+        for page in SHELL_PAGES:
+            portal.open(page)
+            assert portal.driver.find_elements(*PAGE_MARKERS[page]), f"{page} did not render offline"
+
+        cached = portal.fetch_json("fleet_positions.php?since=123")
+        uncached = portal.fetch_json("student_summary.php")
+    finally:
+        portal.network(ONLINE)
+
+    assert cached["ok"] and "v" in cached["body"]
+    assert not uncached["ok"]
@@ -0,0 +1,90 @@
+import pytest
+
+import sql_profile
+from db_config import connect
+from sql_profile import Digest
+
+LOOKUP = "SELECT `Name` FROM `student` WHERE `Student_ID` = ?"
+LISTING = "SELECT `Student_ID` , `Name` FROM `student`"
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture
+def profiler():
+    profiler = sql_profile.SqlProfiler(min_calls=5)
+    profiler.open()
+    if profiler.unavailable:
+        pytest.skip(profiler.unavailable)
+    yield profiler
+    profiler.close()
+
+
+# -------------------- Tests --------------------
+def test_difference_counts_only_what_ran_in_between():
+    before = {"a": Digest(LOOKUP, 3, 1.5, 3, 3, 0), "b": Digest(LISTING, 1, 4.0, 500, 500, 1)}
+    after = {
+        "a": Digest(LOOKUP, 8, 4.0, 8, 8, 0),
+        "b": Digest(LISTING, 1, 4.0, 500, 500, 1),
+        "c": Digest("DELETE FROM `driver` WHERE `Driver_ID` = ?", 1, 0.5, 1, 0, 0),
+    }
+
+    ran = sql_profile.difference(before, after)
+
+    assert ran == [Digest(LOOKUP, 5, 2.5, 5, 5, 0), Digest("DELETE FROM `driver` WHERE `Driver_ID` = ?", 1, 0.5, 1, 0, 0)]
+    assert sql_profile.totals(ran) == {
+        "statements": 6, "rows_examined": 6, "rows_sent": 5, "latency_ms": 3.0, "no_index": 0,
+    }
+
+
+def test_n_plus_one_flags_repeated_single_row_selects():
+    digests = [
+        Digest(LOOKUP, 12, 3.0, 12, 12, 0),
+        Digest(LISTING, 12, 9.0, 6000, 6000, 12),
+        Digest("UPDATE `student` SET `Fee_Status` = ? WHERE `Student_ID` = ?", 40, 8.0, 40, 0, 0),
+        Digest(LOOKUP.replace("Name", "Phone"), 4, 1.0, 4, 4, 0),
+    ]
+
+    assert sql_profile.n_plus_one(digests, min_calls=10) == [digests[0]]
+
+
+def test_format_profile_lists_statements_and_flags():
+    lookup = Digest(LOOKUP, 12, 3.0, 12, 12, 0)._asdict()
+    profile = sql_profile.totals([Digest(**lookup)])
+    profile.update(digests=[lookup], n_plus_one=[lookup],
+                   slow=[{"at": "2024-01-01", "ms": 250.0, "rows_examined": 9000, "sql": "SELECT 1"}])
+
+    text = sql_profile.format_profile(profile)
+
+    assert text.startswith("12 statements, 12 rows examined, 12 rows sent, 3.0 ms in MySQL")
+    assert f"N+1? 12 calls returning 12 rows: {LOOKUP}" in text
+    assert "Slow: 250 ms, 9000 rows examined: SELECT 1" in text
+    assert sql_profile.format_profile({"unavailable": "performance_schema is OFF"}) == \
+        "Not profiled: performance_schema is OFF\n"
+
+
+def test_profile_attributes_a_lookup_loop(profiler):
+    conn = connect()
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT Student_ID FROM student LIMIT 6")
+        ids = [row[0] for row in cursor.fetchall()]
+
+        state = profiler.start()
+        for student_id in ids:
+            cursor.execute("SELECT Name FROM student WHERE Student_ID = %s", (student_id,))
+            cursor.fetchall()
+        profile = profiler.stop("loop", state)
+    conn.close()
+
+    lookups = [d for d in profile["digests"] if "`Student_ID` = ?" in d["text"] or "Student_ID = ?" in d["text"]]
+    assert [d["calls"] for d in lookups] == [len(ids)]
+    assert profile["statements"] >= len(ids)
+    assert [d["text"] for d in profile["n_plus_one"]] == [lookups[0]["text"]]
+    assert profiler.results["loop"] is profile
+
+
+def test_profiler_statements_are_not_profiled(profiler):
+    profiler.stop("first", profiler.start())
+
+    profile = profiler.stop("idle", profiler.start())
+
+    assert profile["statements"] == 0 and profile["digests"] == []
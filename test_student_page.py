@@ -5,6 +5,8 @@ import pytest
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 
+import page_timing
+
 # =========================
 # Page Object (POM) Class
 # =========================
@@ -15,6 +17,7 @@ class StudentPage:
 
     def load(self):
         self.driver.get(self.url)
+        page_timing.capture(self.driver)
 
     def get_all_rows(self):
         return self.driver.find_elements(By.XPATH, "//table/tbody/tr")
@@ -66,10 +69,10 @@ def test_student_deletion(driver):
     page.load()
     page.delete_student(student_id)
 
+    # The row is removed in place; no reload
     time.sleep(2)
-    driver.refresh()
-    time.sleep(1)
-    page.load()
+    assert driver.current_url == page.url
+    assert "deleted successfully" in driver.find_element(By.ID, "studentStatus").text
 
     ids = page.get_all_ids()
     assert student_id not in ids, f"Student {student_id} was not deleted"
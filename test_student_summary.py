@@ -0,0 +1,121 @@
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import requests
+
+from db_config import connect
+
+BASE_URL = "http://localhost/SE"
+SUMMARY_URL = f"{BASE_URL}/student_summary.php"
+ADD_URL = f"{BASE_URL}/add_student.php"
+DELETE_URL = f"{BASE_URL}/fetch_data_student.php"
+
+STATUSES = ["Paid", "Pending", "Unpaid"]
+WRITERS = 16
+STUDENTS = 300
+
+
+# -------------------- Helpers --------------------
+def add_student(student_id, point_no, driver_id, fee_status):
+    return requests.post(ADD_URL, data={
+        "Student_ID": student_id, "Name": "Summary Student", "Point_no": point_no,
+        "Phone": 3200000, "Fee_Status": fee_status, "Driver_ID": driver_id,
+    }).text
+
+
+def delete_student(student_id):
+    return requests.post(DELETE_URL, data={"action": "delete", "Student_ID": student_id}).json()
+
+
+def summary(**params):
+    response = requests.get(SUMMARY_URL, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def recount(conn):
+    """What the summary should say, from a full scan of the student table."""
+    expected = {}
+    with conn.cursor() as cursor:
+        for dimension in ("Driver_ID", "Fee_Status", "Point_no"):
+            cursor.execute(f"SELECT `{dimension}`, COUNT(*) FROM student GROUP BY `{dimension}`")
+            expected[dimension] = {str(value): count for value, count in cursor.fetchall()}
+    return expected
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def conn():
+    conn = connect(autocommit=True)
+    yield conn
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT Student_ID FROM student WHERE Student_ID LIKE 'SUMM%'")
+        leftovers = [row[0] for row in cursor.fetchall()]
+    for student_id in leftovers:
+        delete_student(student_id)
+    conn.close()
+
+
+# -------------------- Tests --------------------
+def test_counts_match_student_table_under_concurrent_writes(conn):
+    random.seed(35)
+    before = Counter(summary(dimension="Fee_Status")["Fee_Status"])
+    students = [
+        (f"SUMM_{i:04d}", f"SUMM_P{i}", f"SUMM_D{i}", random.choice(STATUSES))
+        for i in range(STUDENTS)
+    ]
+    # Every tenth student is submitted twice; only one of the two may be counted
+    submissions = students + students[::10]
+    random.shuffle(submissions)
+
+    with ThreadPoolExecutor(max_workers=WRITERS) as executor:
+        list(executor.map(lambda s: add_student(*s), submissions))
+
+    deleted = [s[0] for s in students[::3]]
+    with ThreadPoolExecutor(max_workers=WRITERS) as executor:
+        # Deleting a student twice must not decrement twice either
+        list(executor.map(delete_student, deleted + deleted[::5]))
+
+    after = summary()
+    assert after == recount(conn)
+
+    kept = [s for s in students if s[0] not in set(deleted)]
+    added = Counter(s[3] for s in kept)
+    for status in STATUSES:
+        assert after["Fee_Status"].get(status, 0) == before.get(status, 0) + added[status]
+    assert all(f"SUMM_P{i}" not in after["Point_no"] for i in range(0, STUDENTS, 3))
+
+
+def test_single_counter_endpoint(conn):
+    expected = recount(conn)["Fee_Status"].get("Pending", 0)
+
+    assert summary(dimension="Fee_Status", value="Pending")["students"] == expected
+    assert summary(dimension="Fee_Status", value="No such status")["students"] == 0
+
+
+def test_unknown_dimension_is_rejected():
+    response = requests.get(SUMMARY_URL, params={"dimension": "Phone"})
+    assert response.status_code == 400
+
+
+def test_counter_read_is_a_single_key_lookup(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("EXPLAIN SELECT students FROM student_summary WHERE dimension = 'Fee_Status' AND value = 'Pending'")
+        columns = [c[0] for c in cursor.description]
+        plan = dict(zip(columns, cursor.fetchone()))
+
+        cursor.execute("FLUSH STATUS")
+        cursor.execute("SELECT students FROM student_summary WHERE dimension = 'Fee_Status' AND value = 'Pending'")
+        cursor.fetchall()
+        cursor.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+        rows_read = sum(int(value) for _, value in cursor.fetchall())
+
+        cursor.execute("SELECT COUNT(*) FROM student")
+        students = cursor.fetchone()[0]
+
+    print(f"\nCounter read: {plan['type']} on {plan['key']}, {rows_read} handler reads "
+          f"({students} students in the table)", end="")
+    assert plan["key"] == "PRIMARY"
+    assert plan["type"] in ("const", "eq_ref")
+    assert rows_read <= 1
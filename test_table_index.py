@@ -0,0 +1,134 @@
+import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+import page_timing
+
+BASE_URL = "http://localhost/SE/fetch_data_driver.html"
+
+ROWS = 10000
+QUERY = "driver 12"
+
+
+# -------------------- Page Object --------------------
+class DriverSearchPage:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def load(self):
+        self.driver.get(BASE_URL)
+        WebDriverWait(self.driver, 10).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, "#driverTableBody tr")
+        )
+        page_timing.capture(self.driver)
+
+    def load_synthetic_drivers(self, count):
+        """Index `count` synthetic drivers and return the index build time in ms."""
+        return self.driver.execute_script("""
+            var rows = [];
+            for (var i = 0; i < arguments[0]; i++) {
+                rows.push({Name: 'Driver ' + i, Driver_ID: 'SRCH' + i, Route: 'Route ' + (i % 16),
+                           Point_no: String(i), Phone: '0300' + (i % 997)});
+            }
+            driverView.setRows(rows);
+            return driverView.index.buildMs;
+        """, count)
+
+    def keystroke_latencies(self, text):
+        """Type `text` one key at a time; per key, ms from the input event to the next frame."""
+        return self.driver.execute_async_script("""
+            var text = arguments[0], done = arguments[arguments.length - 1];
+            var input = document.getElementById('driverSearch');
+            var latencies = [], sync = [], i = 0;
+            input.value = '';
+            function typeNext() {
+                if (i === text.length) {
+                    done({frameMs: latencies, syncMs: sync});
+                    return;
+                }
+                input.value += text[i++];
+                var started = performance.now();
+                input.dispatchEvent(new Event('input'));
+                sync.push(performance.now() - started);
+                requestAnimationFrame(function () {
+                    latencies.push(performance.now() - started);
+                    setTimeout(typeNext, 0);
+                });
+            }
+            typeNext();
+        """, text)
+
+    def search(self, text):
+        box = self.driver.find_element(By.ID, "driverSearch")
+        box.clear()
+        box.send_keys(text)
+
+    def sort_by(self, header_text):
+        self.driver.find_element(By.XPATH, f"//thead/tr/th[text()='{header_text}']").click()
+        return self.driver.execute_script("return driverView.stats.lastUpdateMs")
+
+    def visible_ids(self):
+        rows = self.driver.find_elements(By.CSS_SELECTOR, "#driverTableBody tr:not(.vt-spacer)")
+        return [row.find_elements(By.TAG_NAME, "td")[1].text for row in rows]
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    driver = webdriver.Chrome(options=options)
+    driver.set_script_timeout(60)
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def search_page(driver):
+    page = DriverSearchPage(driver)
+    page.load()
+    page.load_synthetic_drivers(ROWS)
+    return page
+
+
+# -------------------- Tests --------------------
+def test_search_filters_by_id_and_name_prefix(search_page):
+    search_page.search("SRCH999")
+    ids = search_page.visible_ids()
+    assert set(ids) == {"SRCH999", "SRCH9990", "SRCH9991", "SRCH9992", "SRCH9993",
+                        "SRCH9994", "SRCH9995", "SRCH9996", "SRCH9997", "SRCH9998", "SRCH9999"}
+
+    search_page.search("driver 4321")
+    assert search_page.visible_ids() == ["SRCH4321"]
+
+    search_page.search("nobody")
+    assert "No items found" in search_page.driver.find_element(By.ID, "driverTableBody").text
+
+
+def test_sorting_uses_prebuilt_order(search_page):
+    search_page.sort_by("Point Number")
+    assert search_page.visible_ids()[:3] == ["SRCH0", "SRCH1", "SRCH2"]
+
+    search_page.sort_by("Point Number")
+    assert search_page.visible_ids()[0] == f"SRCH{ROWS - 1}"
+
+    search_page.search("SRCH5")
+    ids = search_page.visible_ids()
+    assert ids[0] == "SRCH5999"
+    assert all(i.startswith("SRCH5") for i in ids)
+
+
+def test_benchmark_keystroke_to_update_at_10k_rows(search_page):
+    build_ms = search_page.driver.execute_script("return driverView.index.buildMs")
+    result = search_page.keystroke_latencies(QUERY)
+    sort_ms = search_page.sort_by("Name")
+
+    frame = sorted(result["frameMs"])
+    sync = sorted(result["syncMs"])
+    print(f"\n{ROWS} rows: index built in {build_ms:.1f} ms; keystroke to next frame "
+          f"median {frame[len(frame) // 2]:.1f} ms, max {frame[-1]:.1f} ms; "
+          f"search+render median {sync[len(sync) // 2]:.2f} ms, max {sync[-1]:.2f} ms; sort {sort_ms:.2f} ms", end="")
+    assert sync[-1] < 16
+    assert sort_ms < 16
+    assert frame[len(frame) // 2] < 50
@@ -0,0 +1,173 @@
+import pytest
+import requests
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+import page_timing
+from db_config import connect
+
+BASE_URL = "http://localhost/SE"
+PAGE_URL = f"{BASE_URL}/fetch_data_driver.html"
+API_URL = f"{BASE_URL}/fetch_data_driver.php"
+
+ROWS = 10000
+DELETES = 5
+
+
+# -------------------- Page Object --------------------
+class DriverAdminPage:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def load(self):
+        self.driver.get(PAGE_URL)
+        WebDriverWait(self.driver, 30).until(lambda d: d.execute_script(
+            "return driverSync.version !== null && driverView.index !== null && driverView.index.rows.length >= arguments[0]",
+            ROWS))
+        page_timing.capture(self.driver)
+
+    def scroll_to_middle(self):
+        self.driver.execute_script("""
+            driverTable.scroller.scrollTop = driverTable.scroller.scrollHeight / 2;
+            driverTable.renderWindow();
+        """)
+
+    def visible_sync_id(self):
+        """A seeded driver in the middle of the rendered window."""
+        return self.driver.execute_script("""
+            var rows = driverTable.rows.slice(driverTable.first, driverTable.first + driverTable.pool.length);
+            var seeded = rows.filter(function (row) { return row.Driver_ID.indexOf('SYNC') === 0; });
+            return seeded[Math.floor(seeded.length / 2)].Driver_ID;
+        """)
+
+    def delete_through_form(self, driver_id):
+        box = self.driver.find_element(By.ID, "Driver_ID")
+        box.clear()
+        box.send_keys(driver_id)
+        self.driver.find_element(By.XPATH, "//button[contains(text(), 'Delete Driver')]").click()
+        WebDriverWait(self.driver, 10).until(
+            lambda d: d.find_element(By.ID, "driverStatus").text != "")
+        return self.driver.find_element(By.ID, "driverStatus").text
+
+    def indexed_ids(self):
+        return set(self.driver.execute_script(
+            "return driverView.index.query('', null, false).map(function (row) { return row.Driver_ID; })"))
+
+    def measure(self, action, driver_id):
+        """Run one delete; count requests to the endpoint and DOM mutations under the table body."""
+        return self.driver.execute_async_script("""
+            var action = arguments[0], id = arguments[1], done = arguments[arguments.length - 1];
+            var requests = 0, mutations = 0;
+            var realFetch = window.fetch;
+            window.fetch = function (url) {
+                requests += 1;
+                return realFetch.apply(window, arguments);
+            };
+            var observer = new MutationObserver(function (records) {
+                records.forEach(function (r) {
+                    mutations += r.type === 'childList' ? r.addedNodes.length + r.removedNodes.length : 1;
+                });
+            });
+            observer.observe(driverTable.tbody, {childList: true, subtree: true, attributes: true, characterData: true});
+
+            var started = performance.now(), work;
+            if (action === 'patch') {
+                work = driverSync.remove(id);
+            } else {
+                // What the page did before: post the delete, then reload and refetch the whole list
+                var body = new FormData();
+                body.append('action', 'delete');
+                body.append('Driver_ID', id);
+                work = fetch('fetch_data_driver.php', {method: 'POST', body: body})
+                    .then(function () { return driverSync.load(); });
+            }
+            work.then(function () {
+                requestAnimationFrame(function () {
+                    var elapsed = performance.now() - started;
+                    observer.takeRecords();
+                    observer.disconnect();
+                    window.fetch = realFetch;
+                    done({requests: requests, mutations: mutations, ms: elapsed});
+                });
+            });
+        """, action, driver_id)
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def seeded():
+    conn = connect(autocommit=True)
+    ids = [f"SYNC{i:05d}" for i in range(ROWS)]
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO driver (Driver_ID, Name, Route, Point_no, Phone) VALUES (%s, %s, %s, %s, %s)",
+            [(i, f"Sync Driver {n}", f"Route {n % 16}", str(n), f"0300{n:07d}") for n, i in enumerate(ids)])
+    yield ids
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM driver WHERE Driver_ID LIKE 'SYNC%'")
+        cursor.execute("DELETE FROM table_change WHERE table_name = 'driver' AND Row_ID LIKE 'SYNC%'")
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    driver = webdriver.Chrome(options=options)
+    driver.set_script_timeout(60)
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def admin_page(driver, seeded):
+    page = DriverAdminPage(driver)
+    page.load()
+    page.scroll_to_middle()
+    return page
+
+
+# -------------------- Tests --------------------
+def test_delete_removes_the_row_without_reloading(admin_page):
+    driver_id = admin_page.visible_sync_id()
+    status = admin_page.delete_through_form(driver_id)
+
+    assert "deleted successfully" in status
+    assert admin_page.driver.current_url == PAGE_URL
+    assert driver_id not in admin_page.indexed_ids()
+    stats = admin_page.driver.execute_script("return driverSync.stats")
+    assert stats["requests"] == 2  # the initial list and the delete
+    assert stats["deltaFetches"] == 0
+
+
+def test_stale_page_reconciles_with_a_delta_fetch(admin_page):
+    # Another admin deletes a driver this page still shows
+    other = admin_page.visible_sync_id()
+    assert requests.post(API_URL, data={"action": "delete", "Driver_ID": other}).json()["deleted"] == [other]
+
+    mine = admin_page.driver.execute_script(
+        "return driverTable.rows[driverTable.first + 1].Driver_ID")
+    admin_page.delete_through_form(mine)
+
+    ids = admin_page.indexed_ids()
+    assert other not in ids and mine not in ids
+    stats = admin_page.driver.execute_script("return driverSync.stats")
+    assert stats["deltaFetches"] == 1
+    server_version = requests.get(API_URL, params={"since": 0}).json()["v"]
+    assert admin_page.driver.execute_script("return driverSync.version") == server_version
+
+
+def test_benchmark_delete_at_10k_rows(admin_page):
+    results = {}
+    for action in ("reload", "patch"):
+        runs = [admin_page.measure(action, admin_page.visible_sync_id()) for _ in range(DELETES)]
+        results[action] = {key: sorted(run[key] for run in runs)[DELETES // 2] for key in runs[0]}
+
+    for action, r in results.items():
+        print(f"\n{action} at {ROWS} rows: {r['requests']} round trips, "
+              f"{r['mutations']} DOM mutations, {r['ms']:.1f} ms per delete (median of {DELETES})", end="")
+    assert results["patch"]["requests"] == 1
+    assert results["reload"]["requests"] == 2
+    assert results["patch"]["mutations"] < results["reload"]["mutations"]
+    assert results["patch"]["ms"] < results["reload"]["ms"]
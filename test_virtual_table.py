@@ -0,0 +1,151 @@
+import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+import page_timing
+
+BASE_URL = "http://localhost/SE/fetch_data_driver.html"
+
+SIZES = [1000, 10000, 100000]
+SCROLL_FRAMES = 120
+
+
+# -------------------- Page Object --------------------
+class DriverTablePage:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def load(self):
+        self.driver.get(BASE_URL)
+        # Wait for the real data (or the empty message) so it can't overwrite synthetic rows
+        WebDriverWait(self.driver, 10).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, "#driverTableBody tr")
+        )
+        page_timing.capture(self.driver)
+
+    def time_to_first_row(self, count):
+        """Render `count` synthetic drivers; time until the frame after the first row is in the DOM."""
+        return self.driver.execute_async_script("""
+            var count = arguments[0], done = arguments[arguments.length - 1];
+            var rows = [];
+            for (var i = 0; i < count; i++) {
+                rows.push({Name: 'Driver ' + i, Driver_ID: 'VT' + i, Route: 'Route ' + (i % 16),
+                           Point_no: String(i), Phone: '0300' + i});
+            }
+            var started = performance.now();
+            driverTable.setRows(rows);
+            var syncMs = performance.now() - started;
+            requestAnimationFrame(function () {
+                requestAnimationFrame(function () {
+                    done({
+                        syncMs: syncMs,
+                        firstFrameMs: performance.now() - started,
+                        domRows: document.querySelectorAll('#driverTableBody tr:not(.vt-spacer)').length,
+                        firstText: document.querySelector('#driverTableBody tr:not(.vt-spacer) td').textContent
+                    });
+                });
+            });
+        """, count)
+
+    def scroll_benchmark(self, frames):
+        """Jump through the table one screen per frame, timing window refill plus layout."""
+        return self.driver.execute_async_script("""
+            var frames = arguments[0], done = arguments[arguments.length - 1];
+            var scroller = driverTable.scroller;
+            var work = [], gaps = [], last = null, n = 0;
+            var step = Math.max(1, (scroller.scrollHeight - scroller.clientHeight) / (frames - 1));
+            function frame(timestamp) {
+                if (last !== null) { gaps.push(timestamp - last); }
+                last = timestamp;
+                var started = performance.now();
+                scroller.scrollTop = Math.round(step * n);
+                driverTable.renderWindow();
+                void scroller.scrollHeight;   // flush layout inside the measurement
+                work.push(performance.now() - started);
+                if (++n < frames) {
+                    requestAnimationFrame(frame);
+                } else {
+                    work.sort(function (a, b) { return a - b; });
+                    gaps.sort(function (a, b) { return a - b; });
+                    var lastRow = document.querySelectorAll('#driverTableBody tr:not(.vt-spacer)');
+                    done({
+                        meanMs: work.reduce(function (a, b) { return a + b; }, 0) / work.length,
+                        p95Ms: work[Math.floor(work.length * 0.95)],
+                        maxMs: work[work.length - 1],
+                        p95GapMs: gaps[Math.floor(gaps.length * 0.95)],
+                        domRows: lastRow.length,
+                        lastText: lastRow[lastRow.length - 1].firstChild.textContent
+                    });
+                }
+            }
+            requestAnimationFrame(frame);
+        """, frames)
+
+    def legacy_render(self, count):
+        """The old per-row innerHTML + appendChild loop, for comparison."""
+        return self.driver.execute_script("""
+            var count = arguments[0];
+            var tableBody = document.getElementById('driverTableBody');
+            driverTable.teardown();
+            tableBody.replaceChildren();
+            var started = performance.now();
+            for (var i = 0; i < count; i++) {
+                var row = document.createElement('tr');
+                row.innerHTML = '<td>Driver ' + i + '</td><td>VT' + i + '</td><td>Route</td><td>' + i + '</td><td>0300</td>';
+                tableBody.appendChild(row);
+            }
+            void tableBody.offsetHeight;
+            return performance.now() - started;
+        """, count)
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture(scope="module")
+def driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--window-size=1280,900")
+    driver = webdriver.Chrome(options=options)
+    driver.set_script_timeout(120)
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def table_page(driver):
+    page = DriverTablePage(driver)
+    page.load()
+    return page
+
+
+# -------------------- Tests --------------------
+def test_small_tables_render_every_row(table_page):
+    result = table_page.time_to_first_row(300)
+    assert result["domRows"] == 300
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_time_to_first_row_and_scroll_frame_time(table_page, count):
+    first = table_page.time_to_first_row(count)
+    scroll = table_page.scroll_benchmark(SCROLL_FRAMES)
+
+    print(f"\n{count} rows: first row after {first['syncMs']:.1f} ms "
+          f"(next frame {first['firstFrameMs']:.1f} ms), {first['domRows']} DOM rows; "
+          f"scroll frame mean {scroll['meanMs']:.2f} ms, p95 {scroll['p95Ms']:.2f} ms, "
+          f"max {scroll['maxMs']:.2f} ms, p95 rAF gap {scroll['p95GapMs']:.1f} ms", end="")
+
+    assert first["firstText"] == "Driver 0"
+    assert first["domRows"] < 100
+    assert first["syncMs"] < 100
+    assert scroll["domRows"] == first["domRows"]
+    assert scroll["lastText"] == f"Driver {count - 1}"
+    assert scroll["p95Ms"] < 8
+
+
+def test_windowed_render_beats_per_row_append(table_page):
+    windowed = table_page.time_to_first_row(10000)["syncMs"]
+    legacy = table_page.legacy_render(10000)
+
+    print(f"\n10000 rows: windowed {windowed:.1f} ms vs per-row append {legacy:.1f} ms", end="")
+    assert windowed * 5 < legacy
@@ -0,0 +1,76 @@
+import time
+import pytest
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import wait_diagnostics
+from wait_diagnostics import Wait, WaitRecorder
+
+
+# -------------------- Pytest Fixtures --------------------
+@pytest.fixture
+def recorder():
+    recorder = WaitRecorder()
+    undo = wait_diagnostics.instrument(recorder)
+    recorder.nodeid = "test_x.py::test_x"
+    yield recorder
+    undo()
+
+
+def ready_after(seconds):
+    ready_at = time.perf_counter() + seconds
+    return lambda driver: time.perf_counter() >= ready_at
+
+
+# -------------------- Tests --------------------
+def test_expected_conditions_are_described_with_their_locator():
+    assert wait_diagnostics.describe(EC.url_contains("student.html")) == ("url_contains", "'student.html'")
+    assert wait_diagnostics.describe(EC.presence_of_element_located((By.ID, "Student_ID"))) == \
+        ("presence_of_element_located", "id=Student_ID")
+    condition, locator = wait_diagnostics.describe(lambda d: d.find_elements(By.CSS_SELECTOR, "tr"))
+    assert condition.startswith("lambda at test_wait_diagnostics.py:") and locator is None
+
+
+def test_wait_records_time_until_satisfied_and_timeout(recorder):
+    WebDriverWait(object(), 5, poll_frequency=0.05).until(ready_after(0.2))
+
+    [wait] = recorder.waits
+    assert wait.outcome == "ok" and wait.timeout == 5
+    assert 0.2 <= wait.waited < 1
+    assert wait.site.startswith("test_wait_diagnostics.py:") and wait.site.endswith("(test_wait_records_time_until_satisfied_and_timeout)")
+    assert wait.nodeid == "test_x.py::test_x"
+
+
+def test_timed_out_wait_is_recorded(recorder):
+    with pytest.raises(TimeoutException):
+        WebDriverWait(object(), 0.2, poll_frequency=0.05).until_not(lambda d: True)
+
+    [wait] = recorder.waits
+    assert wait.outcome == "timeout" and wait.condition.startswith("not lambda")
+    assert wait.waited >= 0.2
+
+
+def test_nothing_is_recorded_outside_a_test(recorder):
+    recorder.nodeid = None
+    WebDriverWait(object(), 1).until(lambda d: True)
+
+    assert recorder.waits == []
+
+
+def test_report_ranks_waits_and_marks_the_ones_near_their_timeout():
+    waits = [
+        Wait("t::a", "url_contains", "'student.html'", 49.0, 50, "ok", "test_system_flow.py:70 (test_a)"),
+        Wait("t::b", "url_contains", "'student.html'", 3.0, 50, "ok", "test_system_flow.py:70 (test_a)"),
+        Wait("t::c", "find_element", "id=Name", 10.0, 10, "missing", "test_system_flow.py:80 (test_c)"),
+        Wait("t::d", "find_element", "id=Name", 0.01, 10, "ok", "test_system_flow.py:90 (test_d)"),
+    ]
+
+    assert [w.nodeid for w in wait_diagnostics.slowest(waits, top=3)] == ["t::a", "t::c", "t::b"]
+    assert [bool(wait_diagnostics.near_timeout(w)) for w in waits] == [True, False, False, False]
+    assert wait_diagnostics.by_site(waits)[0] == ("test_system_flow.py:70 (test_a)", "url_contains", 2, 52.0, 49.0, 50)
+
+    lines = wait_diagnostics.format_report(waits, top=2).splitlines()
+    assert lines[1] == "  49.00s      50s! ok       url_contains 'student.html'"
+    assert lines[3].startswith("  10.00s      10s  missing  find_element id=Name")
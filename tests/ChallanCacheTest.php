@@ -0,0 +1,131 @@
+<?php
+use PHPUnit\Framework\TestCase;
+
+class ChallanCacheTest extends TestCase
+{
+    protected $dir;
+
+    protected function setUp(): void
+    {
+        require_once('ChallanCache.php');
+        $this->dir = sys_get_temp_dir() . '/challans_' . uniqid();
+    }
+
+    protected function tearDown(): void
+    {
+        if (!is_dir($this->dir)) {
+            return;
+        }
+        $files = new RecursiveIteratorIterator(
+            new RecursiveDirectoryIterator($this->dir, FilesystemIterator::SKIP_DOTS),
+            RecursiveIteratorIterator::CHILD_FIRST
+        );
+        foreach ($files as $file) {
+            $file->isDir() ? rmdir($file->getPathname()) : unlink($file->getPathname());
+        }
+        rmdir($this->dir);
+    }
+
+    /**
+     * Mock connection whose student query streams $rows
+     */
+    private function makeConnection($rows)
+    {
+        $result = $this->createMock(mysqli_result::class);
+        $result->method('fetch_row')->willReturnOnConsecutiveCalls(...array_merge($rows, [null]));
+        $conn = $this->createMock(mysqli::class);
+        $conn->method('query')->willReturn($result);
+        return $conn;
+    }
+
+    private function makeRows($count)
+    {
+        $rows = [];
+        for ($i = 0; $i < $count; $i++) {
+            $rows[] = ["K$i", "Student $i"];
+        }
+        return $rows;
+    }
+
+    /**
+     * Test 1: A second run over unchanged students renders and writes nothing
+     */
+    public function testGenerateBulk_WhenStudentsAreUnchanged_ServesEveryChallanFromCache()
+    {
+        // Arrange
+        $rows = $this->makeRows(50);
+        ChallanGenerator::generateBulk($this->makeConnection($rows), $this->dir);
+        $file = $this->dir . '/0000/K7_challan.html';
+        $before = file_get_contents($file);
+        touch($file, time() - 3600);
+        clearstatcache();
+
+        // Act
+        $stats = ChallanGenerator::generateBulk($this->makeConnection($rows), $this->dir);
+        clearstatcache();
+
+        // Assert
+        $this->assertEquals(50, $stats['count']);
+        $this->assertEquals(50, $stats['hits']);
+        $this->assertEquals(0, $stats['misses']);
+        $this->assertEquals(0, $stats['bytes']);
+        $this->assertSame($before, file_get_contents($file));
+        $this->assertLessThan(time() - 3000, filemtime($file));
+    }
+
+    /**
+     * Test 2: Changed students are re-rendered in place and removed students are deleted
+     */
+    public function testGenerateBulk_WhenStudentsChange_RegeneratesOnlyThoseChallans()
+    {
+        // Arrange
+        $rows = $this->makeRows(50);
+        ChallanGenerator::generateBulk($this->makeConnection($rows), $this->dir);
+        $rows[3][1] = 'Renamed Student';
+        unset($rows[10]);
+
+        // Act
+        $stats = ChallanGenerator::generateBulk($this->makeConnection(array_values($rows)), $this->dir);
+        $cache = new ChallanCache($this->dir);
+
+        // Assert
+        $this->assertEquals(48, $stats['hits']);
+        $this->assertEquals(1, $stats['misses']);
+        $this->assertEquals(1, $stats['removed']);
+        $this->assertEquals('0000/K3_challan.html', $cache->entry('K3')['path']);
+        $this->assertStringContainsString('Renamed Student', file_get_contents($this->dir . '/0000/K3_challan.html'));
+        $this->assertFileDoesNotExist($this->dir . '/0000/K10_challan.html');
+        $this->assertNull($cache->entry('K10'));
+        $this->assertEquals(49, $cache->count());
+    }
+
+    /**
+     * Test 3: The key changes with the printed fields and nothing else
+     */
+    public function testKey_WhenFieldsChange_ChangesKey()
+    {
+        // Act & Assert
+        $this->assertSame(ChallanCache::key('K1', 'John Doe'), ChallanCache::key('K1', 'John Doe'));
+        $this->assertNotSame(ChallanCache::key('K1', 'John Doe'), ChallanCache::key('K1', 'Jane Doe'));
+        $this->assertNotSame(ChallanCache::key('K1', 'John Doe'), ChallanCache::key('K2', 'John Doe'));
+    }
+
+    /**
+     * Test 4: A missing file is a miss even when the index still lists it
+     */
+    public function testLookup_WhenFileWasDeleted_ReportsMiss()
+    {
+        // Arrange
+        ChallanGenerator::generateBulk($this->makeConnection($this->makeRows(5)), $this->dir);
+        unlink($this->dir . '/0000/K2_challan.html');
+        $cache = new ChallanCache($this->dir);
+
+        // Act
+        $path = $cache->lookup('K2', ChallanCache::key('K2', 'Student 2'));
+
+        // Assert
+        $this->assertFalse($path);
+        $this->assertEquals(1, $cache->misses);
+        $this->assertEquals(0, $cache->hits);
+    }
+}
@@ -0,0 +1,168 @@
+<?php
+use PHPUnit\Framework\TestCase;
+
+class EtaServiceTest extends TestCase
+{
+    protected $conn;
+
+    protected function setUp(): void
+    {
+        require_once('EtaService.php');
+
+        // Route indexes are injected, so the connection is never queried
+        $this->conn = $this->createMock(mysqli::class);
+    }
+
+    /**
+     * Builds a route of $count stops from a start point towards campus
+     */
+    private function makeStops($startLat, $startLng, $count = 6)
+    {
+        $stops = [];
+        for ($i = 0; $i < $count; $i++) {
+            $f = $i / ($count - 1);
+            $bend = 0.003 * sin(M_PI * $f);
+            $stops[] = [
+                'name' => "Stop " . ($i + 1),
+                'lat' => $startLat + (24.964290 - $startLat) * $f + $bend,
+                'lng' => $startLng + (67.128804 - $startLng) * $f - $bend,
+            ];
+        }
+        return $stops;
+    }
+
+    /**
+     * Reference answer: the closest point over every segment
+     */
+    private function bruteForceOffset($stops, $lat, $lng)
+    {
+        $scale = cos(deg2rad($stops[0]['lat'])) * 111320.0;
+        $best = INF;
+        for ($i = 0; $i < count($stops) - 1; $i++) {
+            $ax = ($stops[$i]['lng'] - $stops[0]['lng']) * $scale;
+            $ay = ($stops[$i]['lat'] - $stops[0]['lat']) * 111320.0;
+            $bx = ($stops[$i + 1]['lng'] - $stops[0]['lng']) * $scale;
+            $by = ($stops[$i + 1]['lat'] - $stops[0]['lat']) * 111320.0;
+            $px = ($lng - $stops[0]['lng']) * $scale;
+            $py = ($lat - $stops[0]['lat']) * 111320.0;
+            $dx = $bx - $ax;
+            $dy = $by - $ay;
+            $t = max(0, min(1, (($px - $ax) * $dx + ($py - $ay) * $dy) / ($dx * $dx + $dy * $dy)));
+            $best = min($best, hypot($px - ($ax + $dx * $t), $py - ($ay + $dy * $t)));
+        }
+        return $best;
+    }
+
+    /**
+     * Test 1: Snapping matches a brute-force scan for points near and far from the route
+     */
+    public function testSnap_WhenBusIsAnywhere_FindsClosestPointOnRoute()
+    {
+        // Arrange
+        $stops = $this->makeStops(24.8300, 67.1300);
+        $index = new RouteIndex($stops);
+        mt_srand(1);
+
+        // Act & Assert
+        for ($i = 0; $i < 500; $i++) {
+            $lat = 24.80 + mt_rand() / mt_getrandmax() * 0.2;
+            $lng = 67.10 + mt_rand() / mt_getrandmax() * 0.06;
+            $snapped = $index->snap($lat, $lng);
+            $this->assertEqualsWithDelta($this->bruteForceOffset($stops, $lat, $lng), $snapped['offset'], 0.01);
+        }
+    }
+
+    /**
+     * Test 2: A bus on a stop has that stop as the next one with zero distance
+     */
+    public function testRemainingStops_WhenBusIsAtStop_StartsFromThatStop()
+    {
+        // Arrange
+        $stops = $this->makeStops(24.8300, 67.1300);
+        $index = new RouteIndex($stops);
+
+        // Act
+        $snapped = $index->snap($stops[2]['lat'], $stops[2]['lng']);
+        $remaining = $index->remainingStops($snapped['along']);
+
+        // Assert
+        $this->assertCount(4, $remaining);
+        $this->assertEquals(3, $remaining[0]['seq']);
+        $this->assertEqualsWithDelta(0, $remaining[0]['distance_m'], 0.5);
+        $this->assertEqualsWithDelta($index->totalLength() - $snapped['along'], end($remaining)['distance_m'], 0.5);
+    }
+
+    /**
+     * Test 3: ETAs grow along the route and are cached until the fix changes
+     */
+    public function testCompute_WhenFixIsUnchanged_ServesFromCache()
+    {
+        // Arrange
+        $service = new EtaService($this->conn);
+        $service->setRouteIndex('Korangi', new RouteIndex($this->makeStops(24.8300, 67.1300)));
+
+        // Act
+        $first = $service->compute('D_10', 'Korangi', 24.85, 67.13);
+        $second = $service->compute('D_10', 'Korangi', 24.85, 67.13);
+        $moved = $service->compute('D_10', 'Korangi', 24.90, 67.13);
+
+        // Assert
+        $this->assertSame($first, $second);
+        $this->assertNotSame($first, $moved);
+        $this->assertEquals(1, $service->hits);
+        $this->assertEquals(2, $service->misses);
+
+        $etas = array_column($first['stops'], 'eta_s');
+        $sorted = $etas;
+        sort($sorted);
+        $this->assertSame($sorted, $etas);
+        $this->assertLessThanOrEqual(count($first['stops']), count($moved['stops']));
+    }
+
+    /**
+     * Test 4: Benchmark - snapping and ETAs for a whole fleet stay sub-millisecond per bus
+     */
+    public function testBenchmark_WhenWholeFleetIsSnapped_StaysUnderOneMillisecondPerBus()
+    {
+        // Arrange: 16 routes with 40 stops each, 2,000 buses spread over them
+        $service = new EtaService($this->conn);
+        $routes = [];
+        for ($r = 0; $r < 16; $r++) {
+            $route = "Route $r";
+            $stops = $this->makeStops(24.80 + $r * 0.01, 66.99 + $r * 0.01, 40);
+            $service->setRouteIndex($route, new RouteIndex($stops));
+            $routes[$route] = $stops;
+        }
+
+        mt_srand(7);
+        $fleet = [];
+        for ($bus = 0; $bus < 2000; $bus++) {
+            $route = "Route " . ($bus % 16);
+            $stop = $routes[$route][mt_rand(0, 38)];
+            $fleet[] = ["D_$bus", $route, $stop['lat'] + mt_rand(-100, 100) / 1e5, $stop['lng'] + mt_rand(-100, 100) / 1e5];
+        }
+
+        // Act
+        $started = hrtime(true);
+        foreach ($fleet as $bus) {
+            $service->compute($bus[0], $bus[1], $bus[2], $bus[3]);
+        }
+        $elapsedMs = (hrtime(true) - $started) / 1e6;
+
+        $cachedStarted = hrtime(true);
+        foreach ($fleet as $bus) {
+            $service->compute($bus[0], $bus[1], $bus[2], $bus[3]);
+        }
+        $cachedMs = (hrtime(true) - $cachedStarted) / 1e6;
+
+        // Assert
+        $perBusMs = $elapsedMs / count($fleet);
+        fwrite(STDERR, sprintf(
+            "\nETA fleet benchmark: %d buses in %.1f ms (%.3f ms/bus, %.0f buses/s); cached pass %.1f ms\n",
+            count($fleet), $elapsedMs, $perBusMs, count($fleet) / ($elapsedMs / 1000), $cachedMs
+        ));
+        $this->assertLessThan(1.0, $perBusMs);
+        $this->assertLessThan($elapsedMs, $cachedMs);
+        $this->assertEquals(count($fleet), $service->hits);
+    }
+}
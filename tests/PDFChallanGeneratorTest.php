@@ -158,4 +158,70 @@ class PDFChallanGeneratorTest extends TestCase
             unlink($expectedFileName);
         }
     }
-}
\ No newline at end of file
+
+    /**
+     * Test 7: Template Rendering Test
+     * Tests that render() produces the same challan generateChallan writes to disk
+     */
+    public function testRender_WhenGivenSameTimestamp_MatchesGeneratedFile()
+    {
+        // Arrange
+        require_once('ChallanGenerator.php');
+        $studentId = '12345';
+        $studentName = 'John Doe <b>';
+        $expectedFileName = $studentId . '_challan.html';
+
+        // Act
+        ChallanGenerator::generateChallan($studentId, $studentName);
+        $fileContent = file_get_contents($expectedFileName);
+        preg_match('/generated on (\S+ \S+)/', $fileContent, $match);
+        $rendered = ChallanGenerator::render($studentId, $studentName, $match[1]);
+
+        // Assert
+        $this->assertSame($fileContent, $rendered);
+        $this->assertStringNotContainsString('{{', $rendered);
+
+        // Clean up
+        if (file_exists($expectedFileName)) {
+            unlink($expectedFileName);
+        }
+    }
+
+    /**
+     * Test 8: Bulk Generation Test
+     * Tests that every streamed student row ends up in the tar archive
+     */
+    public function testGenerateBulk_WhenWritingTar_ArchivesEveryStudent()
+    {
+        // Arrange
+        require_once('ChallanGenerator.php');
+        $rows = [];
+        for ($i = 0; $i < 1500; $i++) {
+            $rows[] = ["K$i", "Student $i"];
+        }
+        $result = $this->createMock(mysqli_result::class);
+        $result->method('fetch_row')->willReturnOnConsecutiveCalls(...array_merge($rows, [null]));
+        $conn = $this->createMock(mysqli::class);
+        $conn->method('query')->willReturn($result);
+        $archive = sys_get_temp_dir() . '/challans_' . uniqid() . '.tar';
+
+        // Act
+        $stats = ChallanGenerator::generateBulk($conn, $archive);
+        $tar = new PharData($archive);
+        $shards = [];
+        foreach (new RecursiveIteratorIterator($tar) as $file) {
+            $shard = basename(dirname($file->getPathname()));
+            $shards[$shard] = ($shards[$shard] ?? 0) + 1;
+        }
+
+        // Assert
+        $this->assertEquals(1500, $stats['count']);
+        $this->assertEquals('tar', $stats['format']);
+        $this->assertSame(['0000' => 1000, '0001' => 500], $shards);
+        $this->assertStringContainsString('Student Name: Student 1499', $tar['0001/K1499_challan.html']->getContent());
+
+        // Clean up
+        unset($tar);
+        unlink($archive);
+    }
+}
@@ -0,0 +1,110 @@
+<?php
+use PHPUnit\Framework\TestCase;
+
+class RouteRosterTest extends TestCase
+{
+    protected $conn;
+
+    protected function setUp(): void
+    {
+        require_once('RouteRoster.php');
+
+        $this->conn = $this->createMock(mysqli::class);
+    }
+
+    /**
+     * Statement mock whose execute() returns $ok
+     */
+    private function statement($ok = true)
+    {
+        $stmt = $this->createMock(mysqli_stmt::class);
+        $stmt->method('execute')->willReturn($ok);
+        return $stmt;
+    }
+
+    /**
+     * Test 1: Only point_details keys can select roster rows
+     */
+    public function testRefresh_WhenColumnIsNotAKey_Throws()
+    {
+        // Arrange
+        $roster = new RouteRoster($this->conn);
+
+        // Assert
+        $this->expectException(InvalidArgumentException::class);
+
+        // Act
+        $roster->refresh('Name; DROP TABLE student', 'x');
+    }
+
+    /**
+     * Test 2: A refresh replaces the rows of that driver with the join's rows for it
+     */
+    public function testRefresh_ByDriver_DeletesThenRecomputesThatDriversRows()
+    {
+        // Arrange
+        $sql = [];
+        $this->conn->expects($this->exactly(2))
+            ->method('prepare')
+            ->willReturnCallback(function ($query) use (&$sql) {
+                $sql[] = $query;
+                return $this->statement();
+            });
+        $roster = new RouteRoster($this->conn);
+
+        // Act
+        $ok = $roster->refresh('Driver_ID', 'D_12');
+
+        // Assert
+        $this->assertTrue($ok);
+        $this->assertEquals("DELETE FROM route_roster WHERE `Driver_ID` = ?", $sql[0]);
+        $this->assertStringStartsWith("INSERT INTO route_roster (Route, Point_no, Student_ID", $sql[1]);
+        $this->assertStringEndsWith("WHERE p.`Driver_ID` = ?", $sql[1]);
+    }
+
+    /**
+     * Test 3: A failed delete stops the refresh so the caller rolls back
+     */
+    public function testRefresh_WhenDeleteFails_ReturnsFalseWithoutInserting()
+    {
+        // Arrange
+        $this->conn->expects($this->once())
+            ->method('prepare')
+            ->willReturn($this->statement(false));
+        $roster = new RouteRoster($this->conn);
+
+        // Act
+        $ok = $roster->refresh('Student_ID', 'k213199');
+
+        // Assert
+        $this->assertFalse($ok);
+    }
+
+    /**
+     * Test 4: Assigning a point rewrites point_details and that point's roster row in one transaction
+     */
+    public function testAssign_WhenPointIsFree_RefreshesThePointAndCommits()
+    {
+        // Arrange
+        $sql = [];
+        $this->conn->method('prepare')
+            ->willReturnCallback(function ($query) use (&$sql) {
+                $sql[] = $query;
+                return $this->statement();
+            });
+        $this->conn->expects($this->once())->method('begin_transaction');
+        $this->conn->expects($this->once())->method('commit');
+        $this->conn->expects($this->never())->method('rollback');
+        $roster = new RouteRoster($this->conn);
+
+        // Act
+        $result = $roster->assign('21', 'Gulshan', 'k213199', 'D_12');
+
+        // Assert
+        $this->assertTrue($result);
+        $this->assertEquals("DELETE FROM point_details WHERE Point_no = ?", $sql[0]);
+        $this->assertStringStartsWith("INSERT INTO point_details", $sql[1]);
+        $this->assertEquals("DELETE FROM route_roster WHERE `Point_no` = ?", $sql[2]);
+        $this->assertStringEndsWith("WHERE p.`Point_no` = ?", $sql[3]);
+    }
+}
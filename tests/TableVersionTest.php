@@ -0,0 +1,83 @@
+<?php
+use PHPUnit\Framework\TestCase;
+
+class TableVersionTest extends TestCase
+{
+    protected $conn;
+
+    protected function setUp(): void
+    {
+        require_once('TableVersion.php');
+
+        $this->conn = $this->createMock(mysqli::class);
+    }
+
+    /**
+     * Statement mock whose result yields $rows from both fetch_row and fetch_assoc
+     */
+    private function statementReturning($rows)
+    {
+        $result = $this->createMock(mysqli_result::class);
+        $result->method('fetch_row')->willReturnOnConsecutiveCalls(...array_merge(array_map('array_values', $rows), [null]));
+        $result->method('fetch_assoc')->willReturnOnConsecutiveCalls(...array_merge($rows, [null]));
+
+        $stmt = $this->createMock(mysqli_stmt::class);
+        $stmt->method('execute')->willReturn(true);
+        $stmt->method('get_result')->willReturn($result);
+        return $stmt;
+    }
+
+    /**
+     * Test 1: Only the driver and student tables carry versions
+     */
+    public function testConstructor_WhenTableIsUnknown_Throws()
+    {
+        // Arrange & Assert
+        $this->expectException(InvalidArgumentException::class);
+
+        // Act
+        new TableVersion($this->conn, 'admin_login');
+    }
+
+    /**
+     * Test 2: A caller at the current version gets nothing and costs one lookup
+     */
+    public function testChangesSince_WhenCallerIsCurrent_ReturnsNoChanges()
+    {
+        // Arrange
+        $this->conn->expects($this->once())
+            ->method('prepare')
+            ->willReturn($this->statementReturning([['version' => 7]]));
+        $versions = new TableVersion($this->conn, 'student');
+
+        // Act
+        $changes = $versions->changesSince(7);
+
+        // Assert
+        $this->assertEquals(["v" => 7, "deleted" => [], "rows" => []], $changes);
+    }
+
+    /**
+     * Test 3: Tombstones and rows deleted after their change come back as IDs, the rest as rows
+     */
+    public function testChangesSince_WhenRowsChanged_SplitsDeletedFromChanged()
+    {
+        // Arrange
+        $changed = ['Row_ID' => 'D_2', 'deleted' => 0, 'Driver_ID' => 'D_2', 'Name' => 'Ali', 'Route' => 'Gulshan', 'Point_no' => '2', 'Phone' => '0300'];
+        $tombstone = ['Row_ID' => 'D_3', 'deleted' => 1, 'Driver_ID' => null, 'Name' => null, 'Route' => null, 'Point_no' => null, 'Phone' => null];
+        $vanished = ['Row_ID' => 'D_4', 'deleted' => 0, 'Driver_ID' => null, 'Name' => null, 'Route' => null, 'Point_no' => null, 'Phone' => null];
+        $this->conn->method('prepare')->willReturnOnConsecutiveCalls(
+            $this->statementReturning([['version' => 12]]),
+            $this->statementReturning([$changed, $tombstone, $vanished])
+        );
+        $versions = new TableVersion($this->conn, 'driver');
+
+        // Act
+        $changes = $versions->changesSince(9);
+
+        // Assert
+        $this->assertEquals(12, $changes["v"]);
+        $this->assertEquals(['D_3', 'D_4'], $changes["deleted"]);
+        $this->assertEquals([['Driver_ID' => 'D_2', 'Name' => 'Ali', 'Route' => 'Gulshan', 'Point_no' => '2', 'Phone' => '0300']], $changes["rows"]);
+    }
+}
@@ -4,11 +4,65 @@ $username = "root";
 $password = "";
 $db_name = "point_management";
 
+$port = 3307;
 
 if ($_SERVER["REQUEST_METHOD"] == "POST") {
     $latitude = $_POST['lat'];
     $longitude = $_POST['lng'];
+
+    // Fixes sent by a bus carry its Driver_ID and are persisted; map clicks are only echoed
+    if (isset($_POST['Driver_ID']) && is_numeric($latitude) && is_numeric($longitude)) {
+        $conn = new mysqli($servername, $username, $password, $db_name, $port);
+
+        if ($conn->connect_error) {
+            die("Connection failed: " . $conn->connect_error);
+        }
+
+        $driverID = $_POST['Driver_ID'];
+
+        // Only drivers in the driver table can report a position
+        $checkStmt = $conn->prepare("SELECT Driver_ID FROM driver WHERE Driver_ID = ?");
+        $checkStmt->bind_param("s", $driverID);
+        $checkStmt->execute();
+        $checkStmt->store_result();
+        $known = $checkStmt->num_rows > 0;
+        $checkStmt->close();
+
+        if (!$known) {
+            $conn->close();
+            http_response_code(404);
+            die("Unknown driver: " . htmlspecialchars($driverID));
+        }
+
+        $latE5 = (int) round($latitude * 100000);
+        $lngE5 = (int) round($longitude * 100000);
+
+        // The history row needs no ordering, so it is written before the counter is touched
+        $historyStmt = $conn->prepare("INSERT INTO location_history (Driver_ID, lat, lng, recorded_at) VALUES (?, ?, ?, NOW(3))");
+        $historyStmt->bind_param("sdd", $driverID, $latitude, $longitude);
+        $historyStmt->execute();
+        $historyStmt->close();
+
+        // The counter row stays locked until commit, so versions become visible in order.
+        // Only the bump and the position it stamps share the transaction: two
+        // primary-key writes, so every other bus waits for as little as possible.
+        $conn->begin_transaction();
+        $conn->query("UPDATE tracking_version SET version = LAST_INSERT_ID(version + 1) WHERE id = 1");
+        $version = $conn->insert_id;
+
+        $stmt = $conn->prepare(
+            "INSERT INTO driver_location (Driver_ID, lat_e5, lng_e5, recorded_at, version) VALUES (?, ?, ?, NOW(3), ?)
+             ON DUPLICATE KEY UPDATE lat_e5 = VALUES(lat_e5), lng_e5 = VALUES(lng_e5), recorded_at = VALUES(recorded_at), version = VALUES(version)"
+        );
+        $stmt->bind_param("siii", $driverID, $latE5, $lngE5, $version);
+        $stmt->execute();
+        $stmt->close();
+
+        $conn->commit();
+        $conn->close();
+    }
+
     // Process the coordinates
     echo "AJAX Received: Latitude = $latitude, Longitude = $longitude";
 }
-?>
\ No newline at end of file
+?>
@@ -0,0 +1,249 @@
+/**
+ * Windowed rendering for the admin data tables.
+ *
+ * Small tables (up to FULL_RENDER_LIMIT rows) are built off-DOM in a single
+ * DocumentFragment and inserted with one append, so the browser lays the
+ * table out once instead of once per row. Larger tables only keep DOM rows
+ * for the visible window plus OVERSCAN rows on each side: a fixed pool of
+ * <tr> elements is refilled on scroll, and two spacer rows stand in for the
+ * rows above and below the window so the scrollbar still covers the whole
+ * table. Cells are filled through textContent, never innerHTML.
+ */
+var VirtualTable = (function () {
+    var FULL_RENDER_LIMIT = 500;
+    var OVERSCAN = 10;
+    var VIEWPORT_PX = 480;
+    var DEFAULT_ROW_PX = 39;
+
+    /**
+     * @param {HTMLElement} tbody Table body to render into
+     * @param {string[]} columns Row fields, in column order
+     * @param {Object} [options] emptyText, viewportPx, fullRenderLimit
+     */
+    function VirtualTable(tbody, columns, options) {
+        options = options || {};
+        this.tbody = tbody;
+        this.columns = columns;
+        this.emptyText = options.emptyText || 'No items found.';
+        this.viewportPx = options.viewportPx || VIEWPORT_PX;
+        this.fullRenderLimit = options.fullRenderLimit === undefined ? FULL_RENDER_LIMIT : options.fullRenderLimit;
+        // Scrolls in windowed mode; the table is wrapped in .table-scroll by the page
+        this.scroller = tbody.closest('.table-scroll') || tbody.parentNode.parentNode;
+        this.rows = [];
+        this.pool = [];
+        this.rowPx = DEFAULT_ROW_PX;
+        this.first = -1;
+        this.frameId = null;
+        this.windowed = false;
+        this.stats = { windowUpdates: 0, totalUpdateMs: 0, maxUpdateMs: 0 };
+
+        var self = this;
+        this.onScroll = function () {
+            if (self.frameId === null) {
+                self.frameId = requestAnimationFrame(function () {
+                    self.frameId = null;
+                    self.renderWindow();
+                });
+            }
+        };
+    }
+
+    VirtualTable.prototype.createRow = function () {
+        var row = document.createElement('tr');
+        for (var i = 0; i < this.columns.length; i++) {
+            row.appendChild(document.createElement('td'));
+        }
+        return row;
+    };
+
+    VirtualTable.prototype.fillRow = function (row, record) {
+        var cells = row.children;
+        for (var i = 0; i < this.columns.length; i++) {
+            var value = record[this.columns[i]];
+            var text = value === null || value === undefined ? '' : String(value);
+            // Rows above an in-place delete keep their text; leave those cells alone
+            if (cells[i].textContent !== text) {
+                cells[i].textContent = text;
+            }
+        }
+    };
+
+    VirtualTable.prototype.spacer = function () {
+        var row = document.createElement('tr');
+        row.className = 'vt-spacer';
+        var cell = document.createElement('td');
+        cell.colSpan = this.columns.length;
+        cell.style.padding = '0';
+        cell.style.border = '0';
+        cell.style.height = '0px';
+        row.appendChild(cell);
+        return row;
+    };
+
+    /**
+     * Show a single full-width message row.
+     */
+    VirtualTable.prototype.message = function (text) {
+        this.teardown();
+        var row = document.createElement('tr');
+        var cell = document.createElement('td');
+        cell.colSpan = this.columns.length;
+        cell.textContent = text;
+        row.appendChild(cell);
+        this.tbody.replaceChildren(row);
+    };
+
+    /**
+     * Replace the table contents with these records.
+     *
+     * @param {Object[]} rows Records keyed by column name
+     */
+    VirtualTable.prototype.setRows = function (rows) {
+        this.teardown();
+        this.rows = rows;
+        if (rows.length === 0) {
+            this.message(this.emptyText);
+        } else if (rows.length <= this.fullRenderLimit) {
+            this.renderAll();
+        } else {
+            this.startWindow();
+        }
+    };
+
+    /**
+     * Show a new version of the current rows, keeping the scroll position.
+     *
+     * Meant for in-place edits such as deletes. A windowed table refills its
+     * pool from the same scroll offset; a fully rendered table removes the
+     * <tr> of every record that is no longer in `rows`, provided `rows` is
+     * the old list minus some records. Anything else falls back to setRows().
+     *
+     * @param {Object[]} rows Records keyed by column name
+     */
+    VirtualTable.prototype.update = function (rows) {
+        if (this.windowed && rows.length > this.fullRenderLimit) {
+            this.rows = rows;
+            this.first = -1;
+            this.renderWindow();
+        } else if (this.windowed || rows.length === 0 || this.rows.length === 0 || !this.removeMissing(rows)) {
+            this.setRows(rows);
+        }
+    };
+
+    /**
+     * Remove the <tr> of every record missing from `rows`.
+     *
+     * @return {boolean} False, with the DOM untouched, if `rows` is not a subsequence of the current rows
+     */
+    VirtualTable.prototype.removeMissing = function (rows) {
+        var missing = [];
+        var j = 0;
+        for (var i = 0; i < this.rows.length; i++) {
+            if (j < rows.length && this.rows[i] === rows[j]) {
+                j++;
+            } else {
+                missing.push(i);
+            }
+        }
+        if (j !== rows.length) {
+            return false;
+        }
+        var trs = this.tbody.children;
+        for (var m = missing.length - 1; m >= 0; m--) {
+            trs[missing[m]].remove();
+        }
+        this.rows = rows;
+        return true;
+    };
+
+    VirtualTable.prototype.renderAll = function () {
+        var fragment = document.createDocumentFragment();
+        for (var i = 0; i < this.rows.length; i++) {
+            var row = this.createRow();
+            this.fillRow(row, this.rows[i]);
+            fragment.appendChild(row);
+        }
+        this.tbody.replaceChildren(fragment);
+    };
+
+    VirtualTable.prototype.startWindow = function () {
+        this.windowed = true;
+        this.scroller.style.maxHeight = this.viewportPx + 'px';
+        this.scroller.style.overflowY = 'auto';
+
+        // Measure one real row so spacer heights match the stylesheet
+        var probe = this.createRow();
+        this.fillRow(probe, this.rows[0]);
+        this.tbody.replaceChildren(probe);
+        this.rowPx = probe.getBoundingClientRect().height || DEFAULT_ROW_PX;
+
+        var poolSize = Math.min(this.rows.length, Math.ceil(this.viewportPx / this.rowPx) + 2 * OVERSCAN);
+        var fragment = document.createDocumentFragment();
+        this.topSpacer = this.spacer();
+        this.bottomSpacer = this.spacer();
+        fragment.appendChild(this.topSpacer);
+        this.pool = [probe];
+        fragment.appendChild(probe);
+        for (var i = 1; i < poolSize; i++) {
+            var row = this.createRow();
+            this.pool.push(row);
+            fragment.appendChild(row);
+        }
+        fragment.appendChild(this.bottomSpacer);
+        this.tbody.replaceChildren(fragment);
+
+        this.first = -1;
+        this.renderWindow();
+        this.scroller.addEventListener('scroll', this.onScroll, { passive: true });
+    };
+
+    /**
+     * Refill the row pool for the current scroll position.
+     */
+    VirtualTable.prototype.renderWindow = function () {
+        var started = performance.now();
+        var bodyTop = this.tbody.offsetTop;
+        var visibleFirst = Math.floor(Math.max(0, this.scroller.scrollTop - bodyTop) / this.rowPx);
+        var first = Math.max(0, Math.min(visibleFirst - OVERSCAN, this.rows.length - this.pool.length));
+        if (first === this.first) {
+            return;
+        }
+        this.first = first;
+
+        for (var i = 0; i < this.pool.length; i++) {
+            this.fillRow(this.pool[i], this.rows[first + i]);
+        }
+        this.topSpacer.firstChild.style.height = (first * this.rowPx) + 'px';
+        this.bottomSpacer.firstChild.style.height = ((this.rows.length - first - this.pool.length) * this.rowPx) + 'px';
+
+        var elapsed = performance.now() - started;
+        this.stats.windowUpdates += 1;
+        this.stats.totalUpdateMs += elapsed;
+        this.stats.maxUpdateMs = Math.max(this.stats.maxUpdateMs, elapsed);
+    };
+
+    VirtualTable.prototype.teardown = function () {
+        if (this.windowed) {
+            this.scroller.removeEventListener('scroll', this.onScroll);
+            this.scroller.style.maxHeight = '';
+            this.scroller.style.overflowY = '';
+            this.windowed = false;
+        }
+        if (this.frameId !== null) {
+            cancelAnimationFrame(this.frameId);
+            this.frameId = null;
+        }
+        this.pool = [];
+    };
+
+    /**
+     * Number of <tr> elements currently holding data.
+     */
+    VirtualTable.prototype.renderedRows = function () {
+        return this.windowed ? this.pool.length : this.tbody.children.length;
+    };
+
+    VirtualTable.FULL_RENDER_LIMIT = FULL_RENDER_LIMIT;
+
+    return VirtualTable;
+})();
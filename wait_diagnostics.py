@@ -0,0 +1,259 @@
+"""
+How long each WebDriverWait and element lookup actually waited.
+
+A pytest plugin, loaded by conftest.py. `pytest --wait-report` records
+every WebDriverWait(...).until()/until_not() and every find_element(s)
+call a test makes, with:
+
+  condition   the expected_conditions function (url_contains, ...) or
+              where the lambda is defined; `find_element(s)` for lookups
+  locator     the (By, value) or URL the condition was given
+  waited      seconds until the condition held or the wait gave up
+  timeout     the wait's timeout; for lookups the driver's implicit wait
+  outcome     ok, timeout (TimeoutException), empty (find_elements found
+              nothing), missing (NoSuchElementException) or error
+  site        the test code line that started the wait
+
+Lookups made by a condition while a wait polls it are part of that wait.
+At the end of the run the slowest waits are listed, slowest first, and the
+call sites are ranked by total time waited. Waits that held but used
+NEAR_TIMEOUT or more of their timeout are marked `!`: they pass today and
+time out on a slower machine. `--wait-report-json` also writes every
+recorded wait to a file.
+
+Examples:
+    pytest test_system_flow.py --wait-report
+    pytest --wait-report --wait-report-top 50 --wait-report-json waits.json
+"""
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+import pytest
+
+TOP = 20
+# Share of its timeout a successful wait may use before it is marked
+NEAR_TIMEOUT = 0.8
+
+Wait = namedtuple("Wait", "nodeid condition locator waited timeout outcome site")
+
+# Modules whose frames are skipped when looking for the line that started a wait
+INTERNAL = ("selenium", __name__, "phase_timing")
+
+
+# -------------------- Describing waits --------------------
+def format_locator(value):
+    if isinstance(value, tuple) and len(value) == 2:
+        return f"{value[0]}={value[1]}"
+    return None if value is None else repr(value)
+
+
+def describe(method):
+    """(condition, locator) of a WebDriverWait condition."""
+    code = getattr(method, "__code__", None)
+    if code is None:
+        # Class-based conditions and other callables
+        return type(method).__name__, format_locator(getattr(method, "locator", None) or getattr(method, "url", None))
+    if method.__name__ == "<lambda>":
+        return f"lambda at {os.path.basename(code.co_filename)}:{code.co_firstlineno}", None
+    # expected_conditions return closures: url_contains.<locals>._predicate
+    condition = method.__qualname__.split(".<locals>")[0]
+    locator = None
+    for cell in method.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], str):
+            return condition, format_locator(value)
+        if isinstance(value, str):
+            locator = value
+    return condition, format_locator(locator)
+
+
+def call_site():
+    """file:line (function) of the first frame outside Selenium and the timing plugins."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__", "").startswith(INTERNAL):
+        frame = frame.f_back
+    if frame is None:
+        return None
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+# -------------------- Recording --------------------
+class WaitRecorder:
+    def __init__(self):
+        self.nodeid = None
+        self.depth = 0
+        self.waits = []
+
+    def timed(self, condition, locator, timeout, function, *args, **kwargs):
+        if self.depth or self.nodeid is None:
+            return function(*args, **kwargs)
+        # Only reached through the wrapped Selenium methods, so this import is already loaded
+        from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+        site = call_site()
+        self.depth += 1
+        outcome = "ok"
+        started = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+            if result == []:
+                outcome = "empty"
+            return result
+        except TimeoutException:
+            outcome = "timeout"
+            raise
+        except NoSuchElementException:
+            outcome = "missing"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self.depth -= 1
+            self.waits.append(Wait(self.nodeid, condition, locator, time.perf_counter() - started,
+                                   timeout, outcome, site))
+
+
+def instrument(recorder):
+    """Wrap the waits and lookups; returns a function that undoes it."""
+    # Imported here so the plugin loads, and the pure tests run, without Selenium
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+    from selenium.webdriver.support.wait import WebDriverWait
+
+    originals = [(owner, name, getattr(owner, name)) for owner, name in (
+        (WebDriverWait, "until"), (WebDriverWait, "until_not"), (WebDriver, "implicitly_wait"),
+        (WebDriver, "find_element"), (WebDriver, "find_elements"),
+        (WebElement, "find_element"), (WebElement, "find_elements"),
+    )]
+    wrapped = {(owner, name): original for owner, name, original in originals}
+
+    def wait(name):
+        original = wrapped[WebDriverWait, name]
+
+        def until(self, method, *args, **kwargs):
+            condition, locator = describe(method)
+            if name == "until_not":
+                condition = f"not {condition}"
+            return recorder.timed(condition, locator, self._timeout, original, self, method, *args, **kwargs)
+        return until
+
+    def find(owner, name):
+        original = wrapped[owner, name]
+
+        def find_element(self, by="id", value=None):
+            driver = self if owner is WebDriver else self.parent
+            return recorder.timed(name, format_locator((by, value)), getattr(driver, "_recorded_implicit_wait", 0),
+                                  original, self, by, value)
+        return find_element
+
+    def implicitly_wait(self, time_to_wait):
+        # The driver cannot be asked cheaply, so remember what it was told
+        self._recorded_implicit_wait = time_to_wait
+        return wrapped[WebDriver, "implicitly_wait"](self, time_to_wait)
+
+    WebDriverWait.until = wait("until")
+    WebDriverWait.until_not = wait("until_not")
+    WebDriver.implicitly_wait = implicitly_wait
+    for owner in (WebDriver, WebElement):
+        for name in ("find_element", "find_elements"):
+            setattr(owner, name, find(owner, name))
+
+    def undo():
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+    return undo
+
+
+# -------------------- Reports --------------------
+def near_timeout(wait):
+    return wait.outcome == "ok" and wait.timeout and wait.waited >= wait.timeout * NEAR_TIMEOUT
+
+
+def slowest(waits, top=TOP):
+    return sorted(waits, key=lambda w: w.waited, reverse=True)[:top]
+
+
+def by_site(waits, top=TOP):
+    """[(site, condition, calls, total s, max s, timeout)] ranked by total time waited."""
+    sites = {}
+    for w in waits:
+        key = (w.site, w.condition)
+        calls, total, longest, timeout = sites.get(key, (0, 0.0, 0.0, w.timeout))
+        sites[key] = (calls + 1, total + w.waited, max(longest, w.waited), max(timeout or 0, w.timeout or 0))
+    ranked = sorted(sites.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    return [(site, condition, *stats) for (site, condition), stats in ranked]
+
+
+def format_report(waits, top=TOP):
+    lines = [f"{'waited':>8} {'timeout':>8}  {'outcome':<8} condition / locator / site / test"]
+    for w in slowest(waits, top):
+        mark = "!" if near_timeout(w) else " "
+        timeout = f"{w.timeout:g}s" if w.timeout is not None else "-"
+        lines.append(f"{w.waited:>7.2f}s {timeout:>8}{mark} {w.outcome:<8} {w.condition} {w.locator or ''}".rstrip())
+        lines.append(f"{'':>28}{w.site}  {w.nodeid}")
+    lines += ["", f"{'total':>8} {'max':>8} {'calls':>6}  site / condition"]
+    for site, condition, calls, total, longest, timeout in by_site(waits, top):
+        lines.append(f"{total:>7.2f}s {longest:>7.2f}s {calls:>6}  {site}  {condition} (timeout {timeout:g}s)")
+    return "\n".join(lines)
+
+
+# -------------------- Pytest plugin --------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("wait-report", "wait-time diagnostics")
+    group.addoption("--wait-report", action="store_true",
+                    help="record every WebDriverWait and element lookup and rank the slowest")
+    group.addoption("--wait-report-top", type=int, default=TOP, help=f"waits and call sites to list (default {TOP})")
+    group.addoption("--wait-report-json", default=None, help="also write every recorded wait to this file")
+
+
+def pytest_configure(config):
+    if config.getoption("wait_report"):
+        config._wait_recorder = WaitRecorder()
+        config._wait_undo = instrument(config._wait_recorder)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_unconfigure(config):
+    # After phase_timing has unwrapped, as it wrapped these methods over ours
+    if getattr(config, "_wait_recorder", None) is not None:
+        config._wait_undo()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    recorder = getattr(item.config, "_wait_recorder", None)
+    if recorder is not None:
+        recorder.nodeid = item.nodeid
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_teardown(item, nextitem):
+    recorder = getattr(item.config, "_wait_recorder", None)
+    if recorder is not None:
+        recorder.nodeid = None
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    recorder = getattr(config, "_wait_recorder", None)
+    if recorder is None:
+        return
+    path = config.getoption("wait_report_json")
+    if path:
+        with open(path, "w") as f:
+            json.dump([w._asdict() for w in recorder.waits], f, indent=1)
+    terminalreporter.section("Slowest waits")
+    if not recorder.waits:
+        terminalreporter.write_line("No waits recorded")
+        return
+    waited = sum(w.waited for w in recorder.waits)
+    terminalreporter.write_line(f"{len(recorder.waits)} waits and lookups, {waited:.1f} s in total; "
+                                f"! = held after {NEAR_TIMEOUT:.0%} or more of its timeout")
+    for line in format_report(recorder.waits, config.getoption("wait_report_top")).splitlines():
+        terminalreporter.write_line(line)